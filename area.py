@@ -1,4 +1,4 @@
-from typing import Union
+from typing import Iterable, Union
 import math
 import pandas as pd
 
@@ -24,6 +24,41 @@ class Area:
                 ):
         self.etabs = etabs
         self.SapModel = etabs.SapModel
+        self._label_index = None
+
+    def get_label_index(self, refresh: bool=False):
+        '''
+        return the name <-> (label, story) index of areas, it reads
+        'Area Assignments - Summary' once until invalidate_label_index
+        '''
+        if refresh or self._label_index is None:
+            from label_index import LabelIndex
+            table_key = 'Area Assignments - Summary'
+            df = self.etabs.database.read(table_key, to_dataframe=True, cols=['UniqueName', 'Label', 'Story'])
+            self._label_index = LabelIndex.from_dataframe(df)
+        return self._label_index
+
+    def invalidate_label_index(self):
+        '''
+        call it when areas are added or deleted
+        '''
+        self._label_index = None
+
+    def get_label_and_story(self, name: str) -> tuple:
+        '''
+        return (label, story) of area like GetLabelFromName, ('', '') for unknown area
+        '''
+        refreshed = self._label_index is None
+        ret = self.get_label_index().label_story(name)
+        if ret is None and not refreshed:
+            ret = self.get_label_index(refresh=True).label_story(name)
+        return ('', '') if ret is None else ret
+
+    def get_name_from_label(self, label: str, story: str) -> Union[str, None]:
+        '''
+        return the name of area with label on story like GetNameFromLabel, None if there is no area
+        '''
+        return self.get_label_index().name(label, story)
 
     def set_pier(self,
                  names: list,
@@ -38,6 +73,7 @@ class Area:
             names = [names]
         for name in names:
             self.SapModel.AreaObj.Delete(name)
+        self.invalidate_label_index()
 
     def get_piers(self,
                   names: Union[str, list, None]=None,
@@ -55,7 +91,7 @@ class Area:
             names = self.get_all_names()
         if isinstance(names, str):
             names = [names]
-        return {name: self.SapModel.AreaObj.GetLabelFromName(name)[:-1] for name in names}
+        return {name: self.get_label_and_story(name) for name in names}
     
     def get_all_names(self) ->  list:
         try:
@@ -208,6 +244,7 @@ class Area:
             ret = self.SapModel.AreaObj.AddByCoord(n, xs, ys, zs)
         else:
             ret = self.SapModel.AreaObj.AddByCoord(n, xs, ys, zs, '', prop_name)
+        self.invalidate_label_index()
         return ret[3]
 
     def export_freecad_openings(self, doc : 'App.Document' = None):
@@ -620,13 +657,42 @@ class Area:
             self.reset_slab_sections_modifiers()
         if len(slab_names) == 0:
             slab_names = self.get_slab_names()
+        import modifiers
         mod_names = [f11, f22, f12, m11, m22, m12, v13, v23, mass, weight]
-        for name in slab_names:
-            modifiers = list(self.SapModel.AreaObj.GetModifiers(name)[0])
-            for i, mod in enumerate(mod_names):    
-                if mod:
-                    modifiers[i] = mod
-            self.SapModel.AreaObj.SetModifiers(name, modifiers)
+        table = self.get_modifier_table()
+        df = table.read(slab_names)
+        for col, mod in zip(modifiers.AREA_MODIFIER_COLUMNS, mod_names):
+            if mod:
+                df[col] = float(mod)
+        table.write(df)
+
+    def get_modifier_table(self):
+        '''
+        return the table of areas stiffness modifiers, see modifiers.ModifierTable
+        '''
+        from modifiers import ModifierTable
+        return ModifierTable.areas(self.etabs)
+
+    def get_modifiers(self,
+            names: Union[Iterable, None] = None,
+            ) -> pd.DataFrame:
+        '''
+        return the stiffness modifiers of names or all areas with one table read
+        '''
+        return self.get_modifier_table().read(names)
+
+    def set_drift_modifiers(self,
+            i_wall: float = 1,
+            i_floor: float = 0.25 * 1.5,
+            ):
+        '''
+        set the modifiers of walls and floors for drift periods, see
+        modifiers.drift_area_modifiers
+        '''
+        import modifiers
+        table = self.get_modifier_table()
+        df = modifiers.drift_area_modifiers(table.read(), i_wall, i_floor)
+        return table.write(df)
     
     def save_as_deflection_filename(self,
                                     slab_name: str,
@@ -638,7 +704,7 @@ class Area:
             import os
             os.mkdir(str(deflection_path))
         if not filename:
-            label, story, _ = self.SapModel.AreaObj.GetLabelFromName(slab_name)
+            label, story = self.get_label_and_story(slab_name)
             filename = f'deflection_{label}_{story}.EDB'
             print(f'Save file as {filename} ...')
             self.SapModel.File.Save(str(deflection_path / filename))
@@ -827,6 +893,7 @@ class Area:
         else:
             for area in areas:
                 self.SapModel.AreaObj.Delete(area)
+        self.invalidate_label_index()
 
     def get_points_coordinate_of_all_areas(self,
                                            type_: str='floor', # 'wall'
@@ -0,0 +1,300 @@
+'''
+Incremental backups of model files.
+
+The model file is split into chunks, each chunk is stored once, compressed and
+named by its hash, so backups of a model that changes a little share most of
+their chunks. A backup is a small json manifest with the list of chunks:
+
+    backups/
+        .store/chunks/ab/ab12....z
+        .store/manifests/BACKUP_model_1.json
+
+    store = BackupStore(model_path.parent / 'backups')
+    name = store.backup(model_path).name
+    store.restore(name, model_path.with_name('restored.EDB'))
+
+The file must not be written while it is read, a backup that sees the size or
+modification time of the file change reads it again.
+'''
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Union
+import datetime
+import hashlib
+import json
+import os
+import threading
+import zlib
+
+
+__all__ = ['BackupStore', 'Manifest']
+
+CHUNK_SIZE = 4 * 1024 * 1024
+
+
+@dataclass
+class Manifest:
+    name: str
+    source: str
+    size: int
+    mtime_ns: int
+    created: str
+    chunks: list = field(default_factory=list)
+
+    @property
+    def created_time(self) -> datetime.datetime:
+        return datetime.datetime.fromisoformat(self.created)
+
+
+class BackupStore:
+    def __init__(self,
+                 root: Union[str, Path],
+                 keep_last: Union[int, None] = None,
+                 max_age_days: Union[float, None] = None,
+                 chunk_size: int = CHUNK_SIZE,
+                 compress_level: int = 1,
+                 retries: int = 3,
+                 ):
+        '''
+        root: backups folder, keep_last and max_age_days are the retention
+        policies that prune runs after each backup, None disables them
+        retries: number of times the file is read again when it changes
+            during the backup
+        '''
+        self.root = Path(root)
+        self.chunks_path = self.root / '.store' / 'chunks'
+        self.manifests_path = self.root / '.store' / 'manifests'
+        self.keep_last = keep_last
+        self.max_age_days = max_age_days
+        self.chunk_size = chunk_size
+        self.compress_level = compress_level
+        self.retries = retries
+        self._executor = None
+        self._lock = threading.RLock()
+
+    # chunks
+
+    def chunk_path(self, digest: str) -> Path:
+        return self.chunks_path / digest[:2] / f'{digest}.z'
+
+    def write_chunk(self, data: bytes) -> str:
+        digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+        path = self.chunk_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f'.{threading.get_ident()}.tmp')
+            tmp.write_bytes(zlib.compress(data, self.compress_level))
+            os.replace(tmp, path)
+        return digest
+
+    def read_chunk(self, digest: str) -> bytes:
+        return zlib.decompress(self.chunk_path(digest).read_bytes())
+
+    # manifests
+
+    def manifest_path(self, name: str) -> Path:
+        return self.manifests_path / f'{Path(name).stem}.json'
+
+    def write_manifest(self, manifest: Manifest) -> None:
+        self.manifests_path.mkdir(parents=True, exist_ok=True)
+        path = self.manifest_path(manifest.name)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(manifest.__dict__))
+        os.replace(tmp, path)
+
+    def read_manifest(self, name: str) -> Manifest:
+        path = self.manifest_path(name)
+        if not path.exists():
+            raise FileNotFoundError(f'There is no backup with name {name}')
+        return Manifest(**json.loads(path.read_text()))
+
+    def manifests(self, source: Union[str, Path, None] = None) -> list:
+        '''
+        return manifests of source or all sources, older first
+        '''
+        if not self.manifests_path.exists():
+            return []
+        manifests = [Manifest(**json.loads(path.read_text()))
+                     for path in self.manifests_path.glob('*.json')]
+        if source is not None:
+            source = str(Path(source).name)
+            manifests = [m for m in manifests if m.source == source]
+        return sorted(manifests, key=lambda m: (m.created, m.name))
+
+    def backup_names(self, source: Union[str, Path, None] = None) -> list:
+        return [m.name for m in self.manifests(source)]
+
+    def next_name(self, source: Union[str, Path]) -> str:
+        source = Path(source)
+        prefix = f'BACKUP_{source.stem}_'
+        max_num = 0
+        names = self.backup_names(source)
+        # full copies of older versions
+        if self.root.exists():
+            names += [p.stem for p in self.root.glob(f'{prefix}*{source.suffix}')]
+        for name in names:
+            try:
+                max_num = max(max_num, int(Path(name).stem[len(prefix):]))
+            except ValueError:
+                continue
+        return f'{prefix}{max_num + 1}'
+
+    # backup and restore
+
+    def read_chunks(self, source: Union[str, Path]) -> list:
+        '''
+        write the chunks of source file and return their hashes
+        '''
+        chunks = []
+        with open(source, 'rb') as f:
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    break
+                chunks.append(self.write_chunk(data))
+        return chunks
+
+    def backup(self,
+               source: Union[str, Path],
+               name: Union[str, None] = None,
+               ) -> Manifest:
+        '''
+        backup source file and return its manifest, only the chunks that are
+        not in the store are written
+        '''
+        source = Path(source)
+        with self._lock:
+            if name is None:
+                name = self.next_name(source)
+            previous = self.manifests(source)
+            for _ in range(self.retries + 1):
+                stat = source.stat()
+                if (previous and
+                    previous[-1].size == stat.st_size and
+                    previous[-1].mtime_ns == stat.st_mtime_ns
+                    ):
+                    # file does not change from the last backup
+                    chunks = list(previous[-1].chunks)
+                    break
+                chunks = self.read_chunks(source)
+                after = source.stat()
+                if (after.st_size, after.st_mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                    break
+            else:
+                # chunks of the torn reads
+                self.collect_garbage()
+                raise RuntimeError(f'{source} changed while it was backed up')
+            manifest = Manifest(
+                name=Path(name).stem,
+                source=source.name,
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                created=datetime.datetime.now().isoformat(),
+                chunks=chunks,
+                )
+            self.write_manifest(manifest)
+        self.prune(source)
+        return manifest
+
+    def backup_async(self,
+                     source: Union[str, Path],
+                     name: Union[str, None] = None,
+                     ) -> Future:
+        '''
+        backup source in a background thread, backups run one after another.
+        The caller must not write source until the Future is done, call wait
+        before saving the model.
+        '''
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='backup')
+        return self._executor.submit(self.backup, source, name)
+
+    def wait(self) -> None:
+        '''
+        wait for the background backups
+        '''
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def restore(self,
+                name: str,
+                target: Union[str, Path],
+                verify: bool = False,
+                ) -> Path:
+        '''
+        write the backup to target file, if verify, the hash of chunks are checked
+        '''
+        manifest = self.read_manifest(name)
+        target = Path(target)
+        tmp = target.with_name(f'{target.name}.tmp')
+        try:
+            with open(tmp, 'wb') as f:
+                for digest in manifest.chunks:
+                    data = self.read_chunk(digest)
+                    if verify and hashlib.blake2b(data, digest_size=20).hexdigest() != digest:
+                        raise ValueError(f'Chunk {digest} of backup {name} is corrupted')
+                    f.write(data)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        os.replace(tmp, target)
+        return target
+
+    # retention
+
+    def remove(self, name: str, collect: bool = True) -> None:
+        with self._lock:
+            self.manifest_path(name).unlink(missing_ok=True)
+            if collect:
+                self.collect_garbage()
+
+    def prune(self, source: Union[str, Path, None] = None) -> list:
+        '''
+        remove backups of source by retention policies and return the removed names
+        '''
+        manifests = self.manifests(source)
+        removed = []
+        if self.max_age_days is not None:
+            limit = datetime.datetime.now() - datetime.timedelta(days=self.max_age_days)
+            removed += [m.name for m in manifests[:-1] if m.created_time < limit]
+        if self.keep_last is not None and len(manifests) > self.keep_last:
+            removed += [m.name for m in manifests[:len(manifests) - self.keep_last]]
+        removed = list(dict.fromkeys(removed))
+        if removed:
+            for name in removed:
+                self.remove(name, collect=False)
+            self.collect_garbage()
+        return removed
+
+    def collect_garbage(self) -> int:
+        '''
+        remove chunks that no backup uses and return the number of them
+        '''
+        if not self.chunks_path.exists():
+            return 0
+        with self._lock:
+            used = set()
+            for manifest in self.manifests():
+                used.update(manifest.chunks)
+            n = 0
+            for path in self.chunks_path.glob('*/*.z'):
+                if path.stem not in used:
+                    path.unlink()
+                    n += 1
+        return n
+
+    def clear(self) -> None:
+        for name in self.backup_names():
+            self.remove(name, collect=False)
+        self.collect_garbage()
+
+    def nbytes(self) -> int:
+        '''
+        size of the stored chunks in bytes
+        '''
+        if not self.chunks_path.exists():
+            return 0
+        return sum(path.stat().st_size for path in self.chunks_path.glob('*/*.z'))
@@ -0,0 +1,214 @@
+'''
+Opt-in profiler of the COM calls of an EtabsModel.
+
+    profiler = etabs.start_com_profiler()
+    etabs.frame_obj.get_beams_columns()
+    etabs.stop_com_profiler()
+    profiler.to_dataframe()
+    profiler.export_flamegraph('etabs_api.folded')
+
+Each COM method call is recorded with its latency and payload size (number
+of values passed and returned) and is attributed to the etabs_api methods on
+the call stack, e.g. FrameObj.get_beams_columns.
+'''
+
+from pathlib import Path
+from typing import Union
+import functools
+import sys
+import time
+
+import pandas as pd
+
+
+__all__ = ['ComProfiler', 'ComProxy', 'install', 'uninstall']
+
+package_path = Path(__file__).parent
+_PLAIN_TYPES = (int, float, str, bytes, bool, tuple, list, dict, type(None))
+_IGNORED_FILES = {'com_profiler.py', 'offline_sap_model.py', 'python_functions.py'}
+
+
+def payload_size(value) -> int:
+    '''
+    number of scalar values in nested tuples and lists
+    '''
+    if isinstance(value, (tuple, list)):
+        return sum(payload_size(v) for v in value)
+    return 1
+
+
+class ComProfiler:
+    def __init__(self):
+        # (stack, method) : [calls, time, payload]
+        self.stats = {}
+
+    def reset(self):
+        self.stats.clear()
+
+    @staticmethod
+    def caller_stack() -> tuple:
+        '''
+        return the etabs_api methods on the call stack from outer to inner,
+        like ('EtabsModel.get_drift_periods', 'FrameObj.get_beams_columns')
+        '''
+        stack = []
+        frame = sys._getframe(2)
+        while frame is not None:
+            filename = Path(frame.f_code.co_filename)
+            if filename.parent == package_path and filename.name not in _IGNORED_FILES:
+                self_ = frame.f_locals.get('self', None)
+                if self_ is not None:
+                    stack.append(f'{type(self_).__name__}.{frame.f_code.co_name}')
+                else:
+                    stack.append(f'{filename.stem}.{frame.f_code.co_name}')
+            frame = frame.f_back
+        return tuple(reversed(stack))
+
+    def call(self, method, func, *args, **kwargs):
+        stack = self.caller_stack()
+        payload = payload_size(args) + payload_size(tuple(kwargs.values()))
+        start = time.perf_counter()
+        try:
+            ret = func(*args, **kwargs)
+        except Exception:
+            self.record(stack, method, time.perf_counter() - start, payload)
+            raise
+        self.record(stack, method, time.perf_counter() - start, payload + payload_size(ret))
+        return ret
+
+    def record(self, stack, method, elapsed, payload):
+        stat = self.stats.get((stack, method), None)
+        if stat is None:
+            self.stats[(stack, method)] = [1, elapsed, payload]
+        else:
+            stat[0] += 1
+            stat[1] += elapsed
+            stat[2] += payload
+
+    @property
+    def total_calls(self) -> int:
+        return sum(stat[0] for stat in self.stats.values())
+
+    @property
+    def total_time(self) -> float:
+        return sum(stat[1] for stat in self.stats.values())
+
+    def to_dataframe(self,
+                     by: Union[str, list, None]=None,
+                     ) -> pd.DataFrame:
+        '''
+        return Method, Caller, Calls, Time, MeanTime and Payload columns sorted by Time,
+        by: 'Method', 'Caller' or ['Caller', 'Method'] to sum the calls
+        '''
+        data = []
+        for (stack, method), (calls, elapsed, payload) in self.stats.items():
+            caller = stack[-1] if stack else '<module>'
+            data.append((method, caller, calls, elapsed, payload))
+        df = pd.DataFrame(data, columns=['Method', 'Caller', 'Calls', 'Time', 'Payload'])
+        if by is not None:
+            df = df.groupby(by, as_index=False)[['Calls', 'Time', 'Payload']].sum()
+        df['MeanTime'] = df['Time'] / df['Calls']
+        return df.sort_values('Time', ascending=False, ignore_index=True)
+
+    def collapsed_stacks(self) -> list:
+        '''
+        return the calls in collapsed stack format of flame graph tools,
+        'caller1;caller2;SapModel.FrameObj.GetDesignOrientation time_in_microseconds'
+        '''
+        weights = {}
+        for (stack, method), (_, elapsed, _) in self.stats.items():
+            key = ';'.join(stack + (f'SapModel.{method}',))
+            weights[key] = weights.get(key, 0) + elapsed
+        return [f'{key} {max(round(elapsed * 1e6), 1)}' for key, elapsed in sorted(weights.items())]
+
+    def export_flamegraph(self,
+                          filename: Union[str, Path],
+                          ) -> Path:
+        '''
+        write the collapsed stacks for flamegraph.pl, speedscope or inferno
+        '''
+        filename = Path(filename)
+        filename.write_text('\n'.join(self.collapsed_stacks()) + '\n')
+        return filename
+
+
+class ComProxy:
+    '''
+    Wrap a COM object and record the calls of its methods and sub-objects
+    '''
+    def __init__(self, obj, profiler: ComProfiler, path: str=''):
+        object.__setattr__(self, '_obj', obj)
+        object.__setattr__(self, '_profiler', profiler)
+        object.__setattr__(self, '_path', path)
+        object.__setattr__(self, '_children', {})
+
+    def __getattr__(self, name):
+        attr = getattr(self._obj, name)
+        path = f'{self._path}.{name}' if self._path else name
+        if callable(attr):
+            return functools.partial(self._profiler.call, path, attr)
+        if isinstance(attr, _PLAIN_TYPES):
+            return attr
+        child = self._children.get(name, None)
+        if child is None or child._obj is not attr:
+            child = ComProxy(attr, self._profiler, path)
+            self._children[name] = child
+        return child
+
+    def __setattr__(self, name, value):
+        setattr(self._obj, name, value)
+
+    def __repr__(self):
+        return f'ComProxy({self._obj!r})'
+
+
+def _is_package_object(obj) -> bool:
+    module = sys.modules.get(type(obj).__module__, None)
+    filename = getattr(module, '__file__', None)
+    return filename is not None and Path(filename).parent == package_path
+
+
+def _model_objects(etabs):
+    '''
+    yield etabs and the etabs_api objects that are reachable from its
+    attributes, like etabs.frame_obj and the helpers of etabs.frame_obj
+    '''
+    seen = set()
+    stack = [etabs]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, ComProxy):
+            continue
+        seen.add(id(obj))
+        yield obj
+        for value in vars(obj).values():
+            if hasattr(value, '__dict__') and _is_package_object(value):
+                stack.append(value)
+
+
+def install(etabs, profiler: Union[ComProfiler, None]=None) -> ComProfiler:
+    '''
+    replace the SapModel of etabs and of all of its etabs_api objects, nested
+    or not, with a profiled proxy
+    '''
+    if profiler is None:
+        profiler = ComProfiler()
+    uninstall(etabs)
+    sap_model = etabs.SapModel
+    proxy = ComProxy(sap_model, profiler)
+    for obj in list(_model_objects(etabs)):
+        if obj is not sap_model and getattr(obj, 'SapModel', None) is sap_model:
+            obj.SapModel = proxy
+    etabs.com_profiler = profiler
+    return profiler
+
+
+def uninstall(etabs) -> Union[ComProfiler, None]:
+    '''
+    restore the original SapModel, return the profiler
+    '''
+    for obj in list(_model_objects(etabs)):
+        sap_model = getattr(obj, 'SapModel', None)
+        if isinstance(sap_model, ComProxy):
+            obj.SapModel = sap_model._obj
+    return getattr(etabs, 'com_profiler', None)
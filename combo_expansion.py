@@ -0,0 +1,179 @@
+'''
+Expansion of load combinations that use expanded load cases.
+
+When a load case like EXALL is replaced with EX, EPX and ENX, each linear
+combination that uses it is replaced with one combination for each of them,
+COMB1 -> COMB1(1/3), COMB1(2/3), COMB1(3/3), and so on for the combinations
+that use those combinations. Envelopes use all the expanded names.
+
+    expansion = ComboExpansion(loadcombos_df, {'EXALL': ['EX', 'EPX', 'ENX']})
+    df, convert_lcombos = expansion.expand()
+    expansion.timings
+
+The combinations are expanded once in the order of their dependencies and
+the rows are concatenated one time at the end.
+'''
+
+from collections import deque
+from typing import Union
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = ['ComboExpansion', 'topological_order']
+
+
+def topological_order(graph: dict) -> list:
+    '''
+    return the nodes of graph, {node: set of nodes that it uses}, each one
+    after the nodes that it uses, with the Kahn algorithm
+    '''
+    users = {node: [] for node in graph}
+    n_uses = {}
+    for node, uses in graph.items():
+        for used in uses:
+            users.setdefault(used, []).append(node)
+        n_uses[node] = len(uses)
+    for node in users:
+        n_uses.setdefault(node, 0)
+    ready = deque(node for node, n in n_uses.items() if n == 0)
+    order = []
+    while ready:
+        node = ready.popleft()
+        order.append(node)
+        for user in users[node]:
+            n_uses[user] -= 1
+            if n_uses[user] == 0:
+                ready.append(user)
+    if len(order) < len(n_uses):
+        cycle = [node for node, n in n_uses.items() if n > 0]
+        raise ValueError(f'Load combinations {cycle} use each other')
+    return order
+
+
+class ComboExpansion:
+    def __init__(self,
+                 loadcombos_df: pd.DataFrame,
+                 expanded_loads: dict,
+                 ):
+        '''
+        loadcombos_df: 'Load Combination Definitions' table,
+        expanded_loads: {load case: [expanded load cases]}
+        '''
+        df = loadcombos_df.reset_index(drop=True)
+        if 'GUID' in df.columns:
+            df = df.drop(columns='GUID')
+        self.df = df
+        self.expanded_loads = {load: list(loads) for load, loads in expanded_loads.items()}
+        # stage : seconds
+        self.timings = {}
+
+    def _record(self, stage: str, start: float) -> None:
+        self.timings[stage] = self.timings.get(stage, 0) + time.perf_counter() - start
+
+    def linear_combos(self) -> pd.DataFrame:
+        return self.df.loc[self.df['Type'] != 'Envelope']
+
+    def envelope_combos(self) -> pd.DataFrame:
+        return self.df.loc[self.df['Type'] == 'Envelope']
+
+    def dependency_graph(self) -> dict:
+        '''
+        {linear combo: set of linear combos that it uses}
+        '''
+        start = time.perf_counter()
+        df = self.linear_combos()
+        graph = {name: set() for name in pd.unique(df['Name'])}
+        uses = df.loc[df['LoadName'].isin(graph.keys())]
+        for name, load in zip(uses['Name'], uses['LoadName']):
+            graph[name].add(load)
+        self._record('graph', start)
+        return graph
+
+    def order(self) -> list:
+        '''
+        linear combos, each one after the combos that it uses
+        '''
+        graph = self.dependency_graph()
+        start = time.perf_counter()
+        order = topological_order(graph)
+        self._record('graph', start)
+        return order
+
+    def expand_linear(self) -> tuple:
+        '''
+        return the linear combos with expanded combos instead of the combos
+        that use expanded loads and {combo: [expanded combos]}
+        '''
+        order = self.order()
+        start = time.perf_counter()
+        df = self.linear_combos()
+        positions = df.groupby('Name', sort=False).indices
+        load_names = df['LoadName'].to_numpy(dtype=object)
+        expanded = dict(self.expanded_loads)
+        # expanded loads are level 0, a combo is one level above its loads
+        levels = dict.fromkeys(expanded, 0)
+        convert_lcombos = {}
+        fragments = []
+        for combo in order:
+            pos = positions[combo]
+            loads = load_names[pos]
+            uses = [load for load in dict.fromkeys(loads) if load in expanded]
+            if not uses:
+                continue
+            # lower levels first, so nested names are like COMB2(1/3)(2/2)
+            uses.sort(key=lambda load: levels[load])
+            lists = [expanded[load] for load in uses]
+            index = np.array(list(itertools.product(*(range(len(l)) for l in lists))),
+                             dtype=int).reshape(-1, len(uses))
+            new_loads = np.tile(loads, (len(index), 1))
+            for j, load in enumerate(uses):
+                choices = np.asarray(lists[j], dtype=object)[index[:, j]]
+                new_loads[:, loads == load] = choices[:, None]
+            names = [combo + ''.join(f'({i + 1}/{len(l)})' for i, l in zip(row, lists))
+                     for row in index]
+            fragment = df.iloc[np.tile(pos, len(index))].copy()
+            fragment['Name'] = np.repeat(np.asarray(names, dtype=object), len(pos))
+            fragment['LoadName'] = new_loads.ravel()
+            fragments.append(fragment)
+            expanded[combo] = names
+            levels[combo] = max(levels[load] for load in uses) + 1
+            convert_lcombos[combo] = names
+        filt = ~df['Name'].isin(convert_lcombos.keys())
+        df = pd.concat([df.loc[filt]] + fragments, ignore_index=True)
+        self._record('linear', start)
+        return df, convert_lcombos
+
+    def expand_envelope(self,
+                        expanded: Union[dict, None] = None,
+                        ) -> pd.DataFrame:
+        '''
+        return the envelopes with the expanded names instead of the names
+        in expanded, default to the expanded loads
+        '''
+        start = time.perf_counter()
+        if expanded is None:
+            expanded = self.expanded_loads
+        df = self.envelope_combos().copy()
+        df['LoadName'] = [expanded.get(load, load) for load in df['LoadName']]
+        df = df.explode('LoadName', ignore_index=True)
+        self._record('envelope', start)
+        return df
+
+    def expand(self) -> tuple:
+        '''
+        return the expanded 'Load Combination Definitions' table and
+        {combo: [expanded combos]}
+        '''
+        self.timings.clear()
+        df_linear, convert_lcombos = self.expand_linear()
+        expanded = dict(self.expanded_loads)
+        expanded.update(convert_lcombos)
+        df_envelope = self.expand_envelope(expanded)
+        start = time.perf_counter()
+        df = pd.concat([df_linear, df_envelope], ignore_index=True)
+        self._record('concat', start)
+        return df, convert_lcombos
@@ -1,15 +1,159 @@
+from collections import OrderedDict
 from pathlib import Path
 import sys
 from typing import Iterable, Union
 import copy
+import time
 
 from numpy import int16
+import numpy as np
 
 import pandas as pd
 pd.options.mode.chained_assignment = None
 
 
-__all__ = ['DatabaseTables']
+__all__ = ['DatabaseTables', 'TableCache', 'TableCatalogue', 'TABLE_SCHEMAS']
+
+# numeric columns of tables, read(table_key, schema=True) converts them to float64
+TABLE_SCHEMAS = {
+    'Point Object Connectivity': ('X', 'Y', 'Z'),
+    'Objects and Elements - Joints': ('GlobalX', 'GlobalY', 'GlobalZ'),
+    'Joint Displacements': ('Ux', 'Uy', 'Uz', 'Rx', 'Ry', 'Rz'),
+    'Joint Reactions': ('FX', 'FY', 'FZ', 'MX', 'MY', 'MZ'),
+    'Base Reactions': ('FX', 'FY', 'FZ', 'MX', 'MY', 'MZ', 'X', 'Y', 'Z'),
+    'Element Forces - Beams': ('Station', 'P', 'V2', 'V3', 'T', 'M2', 'M3'),
+    'Element Forces - Columns': ('Station', 'P', 'V2', 'V3', 'T', 'M2', 'M3'),
+    'Story Forces': ('P', 'VX', 'VY', 'T', 'MX', 'MY'),
+    'Section Cut Forces - Analysis': ('F1', 'F2', 'F3', 'M1', 'M2', 'M3'),
+    'Story Definitions': ('Height',),
+    'Frame Section Property Definitions - Concrete Rectangular': ('t3', 't2'),
+    'Modal Participating Mass Ratios': ('Period', 'UX', 'UY', 'UZ', 'SumUX', 'SumUY', 'SumUZ',
+                                        'RX', 'RY', 'RZ', 'SumRX', 'SumRY', 'SumRZ'),
+}
+
+
+class TableCache:
+    '''
+    LRU cache of the GetTableForDisplayArray results, the least recently used
+    tables are removed when the size of cached data exceeds max_bytes
+    '''
+    def __init__(self, max_bytes: int=256 * 2 ** 20):
+        self.max_bytes = max_bytes
+        # key : (ret, nbytes)
+        self.tables = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.tables)
+
+    def __contains__(self, key):
+        return key in self.tables
+
+    @staticmethod
+    def size_of(ret) -> int:
+        '''
+        approximate memory size of the fields and data of a table
+        '''
+        size = sys.getsizeof(ret)
+        for item in ret:
+            size += sys.getsizeof(item)
+            if isinstance(item, (tuple, list)):
+                size += sum(sys.getsizeof(value) for value in item)
+        return size
+
+    def get(self, key):
+        item = self.tables.get(key, None)
+        if item is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.tables.move_to_end(key)
+        return list(item[0])
+
+    def put(self, key, ret) -> None:
+        self.remove(key)
+        nbytes = self.size_of(ret)
+        if nbytes > self.max_bytes:
+            return
+        self.tables[key] = (tuple(ret), nbytes)
+        self.nbytes += nbytes
+        while self.nbytes > self.max_bytes:
+            _, (_, size) = self.tables.popitem(last=False)
+            self.nbytes -= size
+
+    def remove(self, key) -> None:
+        item = self.tables.pop(key, None)
+        if item is not None:
+            self.nbytes -= item[1]
+
+    def invalidate(self, table_key: Union[str, None]=None) -> None:
+        '''
+        remove table_key with all display selections, or all tables if it is None
+        '''
+        if table_key is None:
+            self.tables.clear()
+            self.nbytes = 0
+            return
+        for key in [key for key in self.tables if key[0] == table_key]:
+            self.remove(key)
+
+
+class TableCatalogue:
+    '''
+    names of the available tables of the model with a trigram index for
+    substring lookups
+    '''
+    def __init__(self,
+                 names: Iterable=(),
+                 ):
+        self.names = tuple(names)
+        self._names = set(self.names)
+        # trigram : indices of names
+        self.trigrams = {}
+        for i, name in enumerate(self.names):
+            for j in range(len(name) - 2):
+                self.trigrams.setdefault(name[j:j + 3], set()).add(i)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, table_key):
+        return table_key in self._names
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def _candidates(self, partial_str: str) -> Union[set, None]:
+        if len(partial_str) < 3:
+            return None
+        candidates = None
+        for j in range(len(partial_str) - 2):
+            indices = self.trigrams.get(partial_str[j:j + 3], None)
+            if indices is None:
+                return set()
+            candidates = set(indices) if candidates is None else candidates & indices
+            if not candidates:
+                break
+        return candidates
+
+    def containing(self, *partial_strings) -> list:
+        '''
+        return the names that contain all partial_strings in the model order
+        '''
+        candidates = None
+        for partial_str in partial_strings:
+            indices = self._candidates(partial_str)
+            if indices is None:
+                continue
+            candidates = indices if candidates is None else candidates & indices
+        if candidates is None:
+            names = self.names
+        else:
+            names = (self.names[i] for i in sorted(candidates))
+        return [name for name in names if all(partial_str in name for partial_str in partial_strings)]
+
 
 class DatabaseTables:
     def __init__(
@@ -22,35 +166,136 @@ class DatabaseTables:
             self.SapModel = etabs.SapModel
         else:
             self.SapModel = SapModel
+        self.cache = None
+        self.catalogue = None
+        # selected load cases, load combinations and load patterns for display
+        self.display_selection = (None, None, None)
+        # stage : seconds of the last expand_loads
+        self.expand_timings = {}
+
+    def enable_cache(self, max_bytes: int=256 * 2 ** 20) -> TableCache:
+        '''
+        cache the tables that read with read_table until the model changes with
+        apply_data, unlock_model, run_analysis or open_model of EtabsModel.
+        Changes of the model with other COM functions must follow with clear_cache.
+        '''
+        if self.cache is None:
+            self.cache = TableCache(max_bytes)
+        else:
+            self.cache.max_bytes = max_bytes
+        return self.cache
+
+    def disable_cache(self) -> None:
+        self.cache = None
+
+    def clear_cache(self, table_key: Union[str, None]=None) -> None:
+        '''
+        remove table_key from the cached tables, if table_key is None remove
+        all tables and the catalogue of available tables
+        '''
+        if table_key is None:
+            self.catalogue = None
+        if self.cache is not None:
+            self.cache.invalidate(table_key)
+
+    def available_tables(self, refresh: bool=False) -> TableCatalogue:
+        '''
+        return the catalogue of available tables, it fetches once until
+        clear_cache, e.g. by run_analysis, unlock_model or apply_table
+        '''
+        if refresh or self.catalogue is None:
+            names = self.SapModel.DatabaseTables.GetAvailableTables()[1]
+            self.catalogue = TableCatalogue(names or ())
+        return self.catalogue
 
     @staticmethod
-    def reshape_data(FieldsKeysIncluded, table_data):
+    def _selection_key(names):
+        if names is None:
+            return None
+        if isinstance(names, str):
+            names = [names] if names else []
+        return tuple(names)
+
+    def set_selected_for_display(self,
+                                 load_cases: Union[list, str, None]=None,
+                                 load_combinations: Union[list, str, None]=None,
+                                 load_patterns: Union[list, None]=None,
+                                 ) -> None:
+        '''
+        select the load cases, load combinations and load patterns of the display tables,
+        None does not change the current selection. The selection is a part of the
+        cached table keys.
+        '''
+        cases, combos, patterns = self.display_selection
+        if load_cases is not None:
+            self.SapModel.DatabaseTables.SetLoadCasesSelectedForDisplay(load_cases)
+            cases = self._selection_key(load_cases)
+        if load_combinations is not None:
+            self.SapModel.DatabaseTables.SetLoadCombinationsSelectedForDisplay(load_combinations)
+            combos = self._selection_key(load_combinations)
+        if load_patterns is not None:
+            self.SapModel.DatabaseTables.SetLoadPatternsSelectedForDisplay(load_patterns)
+            patterns = self._selection_key(load_patterns)
+        self.display_selection = (cases, combos, patterns)
+
+    @staticmethod
+    def reshape_array(FieldsKeysIncluded, table_data) -> np.ndarray:
+        '''
+        return the flat table_data as a 2-D object array, the rows are views of the array
+        '''
         n = len(FieldsKeysIncluded)
-        data = [list(table_data[i:i+n]) for i in range(0, len(table_data), n)]
-        return data
+        return np.asarray(table_data, dtype=object).reshape(-1, n)
+
+    @staticmethod
+    def reshape_data(FieldsKeysIncluded, table_data):
+        return DatabaseTables.reshape_array(FieldsKeysIncluded, table_data).tolist()
+
+    @staticmethod
+    def to_float(array: np.ndarray) -> np.ndarray:
+        '''
+        convert the columns of a 2-D object array to float64, empty or
+        invalid values are nan
+        '''
+        try:
+            return array.astype(np.float64)
+        except (ValueError, TypeError):
+            return np.column_stack(
+                [pd.to_numeric(array[:, i], errors='coerce') for i in range(array.shape[1])]
+                ).astype(np.float64)
 
     @staticmethod
     def reshape_data_to_df(
                 FieldsKeysIncluded,
                 table_data,
                 cols:list=None,
+                schema: Union[Iterable, None]=None,
                 ) -> 'pandas.DataFrame':
-        n = len(FieldsKeysIncluded)
-        data = [list(table_data[i:i+n]) for i in range(0, len(table_data), n)]
-        df = pd.DataFrame(data, columns=FieldsKeysIncluded)
-        if cols is not None:
-            df = df[cols]
+        '''
+        schema: numeric columns that convert to float64
+        '''
+        fields = list(FieldsKeysIncluded)
+        array = DatabaseTables.reshape_array(fields, table_data)
+        if cols is None:
+            cols = fields
+        else:
+            array = array[:, [fields.index(col) for col in cols]]
+        numeric_cols = set() if schema is None else set(schema).intersection(cols)
+        if not numeric_cols:
+            return pd.DataFrame(array, columns=cols)
+        indices = [i for i, col in enumerate(cols) if col in numeric_cols]
+        numeric = DatabaseTables.to_float(array[:, indices])
+        numeric = dict(zip((cols[i] for i in indices), numeric.T))
+        df = pd.DataFrame(
+            {col: numeric[col] if col in numeric else array[:, i] for i, col in enumerate(cols)},
+            columns=cols,
+            )
         return df
 
     def table_exist(self, table_key):
-        all_table = self.SapModel.DatabaseTables.GetAvailableTables()[1]
-        if table_key in all_table:
-            return True
-        return False
-    
-    def table_names_that_containe(self, partial_str):
-        all_table = self.SapModel.DatabaseTables.GetAvailableTables()[1]
-        return [item for item in all_table if partial_str in item]
+        return table_key in self.available_tables()
+
+    def table_names_that_containe(self, *partial_strings):
+        return self.available_tables().containing(*partial_strings)
     
     def table_name_that_containe(self, partial_str):
         names = self.table_names_that_containe(partial_str)
@@ -60,10 +305,9 @@ class DatabaseTables:
         return None
 
     def table_name_that_containe_texts(self, partial_strings: str):
-        names = self.table_names_that_containe(partial_strings[0])
-        for name in names:
-            if all(partial_str in name for partial_str in partial_strings):
-                return name
+        names = self.table_names_that_containe(*partial_strings)
+        if names:
+            return names[0]
         print(f"The Table that contains {' '.join(partial_strings)} did not exists.")
         return None
 
@@ -71,7 +315,12 @@ class DatabaseTables:
                 table_key : str,
                 to_dataframe : bool = False,
                 cols : list = None,
+                schema: Union[bool, Iterable] = False,
                 ):
+        '''
+        schema: numeric columns of dataframe that convert to float64,
+        True for the columns of the table in TABLE_SCHEMAS
+        '''
         ret = self.read_table(table_key)
         if not ret:
             print(f"There is no table data with '{table_key}'")
@@ -80,7 +329,11 @@ class DatabaseTables:
         if fields[0] is None:
             return None
         if to_dataframe:
-            data = self.reshape_data_to_df(fields, data, cols)
+            if schema is True:
+                schema = TABLE_SCHEMAS.get(table_key, None)
+            elif schema is False:
+                schema = None
+            data = self.reshape_data_to_df(fields, data, cols, schema)
         else:
             data = self.reshape_data(fields, data)
         return data
@@ -129,21 +382,110 @@ class DatabaseTables:
         '''
         ret: 0 if the function executes correctly, otherwise returns nonzero
         '''
+        self.clear_cache()
+        if self.etabs is not None:
+            # edited tables can add or delete objects and load patterns
+            self.etabs.frame_obj.invalidate_label_index()
+            self.etabs.area.invalidate_label_index()
+            self.etabs.load_patterns.invalidate_seismic_classification()
         self.SapModel.SetModelIsLocked(False)
         num_fatal_errors, num_error_msgs, num_warn_msgs, num_info_msgs, import_log, ret = \
             self.SapModel.DatabaseTables.ApplyEditedTables(fill_import_log)
         return num_fatal_errors, num_error_msgs, num_warn_msgs, num_info_msgs, import_log, ret
 
-    def read_table(self, table_key):
-        GroupName = table_key
+    def present_unit(self):
+        '''
+        the present unit of the model, e.g. ('kgf', 'm')
+        '''
+        if self.etabs is not None:
+            return tuple(u.lower() for u in self.etabs.get_current_unit())
+        return self.SapModel.GetPresentUnits()
+
+    def read_table(self,
+                   table_key,
+                   group: Union[str, None]=None,
+                   use_cache: bool=True,
+                   ):
+        '''
+        group: read the rows of objects in this group
+        '''
+        GroupName = table_key if group is None else group
         FieldKeyList = []
         TableVersion = 0
         FieldsKeysIncluded = []
         NumberRecords = 0
         TableData = []
+        use_cache = use_cache and self.cache is not None
+        if use_cache:
+            # the values of the table are in the present unit
+            key = (table_key, self.display_selection, self.present_unit())
+            if group is not None:
+                key += (group,)
+            ret = self.cache.get(key)
+            if ret is not None:
+                return ret
         if not self.table_exist(table_key):
             return None
-        return self.SapModel.DatabaseTables.GetTableForDisplayArray(table_key, FieldKeyList, GroupName, TableVersion, FieldsKeysIncluded, NumberRecords, TableData)
+        ret = self.SapModel.DatabaseTables.GetTableForDisplayArray(table_key, FieldKeyList, GroupName, TableVersion, FieldsKeysIncluded, NumberRecords, TableData)
+        if use_cache and ret:
+            self.cache.put(key, ret)
+        return ret
+
+    def iter_read(self,
+                  table_key: str,
+                  load_cases: Union[list, None]=None,
+                  load_combinations: Union[list, None]=None,
+                  groups: Union[list, None]=None,
+                  chunk_size: int=1,
+                  cols: list=None,
+                  schema: Union[bool, Iterable]=True,
+                  ):
+        '''
+        yield the dataframes of table_key for chunks of chunk_size load cases,
+        then load combinations, or for each group, so only one chunk is in memory.
+        The known display selection restores at the end, chunks are not cached.
+        '''
+        if schema is True:
+            schema = TABLE_SCHEMAS.get(table_key, None)
+        elif schema is False:
+            schema = None
+        chunk_size = max(int(chunk_size), 1)
+        previous_selection = self.display_selection
+        selections = []
+        for names, is_case in ((load_cases, True), (load_combinations, False)):
+            if not names:
+                continue
+            names = list(names)
+            for i in range(0, len(names), chunk_size):
+                chunk = names[i:i + chunk_size]
+                if is_case:
+                    selections.append({'load_cases': chunk, 'load_combinations': ''})
+                else:
+                    selections.append({'load_cases': '', 'load_combinations': chunk})
+        if not selections:
+            selections = [None]
+        if not groups:
+            groups = [None]
+        try:
+            for selection in selections:
+                if selection is not None:
+                    self.set_selected_for_display(**selection)
+                for group in groups:
+                    ret = self.read_table(table_key, group=group, use_cache=False)
+                    if not ret:
+                        continue
+                    _, _, fields, _, data, _ = ret
+                    if fields[0] is None:
+                        continue
+                    yield self.reshape_data_to_df(fields, data, cols, schema)
+                    del ret, data
+        finally:
+            if selections != [None]:
+                cases, combos, _ = previous_selection
+                self.set_selected_for_display(
+                    load_cases=None if cases is None else list(cases),
+                    load_combinations=None if combos is None else list(combos),
+                    )
 
     @staticmethod
     def remove_df_columns(df,
@@ -265,7 +607,7 @@ class DatabaseTables:
             df = df.loc[filt]
         filt = ~(df['Name'].isin(multi_load_names))
         df = df.loc[filt]
-        df = df.append(df_expanded)
+        df = pd.concat([df, df_expanded])
         d = {1: 'Yes', 0: 'No'}
         for col in cols:
             df[col] = df[col].map(d)
@@ -288,6 +630,7 @@ class DatabaseTables:
         loadcases_include_zip_loadpatterns = list(loadcases_df.loc[filt]['Name'])
         filt = ~(loadcases_df['Name'].isin(loadcases_include_zip_loadpatterns))
         new_loadcase_df = loadcases_df.loc[filt]
+        fragments = [new_loadcase_df]
         zip_loadcases = dict()
         for loadcase in loadcases_include_zip_loadpatterns:
             filt = loadcases_df['Name'] == loadcase
@@ -304,91 +647,66 @@ class DatabaseTables:
                             new_names.append(name) if name.startswith('-') else new_names.append(f'+{name}')
                         name = ''.join(new_names)
                         append_df['Name'] = name
-                        new_loadcase_df = new_loadcase_df.append(append_df)
+                        fragments.append(append_df)
                         # if load_type == 5:
                         if i == 0:
                             zip_loadcases[loadcase] = [name]
                         else:
                             zip_loadcases[loadcase].append(name)
+        new_loadcase_df = pd.concat(fragments)
         return new_loadcase_df, zip_loadcases
 
     def expand_linear_loadcombos(self,
             loads_expanded : Union[dict, bool] = None,
             loadcombos_df : Union[pd.DataFrame, bool] = None,
             ):
+        '''
+        return the linear load combinations with the expanded combinations
+        instead of the combinations that use loads_expanded directly or
+        through other combinations, and {combo: [expanded combos]}
+        '''
+        from combo_expansion import ComboExpansion
         if loads_expanded is None:
             ret = self.expand_loadcases()
             if ret is None:
                 return
             loads_expanded = ret[1]
-        zip_loadcases = list(loads_expanded.keys())
         if loadcombos_df is None:
             table_key = 'Load Combination Definitions'
             loadcombos_df = self.read(table_key, to_dataframe=True)
-        self.remove_df_columns(loadcombos_df, ('GUID',))
-        # remove envelop combos, because envelopes not to be iterate, must be add
-        envelop_combos = list(loadcombos_df[loadcombos_df['Type'] == 'Envelope']['Name'])
-        filt_envelope = loadcombos_df['Name'].isin(envelop_combos)
-        new_loadcombo_df = loadcombos_df.loc[~filt_envelope]
-        filt = new_loadcombo_df['LoadName'].isin(zip_loadcases)
-        loadcombos_include_zip_loadcases = list(new_loadcombo_df.loc[filt]['Name'].unique())
-        filt = ~(new_loadcombo_df['Name'].isin(loadcombos_include_zip_loadcases))
-        new_loadcombo_df = new_loadcombo_df.loc[filt]
-        zip_loadcombos = dict()
-        for loadcombo in loadcombos_include_zip_loadcases:
-            filt = loadcombos_df['Name'] == loadcombo
-            zip_df = loadcombos_df.loc[filt]
-            load_names = list(zip_df['LoadName'])
-            for zip_loadpat, expand_loaded in loads_expanded.items():
-                n = len(expand_loaded)
-                if zip_loadpat in load_names:
-                    for i, load in enumerate(expand_loaded, start=1):
-                        append_df = zip_df.replace(zip_loadpat, load)
-                        name = f'{loadcombo}({i}/{n})'
-                        append_df['Name'] = name
-                        new_loadcombo_df = new_loadcombo_df.append(append_df)
-                        # if load_type == 5:
-                        if i == 1:
-                            zip_loadcombos[loadcombo] = [name]
-                        else:
-                            zip_loadcombos[loadcombo].append(name)
-        return new_loadcombo_df, zip_loadcombos
+        return ComboExpansion(loadcombos_df, loads_expanded).expand_linear()
 
     def expand_envelop_loadcombos(self,
             loads_expanded : Union[dict, bool] = None,
             loadcombos_df : Union[pd.DataFrame, bool] = None,
             ):
+        from combo_expansion import ComboExpansion
         if loads_expanded is None:
             ret = self.expand_loadcases()
             if ret is None:
                 return
             loads_expanded = ret[1]
-        zip_loadcases = list(loads_expanded.keys())
         if loadcombos_df is None:
             table_key = 'Load Combination Definitions'
             loadcombos_df = self.read(table_key, to_dataframe=True)
-        self.remove_df_columns(loadcombos_df, ('GUID',))
-        # remove envelop combos, because envelopes not to be iterate, must be add
-        envelop_combos = list(loadcombos_df[loadcombos_df['Type'] == 'Envelope']['Name'])
-        filt_envelope = loadcombos_df['Name'].isin(envelop_combos)
-        new_loadcombo_df = loadcombos_df.loc[filt_envelope]
-        filt = new_loadcombo_df['LoadName'].isin(zip_loadcases)
-        df_loadcombos_include_zip_loadcases = new_loadcombo_df.loc[filt]
-        df_loadcombos_not_include_zip_loadcases = new_loadcombo_df.loc[~filt]
-        df_loadcombos_include_zip_loadcases.loc[:, 'LoadName'] = df_loadcombos_include_zip_loadcases.loc[:, 'LoadName'].map(loads_expanded)
-        df_loadcombos_include_zip_loadcases = df_loadcombos_include_zip_loadcases.explode('LoadName')
-        df = df_loadcombos_not_include_zip_loadcases.append(df_loadcombos_include_zip_loadcases)
-        return df
+        return ComboExpansion(loadcombos_df, loads_expanded).expand_envelope()
 
     def expand_loadcombos(self,
-            convert_loadcases : dict):
-        df_linear_combos, convert_lcombos = self.expand_linear_loadcombos(convert_loadcases)
-        additional_convert_lcombos = convert_lcombos.copy()
-        while additional_convert_lcombos:
-            df_linear_combos, additional_convert_lcombos = self.expand_linear_loadcombos(additional_convert_lcombos, df_linear_combos)
-            convert_lcombos.update(additional_convert_lcombos)
-        df_envelop_combos = self.expand_envelop_loadcombos(convert_lcombos)
-        df = df_linear_combos.append(df_envelop_combos)
+            convert_loadcases : dict,
+            loadcombos_df : Union[pd.DataFrame, None] = None,
+            ):
+        '''
+        expand the load combinations in one pass in the order of their
+        dependencies, the time of each stage is in expand_timings
+        '''
+        from combo_expansion import ComboExpansion
+        if loadcombos_df is None:
+            table_key = 'Load Combination Definitions'
+            loadcombos_df = self.read(table_key, to_dataframe=True)
+        expansion = ComboExpansion(loadcombos_df, convert_loadcases)
+        df, convert_lcombos = expansion.expand()
+        for stage, seconds in expansion.timings.items():
+            self.expand_timings[f'load combinations - {stage}'] = seconds
         return df, convert_lcombos
 
     def expand_design_combos(self,
@@ -507,26 +825,40 @@ class DatabaseTables:
             drift_prefix : str = '',
             drift_suffix : str = '_DRIFT',
             ):
+        self.expand_timings = {}
+        start = time.perf_counter()
+        def record(stage):
+            nonlocal start
+            self.expand_timings[stage] = time.perf_counter() - start
+            start = time.perf_counter()
         yield ("Get expanding seismic load patterns ...", 5)
         ret = self.expand_seismic_load_patterns(equal_names, replace_ex, replace_ey, drift_prefix, drift_suffix)
         if ret is None:
             yield ('There is No zip load pattern in this Model.', 100)
             return False
         dflp, convert_lps = ret
+        record('load patterns')
         yield ("Get expanding load cases ...", 15)
         dflc, convert_lcs = self.expand_loadcases(convert_lps)
+        record('load cases')
         yield ("Get expanding load combinations ...", 25)
         df_loadcombo, convert_lcombos = self.expand_loadcombos(convert_lcs)
+        record('load combinations')
         yield ("Get expanding Design load combinations ...", 35)
         expanded_design_tables = self.expand_design_combos(convert_lcombos)
+        record('design combinations')
         yield ("Apply expanding  seismic load patterns ...", 45)
         self.set_expand_seismic_load_patterns(dflp, convert_lps)
+        record('apply load patterns')
         yield ("Apply expanding load cases ...", 60)
         self.set_expand_loadcases(dflc, convert_lcs)
+        record('apply load cases')
         yield ("Apply expanding load combinations ...", 70)
         self.set_expand_load_combinations(df_loadcombo)
+        record('apply load combinations')
         yield ("Apply expanding Design load combinations ...", 90)
         self.apply_expand_design_combos(expanded_design_tables)
+        record('apply design combinations')
         yield ("Expanding Load Patterns Finished ...", 100)
         yield True
 
@@ -545,7 +877,7 @@ class DatabaseTables:
         df_not_include = df[~filt]
         df_include.loc[:, col_name] = df_include.loc[:, col_name].map(expand)
         df_include = df_include.explode(col_name)
-        new_df = df_not_include.append(df_include)
+        new_df = pd.concat([df_not_include, df_include])
         return new_df
     
     def get_story_mass_as_dict(self,
@@ -636,9 +968,8 @@ class DatabaseTables:
                         new_row['OverDiaph'] = diaph
                         new_row['OverEcc'] = str(length)
                         additional_rows.append(new_row)
-        # input_df = input_df.append(pd.DataFrame.from_records(additional_rows, columns=FieldsKeysIncluded1))
-        for row in additional_rows:
-            input_df = input_df.append(row)
+        if additional_rows:
+            input_df = pd.concat([input_df, pd.DataFrame(additional_rows)])
         return self.apply_data(table_key, input_df, fields_keys_included1)
     
     
@@ -696,8 +1027,8 @@ class DatabaseTables:
                         new_row['OverDiaph'] = diaph
                         new_row['OverEccen'] = str(length)
                         additional_rows.append(new_row)
-        for row in additional_rows:
-            df1 = df1.append(row)
+        if additional_rows:
+            df1 = pd.concat([df1, pd.DataFrame(additional_rows)])
         if self.etabs.etabs_main_version  < 20:
             df1 = df1.rename(col_map, axis=1)
         self.SapModel.SetModelIsLocked(False)
@@ -729,6 +1060,7 @@ class DatabaseTables:
         modal = self.etabs.load_cases.get_modal_loadcase_name()
         self.etabs.analyze.set_load_cases_to_analyze([modal])
         self.SapModel.Analyze.RunAnalysis()
+        self.clear_cache()
         wx, wy, ix, iy = self.etabs.results.get_xy_frequency()
         table_key = 'Joint Displacements'
         [_, _, fields_keys_included, _, table_data, _] = self.read_table(table_key)
@@ -847,8 +1179,7 @@ class DatabaseTables:
             type_combos[type_] = combinations
             if combinations:
                 load_combinations = load_combinations.union(combinations)
-        self.SapModel.DatabaseTables.SetLoadCasesSelectedForDisplay('')
-        self.SapModel.DatabaseTables.SetLoadCombinationsSelectedForDisplay(load_combinations)
+        self.set_selected_for_display(load_cases='', load_combinations=load_combinations)
         return type_combos
     
     def select_load_cases_combinations(self,
@@ -856,21 +1187,21 @@ class DatabaseTables:
                                        load_combinations: list=[],
             ):
         self.etabs.run_analysis()
-        self.SapModel.DatabaseTables.SetLoadCasesSelectedForDisplay([])
-        self.SapModel.DatabaseTables.SetLoadCombinationsSelectedForDisplay([])
-        self.SapModel.DatabaseTables.SetLoadCasesSelectedForDisplay(load_cases)
-        self.SapModel.DatabaseTables.SetLoadCombinationsSelectedForDisplay(load_combinations)
+        self.set_selected_for_display(load_cases=[], load_combinations=[])
+        self.set_selected_for_display(load_cases=load_cases, load_combinations=load_combinations)
 
     def get_beams_forces(self,
                         load_combinations : list = None,
                         beams : list = None,
                         cols : list = None,
+                        chunk_size : int = 0,
                         ) -> 'pandas.DataFrame':
         return self.get_element_forces(
             element_type='Beams',
             load_combinations=load_combinations,
             elements=beams,
             cols=cols,
+            chunk_size=chunk_size,
         )
 
     def get_element_forces(self,
@@ -878,16 +1209,32 @@ class DatabaseTables:
                         load_combinations : list = None,
                         elements : list = None,
                         cols : list = None,
+                        chunk_size : int = 0,
                         ) -> 'pandas.DataFrame':
         '''
         cols : columns in dataframe that we want to get
+        chunk_size : if it is not zero, read the table for chunk_size load
+            combinations at a time and keep only the rows of elements
         '''
         self.etabs.run_analysis()
         if load_combinations is None:
             load_combinations = self.get_concrete_frame_design_load_combinations()
-        self.SapModel.DatabaseTables.SetLoadCasesSelectedForDisplay('')
-        self.SapModel.DatabaseTables.SetLoadCombinationsSelectedForDisplay(load_combinations)
         table_key = f'Element Forces - {element_type}'
+        if chunk_size:
+            dfs = []
+            for df in self.iter_read(table_key,
+                                     load_combinations=load_combinations,
+                                     chunk_size=chunk_size,
+                                     cols=cols,
+                                     schema=False,
+                                     ):
+                if elements is not None:
+                    df = df[df['UniqueName'].isin(elements)]
+                dfs.append(df)
+            if not dfs:
+                return None
+            return pd.concat(dfs, ignore_index=True)
+        self.set_selected_for_display(load_cases='', load_combinations=load_combinations)
         df = self.read(table_key, to_dataframe=True, cols=cols)
         if elements is not None:
             df = df[df['UniqueName'].isin(elements)]
@@ -1164,14 +1511,10 @@ class DatabaseTables:
         points = joint_design_reactions_df['UniqueName'].unique()
         df['UniqueName'] = points
         points_and_columns = self.get_points_connectivity_with_type(points, 2)
-        dic_x = {}
-        dic_y = {}
-        dic_z = {}
-        for name in points:
-            x, y, z, _ = self.SapModel.PointObj.GetCoordCartesian(name)
-            dic_x[name] = x
-            dic_y[name] = y
-            dic_z[name] = z
+        coords = self.etabs.points.get_points_coords(points)
+        dic_x = {name: xyz[0] for name, xyz in coords.items()}
+        dic_y = {name: xyz[1] for name, xyz in coords.items()}
+        dic_z = {name: xyz[2] for name, xyz in coords.items()}
         for col, dic in zip(('column', 'x', 'y', 'z'), (points_and_columns, dic_x, dic_y, dic_z)):
             df[col] = df['UniqueName'].map(dic)
         if base_columns_df is None:
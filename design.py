@@ -101,17 +101,14 @@ class Design:
     def model_designed(self,
                        type_: str='Concrete',
                        ):
-        all_table = self.SapModel.DatabaseTables.GetAvailableTables()[1]
-        import python_functions
-        if (
-            type_ == 'Concrete' and
-            python_functions.is_text_in_list_elements(all_table, 'Concrete Beam Design Summary')
-        ) or (
-            type_ == 'Steel' and
-            python_functions.is_text_in_list_elements(all_table, 'Steel Frame Design Summary')
-        ):
-            return True
-        return False
+        table_names = {
+            'Concrete': 'Concrete Beam Design Summary',
+            'Steel': 'Steel Frame Design Summary',
+        }
+        partial_str = table_names.get(type_, None)
+        if partial_str is None:
+            return False
+        return bool(self.etabs.database.table_names_that_containe(partial_str))
 
     def set_phi_joint_shear(self,
         value=0.75,
@@ -126,6 +123,7 @@ class Design:
             item = 10
         self.set_preference(item, value, code=code)
     
+    @change_unit('N', 'cm')
     def get_rho_of_beams(
             self,
             names: "list[str]",
@@ -141,8 +139,6 @@ class Design:
         from scipy.interpolate import interp1d
         rhos = []
         texts = []
-        units = self.etabs.get_current_unit()
-        self.etabs.set_current_unit('N', 'cm')
         self.etabs.run_analysis()
         self.etabs.frame_obj.set_frame_obj_selected(names)
         self.etabs.start_design(check_designed=True)
@@ -226,7 +222,6 @@ class Design:
             text += f'rho = As / b x d = {area:.1f} / {frame_area:.1f} = {rho:.4f}\n'
             rhos.append(rho)
             texts.append(text)
-        self.etabs.set_current_unit(*units)
         return rhos, texts
     
     def get_deflection_of_beams(self,
@@ -0,0 +1,303 @@
+'''
+The methods of EtabsModel that only need SapModel and the etabs_api modules.
+
+EtabsModel attaches to ETABS with comtypes, offline_sap_model.OfflineEtabsModel
+uses an OfflineSapModel, both share the model objects, units, settings, file
+names, locking and analysis of EtabsModelBase.
+'''
+
+from pathlib import Path
+from typing import Union
+
+from load_patterns import LoadPatterns
+from load_cases import LoadCases
+from load_combinations import LoadCombination
+from story import Story
+from frame_obj import FrameObj
+from analyze import Analyze
+from view import View
+from database import DatabaseTables
+# from sections.sections import Sections
+from results import Results
+from points import Points
+from group import Group
+from select_obj import SelectObj
+from material import Material
+from area import Area
+from design import Design
+from prop_frame import PropFrame
+from diaphragm import Diaphragm
+from func import Func
+from pier import Pier
+from shearwall import ShearWall
+from units import UnitState
+from project_settings import ProjectSettings
+
+__all__ = ['EtabsModelBase']
+
+
+class EtabsModelBase:
+    force_units = dict(Ib=1, kip=2, N=3, kN=4, KN=4, kgf=5, Kgf=5, tonf=6, Tonf=6)
+    length_units = dict(inch=1, ft=2, micron=3, mm=4, cm=5, m=6)
+    length_units['in'] = 1
+    enum_units = {
+        'ib_inch': 1,
+        'ib_ft': 2,
+        'kip_inch': 3,
+        'kip_ft': 4,
+        'kn_mm' : 5,
+        'kn_m' : 6,
+        'kgf_mm' : 7,
+        'kgf_m' : 8,
+        'n_mm' : 9,
+        'n_m' : 10,
+        'tonf_mm' : 11,
+        'tonf_m' : 12,
+        'kn_cm' : 13,
+        'kgf_cm' : 14,
+        'n_cm' : 15,
+        'tonf_cm' : 16,
+    }
+    # BackupStore of the model file, see EtabsModel.backup_model
+    backup_store = None
+
+    def init_model_objects(self):
+        '''
+        create unit state, settings and the objects of etabs_api modules for self.SapModel
+        '''
+        self.unit_state = UnitState(self)
+        self.settings = ProjectSettings(self)
+        self.load_patterns = LoadPatterns(None, self)
+        self.load_cases = LoadCases(self)
+        self.load_combinations = LoadCombination(self)
+        self.story = Story(None, self)
+        self.frame_obj = FrameObj(self)
+        self.analyze = Analyze(self.SapModel, None)
+        self.view = View(self)
+        self.database = DatabaseTables(None, self)
+        # self.sections = Sections(self.SapModel, None)
+        self.results = Results(None, self)
+        self.points = Points(None, self)
+        self.group = Group(self)
+        self.select_obj = SelectObj(self)
+        self.material = Material(self)
+        self.area = Area(self)
+        self.design = Design(self)
+        self.prop_frame = PropFrame(self)
+        self.diaphragm = Diaphragm(self)
+        self.func = Func(self)
+        self.pier = Pier(self)
+        self.shearwall = ShearWall(self)
+        self.set_special_values_according_to_software_and_version()
+
+    def set_special_values_according_to_software_and_version(self):
+        self.etabs_main_version = self.get_etabs_main_version()
+        if self.software == "ETABS":
+            if self.etabs_main_version < 20:
+                self.seismic_drift_text = 'Seismic (Drift)'
+                self.seismic_drift_load_type = 37
+                self.ecc_overwrite_story = 'Ecc Overwrite Story'
+                self.auto_seismic_user_coefficient_columns_part1 = [
+                    'Name',
+                    'Is Auto Load',
+                    'X Dir?',
+                    'X Dir Plus Ecc?',
+                    'X Dir Minus Ecc?',
+                    'Y Dir?',
+                    'Y Dir Plus Ecc?',
+                    'Y Dir Minus Ecc?',
+                    'Ecc Ratio',
+                    'Top Story',
+                    'Bottom Story',
+                ]
+                self.auto_seismic_user_coefficient_columns_part2 = [
+                    self.ecc_overwrite_story,
+                    'Ecc Overwrite Diaphragm',
+                    'Ecc Overwrite Length',
+                ]
+                self.auto_notional_loads_columns = ['Load Pattern', 'Base Load Pattern', 'Load Ratio', 'Load Direction']
+            else:
+                self.seismic_drift_text = 'QuakeDrift'
+                self.seismic_drift_load_type = 61
+                self.ecc_overwrite_story = 'OverStory'
+                self.auto_seismic_user_coefficient_columns_part1 = [
+                    'Name',
+                    'IsAuto',
+                    'XDir',
+                    'XDirPlusE',
+                    'XDirMinusE',
+                    'YDir',
+                    'YDirPlusE',
+                    'YDirMinusE',
+                    'EccRatio',
+                    'TopStory',
+                    'BotStory',
+                ]
+                self.auto_seismic_user_coefficient_columns_part2 = [
+                    self.ecc_overwrite_story,
+                    'OverDiaph',
+                    'OverEcc',
+                ]
+                self.auto_notional_loads_columns = ['LoadPattern', 'BasePattern', 'LoadRatio', 'LoadDir']
+            self.auto_seismic_user_coefficient_columns = {
+                'IsAuto': 'Is Auto Load',
+                'XDir': 'X Dir?',
+                'XDirPlusE': 'X Dir Plus Ecc?',
+                'XDirMinusE': 'X Dir Minus Ecc?',
+                'YDir': 'Y Dir?',
+                'YDirPlusE': 'Y Dir Plus Ecc?',
+                'YDirMinusE': 'Y Dir Minus Ecc?',
+                'EccRatio': 'Ecc Ratio',
+                'TopStory': 'Top Story',
+                'BotStory': 'Bottom Story',
+                'OverStory': 'Ecc Overwrite Story',
+                'OverDiaph': 'Ecc Overwrite Diaphragm',
+                'OverEcc': 'Ecc Overwrite Length',
+            }
+
+    def get_etabs_main_version(self):
+        ver = self.SapModel.GetVersion()
+        return int(ver[0].split('.')[0])
+
+    def start_com_profiler(self, profiler=None):
+        '''
+        Record count, latency and payload of every COM call, attributed to the
+        calling etabs_api method, until stop_com_profiler is called
+        '''
+        import com_profiler
+        return com_profiler.install(self, profiler)
+
+    def stop_com_profiler(self):
+        '''
+        return the profiler, see ComProfiler.to_dataframe and export_flamegraph
+        '''
+        import com_profiler
+        return com_profiler.uninstall(self)
+
+    def lock_model(self):
+        self.SapModel.SetModelIsLocked(True)
+
+    def unlock_model(self):
+        name = self.get_filename()
+        print(f"Unlock Model: {name}")
+        self.database.clear_cache()
+        self.SapModel.SetModelIsLocked(False)
+
+    def lock_and_unlock_model(self):
+        self.database.clear_cache()
+        self.SapModel.SetModelIsLocked(True)
+        self.SapModel.SetModelIsLocked(False)
+
+    def run_analysis(self, open_lock=False):
+        if self.SapModel.GetModelIsLocked():
+            if open_lock:
+                self.database.clear_cache()
+                self.SapModel.SetModelIsLocked(False)
+                print('Run Analysis ...')
+                self.SapModel.analyze.RunAnalysis()
+        else:
+            self.database.clear_cache()
+            print('Run Analysis ...')
+            self.SapModel.analyze.RunAnalysis()
+
+    def set_current_unit(self, force, length):
+        self.unit_state.set_current_unit(force, length)
+
+    def get_current_unit(self,
+                         ):
+        return self.unit_state.get_current_unit()
+
+    def unit_scope(self,
+                   force: Union[str, None]=None,
+                   length: Union[str, None]=None,
+                   ):
+        '''
+        context manager that sets the present unit and restores it at the end,
+        nested scopes skip the switches to the present unit
+        '''
+        return self.unit_state.scope(force, length)
+
+    def convert_unit(self,
+                     values,
+                     to_unit: tuple,
+                     from_unit: Union[tuple, None]=None,
+                     force: int=1,
+                     length: int=0,
+                     ):
+        '''
+        convert values from_unit (default present unit) to to_unit without
+        changing the present unit, force and length are the dimensions of values
+        '''
+        import units
+        if from_unit is None:
+            from_unit = self.get_current_unit()
+        return units.convert_unit(values, from_unit, to_unit, force, length)
+
+    def get_file_name_without_suffix(self):
+        f = Path(self.SapModel.GetModelFilename())
+        name = f.stem
+        return name
+
+    def get_filename_with_suffix(self,
+            suffix: str= '.EDB',
+            ):
+        f = Path(self.SapModel.GetModelFilename())
+        f = f.with_suffix(suffix)
+        return f.name
+
+    def get_filename_path_with_suffix(self,
+            suffix: str= '.EDB',
+            ):
+        file_path = Path(self.etabs.SapModel.GetModelFilename())
+        return file_path.with_suffix(suffix)
+
+    def get_filename(self) -> Union[Path, None]:
+        '''
+        return: WindowsPath('H:/1402/montazer/rashidzadeh/etabs/test.EDB')
+        '''
+        if not hasattr(self, 'SapModel') or self.SapModel is None:
+            return None
+        filename = self.SapModel.GetModelFilename()
+        if filename is None:
+            return None
+        return Path(filename)
+
+    def get_filepath(self) -> Path:
+        return Path(self.SapModel.GetModelFilename()).parent
+
+    def wait_for_backup(self) -> None:
+        '''
+        wait for the background backups of the model file, the model file must
+        not be saved or replaced before
+        '''
+        if self.backup_store is not None:
+            self.backup_store.wait()
+
+    def open_model(self, filename: Union[str, Path]):
+        self.wait_for_backup()
+        self.database.clear_cache()
+        self.settings.invalidate()
+        self.frame_obj.invalidate_label_index()
+        self.area.invalidate_label_index()
+        self.load_patterns.invalidate_seismic_classification()
+        self.SapModel.File.OpenFile(str(filename))
+
+    def get_settings_from_model(self, refresh: bool=False):
+        '''
+        return settings dictionary, it reads from the model only once, see ProjectSettings
+        '''
+        return self.settings.get(refresh)
+
+    def update_setting(
+        self,
+        keys: Union[list, dict],
+        values: Union[list, None] = None,
+        ):
+        '''
+        update etabs setting dictionary with keys and values or dict, inside
+        settings.transaction() the model saves once at the end
+        '''
+        self.settings.update(keys, values)
+
+    def set_settings_to_model(self, d: dict):
+        self.settings.set(d)
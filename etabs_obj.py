@@ -7,61 +7,18 @@ import comtypes.client
 from pathlib import Path
 from typing import Tuple, Union
 import shutil
-import math
 import sys
-import json
 
 from python_functions import change_unit
 
 
-from load_patterns import LoadPatterns
-from load_cases import LoadCases
-from load_combinations import LoadCombination
-from story import Story
-from frame_obj import FrameObj
-from analyze import Analyze
-from view import View
-from database import DatabaseTables
-# from sections.sections import Sections
-from results import Results
-from points import Points
-from group import Group
-from select_obj import SelectObj
-from material import Material
-from area import Area
-from design import Design
-from prop_frame import PropFrame
-from diaphragm import Diaphragm
-from func import Func
-from pier import Pier
-from shearwall import ShearWall
+from etabs_model_base import EtabsModelBase
+from backup_store import BackupStore
 
 __all__ = ['EtabsModel']
 
 
-class EtabsModel:
-    force_units = dict(Ib=1, kip=2, N=3, kN=4, KN=4, kgf=5, Kgf=5, tonf=6, Tonf=6)
-    length_units = dict(inch=1, ft=2, micron=3, mm=4, cm=5, m=6)
-    length_units['in'] = 1
-    enum_units = {
-        'ib_inch': 1,
-        'ib_ft': 2,
-        'kip_inch': 3,
-        'kip_ft': 4,
-        'kn_mm' : 5,
-        'kn_m' : 6,
-        'kgf_mm' : 7,
-        'kgf_m' : 8,
-        'n_mm' : 9,
-        'n_m' : 10,
-        'tonf_mm' : 11,
-        'tonf_m' : 12,
-        'kn_cm' : 13,
-        'kgf_cm' : 14,
-        'n_cm' : 15,
-        'tonf_cm' : 16,
-    }
-
+class EtabsModel(EtabsModelBase):
     def __init__(
                 self,
                 attach_to_instance: bool = True,
@@ -75,6 +32,7 @@ class EtabsModel:
         self.etabs = None
         self.success = False
         self.error_message_connection = ''
+        self.backup_store = None
         helper = comtypes.client.CreateObject(f'{software}v1.Helper')
         if software in ("ETABS", "SAFE"):
             software_obj_name = 'ETABS'
@@ -118,34 +76,15 @@ class EtabsModel:
         if self.success and self.etabs is not None:
             self.SapModel = self.etabs.SapModel
             if backup:
-                self.backup_model()
+                self.backup_model(asynchronous=True)
             # solver_options = self.SapModel.Analyze.GetSolverOption_2()
             # solver_options[1] = 1
             # self.SapModel.Analyze.SetSolverOption_2(*solver_options[:-1])
             # self.SapModel.File.Save()
-            self.load_patterns = LoadPatterns(None, self)
-            self.load_cases = LoadCases(self)
-            self.load_combinations = LoadCombination(self)
-            self.story = Story(None, self)
-            self.frame_obj = FrameObj(self)
-            self.analyze = Analyze(self.SapModel, None)
-            self.view = View(self)
-            self.database = DatabaseTables(None, self)
-            # self.sections = Sections(self.SapModel, None)
-            self.results = Results(None, self)
-            self.points = Points(None, self)
-            self.group = Group(self)
-            self.select_obj = SelectObj(self)
-            self.material = Material(self)
-            self.area = Area(self)
-            self.design = Design(self)
-            self.prop_frame = PropFrame(self)
-            self.diaphragm = Diaphragm(self)
-            self.func = Func(self)
-            self.pier = Pier(self)
-            self.shearwall = ShearWall(self)
-            self.set_special_values_according_to_software_and_version()
+            self.init_model_objects()
             self.etabs_pywinauto = None
+            # analyses of the last scaling of response spectrums
+            self.spectrum_scale_report = {}
     
     @staticmethod
     def connect_to_the_software_using_the_executable_path(exe_path):
@@ -199,108 +138,39 @@ class EtabsModel:
                 self.etabs_pywinauto = None
         return self.etabs_pywinauto
 
-    def set_special_values_according_to_software_and_version(self):
-        self.etabs_main_version = self.get_etabs_main_version()
-        if self.software == "ETABS":
-            if self.etabs_main_version < 20:
-                self.seismic_drift_text = 'Seismic (Drift)'
-                self.seismic_drift_load_type = 37
-                self.ecc_overwrite_story = 'Ecc Overwrite Story'
-                self.auto_seismic_user_coefficient_columns_part1 = [
-                    'Name',
-                    'Is Auto Load',
-                    'X Dir?',
-                    'X Dir Plus Ecc?',
-                    'X Dir Minus Ecc?',
-                    'Y Dir?',
-                    'Y Dir Plus Ecc?',
-                    'Y Dir Minus Ecc?',
-                    'Ecc Ratio',
-                    'Top Story',
-                    'Bottom Story',
-                ]
-                self.auto_seismic_user_coefficient_columns_part2 = [
-                    self.ecc_overwrite_story,
-                    'Ecc Overwrite Diaphragm',
-                    'Ecc Overwrite Length',
-                ]
-                self.auto_notional_loads_columns = ['Load Pattern', 'Base Load Pattern', 'Load Ratio', 'Load Direction']
-            else:
-                self.seismic_drift_text = 'QuakeDrift'
-                self.seismic_drift_load_type = 61
-                self.ecc_overwrite_story = 'OverStory'
-                self.auto_seismic_user_coefficient_columns_part1 = [
-                    'Name',
-                    'IsAuto',
-                    'XDir',
-                    'XDirPlusE',
-                    'XDirMinusE',
-                    'YDir',
-                    'YDirPlusE',
-                    'YDirMinusE',
-                    'EccRatio',
-                    'TopStory',
-                    'BotStory',
-                ]
-                self.auto_seismic_user_coefficient_columns_part2 = [
-                    self.ecc_overwrite_story,
-                    'OverDiaph',
-                    'OverEcc',
-                ]
-                self.auto_notional_loads_columns = ['LoadPattern', 'BasePattern', 'LoadRatio', 'LoadDir']
-            self.auto_seismic_user_coefficient_columns = {
-                'IsAuto': 'Is Auto Load',
-                'XDir': 'X Dir?',
-                'XDirPlusE': 'X Dir Plus Ecc?',
-                'XDirMinusE': 'X Dir Minus Ecc?',
-                'YDir': 'Y Dir?',
-                'YDirPlusE': 'Y Dir Plus Ecc?',
-                'YDirMinusE': 'Y Dir Minus Ecc?',
-                'EccRatio': 'Ecc Ratio',
-                'TopStory': 'Top Story',
-                'BotStory': 'Bottom Story',
-                'OverStory': 'Ecc Overwrite Story',
-                'OverDiaph': 'Ecc Overwrite Diaphragm',
-                'OverEcc': 'Ecc Overwrite Length',
-            }
-
-    def get_etabs_main_version(self):
-        ver = self.SapModel.GetVersion()
-        return int(ver[0].split('.')[0])
-    
     def close_etabs(self):
         self.SapModel.SetModelIsLocked(False)
         self.etabs.ApplicationExit(False)
         self.SapModel = None
         self.etabs = None
 
-    def backup_model(self, name=None):
-        max_num = 0
-        backup_path=None
+    def get_backup_store(self) -> BackupStore:
+        backup_path = self.get_filepath() / 'backups'
+        if self.backup_store is None or self.backup_store.root != backup_path:
+            if self.backup_store is not None:
+                self.backup_store.wait()
+            self.backup_store = BackupStore(backup_path)
+        return self.backup_store
+
+    def backup_model(self, name=None, asynchronous: bool=False):
+        '''
+        Without name, it backups the saved model file in the incremental backup
+        store of backups folder and returns the Manifest of the backup. If
+        asynchronous, it backups in a background thread and returns the Future,
+        the model must not be saved until self.wait_for_backup() returns.
+        With name, it copies the model file with name in the model folder and
+        returns the new path.
+        '''
         asli_file_path = self.get_filename()
         suffix = asli_file_path.suffix
         if name is None:
-            filename = self.get_file_name_without_suffix()
-            file_path = self.get_filepath()
-            backup_path = file_path / 'backups'
-            if not backup_path.exists():
-                import os
-                os.mkdir(str(backup_path))
-            for edb in backup_path.glob(f'BACKUP_{filename}*{suffix}'):
-                num = edb.name.rstrip(suffix)[len('BACKUP_') + len(filename) + 1:]
-                try:
-                    num = int(num)
-                    max_num = max(max_num, num)
-                except ValueError:
-                    continue
-            name = f'BACKUP_{filename}_{max_num + 1}{suffix}'
+            store = self.get_backup_store()
+            if asynchronous:
+                return store.backup_async(asli_file_path)
+            return store.backup(asli_file_path)
         if not name.lower().endswith(suffix.lower()):
             name += suffix
-        asli_file_path = asli_file_path.with_suffix(suffix)
-        if backup_path is None:
-            new_file_path = asli_file_path.parent / name
-        else:
-            new_file_path = backup_path / name
+        new_file_path = asli_file_path.parent / name
         shutil.copy(asli_file_path, new_file_path)
         return new_file_path
 
@@ -310,34 +180,26 @@ class EtabsModel:
         suffix = asli_file_path.suffix
         for edb in file_path.glob(f'BACKUP_*{suffix}'):
             edb.unlink()
+        store = self.get_backup_store()
+        store.wait()
+        store.clear()
         return None
 
     def restore_backup(self, filepath):
+        '''
+        filepath can be a copy of the model or the name of a backup in backup store
+        '''
         current_file_path = self.get_filename()
+        restored = None
+        self.wait_for_backup()
+        if not Path(filepath).exists():
+            store = self.get_backup_store()
+            restored = current_file_path.with_name(f'RESTORE_{Path(filepath).stem}{current_file_path.suffix}')
+            filepath = store.restore(filepath, restored)
         self.SapModel.File.OpenFile(str(filepath))
         self.SapModel.File.Save(str(current_file_path))
-
-    def lock_model(self):
-        self.SapModel.SetModelIsLocked(True)
-    
-    def unlock_model(self):
-        name = self.get_filename()
-        print(f"Unlock Model: {name}")
-        self.SapModel.SetModelIsLocked(False)
-
-    def lock_and_unlock_model(self):
-        self.SapModel.SetModelIsLocked(True)
-        self.SapModel.SetModelIsLocked(False)
-
-    def run_analysis(self, open_lock=False):
-        if self.SapModel.GetModelIsLocked():
-            if open_lock:
-                self.SapModel.SetModelIsLocked(False)
-                print('Run Analysis ...')
-                self.SapModel.analyze.RunAnalysis()
-        else:
-            print('Run Analysis ...')
-            self.SapModel.analyze.RunAnalysis()
+        if restored is not None:
+            restored.unlink(missing_ok=True)
 
     def start_design(self,
         type_: str = 'Concrete', # Steel
@@ -348,6 +210,7 @@ class EtabsModel:
         self.run_analysis()
         print(f"Starting Design {type_}")
         exec(f"self.SapModel.Design{type_}.StartDesign()")
+        self.database.clear_cache()
 
     def start_slab_design(self):
         if self.etabs_main_version < 20:
@@ -355,46 +218,7 @@ class EtabsModel:
         self.run_analysis()
         print("Starting Design Slabs")
         self.SapModel.DesignConcreteSlab.StartSlabDesign()
-
-    def set_current_unit(self, force, length):
-        # force_enum = EtabsModel.force_units[force]
-        # len_enum = EtabsModel.length_units[length]
-        number = self.enum_units.get(f"{force}_{length}".lower(), None)
-        if number is None:
-            raise KeyError
-        self.SapModel.SetPresentUnits(number)
-    
-    def get_current_unit(self,
-                         ):
-        found = False
-        unit_num = self.SapModel.GetPresentUnits()
-        for unit_str, n in self.enum_units.items():
-            if n == unit_num:
-                force, length = unit_str.split("_")[0:2]
-                found = True
-                break
-        if not found:
-            force, length = 'N', 'mm'
-            self.SapModel.SetPresentUnits(9)
-        return force, length
-
-    def get_file_name_without_suffix(self):
-        f = Path(self.SapModel.GetModelFilename())
-        name = f.stem
-        return name
-    
-    def get_filename_with_suffix(self,
-            suffix: str= '.EDB',
-            ):
-        f = Path(self.SapModel.GetModelFilename())
-        f = f.with_suffix(suffix)
-        return f.name
-    
-    def get_filename_path_with_suffix(self,
-            suffix: str= '.EDB',
-            ):
-        file_path = Path(self.etabs.SapModel.GetModelFilename())
-        return file_path.with_suffix(suffix)
+        self.database.clear_cache()
 
     def add_prefix_suffix_name(self,
             prefix : str = '',
@@ -411,21 +235,8 @@ class EtabsModel:
             self.SapModel.File.Save(str(new_path))
         return new_path
 
-    def get_filename(self) -> Union[Path, None]:
-        '''
-        return: WindowsPath('H:/1402/montazer/rashidzadeh/etabs/test.EDB')
-        '''
-        if not hasattr(self, 'SapModel') or self.SapModel is None:
-            return None
-        filename = self.SapModel.GetModelFilename()
-        if filename is None:
-            return None
-        return Path(filename)
-    
-    def get_filepath(self) -> Path:
-        return Path(self.SapModel.GetModelFilename()).parent
-        
     def save(self):
+        self.wait_for_backup()
         self.SapModel.File.Save()
 
     def save_as(self, name):
@@ -472,6 +283,7 @@ class EtabsModel:
             name=name,
             )
         print(f" Save Model As {new_filename}")
+        self.wait_for_backup()
         self.SapModel.File.Save(str(new_filename))
         return asli_file_path, new_filename
     
@@ -514,9 +326,6 @@ class EtabsModel:
         json_file = Path(self.SapModel.GetModelFilepath()) / json_name
         self.save_to_json(json_file, data)
 
-    def open_model(self, filename: Union[str, Path]):
-        self.SapModel.File.OpenFile(str(filename))
-
     def get_main_periods(self,
                          modal_case: str='',
                          ):
@@ -525,6 +334,7 @@ class EtabsModel:
             modal_case = self.load_cases.get_modal_loadcase_name()
         self.analyze.set_load_cases_to_analyze([modal_case])
         self.SapModel.Analyze.RunAnalysis()
+        self.database.clear_cache()
         table_key = "Modal Participating Mass Ratios"
         df = self.database.read(table_key=table_key, to_dataframe=True)
         df = df.astype({'UX': float, 'UY': float})
@@ -576,25 +386,11 @@ class EtabsModel:
         IMod_beam = 0.5
         IMod_col_wall = 1
         IMod_Floors = 0.25 * 1.5
-        for label in self.SapModel.FrameObj.GetLabelNameList()[1]:
-            if self.SapModel.FrameObj.GetDesignProcedure(label)[0] == 2:  # concrete
-                modifiers = list(self.SapModel.FrameObj.GetModifiers(label)[0])
-                if self.SapModel.FrameObj.GetDesignOrientation(label)[0] == 1: # Column
-                    modifiers[:6] = 6 * [IMod_col_wall]
-                elif self.SapModel.FrameObj.GetDesignOrientation(label)[0] == 2:  # Beam
-                    modifiers[4:6] = [IMod_beam, IMod_beam]
-                self.SapModel.FrameObj.SetModifiers(label, modifiers)
+        if structure_type == 'concrete':
+            self.frame_obj.set_drift_modifiers(IMod_beam, IMod_col_wall)
         # Area Objects
         self.area.reset_slab_sections_modifiers()
-        for label in self.SapModel.AreaObj.GetLabelNameList()[1]:
-            modifiers = list(self.SapModel.AreaObj.GetModifiers(label)[0])
-            if self.SapModel.AreaObj.GetDesignOrientation(label)[0] == 1: # Wall
-                modifiers[:6] = 6 * [IMod_col_wall]
-            elif self.SapModel.AreaObj.GetDesignOrientation(label)[0] == 2: # Floor
-                weight_factor = modifiers[-1]
-                for i in range(3, 6):
-                    modifiers[i] = IMod_Floors * weight_factor
-            self.SapModel.AreaObj.SetModifiers(label, modifiers)
+        self.area.set_drift_modifiers(IMod_col_wall, IMod_Floors)
         # run model (this will create the analysis model)
         tx_drift, ty_drift = self.get_main_periods()
         if structure_type == 'concrete':
@@ -944,6 +740,7 @@ class EtabsModel:
             self.story.fix_below_stories(story_name)
             self.SapModel.View.RefreshView()
             self.SapModel.Analyze.RunAnalysis()
+            self.database.clear_cache()
             disp_x = self.results.get_point_xy_displacement(point_name, lp_name_x)[0]
             disp_y = self.results.get_point_xy_displacement(point_name, lp_name_y)[1]
             kx, ky = 100000 / abs(disp_x), 100000 / abs(disp_y)
@@ -1072,15 +869,22 @@ class EtabsModel:
             self.load_cases.reset_scales_for_response_spectrums(loadcases=x_specs+y_specs)
         self.set_current_unit('kgf', 'm')
         self.analyze.set_load_cases_to_analyze(ex_names + ey_names + x_specs + y_specs)
+        specs = x_specs + y_specs
+        spec_directions = len(x_specs) * ['x'] + len(y_specs) * ['y']
+        # static and spectral base shears with one BaseReact, the static base
+        # shears do not change with the scales
         V = self.results.get_base_react(
-                loadcases=ex_names + ey_names,
-                directions=len(ex_names) * ['x'] + len(ey_names) * ['y'],
+                loadcases=ex_names + ey_names + specs,
+                directions=len(ex_names) * ['x'] + len(ey_names) * ['y'] + spec_directions,
                 absolute=True,
                 )
+        n = len(ex_names) + len(ey_names)
         vexes = V[0:len(ex_names)]
-        veyes = V[len(ex_names):]
+        veyes = V[len(ex_names):n]
         vex = sum(vexes)
         vey = sum(veyes)
+        x_targets = len(x_specs) * [x_scale_factor * vex]
+        y_targets = len(y_specs) * [y_scale_factor * vey]
         if consider_min_static_base_shear:
             def acceleration(risk_level):
                 accs = {'کم': 0.20,
@@ -1101,41 +905,36 @@ class EtabsModel:
             vx_min = c_min * wx
             vy_min = c_min * wy
             print(f"{cxes=}, {cyes=}, {wx=}, {wy=}, {c_min=}, {vx_min=}, {vy_min=}")
+            x_targets = [max(vx_min, v) for v in x_targets]
+            y_targets = [max(vy_min, v) for v in y_targets]
         print(f'{vexes=}, {veyes=}')
-        for i in range(num_iteration):
-            vsx = self.results.get_base_react(
-                    loadcases=x_specs,
-                    directions=['x'] * len(x_specs),
-                    absolute=True,
-                    )
-            vsy = self.results.get_base_react(
-                    loadcases=y_specs,
-                    directions=['y'] * len(y_specs),
-                    absolute=True,
-                    )
-            print(f'{vsx=}, {vsy=}')
-            x_scales = []
-            y_scales = []
-            for v in vsx:
-                scale = x_scale_factor * vex / v
-                if consider_min_static_base_shear:
-                    scale = max(vx_min / v, scale)
-                x_scales.append(scale)
-            for v in vsy:
-                scale = y_scale_factor * vey / v
-                if consider_min_static_base_shear:
-                    scale = max(vy_min / v, scale)
-                y_scales.append(scale)
-            print(x_scales, y_scales)
-            max_scale = max(x_scales + y_scales)
-            min_scale = min(x_scales + y_scales)
-            if (max_scale < 1 + tolerance) and (min_scale > 1 - tolerance):
-                break
-            else:
-                for spec, scale in zip(x_specs, x_scales):
-                    self.load_cases.multiply_response_spectrum_scale_factor(spec, scale)
-                for spec, scale in zip(y_specs, y_scales):
-                    self.load_cases.multiply_response_spectrum_scale_factor(spec, scale)
+
+        def read(names):
+            if analyze:
+                # the analysis that verifies the scales is the final analysis
+                self.analyze.set_load_cases_to_analyze()
+            return self.results.get_base_react(
+                loadcases=names,
+                directions=spec_directions,
+                absolute=True,
+                )
+
+        import spectrum_scale
+        scales, v, report = spectrum_scale.solve_spectrum_scales(
+            read,
+            self.load_cases.multiply_response_spectrum_scale_factor,
+            specs,
+            x_targets + y_targets,
+            V[n:],
+            tolerance=tolerance,
+            num_iteration=num_iteration,
+            )
+        x_scales = [float(scale) for scale in scales[:len(x_specs)]]
+        y_scales = [float(scale) for scale in scales[len(x_specs):]]
+        vsx = [float(i) for i in v[:len(x_specs)]]
+        vsy = [float(i) for i in v[len(x_specs):]]
+        print(f'{vsx=}, {vsy=}')
+        print(x_scales, y_scales)
         force = self.get_current_unit()[0]
         import pandas as pd
         load_cases = ['&'.join(ex_names),  '&'.join(ey_names)] + x_specs + y_specs
@@ -1151,12 +950,29 @@ class EtabsModel:
             'Ratio': ratios,
             'Scale': final_scales,
             })
-        self.unlock_model()
-        self.analyze.set_load_cases_to_analyze()
-        if analyze:
-            self.run_analysis()
+        self._finish_response_spectrums_scaling(report, analyze)
         return x_scales, y_scales, df
 
+    def _finish_response_spectrums_scaling(self,
+        report : dict,
+        analyze : bool = True,
+        ):
+        '''
+        run the final analysis of all load cases if the last analysis of the
+        scaling did not, and keep the report of analyses in spectrum_scale_report
+        '''
+        if analyze and report['analyses'] > 1:
+            # the last analysis was with all load cases, the fixed point
+            # iteration needs another analysis
+            report['saved'] += 1
+        else:
+            self.unlock_model()
+            self.analyze.set_load_cases_to_analyze()
+            if analyze:
+                self.run_analysis()
+        print(f"analyses: {report['analyses']}, saved analyses: {report['saved']}")
+        self.spectrum_scale_report = report
+
     def angles_response_spectrums_analysis(self,
         ex_name : list,
         ey_name : list,
@@ -1179,88 +995,61 @@ class EtabsModel:
         if reset_scale:
             self.load_cases.reset_scales_for_response_spectrums(loadcases=specs)
         loadcases = ex_names + ey_names + specs
-        base_shear_spec = {}
-        base_shear_ex = {}
-        base_shear_ey = {}
-        for i in range(num_iteration):
-            self.analyze.set_load_cases_to_analyze(loadcases)
-            df = self.database.get_section_cuts_base_shear(loadcases, section_cuts)
-            df.drop_duplicates(['SectionCut', 'OutputCase'], keep='last', inplace=True)
-            re_dict = self.database.get_section_cuts_angle()
-            df['angle'] = df['SectionCut'].replace(re_dict)
-            angles = df['angle'].unique()
-            re_dict = self.load_cases.get_spectral_with_angles(angles, specs)
-            df['angle_spec'] = df['angle'].replace(re_dict)
-            spec_sec_angle = df[df['OutputCase'] == df['angle_spec']]
-            scales = []
-            spec_scales = {}
-            angle_specs = {}
-            df['F1'] = df['F1'].astype(float)
-            for i, row in spec_sec_angle.iterrows():
-                spec = row['OutputCase']
-                section_cut = row['SectionCut']
-                angle = row['angle']
-                angle_specs[angle] = spec
-                df_angle_section = df[(df['SectionCut'] == section_cut) & (df['angle'] == angle)][['F1', 'OutputCase']]
-                df_angle_section.set_index('OutputCase', inplace=True)
-                f_ex = abs(sum(df_angle_section.loc[ex_names, 'F1']))
-                f_ey = abs(sum(df_angle_section.loc[ey_names, 'F1']))
-                f_spec = abs(df_angle_section.loc[spec, 'F1'])
-                scale = scale_factor * math.sqrt(f_ex ** 2 + f_ey ** 2) / f_spec
-                spec_scales[spec] = scale
-                scales.append(scale)
-                base_shear_spec[angle] = f_spec
-                base_shear_ex[angle] = f_ex
-                base_shear_ey[angle] = f_ey
-            print(scales)
-            max_scale = max(scales)
-            min_scale = min(scales)
-            if (max_scale < 1 + tolerance) and (min_scale > 1 - tolerance):
-                break
-            else:
-                for spec, scale in spec_scales.items():
-                    self.load_cases.multiply_response_spectrum_scale_factor(spec, scale)
+        self.analyze.set_load_cases_to_analyze(loadcases)
+        df = self.database.get_section_cuts_base_shear(loadcases, section_cuts)
+        section_cut_angles = self.database.get_section_cuts_angle()
+        angles = list(dict.fromkeys(section_cut_angles.get(cut, cut) for cut in df['SectionCut']))
+        angle_specs = self.load_cases.get_spectral_with_angles(angles, specs)
+        import spectrum_scale
+        # the static section cut forces do not change with the scales
+        base_shears = spectrum_scale.section_cuts_base_shear(df, ex_names, ey_names, section_cut_angles, angle_specs)
+        target_specs = list(base_shears['spec'])
+        spec_section_cuts = dict(zip(base_shears['spec'], base_shears['SectionCut']))
+
+        def read(names):
+            if analyze:
+                # the analysis that verifies the scales is the final analysis
+                self.analyze.set_load_cases_to_analyze()
+            df = self.database.get_section_cuts_base_shear(names, section_cuts)
+            df = df.drop_duplicates(['SectionCut', 'OutputCase'], keep='last')
+            f1 = df.set_index(['SectionCut', 'OutputCase'])['F1'].astype(float)
+            return [abs(f1[(spec_section_cuts[spec], spec)]) for spec in names]
+
+        scales, v, report = spectrum_scale.solve_spectrum_scales(
+            read,
+            self.load_cases.multiply_response_spectrum_scale_factor,
+            target_specs,
+            scale_factor * base_shears['F_static'].to_numpy(),
+            base_shears['F_spec'].to_numpy(),
+            tolerance=tolerance,
+            num_iteration=num_iteration,
+            )
+        scales = [float(scale) for scale in scales]
+        print(scales)
         force = self.get_current_unit()[0]
         import pandas as pd
-        base_shear_specs = []
-        base_shear_exs = []
-        base_shear_eys = []
-        load_cases =  []
-        final_scales = []
-        for angle in angles:
-            base_shear_specs.append(base_shear_spec[angle])
-            base_shear_exs.append(base_shear_ex[angle])
-            base_shear_eys.append(base_shear_ey[angle])
-            load_cases.append(angle_specs[angle])
-            ret = self.SapModel.LoadCases.ResponseSpectrum.GetLoads(angle_specs[angle])
+        final_scales = [] # Get final scales that applied in etabs model
+        for spec in target_specs:
+            ret = self.SapModel.LoadCases.ResponseSpectrum.GetLoads(spec)
             final_scales.append(ret[3][0])
         ex_names_str = '&'.join(ex_names)
         ey_names_str = '&'.join(ey_names)
         ex_name_col_title = ex_names_str + f' {force}'
         ey_name_col_title = ey_names_str + f' {force}'
         spec_col_title = f'SPEC ({force})'
+        static_col_title = f"({ex_names_str}^2 + {ey_names_str}^2) ^0.5"
+        f_static = base_shears['F_static'].to_numpy()
         df = pd.DataFrame({
-            "Name": load_cases,
-            'Angle': angles,
-            spec_col_title: base_shear_specs,
-            ex_name_col_title: base_shear_exs,
-            ey_name_col_title: base_shear_eys,
-            # 'Ratio': ratios,
-            # 'Scale': final_scales,
+            "Name": target_specs,
+            'Angle': base_shears['angle'].to_numpy(),
+            spec_col_title: v,
+            ex_name_col_title: base_shears['F_ex'].to_numpy(),
+            ey_name_col_title: base_shears['F_ey'].to_numpy(),
+            static_col_title: f_static,
+            'Scale': final_scales,
+            'Ratio': v / f_static,
             })
-        static_col_title = f"({ex_names_str}^2 + {ey_names_str}^2) ^0.5"
-        df[static_col_title] = df.apply(
-            lambda row: math.sqrt(row[ex_name_col_title] ** 2 + row[ey_name_col_title] ** 2),
-            axis=1,
-            )
-        df['Scale'] = final_scales
-        df['Ratio'] = df.apply(
-            lambda row: row[spec_col_title] / row[static_col_title], axis=1
-        )
-        self.unlock_model()
-        self.analyze.set_load_cases_to_analyze()
-        if analyze:
-            self.run_analysis()
+        self._finish_response_spectrums_scaling(report, analyze)
         return scales, df
 
     def create_joint_shear_bcc_file(self,
@@ -1321,39 +1110,6 @@ class EtabsModel:
             return steel
         return concrete
     
-    def get_settings_from_model(self):
-        d = {}
-        info = self.SapModel.GetProjectInfo()
-        json_str = info[2][0]
-        try:
-            company_name = json.loads(json_str)
-        except json.JSONDecodeError:
-            return d
-        if isinstance(company_name, dict):
-            d = company_name
-        return d
-    
-    def update_setting(
-        self,
-        keys: Union[list, dict],
-        values: Union[list, None] = None,
-        ):
-        '''
-        update etabs setting dictionary with keys and values or dict 
-        '''
-        d = self.get_settings_from_model()
-        if isinstance(keys, dict):
-            new_d = keys
-        else:
-            new_d = dict(zip(keys, values))
-        d.update(new_d)
-        self.set_settings_to_model(d)
-
-    def set_settings_to_model(self, d: dict):
-        json_str = json.dumps(d)
-        self.SapModel.SetProjectInfo("Company Name", json_str)
-        self.SapModel.File.Save()
-        
     def get_first_system_seismic(self, d: dict={}):
         if not d:
             d = self.get_settings_from_model()
@@ -3,6 +3,7 @@ from typing import Iterable, Union
 import math
 import copy
 
+import numpy as np
 import pandas as pd
 
 from python_functions import change_unit, get_column_labels
@@ -21,6 +22,45 @@ class FrameObj:
         self.etabs = etabs
         if etabs is not None:
             self.SapModel = self.etabs.SapModel
+        self._label_index = None
+        # records of correct_torsion_stiffness_factor iterations
+        self.torsion_history = []
+
+    def get_label_index(self, refresh: bool=False):
+        '''
+        return the name <-> (label, story) index of frames, it reads
+        'Frame Assignments - Summary' once until invalidate_label_index
+        '''
+        if refresh or self._label_index is None:
+            from label_index import LabelIndex
+            table_key = 'Frame Assignments - Summary'
+            df = self.etabs.database.read(table_key, to_dataframe=True, cols=['UniqueName', 'Label', 'Story'])
+            self._label_index = LabelIndex.from_dataframe(df)
+        return self._label_index
+
+    def invalidate_label_index(self):
+        '''
+        call it when frames are added or deleted
+        '''
+        self._label_index = None
+
+    def get_label_and_story(self, name: str) -> tuple:
+        '''
+        return (label, story) of frame like GetLabelFromName, ('', '') for unknown frame
+        '''
+        refreshed = self._label_index is None
+        index = self.get_label_index()
+        ret = index.label_story(name)
+        if ret is None and not refreshed:
+            # the frame may be added with direct COM call
+            ret = self.get_label_index(refresh=True).label_story(name)
+        return ('', '') if ret is None else ret
+
+    def get_name_from_label(self, label: str, story: str) -> Union[str, None]:
+        '''
+        return the name of frame with label on story like GetNameFromLabel, None if there is no frame
+        '''
+        return self.get_label_index().name(label, story)
 
     def set_end_release_frame(self, name):
         end_release = self.SapModel.FrameObj.GetReleases(name)
@@ -190,7 +230,7 @@ class FrameObj:
     def is_frame_on_story(self, frame, story=None):
         if story is None:
             return True
-        st = self.SapModel.FrameObj.GetLabelFromName(frame)[1]
+        st = self.get_label_and_story(frame)[1]
         return st == story
 
     def get_design_procedure(self, name):
@@ -215,16 +255,97 @@ class FrameObj:
         type_ = map_dict.get(number, None)
         return type_
 
+    @staticmethod
+    def design_procedure_number(design_procedure: str) -> int:
+        '''
+        map design procedure text of database tables, like 'Concrete Frame'
+        to the number of GetDesignProcedure
+        '''
+        text = str(design_procedure).lower()
+        for key, number in (
+            ('joist', 4),
+            ('composite beam', 3),
+            ('composite column', 13),
+            ('steel', 1),
+            ('concrete', 2),
+            ('no design', 7),
+            ('program', 0),
+            ):
+            if key in text:
+                return number
+        return 0
+
+    def get_frames_type_and_design_procedure(self) -> Union[pd.DataFrame, None]:
+        '''
+        return UniqueName, Story, Label, Type (Beam, Column, Brace) and
+        DesignProcedure (number of GetDesignProcedure) of all frames from
+        'Frame Assignments - Summary' table, return None if the tables are
+        not available or have no design procedure of frames
+        '''
+        table_key = 'Frame Assignments - Summary'
+        df = self.etabs.database.read(table_key, to_dataframe=True)
+        if df is None:
+            return None
+        proc_cols = [col for col in ('DesignProc', 'DesignProcedure', 'Design Procedure') if col in df.columns]
+        if proc_cols:
+            procedures = df[proc_cols[0]]
+        else:
+            procedures = None
+            table_key = self.etabs.database.table_name_that_containe_texts(('Frame Assignments', 'Design Procedure'))
+            if table_key is not None:
+                df_proc = self.etabs.database.read(table_key, to_dataframe=True)
+                proc_cols = [col for col in df_proc.columns if col.startswith('DesignProc')]
+                if proc_cols:
+                    procedures = df['UniqueName'].map(df_proc.set_index('UniqueName')[proc_cols[0]])
+        if procedures is None:
+            return None
+        df = df[['UniqueName', 'Story', 'Label', 'Type']].copy()
+        numbers = {proc: self.design_procedure_number(proc) for proc in procedures.unique()}
+        df['DesignProcedure'] = procedures.map(numbers)
+        return df
+
+    def get_beams_columns_from_tables(
+            self,
+            type_=2,
+            types : list =[],
+            story : Union[str, bool] = None,
+            stories: list=[],
+            ):
+        '''
+        Same as get_beams_columns, with one table read instead of COM calls
+        for each frame, return None if the tables are not available
+        '''
+        types = set(types).union([type_])
+        if story is None and len(stories) > 0:
+            story = stories[0]
+        stories = set(stories).union([story])
+        df = self.get_frames_type_and_design_procedure()
+        if df is None:
+            return None
+        filt = df['DesignProcedure'].isin(types)
+        if None not in stories:
+            filt = filt & df['Story'].isin(stories)
+        df = df.loc[filt]
+        beams = list(df.loc[df['Type'] == 'Beam', 'UniqueName'])
+        columns = list(df.loc[df['Type'] == 'Column', 'UniqueName'])
+        return beams, columns
+
     def get_beams_columns(
             self,
             type_=2,
             types : list =[],
             story : Union[str, bool] = None,
             stories: list=[],
+            use_tables: bool=True,
             ):
         '''
         type_: 1=steel and 2=concrete
+        use_tables: classify the frames with database tables instead of COM calls for each frame
         '''
+        if use_tables:
+            ret = self.get_beams_columns_from_tables(type_, types, story, stories)
+            if ret is not None:
+                return ret
         beams = []
         columns = []
         others = []
@@ -295,7 +416,7 @@ class FrameObj:
         unique_names = []
         labels = []
         for frame in frame_names:
-            label, _, _ = self.etabs.SapModel.FrameObj.GetLabelFromName(frame)
+            label = self.get_label_and_story(frame)[0]
             if label not in labels:
                 labels.append(label)
                 unique_names.append(frame)
@@ -310,11 +431,8 @@ class FrameObj:
         columns = self.get_beams_columns(types=[1,2])[1]
         labels = self.get_unique_frames(columns)[1]
         stories = self.etabs.story.get_sorted_story_name(reverse=False, include_base=False)
-        for lable in labels:
-            names = []
-            for story in stories:
-                name = self.SapModel.FrameObj.GetNameFromLabel(lable, story)[0]
-                names.append(name)
+        df = self.get_label_index().names_by_story(labels, stories)
+        for lable, names in zip(df.index, df.values.tolist()):
             ret[lable] = names
         return ret
 
@@ -335,66 +453,8 @@ class FrameObj:
                 to_dataframe=True,
                 cols=['UniqueName', 'UniquePtI', 'UniquePtJ'],
             )
-        # Build point Z lookup
-        point_z = points_df.set_index('UniqueName')['Z'].to_dict()
-        # Build column info: id -> (pt_low, pt_up, z_low, z_up, length)
-        col_info = {}
-        for _, row in columns_df.iterrows():
-            col_id = row['UniqueName']
-            pt_i, pt_j = row['UniquePtI'], row['UniquePtJ']
-            z_i, z_j = point_z[pt_i], point_z[pt_j]
-            if z_i <= z_j:
-                pt_low, pt_up, z_low, z_up = pt_i, pt_j, z_i, z_j
-            else:
-                pt_low, pt_up, z_low, z_up = pt_j, pt_i, z_j, z_i
-            length = abs(z_up - z_low)
-            col_info[col_id] = dict(
-                pt_low=pt_low, pt_up=pt_up, z_low=z_low, z_up=z_up, length=length
-            )
-        # Build mapping: pt_low -> [col_id], pt_up -> [col_id]
-        pt_low_map = {}
-        pt_up_map = {}
-        for col_id, info in col_info.items():
-            pt_low_map.setdefault(info['pt_low'], []).append(col_id)
-            pt_up_map.setdefault(info['pt_up'], []).append(col_id)
-        # Find base columns (those whose pt_low is not pt_up of any other column)
-        base_cols = []
-        for col_id, info in col_info.items():
-            if info['pt_low'] not in pt_up_map:
-                base_cols.append(col_id)
-        # Build chains
-        used_cols = set()
-        groups = []
-        for base_col in base_cols:
-            chain = []
-            curr_col = base_col
-            while curr_col is not None:
-                chain.append(curr_col)
-                used_cols.add(curr_col)
-                pt_up = col_info[curr_col]['pt_up']
-                next_cols = pt_low_map.get(pt_up, [])
-                # If multiple, pick the longest
-                next_col = None
-                if next_cols:
-                    if len(next_cols) > 1:
-                        # Pick the longest
-                        next_col = max(next_cols, key=lambda cid: col_info[cid]['length'])
-                    else:
-                        next_col = next_cols[0]
-                    if next_col in used_cols:
-                        break
-                else:
-                    next_col = None
-                curr_col = next_col
-            groups.append(chain)
-        # Add any unchained columns (not in any group)
-        for col_id in col_info:
-            if col_id not in used_cols:
-                groups.append([col_id])
-        # Sort each group bottom to top by z_low
-        for group in groups:
-            group.sort(key=lambda cid: col_info[cid]['z_low'])
-        return groups
+        import frame_obj_funcs
+        return frame_obj_funcs.group_stacked_columns(points_df, columns_df)
 
     @change_unit('N', 'mm')
     def stacked_columns_dataframe_by_points(self,
@@ -417,38 +477,9 @@ class FrameObj:
                 cols=['UniqueName', 'UniquePtI', 'UniquePtJ'],
             )
         groups = self.group_stacked_columns_by_points(points_df=points_df, columns_df=columns_df)
-        # Build point Z lookup
-        point_z = points_df.set_index('UniqueName')['Z'].to_dict()
-        # Build a dict: col_id -> (z_low, z_up)
-        col_z_bounds = {}
-        for _, row in columns_df.iterrows():
-            col_id = row['UniqueName']
-            pt_i, pt_j = row['UniquePtI'], row['UniquePtJ']
-            z_i, z_j = point_z[pt_i], point_z[pt_j]
-            z_low, z_up = sorted([z_i, z_j])
-            col_z_bounds[col_id] = (z_low, z_up)
-        # Collect all unique Z levels
-        z_levels = set()
-        for z_low, z_up in col_z_bounds.values():
-            z_levels.add(z_low)
-            z_levels.add(z_up)
-        z_levels = sorted(z_levels, reverse=True)
-        # Exclude the lowest Z
-        if len(z_levels) > 1:
-            z_levels = z_levels[:-1]
-        # Build DataFrame
-        data = []
-        for z in z_levels:
-            row = []
-            for group in groups:
-                col_at_z = None
-                for col_id in group:
-                    z_low, z_up = col_z_bounds[col_id]
-                    if z_low < z <= z_up or math.isclose(z, z_up, abs_tol=tolerance):
-                        col_at_z = col_id
-                        break
-                row.append(col_at_z)
-            data.append(row)
+        import frame_obj_funcs
+        z_levels, data = frame_obj_funcs.get_stacked_columns_levels(
+            points_df, columns_df, groups, tolerance)
         df = pd.DataFrame(data, index=z_levels)
         story_elevation = self.etabs.story.get_sorted_story_and_levels()
         indexes = self.replace_story_with_elevation(df.index, story_elevation)
@@ -509,6 +540,7 @@ class FrameObj:
             self.SapModel.SelectObj.ClearSelection()
             print('Start Design ...')
             self.SapModel.DesignConcrete.StartDesign()
+            self.etabs.database.clear_cache()
         self.etabs.set_current_unit('kgf', 'cm')
         beams, columns = self.get_beams_columns()
         if frame_names is not None:
@@ -542,14 +574,14 @@ class FrameObj:
         columns_pmm_main_and_weakness = []
         for key, value in columns_pmm.items():
             value2 = columns_pmm_weakness[key]
-            label, story, _ = self.SapModel.FrameObj.GetLabelFromName(key)
+            label, story = self.get_label_and_story(key)
             ratio = round(value2/value, 3)
             columns_pmm_main_and_weakness.append((story, label, value, value2, ratio))
         col_fields = ('Story', 'Label', 'PMM Ratio1', 'PMM ratio2', 'Ratio')
         beams_rebars_main_and_weakness = []
         for key, d in beams_rebars.items():
             d2 = beams_rebars_weakness[key]
-            label, story, _ = self.SapModel.FrameObj.GetLabelFromName(key)
+            label, story = self.get_label_and_story(key)
             locations = d['location']
             top_area1 = d['TopArea']
             top_area2 = d2['TopArea']
@@ -594,7 +626,7 @@ class FrameObj:
             except IndexError:
                 return None
         self.SapModel.File.Save()
-        story = self.SapModel.FrameObj.GetLabelFromName(name)[1]
+        story = self.get_label_and_story(name)[1]
         story_frames = list(self.SapModel.FrameObj.GetNameListOnStory(story)[1])
         story_frames.remove(name)
         print('get columns pmm and beams rebars')
@@ -684,33 +716,77 @@ class FrameObj:
         assert j <= 1
         if beam_names is None:
             beam_names, _ = self.get_beams_columns(2)
-        self.SapModel.SetModelIsLocked(False)
-        for name in beam_names:
-            modifiers = list(self.SapModel.FrameObj.GetModifiers(name)[0])
-            modifiers[3] = j
-            self.SapModel.FrameObj.SetModifiers(name, modifiers)
+        table = self.get_modifier_table()
+        df = table.read(beam_names)
+        df['JMod'] = j
+        table.write(df)
     
     def multiply_modifiers(self,
                 mult: list= 8*[1.4],
                 frame_names: Union[None, list]=None,
                 ):
+        import modifiers
         assert min(mult) >= 0
         if frame_names is None:
             frame_names, _ = self.get_beams_columns(2)
-        self.SapModel.SetModelIsLocked(False)
-        for name in frame_names:
-            modifiers = list(self.SapModel.FrameObj.GetModifiers(name)[0])
-            modifiers = [min(modifiers[i] * mult[i], 1) for i in range(len(modifiers))]
-            self.SapModel.FrameObj.SetModifiers(name, modifiers)
+        table = self.get_modifier_table()
+        df = table.read(frame_names)
+        df = modifiers.multiply_modifiers(df, mult)
+        table.write(df)
     
     def apply_torsion_stiffness_coefficient(self,
                 beams_coeff : dict,
                 ):
-        self.SapModel.SetModelIsLocked(False)
-        for name, ratio in beams_coeff.items():
-            modifiers = list(self.SapModel.FrameObj.GetModifiers(name)[0])
-            modifiers[3] = ratio
-            self.SapModel.FrameObj.SetModifiers(name, modifiers)
+        table = self.get_modifier_table()
+        df = table.read(beams_coeff.keys())
+        df['JMod'] = df.index.map(beams_coeff).astype(float)
+        table.write(df)
+
+    def get_modifier_table(self):
+        '''
+        return the table of frames property modifiers, see modifiers.ModifierTable
+        '''
+        from modifiers import ModifierTable
+        return ModifierTable.frames(self.etabs)
+
+    def get_modifiers(self,
+                names: Union[Iterable, None] = None,
+                ) -> pd.DataFrame:
+        '''
+        return the property modifiers of names or all frames with one table read
+        '''
+        return self.get_modifier_table().read(names)
+
+    def _read_classified_modifiers(self,
+                table,
+                names: Union[Iterable, None] = None,
+                ) -> pd.DataFrame:
+        '''
+        return the modifiers of table with Type and DesignProcedure of
+        get_frames_type_and_design_procedure
+        '''
+        frames = self.get_frames_type_and_design_procedure()
+        if frames is None:
+            raise ValueError('The design procedure of frames is not available in the database tables')
+        frames = frames.drop_duplicates('UniqueName').set_index('UniqueName')
+        df = table.read(names)
+        df['Type'] = df.index.map(frames['Type'])
+        df['DesignProcedure'] = df.index.map(frames['DesignProcedure'])
+        return df
+
+    def set_drift_modifiers(self,
+                i_beam: float = 0.5,
+                i_column: float = 1,
+                ):
+        '''
+        set the modifiers of concrete frames for drift periods, see
+        modifiers.drift_frame_modifiers
+        '''
+        import modifiers
+        table = self.get_modifier_table()
+        df = self._read_classified_modifiers(table)
+        df = modifiers.drift_frame_modifiers(df, i_beam, i_column)
+        return table.write(df)
         
     def get_t_crack(self,
                     beams_names = None,
@@ -799,53 +875,43 @@ class FrameObj:
             design_orientation: str='',
             ):
         '''
-        design_procedure: steel: 1, concrete: 2
+        design_procedure: 'steel' or 'concrete'
+        design_orientation: 'column' or 'beam'
+        a modifier greater than 1 is a length, the modifier of rectangular
+        sections with depth h is 1 - mod / h if mod < h
         '''
+        import modifiers
+        table = self.get_modifier_table()
+        df = self._read_classified_modifiers(table, frame_names)
         # filter desired procedure
-        design_procedures = {'steel': 1, 'concrete': 2}
-        design_procedure = design_procedures.get(design_procedure, None)
-        if design_procedure is not None:
-            desired_procedure = []
-            for name in frame_names:
-                if self.SapModel.FrameObj.GetDesignProcedure(name)[0] == design_procedure:
-                    desired_procedure.append(name)
-            frame_names = desired_procedure
+        if design_procedure in ('steel', 'concrete'):
+            df = df.loc[df['DesignProcedure'] == self.design_procedure_number(design_procedure)]
         # filter desired orientation
-        design_orientations = {'column': 1, 'beam': 2}
+        design_orientations = {'column': 'Column', 'beam': 'Beam'}
         design_orientation = design_orientations.get(design_orientation)
         if design_orientation is not None:
-            desired_orientation = []
-            for name in frame_names:
-                if self.SapModel.FrameObj.GetDesignOrientation(name)[0] == design_orientation:
-                    desired_orientation.append(name)
-            frame_names = desired_orientation
+            df = df.loc[df['Type'] == design_orientation]
+        if len(df) == 0:
+            raise ValueError('None of frame_names matches design_procedure and design_orientation')
         mod_names = [area, as2, as3, torsion, i22, i33, mass, weight]
-        for name in frame_names:
-            modifiers = list(self.SapModel.FrameObj.GetModifiers(name)[0])
-            for i, mod in enumerate(mod_names):
-                if mod:
-                    if mod > 1:
-                        section_name = self.SapModel.FrameObj.GetSection(name)[0]
-                        try:
-                            h = self.SapModel.PropFrame.GetRectangle(section_name)[2]
-                        except: # Non prismitic sections
-                            continue
-                        ratio = mod / h
-                        if ratio < 1:
-                            mod = 1 - ratio
-                    modifiers[i] = mod
-            self.SapModel.FrameObj.SetModifiers(name, modifiers)
+        values = dict(zip(modifiers.FRAME_MODIFIER_COLUMNS, mod_names))
+        depths = None
+        if any(mod and mod > 1 for mod in mod_names):
+            # Non prismitic sections have no depth
+            sections_df = self.etabs.database.read('Frame Section Property Definitions - Concrete Rectangular',
+                to_dataframe=True, cols=['Name', 't3'], schema=True)
+            if sections_df is not None:
+                depths = df['AnalysisSect'].map(dict(zip(sections_df['Name'], sections_df['t3'])))
+        df = modifiers.assign_modifiers(df, values, depths)
+        table.write(df)
     
     def get_beams_torsion_prop_modifiers(self,
             beams_names : Iterable[str] = None,
             ) -> dict:
         if beams_names is None:
             beams_names, _  = self.get_beams_columns()
-        beams_j = {}
-        for name in beams_names:
-            modifiers = list(self.SapModel.FrameObj.GetModifiers(name)[0])
-            beams_j[name] = modifiers[3]
-        return beams_j
+        df = self.get_modifiers(beams_names)
+        return dict(zip(df.index, df['JMod']))
 
     def correct_torsion_stiffness_factor(self,
                 load_combinations : Iterable[str] = None,
@@ -857,8 +923,24 @@ class FrameObj:
                 j_min_value = 0.01,
                 initial_j : Union[float, None] = None,
                 decimals : Union[int, None] = None,
+                incremental : bool = False,
+                secant : bool = False,
+                relaxation : float = 1.0,
                 ):
-        import numpy as np
+        '''
+        yield the iteration number after each analysis and the dataframe of
+        beams at the end.
+        incremental: only the beams with T > phi_Tcr / (1 - tolerance) change
+            their j, the changed j are written to the modifiers table and the
+            torsion of these beams is read for the combinations that give their
+            maximum torsion. All beams and combinations are checked before the end.
+        secant: use the secant of the last two iterations for the j of beams
+        relaxation: fraction of the change of j in each iteration
+        self.torsion_history: number of active and changed beams, residual,
+            max(T / phi_Tcr) - 1, and times of each iteration
+        '''
+        import time
+        import frame_obj_funcs as fof
         if beams_names is None:
             beams_names, _  = self.get_beams_columns()
         if initial_j is not None:
@@ -866,39 +948,89 @@ class FrameObj:
         section_t_crack = self.get_t_crack(beams_names, phi=phi)
         beams_sections = self.get_beams_sections(beams_names)
         beams_j = self.get_beams_torsion_prop_modifiers(beams_names)
-        df = self.etabs.database.get_beams_torsion(load_combinations, beams_names)
+        cols = ['Story', 'Beam', 'UniqueName', 'OutputCase', 'T'] if incremental else None
+        df = self.etabs.database.get_beams_torsion(load_combinations, beams_names, cols)
+        df = df.reset_index(drop=True)
         df['section'] = df['UniqueName'].map(beams_sections)
         df['j'] = df['UniqueName'].map(beams_j)
         df['init_j'] = df['j']
         df['phi_Tcr'] = df['section'].map(section_t_crack)
         low = 1 - tolerance
+        self.torsion_history = []
+        j_prev = t_prev = None
+        # the torsion of all beams and combinations are read in last iteration
+        all_read = True
         for i in range(num_iteration):
-            df['ratio'] = df['phi_Tcr'] / df['T']
-            df['ratio'].replace([np.inf, -np.inf], 1, inplace=True)
-            df['ratio'].fillna(1, inplace=True)
-            mask = (df['ratio'] > low)
-            if mask.all():
+            ratio = fof.get_torsion_ratio(df['phi_Tcr'], df['T'])
+            if not all_read and (ratio > low).all():
+                # changing j of some beams changes the torsion of converged beams
+                self._read_beams_torsion(df, load_combinations, beams_names)
+                all_read = True
+                ratio = fof.get_torsion_ratio(df['phi_Tcr'], df['T'])
+            if (ratio > low).all():
                 yield num_iteration - 1
                 break
+            record = {'iteration': i}
+            start = time.perf_counter()
+            j = df['j'].to_numpy(dtype=float, copy=True)
+            t = df['T'].to_numpy(dtype=float, copy=True)
+            new_j = fof.update_torsion_j(j, t, df['phi_Tcr'], j_min_value, j_max_value, low,
+                j_prev, t_prev, relaxation)
+            if secant:
+                j_prev, t_prev = j, t
+            if incremental:
+                active = ratio <= low
+                new_j = np.where(active, new_j, j)
+                changed = active & (new_j != j)
+            else:
+                active = changed = np.ones(len(df), dtype=bool)
+            df['j'] = new_j
+            values = df['j'].round(decimals=decimals) if decimals else df['j']
+            j_dict = dict(zip(df.loc[changed, 'UniqueName'], values[changed]))
+            record['active'] = int(active.sum())
+            record['changed'] = len(j_dict)
+            if not j_dict:
+                # the j of active beams are at their limits
+                self.torsion_history.append(record)
+                break
+            self.apply_torsion_stiffness_coefficient(j_dict)
+            record['write'] = time.perf_counter() - start
+            start = time.perf_counter()
+            self.etabs.run_analysis()
+            record['analysis'] = time.perf_counter() - start
+            start = time.perf_counter()
+            if incremental:
+                names = list(df.loc[active, 'UniqueName'])
+                combos = list(df.loc[active, 'OutputCase'].unique())
+                self._read_beams_torsion(df, combos, names)
+                all_read = False
             else:
-                df['j'] = df['ratio'] * df['j']
-                df['j'] = df['j'].clip(j_min_value, j_max_value)
-                mask = (df['T'] / df['phi_Tcr'] < low)
-                if mask.any():
-                    df['ratio'] = df['ratio'].clip(j_min_value, j_max_value)
-                    df.loc[mask, 'j'] = df.loc[mask, 'ratio']
-                j_dict = dict(zip(df['UniqueName'],
-                    df['j'].round(decimals=decimals) if decimals else df['j']))
-                self.apply_torsion_stiffness_coefficient(j_dict)
-                self.etabs.run_analysis()
                 cols=['UniqueName', 'T']
                 torsion_dict = self.etabs.database.get_beams_torsion(load_combinations, beams_names, cols)
                 df['T'] = df['UniqueName'].map(torsion_dict)
+            record['read'] = time.perf_counter() - start
+            record['residual'] = float(np.max(1 / fof.get_torsion_ratio(df['phi_Tcr'], df['T']))) - 1
+            self.torsion_history.append(record)
             yield i
-        df.drop(columns=['ratio'], inplace=True)
         df = df[['Story', 'Beam', 'UniqueName', 'section', 'phi_Tcr', 'T', 'j', 'init_j']]
         yield df
 
+    def _read_beams_torsion(self,
+                df : pd.DataFrame,
+                load_combinations : Union[Iterable[str], None],
+                beams_names : Iterable[str],
+                ):
+        '''
+        update T and OutputCase of beams_names in df with their maximum torsion
+        '''
+        cols = ['UniqueName', 'OutputCase', 'T']
+        torsion = self.etabs.database.get_beams_torsion(load_combinations, beams_names, cols)
+        torsion = torsion.set_index('UniqueName')
+        filt = df['UniqueName'].isin(torsion.index)
+        names = df.loc[filt, 'UniqueName']
+        df.loc[filt, 'T'] = torsion['T'].reindex(names).to_numpy()
+        df.loc[filt, 'OutputCase'] = torsion['OutputCase'].reindex(names).to_numpy()
+
     def angle_between_two_lines(self,
         line1 : Union[str, Iterable],
         line2 : Union[str, Iterable],
@@ -981,6 +1113,7 @@ class FrameObj:
             x1_offset, y1_offset, z1, x2_offset, y2_offset, z2 = self.get_offset_coordinate_of_beam_in_plan(name, distance, neg)
             line = self.SapModel.FrameObj.AddByCoord(x1_offset, y1_offset, z1, x2_offset, y2_offset, z2)[0]
             lines.append(line)
+        self.invalidate_label_index()
         self.SapModel.SelectObj.ClearSelection()
         self.SapModel.View.RefreshView()
         return lines
@@ -1073,14 +1206,29 @@ class FrameObj:
             name = self.SapModel.SelectObj.GetSelected()[2][-1]
         if stories is None:
             stories = self.SapModel.Story.GetNameList()[1]
-        lable = self.SapModel.FrameObj.GetLabelFromName(name)[0]
+        lable = self.get_label_and_story(name)[0]
         names = []
         for story in stories:
-            bname = self.SapModel.FrameObj.GetNameFromLabel(lable, story)[0]
+            bname = self.get_name_from_label(lable, story)
             if bname is not None:
                 names.append(bname)
         return names
 
+    def get_frames_with_same_labels(self,
+            names: Iterable,
+            stories: Union[list, bool] = None,
+            ) -> list:
+        '''
+        return the frames with the label of names on stories, like get_above_frames
+        for all names
+        '''
+        index = self.get_label_index()
+        if stories is None:
+            stories = self.SapModel.Story.GetNameList()[1]
+        df = index.names_by_story(index.unique_labels(names), stories)
+        frames = (name for name in df.values.ravel().tolist() if name is not None)
+        return list(dict.fromkeys(frames))
+
     def get_height_of_beam(self, name, none_beam_h=0):
         '''
         default: if h = 0, it returns default value
@@ -1099,13 +1247,13 @@ class FrameObj:
         none_beam_h: if the section of beam is None, it gives this value as height of beam
         default : if there is no beam above the beam name, it returns the default value
         '''
-        lable, story, _ = self.SapModel.FrameObj.GetLabelFromName(name)
+        lable, story = self.get_label_and_story(name)
         stories = self.SapModel.Story.GetNameList()[1]
         i_story = stories.index(story)
         if i_story == 0:
             return default
         above_story = stories[i_story - 1]
-        above_beam = self.SapModel.FrameObj.GetNameFromLabel(lable, above_story)[0]
+        above_beam = self.get_name_from_label(lable, above_story)
         if above_beam == None:
             return default
         above_beam_h = self.get_height_of_beam(above_beam, none_beam_h)
@@ -1120,7 +1268,7 @@ class FrameObj:
         '''
         none_beam_h: if the section of beam is None, it gives this value as height of beam
         '''
-        story = self.SapModel.FrameObj.GetLabelFromName(name)[1]
+        story = self.get_label_and_story(name)[1]
         beam_h = self.get_height_of_beam(name, none_beam_h)
         story_h = self.SapModel.Story.GetHeight(story)[0]
         height = story_h - beam_h
@@ -1205,6 +1353,137 @@ class FrameObj:
         self.assign_gravity_load(name, loadpat, value, value, dist1, dist2, load_type, relative, replace, item_type)
         return None
     
+    def get_beams_wall_heights(self,
+            names: Iterable,
+            none_beam_h: Union[float, Iterable] = 0,
+            parapet: Union[float, Iterable] = 0,
+            height_from_below: Union[bool, Iterable] = False,
+            ):
+        '''
+        return the wall heights of beams like assign_gravity_load_from_wall
+        with three table reads instead of some COM calls for each beam
+        '''
+        import frame_obj_funcs
+        database = self.etabs.database
+        summary_df = database.read('Frame Assignments - Summary', to_dataframe=True,
+            cols=['Story', 'Label', 'UniqueName', 'AnalysisSect'])
+        stories_df = database.read('Story Definitions', to_dataframe=True,
+            cols=['Story', 'Height'], schema=True)
+        sections_df = database.read('Frame Section Property Definitions - Concrete Rectangular',
+            to_dataframe=True, cols=['Name', 't3'], schema=True)
+        if summary_df is None:
+            summary_df = pd.DataFrame(columns=['Story', 'Label', 'UniqueName', 'AnalysisSect'])
+        if stories_df is None:
+            stories_df = pd.DataFrame(columns=['Story', 'Height'])
+        depths = {} if sections_df is None else dict(zip(sections_df['Name'], sections_df['t3']))
+        return frame_obj_funcs.get_wall_heights(
+            names,
+            summary_df,
+            list(stories_df['Story']),
+            stories_df['Height'],
+            depths,
+            none_beam_h,
+            parapet,
+            height_from_below,
+            )
+
+    def assign_gravity_loads(self,
+            names: Iterable,
+            loadpat : Union[str, Iterable],
+            val1 : Union[float, Iterable],
+            val2 : Union[float, Iterable],
+            dist1 : Union[float, Iterable] = 0,
+            dist2 : Union[float, Iterable] = 1,
+            load_type : int = 1, # 1: Force per len , 2: Moment per len
+            relative : bool = True,
+            replace : bool = True,
+            ):
+        '''
+        assign gravity distributed loads to frames names like assign_gravity_load,
+        all loads apply with one edit of 'Frame Loads Assignments - Distributed' table
+        '''
+        names = [str(name) for name in names]
+        if not names:
+            return None
+        table_key = 'Frame Loads Assignments - Distributed'
+        self.etabs.load_patterns.select_all_load_patterns()
+        df = self.etabs.database.read(table_key, to_dataframe=True)
+        new_df = pd.DataFrame({
+            'UniqueName': names,
+            'LoadPattern': np.broadcast_to(np.asarray(loadpat, dtype=object), len(names)),
+            'LoadType': 'Force' if load_type == 1 else 'Moment',
+            'Dir': 'Gravity',
+            'DistType': 'Relative Distance' if relative else 'Absolute Distance',
+            'RelDistA' if relative else 'AbsDistA': np.broadcast_to(dist1, len(names)),
+            'RelDistB' if relative else 'AbsDistB': np.broadcast_to(dist2, len(names)),
+            'ForceA': np.broadcast_to(val1, len(names)),
+            'ForceB': np.broadcast_to(val2, len(names)),
+            })
+        if df is None:
+            df = new_df
+        else:
+            if 'GUID' in df.columns:
+                del df['GUID']
+            if replace:
+                keys = pd.MultiIndex.from_frame(new_df[['UniqueName', 'LoadPattern']])
+                filt = pd.MultiIndex.from_frame(df[['UniqueName', 'LoadPattern']]).isin(keys)
+                df = df.loc[~filt]
+            summary = self.etabs.database.read('Frame Assignments - Summary', to_dataframe=True,
+                cols=['Story', 'Label', 'UniqueName'])
+            if summary is not None and {'Story', 'Label'}.issubset(df.columns):
+                summary = summary.drop_duplicates('UniqueName').set_index('UniqueName')
+                new_df.insert(0, 'Label', new_df['UniqueName'].map(summary['Label']))
+                new_df.insert(0, 'Story', new_df['UniqueName'].map(summary['Story']))
+            df = pd.concat([df, new_df], ignore_index=True)
+        self.etabs.database.apply_data(table_key, df)
+        return None
+
+    def assign_gravity_loads_from_walls(self,
+            names: Iterable,
+            loadpat : Union[str, Iterable],
+            mass_per_area : Union[float, Iterable],
+            dist1 : Union[float, Iterable] = 0,
+            dist2 : Union[float, Iterable] = 1,
+            load_type : int = 1, # 1: Force per len , 2: Moment per len
+            relative : bool = True,
+            replace : bool = True,
+            height : Union[float, Iterable, bool] = None,
+            none_beam_h : Union[float, Iterable] = 0,
+            parapet : Union[float, Iterable] = 0,
+            height_from_below : Union[bool, Iterable] = False,
+            opening_ratio : Union[float, Iterable] = 0,
+            ):
+        '''
+        bulk version of assign_gravity_load_from_wall, all parameters except
+        load_type, relative and replace can have one value for each beam
+        '''
+        names = np.asarray([str(name) for name in names], dtype=object)
+        n = len(names)
+        if n == 0:
+            return None
+        if height is None:
+            height = self.get_beams_wall_heights(names, none_beam_h, parapet, height_from_below)
+        height = np.broadcast_to(np.asarray(height, dtype=float), n)
+        values = np.ceil(
+            np.asarray(mass_per_area, dtype=float) * height * (1 - np.asarray(opening_ratio, dtype=float))
+            )
+        values = np.broadcast_to(values, n)
+        filt = height != 0
+        def take(value):
+            return np.broadcast_to(np.asarray(value, dtype=object), n)[filt]
+        self.assign_gravity_loads(
+            names[filt],
+            take(loadpat),
+            values[filt],
+            values[filt],
+            take(dist1),
+            take(dist2),
+            load_type,
+            relative,
+            replace,
+            )
+        return None
+
     def update_gravity_loads_from_wall(self,
             names: str,
             ):
@@ -1222,28 +1501,44 @@ class FrameObj:
         height_from_belows = beams_props.get('height_from_below')
         parapets = beams_props.get('parapet')
         none_beams_h = beams_props.get('none_beam_h')
-        current_names = wall_loadpats.keys()
+        names = [name for name in names if name in wall_loadpats]
+        if not names:
+            return None
         self.etabs.set_current_unit('kgf', 'm')
-        for name in names:
-            if name in current_names:
-                mass_per_area = wall_weight_per_areas.get(name)
-                loadpat = wall_loadpats.get(name)
-                opening_ratio = wall_opening_ratios.get(name)
-                dist1 = wall_dists1.get(name)
-                dist2 = wall_dists2.get(name)
-                height_from_below = height_from_belows.get(name, False)
-                parapet = parapets.get(name)
-                none_beam_h = none_beams_h.get(name, .15)
-                if height_from_below:
-                    height = self.get_heigth_from_top_of_below_story_to_below_of_beam(name, none_beam_h) * .5
-                else:
-                    height = self.get_heigth_from_top_of_beam_to_buttom_of_above_beam(name, none_beam_h, parapet)
-                if height == 0:
-                    continue
-                value = math.ceil(mass_per_area * height * (1 - opening_ratio))
-                self.assign_gravity_load(name, loadpat, value, value, dist1, dist2,)
+        self.assign_gravity_loads_from_walls(
+            names,
+            loadpat=[wall_loadpats.get(name) for name in names],
+            mass_per_area=[wall_weight_per_areas.get(name) for name in names],
+            dist1=[wall_dists1.get(name) for name in names],
+            dist2=[wall_dists2.get(name) for name in names],
+            none_beam_h=[none_beams_h.get(name, .15) for name in names],
+            parapet=[parapets.get(name) for name in names],
+            height_from_below=[height_from_belows.get(name, False) for name in names],
+            opening_ratio=[wall_opening_ratios.get(name) for name in names],
+            )
         return None
 
+    def get_frame_names_of_item_type(self,
+            names: Iterable,
+            item_type: int = 0,
+            ) -> list:
+        '''
+        return the frame names of names for item_type, 0: names are frames,
+        1: the frames of groups names, 2: the selected frames, names are ignored
+        '''
+        if item_type == 0:
+            return list(names)
+        if item_type == 1:
+            frames = []
+            for group in names:
+                types, objects = self.SapModel.GroupDef.GetAssignments(group)[1:3]
+                frames.extend(name for t, name in zip(types, objects) if t == 2)
+            return list(dict.fromkeys(frames))
+        if item_type == 2:
+            types, objects = self.SapModel.SelectObj.GetSelected()[1:3]
+            return [name for t, name in zip(types, objects) if t == 2]
+        raise ValueError(f'item_type must be 0, 1 or 2, not {item_type}')
+
     def assign_gravity_load_to_selfs_and_above_beams(self,
             loadpat : str,
             mass_per_area : float,
@@ -1254,13 +1549,17 @@ class FrameObj:
             load_type : int = 1, # 1: Force per len , 2: Moment per len
             relative : bool = True,
             replace : bool = True,
-            item_type : int = 0, # 0: object, 2: selected_obj
+            item_type : int = 0, # 0: object, 1: group, 2: selected_obj
             height : Union[float, bool] = None,
             none_beam_h : float = 0,
             parapet : float = 0,
             height_from_below : bool = False,
             opening_ratio : float = 0,
         ):
+        '''
+        item_type: 0 names are frames, 1 names are groups and 2 the selected
+            frames, like the ItemType of SetLoadDistributed
+        '''
         d = self.etabs.get_settings_from_model()
         beam_wall_props_key = 'beams_wall_loads'
         beams_props = d.get(beam_wall_props_key, {})
@@ -1272,17 +1571,17 @@ class FrameObj:
             for t, name in zip(types, all_names):
                 if t == 2 and self.is_beam(name):
                     names.append(name)
+        else:
+            names = self.get_frame_names_of_item_type(names, item_type)
         if stories is None:
             stories = self.SapModel.Story.GetNameList()[1]
-        for name in names:
-            beam_names = self.get_above_frames(name, stories)
+        beam_names = self.get_frames_with_same_labels(names, stories)
+        self.assign_gravity_loads_from_walls(beam_names, loadpat,
+            mass_per_area, dist1, dist2, load_type, relative,
+            replace, height, none_beam_h, parapet,
+            height_from_below, opening_ratio)
+        if not height_from_below:
             for beam_name in beam_names:
-                self.assign_gravity_load_from_wall(beam_name, loadpat,
-                    mass_per_area, dist1, dist2, load_type, relative,
-                    replace, item_type, height, none_beam_h, parapet,
-                    height_from_below, opening_ratio)
-                if height_from_below:
-                    continue
                 wall_loads_dict = {
                 'wall_loadpat': loadpat,
                 'wall_weight_per_area': mass_per_area,
@@ -1313,7 +1612,7 @@ class FrameObj:
         d = self.etabs.get_settings_from_model()
         beam_wall_props_key = 'beams_wall_loads'
         beams_props = d.get(beam_wall_props_key, {})
-        names = set()
+        loads = []
         len_unit = 'm'
         weight_unit = 'kg'
         self.etabs.set_current_unit(f'{weight_unit}f', len_unit)
@@ -1342,22 +1641,12 @@ class FrameObj:
                         label, story = obj.base.Label.split('_')[:2]
                     elif hasattr(obj, 'Base'):
                         label, story = obj.Base.Label.split('_')[:2]
-                    name = self.etabs.SapModel.FrameObj.GetNameFromLabel(label, story)[0]
+                    name = self.get_name_from_label(label, story)
                 height, percent = freecad_funcs.equivalent_height_in_meter(obj)
                 load_value = math.ceil(height * weight)
                 dist1, dist2 = freecad_funcs.get_relative_dists(obj)
 
-                self.assign_gravity_load(
-                    name=name,
-                    loadpat=loadpat,
-                    val1=load_value,
-                    val2=load_value,
-                    dist1=dist1,
-                    dist2=dist2,
-                    relative=True,
-                    replace=name not in names,
-                )
-                names.add(name)
+                loads.append((name, loadpat, load_value, dist1, dist2))
                 wall_loads_dict = {
                     'wall_loadpat': loadpat,
                     'wall_weight_per_area': weight,
@@ -1373,6 +1662,9 @@ class FrameObj:
                     props[name] = value
                     if not props:
                         beams_props[key] = props
+        if loads:
+            names, loadpats, values, dists1, dists2 = zip(*loads)
+            self.assign_gravity_loads(names, loadpats, values, values, dists1, dists2)
         self.etabs.update_setting([beam_wall_props_key], [beams_props])
 
     def concrete_section_names(self, type_='Beam'):
@@ -1550,6 +1842,7 @@ class FrameObj:
         self.set_frame_obj_selected(columns)
         print('Start Design ...')
         exec(f"self.SapModel.Design{type_}.StartDesign()")
+        self.etabs.database.clear_cache()
         # get the PMM ratio table
         self.etabs.set_current_unit('tonf', 'm')
         if type_ == 'Concrete':
@@ -1593,13 +1886,20 @@ class FrameObj:
         importance_factor : float = 1,
         replace : bool  = True,
         self_weight : bool = False,
+        use_tables : bool = True,
         ):
+        '''
+        use_tables: write the ev loads to the frame loads tables with one
+        apply_data for each table instead of COM calls for each load
+        '''
         self.etabs.unlock_model()
         self.etabs.set_current_unit('kgf', 'm')
+        ev_value = 0.6 * acc * importance_factor
+        if use_tables:
+            return self.assign_ev_with_tables(frames, load_patterns, ev, ev_value, replace, self_weight)
         # Distributed loads
         table_key = 'Frame Loads Assignments - Distributed'
         df = self.etabs.database.read(table_key=table_key, to_dataframe=True)
-        ev_value = 0.6 * acc * importance_factor
         if replace:
             # remove current loads
             for name in frames:
@@ -1612,7 +1912,7 @@ class FrameObj:
                     LoadPat = ev,
                 )
         if df is not None:
-            del df['GUID']
+            self.etabs.database.remove_df_columns(df, ('GUID',))
             filt = (df.UniqueName.isin(frames) & df.LoadPattern.isin(load_patterns))
             df = df[filt]
 
@@ -1633,7 +1933,7 @@ class FrameObj:
         table_key = 'Frame Loads Assignments - Point'
         df = self.etabs.database.read(table_key=table_key, to_dataframe=True)
         if df is not None:
-            del df['GUID']
+            self.etabs.database.remove_df_columns(df, ('GUID',))
             filt = (df.UniqueName.isin(frames) & df.LoadPattern.isin(load_patterns))
             df = df[filt]
             for i, row in df.iterrows():
@@ -1662,6 +1962,49 @@ class FrameObj:
                     replace = False,
                 )
 
+    def assign_ev_with_tables(
+        self,
+        frames : list,
+        load_patterns : list,
+        ev : str,
+        ev_value : float,
+        replace : bool  = True,
+        self_weight : bool = False,
+        ):
+        '''
+        Same as assign_ev, the ev loads are ceil(Force * ev_value) of the
+        loads in load_patterns and they are written with one apply_data for
+        the distributed and point loads tables
+        '''
+        import frame_obj_funcs as fof
+        frames = list(frames)
+        self_weight_df = None
+        if self_weight:
+            df = self.get_unit_weight_of_beams(frames)
+            index = self.get_label_index()
+            self_weight_df = pd.DataFrame({
+                'Story': [index.story(name) for name in df['UniqueName']],
+                'Label': [index.label(name) for name in df['UniqueName']],
+                'UniqueName': df['UniqueName'].to_numpy(),
+                'LoadPattern': ev,
+                'LoadType': 'Force',
+                'Dir': 'Gravity',
+                'DistType': 'Relative Distance',
+                'RelDistA': 0,
+                'RelDistB': 1,
+                'ForceA': np.ceil(df['unit_weight'].to_numpy(dtype=float) * ev_value),
+                })
+            self_weight_df['ForceB'] = self_weight_df['ForceA']
+        for table_key, force_columns, additional in (
+            ('Frame Loads Assignments - Distributed', ('ForceA', 'ForceB'), self_weight_df),
+            ('Frame Loads Assignments - Point', ('Force',), None),
+            ):
+            df = self.etabs.database.read(table_key=table_key, to_dataframe=True)
+            if df is None and additional is None:
+                continue
+            df = fof.get_ev_loads(df, frames, load_patterns, ev, ev_value, force_columns, replace, additional)
+            self.etabs.database.apply_data(table_key, df)
+
     def get_area(self,
         name: str,
         cover: float=0,
@@ -1699,6 +2042,7 @@ class FrameObj:
         else:
             for frame in frames:
                 self.SapModel.FrameObj.Delete(frame)
+        self.invalidate_label_index()
 
     def set_end_release_for_columns_with_pier_label(self,
                                                     piers: Union[str, list, None]= None,
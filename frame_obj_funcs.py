@@ -1,4 +1,7 @@
-from typing import Union
+from typing import Iterable, Union
+
+import numpy as np
+import pandas as pd
 
 def get_beam_continuity(
                         beams_in_axis_plus_dimensions: list,
@@ -188,3 +191,271 @@ def get_b_joint_shear_of_column(
 
 
 
+
+
+def get_columns_z_bounds(
+    points_df: pd.DataFrame,
+    columns_df: pd.DataFrame,
+) -> tuple:
+    '''
+    return UniqueName, lower point, upper point, z_low and z_up arrays of columns
+    '''
+    points = points_df.drop_duplicates('UniqueName', keep='last')
+    index = pd.Index(points['UniqueName'])
+    z = points['Z'].to_numpy(dtype=float)
+    names = columns_df['UniqueName'].to_numpy(dtype=object)
+    pt_i = columns_df['UniquePtI'].to_numpy(dtype=object)
+    pt_j = columns_df['UniquePtJ'].to_numpy(dtype=object)
+    index_i = index.get_indexer(pt_i)
+    index_j = index.get_indexer(pt_j)
+    missing = np.flatnonzero((index_i < 0) | (index_j < 0))
+    if len(missing):
+        i = missing[0]
+        raise KeyError(pt_i[i] if index_i[i] < 0 else pt_j[i])
+    z_i, z_j = z[index_i], z[index_j]
+    swap = z_i > z_j
+    pt_low = np.where(swap, pt_j, pt_i)
+    pt_up = np.where(swap, pt_i, pt_j)
+    return names, pt_low, pt_up, np.minimum(z_i, z_j), np.maximum(z_i, z_j)
+
+def get_stacked_columns_chains(
+    pt_low: np.ndarray,
+    pt_up: np.ndarray,
+    z_low: np.ndarray,
+    z_up: np.ndarray,
+) -> list:
+    '''
+    return the indices of vertically stacked columns from bottom to top. A chain
+    starts at a column whose lower point is not the upper point of any column and
+    continues with the longest column that starts at the upper point.
+    Columns that are not in any chain are single groups.
+    '''
+    n = len(pt_low)
+    if n == 0:
+        return []
+    codes, uniques = pd.factorize(np.concatenate([pt_low, pt_up]))
+    low_codes, up_codes = codes[:n], codes[n:]
+    is_upper_point = np.zeros(len(uniques), dtype=bool)
+    is_upper_point[up_codes] = True
+    bases = np.flatnonzero(~is_upper_point[low_codes])
+    # the longest column that starts at each point, the first one for equal lengths
+    order = np.lexsort((np.arange(n), -(z_up - z_low), low_codes))
+    _, first = np.unique(low_codes[order], return_index=True)
+    next_column = np.full(len(uniques), -1)
+    next_column[low_codes[order[first]]] = order[first]
+    successors = next_column[up_codes].tolist()
+    used = np.zeros(n, dtype=bool)
+    chains = []
+    for curr in bases.tolist():
+        chain = []
+        while curr >= 0:
+            chain.append(curr)
+            used[curr] = True
+            curr = successors[curr]
+            if curr >= 0 and used[curr]:
+                break
+        chains.append(chain)
+    chains.extend([i] for i in np.flatnonzero(~used).tolist())
+    z_low_list = z_low.tolist()
+    for chain in chains:
+        chain.sort(key=z_low_list.__getitem__)
+    return chains
+
+def group_stacked_columns(
+    points_df: pd.DataFrame,
+    columns_df: pd.DataFrame,
+) -> list:
+    '''
+    return the UniqueName of vertically stacked columns that connect with
+    common points, each group is sorted from bottom to top
+    '''
+    names, pt_low, pt_up, z_low, z_up = get_columns_z_bounds(points_df, columns_df)
+    chains = get_stacked_columns_chains(pt_low, pt_up, z_low, z_up)
+    return [[names[i] for i in chain] for chain in chains]
+
+def get_stacked_columns_levels(
+    points_df: pd.DataFrame,
+    columns_df: pd.DataFrame,
+    groups: list,
+    tolerance: float=1e-2,
+) -> tuple:
+    '''
+    return the Z levels of columns from top to bottom without the lowest Z, and
+    a row for each level with the column of each group that z_low < z <= z_up or
+    z is close to z_up, None if there is no column
+    '''
+    names, _, _, z_low, z_up = get_columns_z_bounds(points_df, columns_df)
+    levels = np.unique(np.concatenate([z_low, z_up]))
+    if len(levels) > 1:
+        levels = levels[1:]
+    grid = np.full((len(levels), len(groups)), None, dtype=object)
+    sizes = [len(group) for group in groups]
+    if sum(sizes):
+        columns = pd.Index(names).get_indexer(np.concatenate([np.asarray(group, dtype=object) for group in groups]))
+        group_ids = np.repeat(np.arange(len(groups)), sizes)
+        zl, zu = z_low[columns], z_up[columns]
+        tol = np.maximum(tolerance, 1e-9 * np.abs(zu))
+        # levels in (z_low, z_up] or close to z_up are one range of sorted levels
+        start = np.minimum(
+            np.searchsorted(levels, zl, side='right'),
+            np.searchsorted(levels, zu - tol, side='left'),
+            )
+        end = np.searchsorted(levels, zu + tol, side='right')
+        counts = np.maximum(end - start, 0)
+        items = np.repeat(np.arange(len(columns)), counts)
+        offsets = np.cumsum(counts) - counts
+        level_ids = start[items] + np.arange(len(items)) - offsets[items]
+        # the first column of each group in each level
+        keys = level_ids * len(groups) + group_ids[items]
+        order = np.argsort(keys, kind='stable')
+        _, first = np.unique(keys[order], return_index=True)
+        items = items[order[first]]
+        grid[level_ids[order[first]], group_ids[items]] = names[columns[items]]
+    return levels[::-1].tolist(), grid[::-1].tolist()
+
+def get_beams_depth(
+    sections: pd.Series,
+    depths: dict,
+    none_beam_h: Union[float, np.ndarray]=0,
+) -> np.ndarray:
+    '''
+    return the depth of beams with sections, none_beam_h for 'None' sections
+    and 0 for sections that are not in depths
+    '''
+    h = sections.map(depths).to_numpy(dtype=float, na_value=np.nan)
+    h = np.where(np.isnan(h), 0, h)
+    return np.where(sections.to_numpy() == 'None', none_beam_h, h)
+
+def get_wall_heights(
+    names: Iterable,
+    summary_df: pd.DataFrame,
+    stories: list,
+    heights: Iterable,
+    depths: dict,
+    none_beam_h: Union[float, Iterable]=0,
+    parapet: Union[float, Iterable]=0,
+    height_from_below: Union[bool, Iterable]=False,
+) -> np.ndarray:
+    '''
+    return the height of walls on beams names, like
+    FrameObj.get_heigth_from_top_of_beam_to_buttom_of_above_beam or half of
+    FrameObj.get_heigth_from_top_of_below_story_to_below_of_beam if height_from_below.
+
+    summary_df: UniqueName, Label, Story and AnalysisSect of frames
+    stories, heights: story names from top to bottom and their heights
+    depths: depth of sections
+    none_beam_h, parapet and height_from_below are scalars or one value for each beam,
+    parapet is the height if there is no beam above the beam
+    '''
+    names = np.asarray(list(names), dtype=object)
+    n = len(names)
+    none_beam_h = np.broadcast_to(np.asarray(none_beam_h, dtype=float), (n,))
+    parapet = np.broadcast_to(np.asarray(parapet, dtype=float), (n,))
+    height_from_below = np.broadcast_to(np.asarray(height_from_below, dtype=bool), (n,))
+    summary = summary_df.drop_duplicates('UniqueName').set_index('UniqueName')
+    rows = summary.reindex(names)
+    stories = np.asarray(stories, dtype=object)
+    heights = np.asarray(heights, dtype=float)
+    if len(stories) == 0:
+        return np.where(height_from_below, 0, parapet)
+    story_index = pd.Index(stories).get_indexer(rows['Story'])
+    story_h = np.where(story_index >= 0, heights[np.maximum(story_index, 0)], 0)
+    beam_h = get_beams_depth(rows['AnalysisSect'], depths, none_beam_h)
+    below = (story_h - beam_h) * .5
+    # the beam with the same label in the above story
+    has_above_story = story_index > 0
+    above_index = np.maximum(story_index - 1, 0)
+    above_story = np.where(has_above_story, stories[above_index], '')
+    labels = summary_df.drop_duplicates(['Label', 'Story']).set_index(['Label', 'Story'])['UniqueName']
+    above_names = labels.reindex(pd.MultiIndex.from_arrays([rows['Label'].to_numpy(), above_story]))
+    has_above_beam = has_above_story & above_names.notna().to_numpy()
+    above_h = get_beams_depth(
+        summary['AnalysisSect'].reindex(above_names.to_numpy()),
+        depths,
+        none_beam_h,
+        )
+    above = np.where(has_above_beam, heights[above_index] - above_h, parapet)
+    return np.where(height_from_below, below, above)
+
+def get_ev_loads(
+    df: Union[pd.DataFrame, None],
+    frames: Iterable,
+    load_patterns: Iterable,
+    ev: str,
+    ev_value: float,
+    force_columns: Iterable=('ForceA', 'ForceB'),
+    replace: bool=True,
+    additional: Union[pd.DataFrame, None]=None,
+) -> pd.DataFrame:
+    '''
+    return the frame loads table df with ev loads of frames, ceil(Force * ev_value)
+    of their loads in load_patterns, like FrameObj.assign_ev.
+
+    df: 'Frame Loads Assignments - Distributed' or 'Point' table
+    replace: remove the current ev loads of frames
+    additional: rows of ev loads that add to the table, like self weight loads
+    '''
+    if df is None:
+        df = pd.DataFrame(columns=additional.columns)
+    df = df.drop(columns='GUID', errors='ignore')
+    filt = df['UniqueName'].isin(list(frames))
+    ev_df = df.loc[filt & df['LoadPattern'].isin(list(load_patterns))].copy()
+    ev_df['LoadPattern'] = ev
+    for col in force_columns:
+        ev_df[col] = np.ceil(ev_df[col].astype(float) * ev_value)
+    if replace:
+        df = df.loc[~(filt & (df['LoadPattern'] == ev))]
+    dfs = [df, ev_df]
+    if additional is not None:
+        dfs.append(additional)
+    return pd.concat(dfs, ignore_index=True)
+
+def get_torsion_ratio(
+    phi_tcr: Iterable,
+    t: Iterable,
+) -> np.ndarray:
+    '''
+    return phi_Tcr / T of beams, 1 for beams without torsion
+    '''
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.asarray(phi_tcr, dtype=float) / np.asarray(t, dtype=float)
+    return np.where(np.isfinite(ratio), ratio, 1.)
+
+def update_torsion_j(
+    j: Iterable,
+    t: Iterable,
+    phi_tcr: Iterable,
+    j_min: float=0.01,
+    j_max: float=1.0,
+    low: float=0.9,
+    j_prev: Union[Iterable, None]=None,
+    t_prev: Union[Iterable, None]=None,
+    relaxation: float=1.0,
+) -> np.ndarray:
+    '''
+    return the next torsion modifiers of beams, like
+    FrameObj.correct_torsion_stiffness_factor j * phi_Tcr / T and
+    phi_Tcr / T for beams with T / phi_Tcr < low, between j_min and j_max.
+
+    j_prev, t_prev: j and T of the previous iteration, beams that their T
+        increases with j use the secant of the two iterations to get T = phi_Tcr
+    relaxation: fraction of the change of j
+    '''
+    j = np.asarray(j, dtype=float)
+    t = np.asarray(t, dtype=float)
+    phi_tcr = np.asarray(phi_tcr, dtype=float)
+    ratio = get_torsion_ratio(phi_tcr, t)
+    target = ratio * j
+    if j_prev is not None and t_prev is not None:
+        dj = j - np.asarray(j_prev, dtype=float)
+        dt = t - np.asarray(t_prev, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = dt / dj
+            secant = j + (phi_tcr - t) / slope
+        filt = (np.abs(dj) > 1e-9) & (slope > 0) & np.isfinite(secant)
+        target = np.where(filt, secant, target)
+    target = np.clip(target, j_min, j_max)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        small_t = t / phi_tcr < low
+    target = np.where(small_t, np.clip(ratio, j_min, j_max), target)
+    return j + relaxation * (target - j)
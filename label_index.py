@@ -0,0 +1,88 @@
+from typing import Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = ['LabelIndex']
+
+
+class LabelIndex:
+    '''
+    name <-> (label, story) lookups of frame or area objects, like
+    GetLabelFromName and GetNameFromLabel without COM calls
+    '''
+    def __init__(self,
+                 names: Iterable,
+                 labels: Iterable,
+                 stories: Iterable,
+                 ):
+        self.names = np.asarray(list(names), dtype=object)
+        self.labels = np.asarray(list(labels), dtype=object)
+        self.stories = np.asarray(list(stories), dtype=object)
+        self._label_story = dict(zip(self.names.tolist(), zip(self.labels.tolist(), self.stories.tolist())))
+        self._names = {}
+        # the first object with label and story, like GetNameFromLabel
+        for name, label, story in zip(self.names.tolist(), self.labels.tolist(), self.stories.tolist()):
+            self._names.setdefault((label, story), name)
+
+    @classmethod
+    def from_dataframe(cls,
+                       df: Union[pd.DataFrame, None],
+                       columns: tuple=('UniqueName', 'Label', 'Story'),
+                       ) -> 'LabelIndex':
+        if df is None:
+            return cls([], [], [])
+        name, label, story = columns
+        return cls(df[name], df[label], df[story])
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._label_story
+
+    def label_story(self, name: str) -> Union[tuple, None]:
+        '''
+        return (label, story) of name, None for unknown name
+        '''
+        return self._label_story.get(name)
+
+    def label(self, name: str) -> Union[str, None]:
+        label_story = self._label_story.get(name)
+        return None if label_story is None else label_story[0]
+
+    def story(self, name: str) -> Union[str, None]:
+        label_story = self._label_story.get(name)
+        return None if label_story is None else label_story[1]
+
+    def name(self, label: str, story: str) -> Union[str, None]:
+        '''
+        return the name of object with label on story, None if there is no object
+        '''
+        return self._names.get((label, story))
+
+    def unique_labels(self, names: Union[Iterable, None]=None) -> list:
+        '''
+        return the labels of names without repetition in order of names
+        '''
+        if names is None:
+            return list(dict.fromkeys(self.labels.tolist()))
+        labels = (self.label(name) for name in names)
+        return list(dict.fromkeys(label for label in labels if label is not None))
+
+    def names_by_story(self,
+                       labels: Union[Iterable, None]=None,
+                       stories: Union[Iterable, None]=None,
+                       ) -> pd.DataFrame:
+        '''
+        return a DataFrame with labels as index and stories as columns, values
+        are the names of objects or None
+        '''
+        if labels is None:
+            labels = self.unique_labels()
+        if stories is None:
+            stories = list(dict.fromkeys(self.stories.tolist()))
+        labels, stories = list(labels), list(stories)
+        data = [[self._names.get((label, story)) for story in stories] for label in labels]
+        return pd.DataFrame(data, index=labels, columns=stories, dtype=object)
@@ -17,12 +17,10 @@ class LoadCases:
 
     def select_all_load_cases(self):
         load_case_names = self.get_load_cases()
-        self.SapModel.DatabaseTables.SetLoadCombinationsSelectedForDisplay('')
-        self.SapModel.DatabaseTables.SetLoadCasesSelectedForDisplay(load_case_names)
+        self.etabs.database.set_selected_for_display(load_combinations='', load_cases=load_case_names)
 
     def select_load_cases(self, names):
-        self.SapModel.DatabaseTables.SetLoadCombinationsSelectedForDisplay('')
-        self.SapModel.DatabaseTables.SetLoadCasesSelectedForDisplay(names)
+        self.etabs.database.set_selected_for_display(load_combinations='', load_cases=names)
 
     def add_response_spectrum_loadcases(self,
                                        names: List[str],
@@ -291,4 +289,4 @@ class LoadCases:
         
         
 
-    
\ No newline at end of file
+    
\ No newline at end of file
@@ -1,8 +1,13 @@
 
+from dataclasses import dataclass
+from types import MappingProxyType
 from typing import Union
 import python_functions
 import enum
+import functools
+import itertools
 
+import numpy as np
 import pandas as pd
 
 @enum.unique
@@ -30,8 +35,8 @@ class LoadCombination:
         if load_combinations is None:
             load_combinations = self.get_load_combination_names()
         if deselect_load_cases:
-            self.SapModel.DatabaseTables.SetLoadCasesSelectedForDisplay('')
-        self.SapModel.DatabaseTables.SetLoadCombinationsSelectedForDisplay(load_combinations)
+            self.etabs.database.set_selected_for_display(load_cases='')
+        self.etabs.database.set_selected_for_display(load_combinations=load_combinations)
     
     def get_load_combination_names(self):
         try:
@@ -246,6 +251,12 @@ class LoadCombination:
             code=code,
             dynamic=dynamic,
             )
+        self.add_notional_loads(notional_loads)
+        return data
+
+    def add_notional_loads(self,
+        notional_loads : list,
+        ):
         if notional_loads:
             etabs_notional_loads = self.etabs.load_patterns.get_notional_load_pattern_names()
             current_notional_loads = set()
@@ -254,7 +265,49 @@ class LoadCombination:
             diff = set(notional_loads).difference(current_notional_loads)
             if len(diff) > 0:
                 self.etabs.load_patterns.add_notional_loads(diff)
-        return data
+
+    def generate_concrete_load_combinations_table(self,
+        equivalent_loads : dict,
+        apply : bool = True,
+        **kwargs,
+        ) -> pd.DataFrame:
+        '''
+        generate the load combinations as a DataFrame and if apply, write them
+        to the model with apply_load_combinations_table. kwargs are the
+        arguments of generate_concrete_load_combinations.
+        '''
+        df, notional_loads = generate_concrete_load_combinations_table(
+            equivalent_loads=equivalent_loads,
+            **kwargs,
+            )
+        self.add_notional_loads(notional_loads)
+        if apply:
+            self.apply_load_combinations_table(df)
+        return df
+
+    def apply_load_combinations_table(self,
+        df : pd.DataFrame,
+        ):
+        '''
+        add or replace the load combinations of df with Name, Type, LoadName
+        and SF columns in one edit of 'Load Combination Definitions'
+        '''
+        table_key = 'Load Combination Definitions'
+        columns = ['Name', 'Type', 'IsAuto', 'LoadName', 'SF', 'Notes']
+        df = df.copy()
+        for col in columns:
+            if col not in df.columns:
+                df[col] = 'No' if col == 'IsAuto' else ''
+        df = df[columns]
+        current_df = self.etabs.database.read(table_key, to_dataframe=True)
+        if current_df is not None:
+            self.etabs.database.remove_df_columns(current_df, ('GUID',))
+            current_df = current_df.loc[~current_df['Name'].isin(df['Name'])]
+            df = pd.concat([current_df, df], ignore_index=True)
+        if self.etabs.etabs_main_version < 20:
+            df = df.rename(columns={'IsAuto': 'Is Auto', 'LoadName': 'Load Name'})
+        ret = self.etabs.database.apply_data(table_key, df)
+        return ret
     
     def create_load_combinations_from_loads(self,
                                             load_names: list,
@@ -307,6 +360,23 @@ def get_mabhas6_load_combinations(
     ):
     '''
     separate_direction: For 100-30 earthquake
+    return a new dict of the rules that can be changed by the caller
+    '''
+    rules = get_mabhas6_rules(way, separate_direction, retaining_wall, code, dynamic)
+    if rules is None:
+        return None
+    return rules.to_dict()
+
+def _mabhas6_load_combinations(
+    way='LRFD', # 'ASD'
+    separate_direction: bool = False,
+    retaining_wall: bool = False,
+    code: str = 'ACI',
+    dynamic: str= '',
+    ):
+    '''
+    definitions of Mabhas-6 load combinations, they are compiled to
+    MABHAS6_RULES at import
     '''
     if separate_direction:
         if retaining_wall:
@@ -1296,9 +1366,88 @@ def get_mabhas6_load_combinations(
                     '1023' : {'Dead':0.6, 'EY' :-0.7, 'EY1' :-0.7, 'EX': 0.21, 'EX1': 0.21, 'EV':-0.7},
                     '1024' : {'Dead':0.6, 'EY' :-0.7, 'EY1' :-0.7, 'EX':-0.21, 'EX1':-0.21, 'EV':-0.7},
                 }
-            
-@python_functions.print_arguments
-def generate_concrete_load_combinations(
+
+
+@dataclass(frozen=True)
+class Mabhas6Rules:
+    '''
+    immutable load combinations of one set of Mabhas-6 rules. combinations
+    are (number, {load: sf}) in the order of definition, and the items of all
+    combinations are in the combo_index, loads and scale_factors arrays.
+    '''
+    key: tuple
+    combinations: tuple
+    combo_index: np.ndarray
+    loads: np.ndarray
+    scale_factors: np.ndarray
+
+    @classmethod
+    def from_dict(cls,
+                  key: tuple,
+                  combos: dict,
+                  ) -> 'Mabhas6Rules':
+        combinations = tuple((number, MappingProxyType(dict(items))) for number, items in combos.items())
+        combo_index = [i for i, (_, items) in enumerate(combinations) for _ in items]
+        loads = [load for _, items in combinations for load in items]
+        scale_factors = [sf for _, items in combinations for sf in items.values()]
+        arrays = (
+            np.array(combo_index, dtype=int),
+            np.array(loads, dtype=object),
+            np.array(scale_factors, dtype=float),
+            )
+        for array in arrays:
+            array.flags.writeable = False
+        return cls(key, combinations, *arrays)
+
+    def __len__(self):
+        return len(self.combinations)
+
+    @property
+    def numbers(self) -> tuple:
+        return tuple(number for number, _ in self.combinations)
+
+    def to_dict(self) -> dict:
+        return {number: dict(items) for number, items in self.combinations}
+
+
+def _normalize_mabhas6_key(
+    way='LRFD',
+    separate_direction: bool = False,
+    retaining_wall: bool = False,
+    code: str = 'ACI',
+    dynamic: str= '',
+    ) -> tuple:
+    return (way.upper(), bool(separate_direction), bool(retaining_wall), code.upper(), dynamic or '')
+
+def _compile_mabhas6_rules() -> MappingProxyType:
+    rules = {}
+    for key in itertools.product(('LRFD', 'ASD'), (False, True), (False, True), ('ACI', 'CSA'), ('', '100-30', 'angular')):
+        rules[key] = Mabhas6Rules.from_dict(key, _mabhas6_load_combinations(*key))
+    return MappingProxyType(rules)
+
+# (way, separate_direction, retaining_wall, code, dynamic) : Mabhas6Rules
+MABHAS6_RULES = _compile_mabhas6_rules()
+
+@functools.lru_cache(maxsize=None)
+def get_mabhas6_rules(
+    way='LRFD', # 'ASD'
+    separate_direction: bool = False,
+    retaining_wall: bool = False,
+    code: str = 'ACI',
+    dynamic: str= '',
+    ) -> Union[Mabhas6Rules, None]:
+    '''
+    return the compiled rules, None if there is no rules for the arguments
+    '''
+    key = _normalize_mabhas6_key(way, separate_direction, retaining_wall, code, dynamic)
+    rules = MABHAS6_RULES.get(key)
+    if rules is None:
+        combos = _mabhas6_load_combinations(*key)
+        if combos is not None:
+            rules = Mabhas6Rules.from_dict(key, combos)
+    return rules
+
+def _concrete_load_combination_columns(
     equivalent_loads : dict,
     prefix : str = 'COMBO',
     suffix : str = '',
@@ -1323,7 +1472,17 @@ def generate_concrete_load_combinations(
     dynamic: str="", # '100-30' , 'angular'
     mabhas6_load_combinations: dict = {},
     ):
-    data = []
+    '''
+    return the names, loads and scale factors of the load combinations
+    item by item before removing the repeated ones, the notional loads, and
+    for each item its load in the rules (None for notional loads) and the EV
+    scale factor that adds to the dead load when A=0.35
+    '''
+    names = []
+    loads = []
+    scale_factors = []
+    rule_loads = []
+    dead_ev_scale_factors = []
     i = 0
     notional_loads = []
     if add_notional_loads:
@@ -1332,8 +1491,10 @@ def generate_concrete_load_combinations(
             if values is not None:
                 notional_loads.extend(values)
     if len(mabhas6_load_combinations) == 0:
-        mabhas6_load_combinations = get_mabhas6_load_combinations(design_type, separate_direction, retaining_wall, code, dynamic)
-    for number, combos in mabhas6_load_combinations.items():
+        combinations = get_mabhas6_rules(design_type, separate_direction, retaining_wall, code, dynamic).combinations
+    else:
+        combinations = mabhas6_load_combinations.items()
+    for number, combos in combinations:
         if add_notional_loads:
             is_gravity = True
             for lateral_load in ('EX', 'EXP', 'EXN', 'EY', 'EYP', 'EYN', 'EX1', 'EXP1', 'EXN1', 'EY1', 'EYP1', 'EYN1', 'EV',
@@ -1374,14 +1535,14 @@ def generate_concrete_load_combinations(
         else:
             directions = ('',)
             sf_multiply = ('',)
-        if A == 0.35:
-            ev_sf = combos.get('EV', None)
-            if ev_sf:
-                dead_load_scale_factor = combos.get('Dead', None)
-                if dead_load_scale_factor:
-                    plus_dead_sf = 0.6 * A * I * ev_sf
-                    if ev_negative or ev_sf > 0:
-                        combos['Dead'] = dead_load_scale_factor + plus_dead_sf
+        ev_sf = combos.get('EV', None)
+        dead_ev_sf = 0
+        if ev_sf and combos.get('Dead', None) and (ev_negative or ev_sf > 0):
+            dead_ev_sf = ev_sf
+        if A == 0.35 and dead_ev_sf:
+            plus_dead_sf = 0.6 * A * I * dead_ev_sf
+            # the rules are not changed
+            combos = {**combos, 'Dead': combos['Dead'] + plus_dead_sf}
         for lname, sf in combos.items():
             equal_names = equivalent_loads.get(lname, [])
             if lname in ('EX', 'EXP', 'EXN', 'SXE', 'SX'):
@@ -1397,13 +1558,369 @@ def generate_concrete_load_combinations(
             if lname == "AngularDynamic":
                 sf *= max(rho_x, rho_y, omega_x, omega_y)
                 for k, name in enumerate(equal_names):
-                    data.extend([combo_names[k], type_, name, sf])
+                    names.append(combo_names[k])
+                    loads.append(name)
+                    scale_factors.append(sf)
+                    rule_loads.append(lname)
+                    dead_ev_scale_factors.append(dead_ev_sf)
             else:
                 for name in equal_names:
                     for k, (dir_, sfm) in enumerate(zip(directions, sf_multiply)):
-                        data.extend([combo_names[k], type_, name, sf])
+                        names.append(combo_names[k])
+                        loads.append(name)
+                        scale_factors.append(sf)
+                        rule_loads.append(lname)
+                        dead_ev_scale_factors.append(dead_ev_sf)
                         if add_notional_loads and is_gravity:
-                            data.extend([combo_names[k], type_, f'N{name}{dir_}', sfm * sf])
+                            names.append(combo_names[k])
+                            loads.append(f'N{name}{dir_}')
+                            scale_factors.append(sfm * sf)
+                            rule_loads.append(None)
+                            dead_ev_scale_factors.append(0)
+    return names, loads, scale_factors, notional_loads, rule_loads, dead_ev_scale_factors
 
+@python_functions.print_arguments
+def generate_concrete_load_combinations(
+    equivalent_loads : dict,
+    prefix : str = 'COMBO',
+    suffix : str = '',
+    rho_x : float = 1,
+    rho_y : float = 1,
+    type_ : str = 'Linear Add',
+    design_type: str = 'LRFD',
+    separate_direction: bool = False,
+    ev_negative: bool = True,
+    A: float = 0.3,
+    I: float = 1,
+    sequence_numbering: bool = False,
+    add_notional_loads: bool = False,
+    retaining_wall: bool = False,
+    omega_x: float=0,
+    omega_y: float=0,
+    rho_x1 : float = 1,
+    rho_y1 : float = 1,
+    omega_x1: float=0,
+    omega_y1: float=0,
+    code: str="ACI",
+    dynamic: str="", # '100-30' , 'angular'
+    mabhas6_load_combinations: dict = {},
+    ):
+    names, loads, scale_factors, notional_loads, *_ = _concrete_load_combination_columns(
+        equivalent_loads=equivalent_loads,
+        prefix=prefix,
+        suffix=suffix,
+        rho_x=rho_x,
+        rho_y=rho_y,
+        type_=type_,
+        design_type=design_type,
+        separate_direction=separate_direction,
+        ev_negative=ev_negative,
+        A=A,
+        I=I,
+        sequence_numbering=sequence_numbering,
+        add_notional_loads=add_notional_loads,
+        retaining_wall=retaining_wall,
+        omega_x=omega_x,
+        omega_y=omega_y,
+        rho_x1=rho_x1,
+        rho_y1=rho_y1,
+        omega_x1=omega_x1,
+        omega_y1=omega_y1,
+        code=code,
+        dynamic=dynamic,
+        mabhas6_load_combinations=mabhas6_load_combinations,
+        )
+    data = []
+    for name, load, sf in zip(names, loads, scale_factors):
+        data.extend([name, type_, load, sf])
     data = python_functions.get_unique_load_combinations(data, sequence_numbering, prefix, suffix)
-    return data, notional_loads
\ No newline at end of file
+    return data, notional_loads
+
+@python_functions.print_arguments
+def generate_concrete_load_combinations_table(
+    equivalent_loads : dict,
+    prefix : str = 'COMBO',
+    suffix : str = '',
+    rho_x : float = 1,
+    rho_y : float = 1,
+    type_ : str = 'Linear Add',
+    design_type: str = 'LRFD',
+    separate_direction: bool = False,
+    ev_negative: bool = True,
+    A: float = 0.3,
+    I: float = 1,
+    sequence_numbering: bool = False,
+    add_notional_loads: bool = False,
+    retaining_wall: bool = False,
+    omega_x: float=0,
+    omega_y: float=0,
+    rho_x1 : float = 1,
+    rho_y1 : float = 1,
+    omega_x1: float=0,
+    omega_y1: float=0,
+    code: str="ACI",
+    dynamic: str="", # '100-30' , 'angular'
+    mabhas6_load_combinations: dict = {},
+    ):
+    '''
+    like generate_concrete_load_combinations, but return the load combinations
+    as a DataFrame with Name, Type, LoadName and SF columns
+    '''
+    names, loads, scale_factors, notional_loads, *_ = _concrete_load_combination_columns(
+        equivalent_loads=equivalent_loads,
+        prefix=prefix,
+        suffix=suffix,
+        rho_x=rho_x,
+        rho_y=rho_y,
+        type_=type_,
+        design_type=design_type,
+        separate_direction=separate_direction,
+        ev_negative=ev_negative,
+        A=A,
+        I=I,
+        sequence_numbering=sequence_numbering,
+        add_notional_loads=add_notional_loads,
+        retaining_wall=retaining_wall,
+        omega_x=omega_x,
+        omega_y=omega_y,
+        rho_x1=rho_x1,
+        rho_y1=rho_y1,
+        omega_x1=omega_x1,
+        omega_y1=omega_y1,
+        code=code,
+        dynamic=dynamic,
+        mabhas6_load_combinations=mabhas6_load_combinations,
+        )
+    df = pd.DataFrame({
+        'Name': names,
+        'Type': type_,
+        'LoadName': loads,
+        'SF': np.asarray(scale_factors, dtype=float),
+        })
+    df = unique_load_combinations_table(df, sequence_numbering, prefix, suffix)
+    return df, notional_loads
+
+def unique_load_combinations_table(
+    df: pd.DataFrame,
+    sequence_numbering: bool = False,
+    prefix: str = 'COMBO',
+    suffix: str = '',
+    decimals: int = 10,
+    ):
+    '''
+    remove the load combinations with the same loads and scale factors as a
+    previous one. Combinations are compared by their sorted (load, scale
+    factor) items, so the order of items does not matter.
+    '''
+    if len(df) == 0:
+        return df.reset_index(drop=True)
+    sfs = np.round(df['SF'].to_numpy(dtype=float), decimals)
+    items = {}
+    for name, load, sf in zip(df['Name'], df['LoadName'], sfs.tolist()):
+        items.setdefault(name, []).append((load, sf))
+    unique_names = {}
+    keys = set()
+    for name, combo_items in items.items():
+        key = tuple(sorted(combo_items))
+        if key not in keys:
+            keys.add(key)
+            unique_names[name] = f'{prefix}{len(keys)}{suffix}' if sequence_numbering else name
+    df = df.loc[df['Name'].isin(unique_names.keys())].copy()
+    df['Name'] = df['Name'].map(unique_names)
+    df['SF'] = np.round(df['SF'].to_numpy(dtype=float), decimals)
+    # items of each combination together, like get_unique_load_combinations
+    order = {name: i for i, name in enumerate(unique_names.values())}
+    df = df.sort_values('Name', kind='stable', key=lambda names: names.map(order))
+    return df.reset_index(drop=True)
+
+# parameters of generate_concrete_load_combinations that only change the
+# scale factors, with their default values
+LOAD_COMBINATION_PARAMETERS = {
+    'rho_x': 1,
+    'rho_y': 1,
+    'omega_x': 0,
+    'omega_y': 0,
+    'rho_x1': 1,
+    'rho_y1': 1,
+    'omega_x1': 0,
+    'omega_y1': 0,
+    'A': 0.3,
+    'I': 1,
+    }
+
+# rule loads that scale with max of parameters
+_SCALED_RULE_LOADS = (
+    (('EX', 'EXP', 'EXN', 'SXE', 'SX'), ('rho_x', 'omega_x')),
+    (('EY', 'EYP', 'EYN', 'SYE', 'SY'), ('rho_y', 'omega_y')),
+    (('EX1', 'EXP1', 'EXN1'), ('rho_x1', 'omega_x1')),
+    (('EY1', 'EYP1', 'EYN1'), ('rho_y1', 'omega_y1')),
+    (('AngularDynamic',), ('rho_x', 'rho_y', 'omega_x', 'omega_y')),
+    )
+
+def load_combination_parameter_grid(**values) -> pd.DataFrame:
+    '''
+    return all combinations of parameter values as rows of a DataFrame, like
+    load_combination_parameter_grid(rho_x=[1, 1.2], A=[0.3, 0.35])
+    '''
+    unknown = set(values).difference(LOAD_COMBINATION_PARAMETERS)
+    if unknown:
+        raise ValueError(f'Unknown parameters: {sorted(unknown)}')
+    keys = list(values)
+    rows = itertools.product(*(np.atleast_1d(values[key]).tolist() for key in keys))
+    return pd.DataFrame(list(rows), columns=keys)
+
+def _multiset_hash(
+    combo_index: np.ndarray,
+    load_codes: np.ndarray,
+    scale_factors: np.ndarray,
+    ) -> np.ndarray:
+    '''
+    hash of the (load, sf) items of each combination for each variant that
+    does not depend on the order of items, items of a combination must be
+    consecutive. scale_factors has shape (variants, items).
+    '''
+    def mix(x):
+        # splitmix64
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+        return x ^ (x >> np.uint64(31))
+    bits = np.ascontiguousarray(scale_factors + 0.0).view(np.uint64)
+    hashes = mix(bits ^ mix(load_codes.astype(np.uint64) + np.uint64(1)))
+    starts = np.flatnonzero(np.r_[True, combo_index[1:] != combo_index[:-1]])
+    return np.add.reduceat(hashes, starts, axis=1)
+
+def _first_unique_combos(
+    combo_index: np.ndarray,
+    load_codes: np.ndarray,
+    scale_factors: np.ndarray,
+    ) -> np.ndarray:
+    '''
+    return a (variants, combos) bool array, True for the combinations that
+    have not the same (load, sf) items as a previous one in their variant.
+    Combinations are grouped by _multiset_hash and the items of combinations
+    with the same hash are compared, so a hash collision does not remove a
+    combination.
+    '''
+    hashes = _multiset_hash(combo_index, load_codes, scale_factors)
+    hash_order = np.argsort(hashes, axis=1, kind='stable')
+    sorted_hashes = np.take_along_axis(hashes, hash_order, axis=1)
+    first = np.ones(sorted_hashes.shape, dtype=bool)
+    first[:, 1:] = sorted_hashes[:, 1:] != sorted_hashes[:, :-1]
+    bounds = np.r_[np.flatnonzero(np.r_[True, combo_index[1:] != combo_index[:-1]]), len(combo_index)]
+    load_codes = load_codes.tolist()
+
+    def items(variant, combo):
+        start, end = bounds[combo], bounds[combo + 1]
+        return sorted(zip(load_codes[start:end], scale_factors[variant, start:end].tolist()))
+
+    for variant, j in zip(*np.nonzero(~first)):
+        combo_items = items(variant, hash_order[variant, j])
+        k = j - 1
+        while k >= 0 and sorted_hashes[variant, k] == sorted_hashes[variant, j]:
+            if first[variant, k] and items(variant, hash_order[variant, k]) == combo_items:
+                break
+            k -= 1
+        else:
+            first[variant, j] = True
+    keep = np.zeros(first.shape, dtype=bool)
+    np.put_along_axis(keep, hash_order, first, axis=1)
+    return keep
+
+def generate_concrete_load_combinations_batch(
+    equivalent_loads : dict,
+    variants : Union[pd.DataFrame, list],
+    prefix : str = 'COMBO',
+    suffix : str = '',
+    type_ : str = 'Linear Add',
+    design_type: str = 'LRFD',
+    separate_direction: bool = False,
+    ev_negative: bool = True,
+    sequence_numbering: bool = False,
+    add_notional_loads: bool = False,
+    retaining_wall: bool = False,
+    code: str="ACI",
+    dynamic: str="", # '100-30' , 'angular'
+    mabhas6_load_combinations: dict = {},
+    decimals: int = 10,
+    **parameters,
+    ):
+    '''
+    generate the load combinations of generate_concrete_load_combinations_table
+    for each row of variants, a DataFrame or a list of dicts with the
+    parameters in LOAD_COMBINATION_PARAMETERS. parameters are the values of
+    the parameters that are not in variants.
+
+    The combinations are generated once and the scale factors of all
+    variants are calculated as a (variants, items) array.
+
+    return a DataFrame with Variant, Name, Type, LoadName and SF columns,
+    where Variant is the index of variants, and the notional loads
+    '''
+    if not isinstance(variants, pd.DataFrame):
+        variants = pd.DataFrame(list(variants))
+    unknown = set(variants.columns).union(parameters).difference(LOAD_COMBINATION_PARAMETERS)
+    if unknown:
+        raise ValueError(f'Unknown parameters: {sorted(unknown)}')
+    values = {}
+    for key, default in LOAD_COMBINATION_PARAMETERS.items():
+        if key in variants.columns:
+            value = variants[key].to_numpy(dtype=float)
+        else:
+            value = np.full(len(variants), parameters.get(key, default), dtype=float)
+        values[key] = value[:, None]
+    # scale factors without the parameters
+    names, loads, scale_factors, notional_loads, rule_loads, dead_ev_scale_factors = \
+        _concrete_load_combination_columns(
+            equivalent_loads=equivalent_loads,
+            prefix=prefix,
+            suffix=suffix,
+            type_=type_,
+            design_type=design_type,
+            separate_direction=separate_direction,
+            ev_negative=ev_negative,
+            sequence_numbering=sequence_numbering,
+            add_notional_loads=add_notional_loads,
+            retaining_wall=retaining_wall,
+            code=code,
+            dynamic=dynamic,
+            mabhas6_load_combinations=mabhas6_load_combinations,
+            A=0,
+            )
+    columns = ['Variant', 'Name', 'Type', 'LoadName', 'SF']
+    if not names or len(variants) == 0:
+        return pd.DataFrame(columns=columns), notional_loads
+    combo_index, combo_names = pd.factorize(pd.Series(names))
+    # items of each combination together
+    order = np.argsort(combo_index, kind='stable')
+    combo_index = combo_index[order]
+    loads = np.asarray(loads, dtype=object)[order]
+    rule_loads = np.asarray(rule_loads, dtype=object)[order]
+    dead_ev_scale_factors = np.asarray(dead_ev_scale_factors, dtype=float)[order]
+    scale_factors = np.asarray(scale_factors, dtype=float)[order]
+    scale_factors = np.broadcast_to(scale_factors, (len(variants), len(scale_factors))).copy()
+    for lnames, keys in _SCALED_RULE_LOADS:
+        filt = np.isin(rule_loads, lnames)
+        if filt.any():
+            scale_factors[:, filt] *= np.maximum.reduce([values[key] for key in keys])
+    filt = rule_loads == 'Dead'
+    A, I = values['A'], values['I']
+    plus_dead_sf = np.where(A == 0.35, 0.6 * A * I, 0)
+    scale_factors[:, filt] += plus_dead_sf * dead_ev_scale_factors[filt]
+    scale_factors = np.round(scale_factors, decimals)
+    # remove repeated combinations of each variant, keep the first one
+    load_codes, _ = pd.factorize(pd.Series(loads))
+    keep = _first_unique_combos(combo_index, load_codes, scale_factors)
+    variant_index, item_index = np.nonzero(keep[:, combo_index])
+    if sequence_numbering:
+        numbers = np.cumsum(keep, axis=1)[variant_index, combo_index[item_index]]
+        names = prefix + pd.Series(numbers).astype(str) + suffix
+    else:
+        names = np.asarray(combo_names, dtype=object)[combo_index[item_index]]
+    df = pd.DataFrame({
+        'Variant': variants.index.to_numpy()[variant_index],
+        'Name': names,
+        'Type': type_,
+        'LoadName': loads[item_index],
+        'SF': scale_factors[variant_index, item_index],
+        }, columns=columns)
+    return df, notional_loads
@@ -1,7 +1,14 @@
+import numpy as np
 import pandas as pd
 pd.options.mode.chained_assignment = None
 
 
+# direction columns of auto seismic table and their bits in the classification mask
+SEISMIC_DIRECTIONS = ('XDir', 'XDirPlusE', 'XDirMinusE', 'YDir', 'YDirPlusE', 'YDirMinusE')
+X_MASK = 0b000111
+Y_MASK = 0b111000
+
+
 class LoadPatterns:
 
     map_number_to_pattern = {
@@ -46,6 +53,34 @@ class LoadPatterns:
             self.SapModel = etabs.SapModel
         else:
             self.SapModel = SapModel
+        self._seismic_classification = None
+
+    def get_seismic_classification(self, refresh: bool=False) -> pd.DataFrame:
+        '''
+        return Name, Mask and Drift of auto seismic load patterns, bits of Mask are
+        the SEISMIC_DIRECTIONS flags. The table reads once until load patterns change.
+        '''
+        if refresh or self._seismic_classification is None:
+            self.select_all_load_patterns()
+            table_key = 'Load Pattern Definitions - Auto Seismic - User Coefficient'
+            df = self.etabs.database.read(table_key, to_dataframe=True)
+            if df is None:
+                df = pd.DataFrame(columns=('Name',) + SEISMIC_DIRECTIONS)
+            flags = df[list(SEISMIC_DIRECTIONS)].eq('Yes').to_numpy()
+            mask = flags.astype(int) @ (1 << np.arange(len(SEISMIC_DIRECTIONS)))
+            drift = df['Name'].isin(self.get_drift_load_pattern_names()).to_numpy()
+            self._seismic_classification = pd.DataFrame({
+                'Name': df['Name'].to_numpy(dtype=object),
+                'Mask': mask,
+                'Drift': drift,
+                })
+        return self._seismic_classification
+
+    def invalidate_seismic_classification(self):
+        '''
+        call it when load patterns change
+        '''
+        self._seismic_classification = None
 
     def get_load_patterns(self):
         all_load_patterns = self.SapModel.LoadPatterns.GetNameList()[1]
@@ -80,173 +115,47 @@ class LoadPatterns:
         '''
         return list of load pattern names, x and y direction separately
         '''
-        self.select_all_load_patterns()
-        names_x = set()
-        names_y = set()
-        table_key = 'Load Pattern Definitions - Auto Seismic - User Coefficient'
-        ret = self.etabs.database.read_table(table_key)
-        if ret is None:
-            return names_x, names_y
-        [_, _, fields, _, data, _] = ret
-        i_xdir = fields.index('XDir')
-        i_xdir_plus = fields.index('XDirPlusE')
-        i_xdir_minus = fields.index('XDirMinusE')
-        i_ydir = fields.index('YDir')
-        i_ydir_plus = fields.index('YDirPlusE')
-        i_ydir_minus = fields.index('YDirMinusE')
-        i_name = fields.index('Name')
-        data = self.etabs.database.reshape_data(fields, data)
-        for earthquake in data:
-            name = earthquake[i_name]
-            if only_ecc:
-                if all((
-                earthquake[i_xdir] == 'Yes',
-                earthquake[i_xdir_minus] == 'No',
-                earthquake[i_xdir_plus] == 'No',
-                )) or all((
-                earthquake[i_ydir] == 'Yes',
-                earthquake[i_ydir_minus] == 'No',
-                earthquake[i_ydir_plus] == 'No',
-                )):
-                    continue
-            if any((
-                earthquake[i_xdir] == 'Yes',
-                earthquake[i_xdir_minus] == 'Yes',
-                earthquake[i_xdir_plus] == 'Yes',
-            )):
-                names_x.add(name)
-            elif any((
-                earthquake[i_ydir] == 'Yes',
-                earthquake[i_ydir_minus] == 'Yes',
-                earthquake[i_ydir_plus] == 'Yes',
-            )):
-                names_y.add(name)
-            
-        return names_x, names_y
+        df = self.get_seismic_classification()
+        names = df['Name'].to_numpy()
+        mask = df['Mask'].to_numpy()
+        filt_x = (mask & X_MASK) != 0
+        filt_y = ((mask & Y_MASK) != 0) & ~filt_x
+        if only_ecc:
+            filt_ecc = ~(((mask & X_MASK) == 1) | ((mask & Y_MASK) == 8))
+            filt_x &= filt_ecc
+            filt_y &= filt_ecc
+        return set(names[filt_x]), set(names[filt_y])
 
     def get_seismic_load_patterns(self,
                                   drifts: bool=False,
                                   ):
         '''
-        return lists of load pattern names, x, +x, -x, y, +y and -y separately
+        return lists of load pattern names, x, -x, +x, y, -y and +y separately
         '''
-        self.select_all_load_patterns()
-        xdir = set()
-        xdir_plus = set()
-        xdir_minus = set()
-        ydir = set()
-        ydir_plus = set()
-        ydir_minus = set()
-        table_key = 'Load Pattern Definitions - Auto Seismic - User Coefficient'
-        ret = self.etabs.database.read_table(table_key)
-        if ret is not None:
-            [_, _, FieldsKeysIncluded, _, TableData, _] = ret
-            i_xdir = FieldsKeysIncluded.index('XDir')
-            i_xdir_plus = FieldsKeysIncluded.index('XDirPlusE')
-            i_xdir_minus = FieldsKeysIncluded.index('XDirMinusE')
-            i_ydir = FieldsKeysIncluded.index('YDir')
-            i_ydir_plus = FieldsKeysIncluded.index('YDirPlusE')
-            i_ydir_minus = FieldsKeysIncluded.index('YDirMinusE')
-            i_name = FieldsKeysIncluded.index('Name')
-            data = self.etabs.database.reshape_data(FieldsKeysIncluded, TableData)
-            drift_lp_names = self.get_drift_load_pattern_names()
-            for earthquake in data:
-                name = earthquake[i_name]
-                if (drifts and name in drift_lp_names) or (not drifts and name not in drift_lp_names):
-                    if all((
-                        earthquake[i_xdir] == 'Yes',
-                        earthquake[i_xdir_minus] == 'No',
-                        earthquake[i_xdir_plus] == 'No',
-                        earthquake[i_ydir] == 'No',
-                        earthquake[i_ydir_minus] == 'No',
-                        earthquake[i_ydir_plus] == 'No',
-                        )):
-                        xdir.add(name)
-                    elif all((
-                        earthquake[i_xdir] == 'No',
-                        earthquake[i_xdir_minus] == 'Yes',
-                        earthquake[i_xdir_plus] == 'No',
-                        earthquake[i_ydir] == 'No',
-                        earthquake[i_ydir_minus] == 'No',
-                        earthquake[i_ydir_plus] == 'No',
-                        )):
-                        xdir_minus.add(name)
-                    elif all((
-                        earthquake[i_xdir] == 'No',
-                        earthquake[i_xdir_minus] == 'No',
-                        earthquake[i_xdir_plus] == 'Yes',
-                        earthquake[i_ydir] == 'No',
-                        earthquake[i_ydir_minus] == 'No',
-                        earthquake[i_ydir_plus] == 'No',
-                        )):
-                        xdir_plus.add(name)
-                    elif all((
-                        earthquake[i_xdir] == 'No',
-                        earthquake[i_xdir_minus] == 'No',
-                        earthquake[i_xdir_plus] == 'No',
-                        earthquake[i_ydir] == 'Yes',
-                        earthquake[i_ydir_minus] == 'No',
-                        earthquake[i_ydir_plus] == 'No',
-                        )):
-                        ydir.add(name)
-                    elif all((
-                        earthquake[i_xdir] == 'No',
-                        earthquake[i_xdir_minus] == 'No',
-                        earthquake[i_xdir_plus] == 'No',
-                        earthquake[i_ydir] == 'No',
-                        earthquake[i_ydir_minus] == 'Yes',
-                        earthquake[i_ydir_plus] == 'No',
-                        )):
-                        ydir_minus.add(name)
-                    elif all((
-                        earthquake[i_xdir] == 'No',
-                        earthquake[i_xdir_minus] == 'No',
-                        earthquake[i_xdir_plus] == 'No',
-                        earthquake[i_ydir] == 'No',
-                        earthquake[i_ydir_minus] == 'No',
-                        earthquake[i_ydir_plus] == 'Yes',
-                        )):
-                        ydir_plus.add(name)
-        return xdir, xdir_minus, xdir_plus, ydir, ydir_minus, ydir_plus
+        df = self.get_seismic_classification()
+        df = df.loc[df['Drift'] == drifts]
+        groups = df.groupby('Mask')['Name'].agg(set)
+        masks = (
+            0b000001, # XDir
+            0b000100, # XDirMinusE
+            0b000010, # XDirPlusE
+            0b001000, # YDir
+            0b100000, # YDirMinusE
+            0b010000, # YDirPlusE
+            )
+        return tuple(set(groups.get(mask, ())) for mask in masks)
 
     def get_EX_EY_load_pattern(self):
         '''
         return earthquakes in x, y direction that did not eccentricity
         '''
-        self.select_all_load_patterns()
-        TableKey = 'Load Pattern Definitions - Auto Seismic - User Coefficient'
-        [_, _, FieldsKeysIncluded, _, TableData, _] = self.etabs.database.read_table(TableKey)
-        i_xdir = FieldsKeysIncluded.index('XDir')
-        i_xdir_plus = FieldsKeysIncluded.index('XDirPlusE')
-        i_xdir_minus = FieldsKeysIncluded.index('XDirMinusE')
-        i_ydir = FieldsKeysIncluded.index('YDir')
-        i_ydir_plus = FieldsKeysIncluded.index('YDirPlusE')
-        i_ydir_minus = FieldsKeysIncluded.index('YDirMinusE')
-        i_name = FieldsKeysIncluded.index('Name')
-        data = self.etabs.database.reshape_data(FieldsKeysIncluded, TableData)
-        name_x = None
-        name_y = None
-        drift_lp_names = self.get_drift_load_pattern_names()
-        for earthquake in data:
-            name = earthquake[i_name]
-            if name in drift_lp_names:
-                continue
-            if all((
-                    not name_x,
-                    earthquake[i_xdir] == 'Yes',
-                    earthquake[i_xdir_minus] == 'No',
-                    earthquake[i_xdir_plus] == 'No',
-                )):
-                    name_x = name
-            if all((
-                    not name_y,
-                    earthquake[i_ydir] == 'Yes',
-                    earthquake[i_ydir_minus] == 'No',
-                    earthquake[i_ydir_plus] == 'No',
-                )):
-                    name_y = name
-            if name_x and name_y:
-                break
+        df = self.get_seismic_classification()
+        df = df.loc[~df['Drift']]
+        mask = df['Mask']
+        names_x = df.loc[(mask & X_MASK) == 1, 'Name']
+        names_y = df.loc[(mask & Y_MASK) == 8, 'Name']
+        name_x = names_x.iloc[0] if len(names_x) else None
+        name_y = names_y.iloc[0] if len(names_y) else None
         return name_x, name_y
 
     def get_xy_spectral_load_patterns_with_angle(self, angle : int = 0):
@@ -360,20 +269,22 @@ class LoadPatterns:
 
     def get_xy_seismic_load_patterns(self, only_ecc=False):
         x_names, y_names = self.get_load_patterns_in_XYdirection(only_ecc)
-        drift_load_pattern_names = self.get_drift_load_pattern_names()
+        df = self.get_seismic_classification()
+        drift_load_pattern_names = set(df.loc[df['Drift'], 'Name'])
         xy_names = x_names.union(y_names).difference(drift_load_pattern_names)
         return xy_names
     
     def get_xy_seismic_load_patterns_separate(self, only_ecc=False):
         x_names, y_names = self.get_load_patterns_in_XYdirection(only_ecc)
-        drift_load_pattern_names = self.get_drift_load_pattern_names()
+        df = self.get_seismic_classification()
+        drift_load_pattern_names = set(df.loc[df['Drift'], 'Name'])
         x_names = x_names.difference(drift_load_pattern_names)
         y_names = y_names.difference(drift_load_pattern_names)
         return x_names, y_names
       
     def select_all_load_patterns(self):
         load_pattern_names = list(self.get_load_patterns())
-        self.SapModel.DatabaseTables.SetLoadPatternsSelectedForDisplay(load_pattern_names) 
+        self.etabs.database.set_selected_for_display(load_patterns=load_pattern_names)
 
     def get_design_type(self, pattern_name):
         '''
@@ -392,6 +303,7 @@ class LoadPatterns:
             return False
         for name in names:
             self.SapModel.LoadPatterns.Add(name, type_)
+        self.invalidate_seismic_classification()
         return True
     
     def add_notional_loads(self,
@@ -0,0 +1,197 @@
+'''
+Property modifiers of frames and stiffness modifiers of areas as tables.
+
+The modifiers of all objects are read from one database table, changed with
+vectorized rules and written back with one apply_data, instead of
+GetModifiers and SetModifiers for each object:
+
+    table = ModifierTable.frames(etabs)
+    df = table.read()
+    filt = df['Type'] == 'Beam'
+    df.loc[filt, 'JMod'] = 0.15
+    table.write(df)
+'''
+
+from typing import Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = [
+    'FRAME_MODIFIER_COLUMNS',
+    'AREA_MODIFIER_COLUMNS',
+    'ModifierTable',
+    'assign_modifiers',
+    'multiply_modifiers',
+    'drift_frame_modifiers',
+    'drift_area_modifiers',
+    ]
+
+FRAME_MODIFIER_COLUMNS = ['AMod', 'A2Mod', 'A3Mod', 'JMod', 'I2Mod', 'I3Mod', 'MMod', 'WMod']
+AREA_MODIFIER_COLUMNS = ['f11Mod', 'f22Mod', 'f12Mod', 'm11Mod', 'm22Mod', 'm12Mod',
+                         'v13Mod', 'v23Mod', 'MMod', 'WMod']
+
+
+class ModifierTable:
+    def __init__(self,
+                 etabs,
+                 table_key: str,
+                 summary_key: str,
+                 columns: list,
+                 summary_columns: list,
+                 ):
+        self.etabs = etabs
+        self.table_key = table_key
+        self.summary_key = summary_key
+        self.columns = list(columns)
+        self.summary_columns = list(summary_columns)
+
+    @classmethod
+    def frames(cls, etabs) -> 'ModifierTable':
+        return cls(
+            etabs,
+            'Frame Assignments - Property Modifiers',
+            'Frame Assignments - Summary',
+            FRAME_MODIFIER_COLUMNS,
+            ['Type', 'DesignProc', 'AnalysisSect'],
+            )
+
+    @classmethod
+    def areas(cls, etabs) -> 'ModifierTable':
+        return cls(
+            etabs,
+            'Area Assignments - Stiffness Modifiers',
+            'Area Assignments - Summary',
+            AREA_MODIFIER_COLUMNS,
+            ['Type'],
+            )
+
+    def read(self,
+             names: Union[Iterable, None] = None,
+             ) -> pd.DataFrame:
+        '''
+        return the modifiers of names or all objects, indexed by UniqueName
+        with Story, Label, the summary columns and the modifier columns. The
+        objects that are not in the modifiers table have modifiers of 1.
+        '''
+        database = self.etabs.database
+        summary = database.read(self.summary_key, to_dataframe=True)
+        if summary is None:
+            summary = pd.DataFrame(columns=['Story', 'Label', 'UniqueName'])
+        summary = summary.drop_duplicates('UniqueName').set_index('UniqueName')
+        cols = ['Story', 'Label'] + [col for col in self.summary_columns if col in summary.columns]
+        df = summary[cols].copy()
+        for col in self.summary_columns:
+            if col not in df.columns:
+                df[col] = ''
+        modifiers = database.read(self.table_key, to_dataframe=True)
+        if modifiers is None:
+            modifiers = pd.DataFrame(columns=['UniqueName'] + self.columns)
+        modifiers = modifiers.drop_duplicates('UniqueName', keep='last').set_index('UniqueName')
+        for col in self.columns:
+            values = modifiers[col] if col in modifiers.columns else pd.Series(dtype=object)
+            values = pd.to_numeric(values.reindex(df.index), errors='coerce')
+            df[col] = values.fillna(1.0).astype(float)
+        if names is not None:
+            names = pd.Index(list(names), dtype=object)
+            df = df.loc[names[names.isin(df.index)]]
+        df.index.name = 'UniqueName'
+        return df
+
+    def write(self,
+              df: pd.DataFrame,
+              ) -> tuple:
+        '''
+        write the modifiers of df, from read, with one apply_data, the other
+        objects in the modifiers table keep their modifiers
+        '''
+        database = self.etabs.database
+        current = database.read(self.table_key, to_dataframe=True)
+        new_df = df[['Story', 'Label'] + self.columns].reset_index()
+        if current is not None:
+            database.remove_df_columns(current, ('GUID',))
+            current = current.loc[~current['UniqueName'].isin(new_df['UniqueName'])]
+            new_df = pd.concat([current, new_df], ignore_index=True)
+        new_df = new_df[['Story', 'Label', 'UniqueName'] + self.columns]
+        return database.apply_data(self.table_key, new_df)
+
+
+def assign_modifiers(
+    df: pd.DataFrame,
+    values: dict,
+    depths: Union[pd.Series, None] = None,
+    ) -> pd.DataFrame:
+    '''
+    set the modifier columns of df to values like assign_frame_modifiers,
+    {col: value}, None or 0 values do not change. A value greater than 1 is
+    a length, the modifier is 1 - value / depth if value < depth, and the
+    modifier does not change for objects without depth.
+    depths: depth of objects with the index of df
+    '''
+    df = df.copy()
+    for col, value in values.items():
+        if not value:
+            continue
+        if value > 1:
+            if depths is None:
+                continue
+            depth = depths.reindex(df.index).to_numpy(dtype=float)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = value / depth
+            mods = np.where(ratio < 1, 1 - ratio, value)
+            filt = ~np.isnan(depth)
+            df.loc[filt, col] = mods[filt]
+        else:
+            df[col] = float(value)
+    return df
+
+def multiply_modifiers(
+    df: pd.DataFrame,
+    mult: Iterable,
+    columns: list = FRAME_MODIFIER_COLUMNS,
+    ) -> pd.DataFrame:
+    '''
+    multiply modifier columns by mult, modifiers are not greater than 1
+    '''
+    df = df.copy()
+    df[columns] = np.minimum(df[columns].to_numpy(dtype=float) * np.asarray(list(mult), dtype=float), 1)
+    return df
+
+def drift_frame_modifiers(
+    df: pd.DataFrame,
+    i_beam: float = 0.5,
+    i_column: float = 1,
+    ) -> pd.DataFrame:
+    '''
+    modifiers of concrete frames for drift periods, the first six modifiers
+    of columns are i_column and I2 and I3 of beams are i_beam.
+    df: modifiers with Type and DesignProcedure, the number of
+        GetDesignProcedure like FrameObj.get_frames_type_and_design_procedure
+    '''
+    df = df.copy()
+    concrete = df['DesignProcedure'] == 2
+    columns = concrete & (df['Type'] == 'Column')
+    beams = concrete & (df['Type'] == 'Beam')
+    if not (columns.any() or beams.any()):
+        raise ValueError('There is no concrete beam or column to set drift modifiers')
+    df.loc[columns, FRAME_MODIFIER_COLUMNS[:6]] = i_column
+    df.loc[beams, ['I2Mod', 'I3Mod']] = i_beam
+    return df
+
+def drift_area_modifiers(
+    df: pd.DataFrame,
+    i_wall: float = 1,
+    i_floor: float = 0.25 * 1.5,
+    ) -> pd.DataFrame:
+    '''
+    modifiers of areas for drift periods, the first six modifiers of walls
+    are i_wall and the bending modifiers of floors are i_floor times their
+    weight modifier
+    '''
+    df = df.copy()
+    df.loc[df['Type'] == 'Wall', AREA_MODIFIER_COLUMNS[:6]] = i_wall
+    filt = df['Type'] == 'Floor'
+    for col in ('m11Mod', 'm22Mod', 'm12Mod'):
+        df.loc[filt, col] = i_floor * df.loc[filt, 'WMod']
+    return df
@@ -0,0 +1,1587 @@
+'''
+Pure python stand-in for the ETABS SapModel COM object.
+
+The model state is held as database tables (pandas DataFrames of strings, the
+same way GetTableForDisplayArray returns them), so a model can be loaded from
+table dumps, e.g. a folder of csv files named with the table keys. Every COM
+method call is counted with its latency, so each etabs_api module can be
+benchmarked without ETABS:
+
+    sap_model = OfflineSapModel(tables)
+    etabs = OfflineEtabsModel(sap_model)
+    etabs.frame_obj.get_beams_columns()
+    sap_model.recorder.to_dataframe()
+
+create_offline_etabs builds both for tables or a generated grid model:
+
+    etabs = create_offline_etabs(stories=2, nx=3)
+'''
+
+from pathlib import Path
+from typing import Union
+from collections import Counter, defaultdict
+import functools
+import inspect
+import time
+
+import numpy as np
+import pandas as pd
+
+from load_patterns import LoadPatterns
+from units import unit_factor
+from etabs_model_base import EtabsModelBase
+from modifiers import FRAME_MODIFIER_COLUMNS, AREA_MODIFIER_COLUMNS
+
+
+__all__ = [
+    'ComCallRecorder',
+    'OfflineSapModel',
+    'OfflineEtabsModel',
+    'load_table_dumps',
+    'save_table_dumps',
+    'grid_model_tables',
+    'create_offline_etabs',
+    ]
+
+
+# tables that only exist when the model has analysis or design results
+RESULT_TABLE_PREFIXES = (
+    'Base Reactions',
+    'Joint Displacements',
+    'Joint Drifts',
+    'Joint Reactions',
+    'Joint Design Reactions',
+    'Element Forces',
+    'Section Cut Forces',
+    'Story Forces',
+    'Story Drifts',
+    'Story Max Over Avg',
+    'Diaphragm Max Over Avg',
+    'Diaphragm Center Of Mass',
+    'Centers Of Mass And Rigidity',
+    'Modal ',
+    'Objects and Elements',
+    'Concrete Frame Design',
+    'Concrete Beam',
+    'Concrete Column',
+    'Concrete Joint',
+    'Steel Frame Design',
+    'Shear Wall Design',
+    )
+
+# result columns that are linear in the applied load
+LINEAR_RESULT_COLUMNS = (
+    'FX', 'FY', 'FZ', 'MX', 'MY', 'MZ',
+    'F1', 'F2', 'F3', 'M1', 'M2', 'M3',
+    'P', 'V2', 'V3', 'T',
+    'Ux', 'Uy', 'Uz', 'Rx', 'Ry', 'Rz',
+    )
+
+# (force, length) dimension of the table columns that convert to the present unit
+UNIT_DIMENSIONS = {
+    'X': (0, 1), 'Y': (0, 1), 'Z': (0, 1),
+    'Ux': (0, 1), 'Uy': (0, 1), 'Uz': (0, 1),
+    'Height': (0, 1), 'Elevation': (0, 1),
+    'FX': (1, 0), 'FY': (1, 0), 'FZ': (1, 0),
+    'F1': (1, 0), 'F2': (1, 0), 'F3': (1, 0),
+    'P': (1, 0), 'V2': (1, 0), 'V3': (1, 0),
+    'MX': (1, 1), 'MY': (1, 1), 'MZ': (1, 1),
+    'M1': (1, 1), 'M2': (1, 1), 'M3': (1, 1),
+    'T': (1, 1),
+    }
+
+DESIGN_ORIENTATIONS = {'Column': 1, 'Beam': 2, 'Brace': 3, 'Null': 4}
+AREA_DESIGN_ORIENTATIONS = {'Wall': 1, 'Floor': 2, 'Ramp': 3, 'Null': 4}
+DESIGN_PROCEDURES = {
+    'Program Determined': 0,
+    'Steel Frame': 1,
+    'Concrete Frame': 2,
+    'Composite Beam': 3,
+    'Steel Joist': 4,
+    'No Design': 7,
+    'Composite Column': 13,
+    }
+COMBO_TYPES = {
+    'Linear Add': 0,
+    'Envelope': 1,
+    'Absolute Add': 2,
+    'SRSS': 3,
+    'Range Add': 4,
+    }
+LOAD_CASE_TYPES = {
+    'Linear Static': 1,
+    'Nonlinear Static': 2,
+    'Modal': 3,
+    'Response Spectrum': 4,
+    'Linear Modal History': 5,
+    'Linear Direct Integration History': 5,
+    'Nonlinear Modal History': 6,
+    'Nonlinear Direct Integration History': 6,
+    }
+
+
+def load_table_dumps(folder: Union[str, Path]) -> dict:
+    '''
+    read csv table dumps in folder, the file names are the table keys:
+    {'Point Object Connectivity': df, ...}
+    '''
+    tables = {}
+    for f in sorted(Path(folder).glob('*.csv')):
+        tables[f.stem] = pd.read_csv(f, dtype=str, keep_default_na=False)
+    return tables
+
+
+def save_table_dumps(
+        tables: dict,
+        folder: Union[str, Path],
+        ) -> None:
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    for table_key, df in tables.items():
+        df.to_csv(folder / f'{table_key}.csv', index=False)
+
+
+def _to_str(value) -> str:
+    if isinstance(value, (float, np.floating)):
+        return repr(float(value))
+    return str(value)
+
+
+def _to_float(value, default: float=0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class ComCallRecorder:
+    '''
+    Count every COM call and its latency, latency is added to each call to
+    simulate the COM round-trip cost
+    '''
+    def __init__(self,
+                 latency: float=0,
+                 ):
+        self.latency = latency
+        self.counts = Counter()
+        self.times = defaultdict(float)
+
+    def call(self, name, func, *args, **kwargs):
+        start = time.perf_counter()
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.counts[name] += 1
+            self.times[name] += time.perf_counter() - start
+
+    def reset(self):
+        self.counts.clear()
+        self.times.clear()
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.times.values())
+
+    def to_dataframe(self) -> pd.DataFrame:
+        '''
+        return a dataframe with Method, Calls and Time columns, sorted by Time
+        '''
+        data = [(name, n, self.times[name]) for name, n in self.counts.items()]
+        df = pd.DataFrame(data, columns=['Method', 'Calls', 'Time'])
+        return df.sort_values('Time', ascending=False, ignore_index=True)
+
+
+class _OfflineComObject:
+    '''
+    Base class of the offline COM objects, the public COM methods start with
+    upper case letters and are recorded by the model recorder. Like COM, the
+    attribute lookup is case insensitive.
+    '''
+    def __init__(self, model, path: str=''):
+        self._model = model
+        self._path = path
+
+    def __getattribute__(self, name):
+        attr = object.__getattribute__(self, name)
+        if name[:1].isupper() and inspect.ismethod(attr):
+            path = object.__getattribute__(self, '_path')
+            recorder = object.__getattribute__(self, '_model').recorder
+            return functools.partial(recorder.call, f'{path}.{name}' if path else name, attr)
+        return attr
+
+    def __getattr__(self, name):
+        lower = name.lower()
+        for attr in dir(type(self)) + list(self.__dict__):
+            if attr.lower() == lower and attr != name:
+                return getattr(self, attr)
+        raise AttributeError(f"{type(self).__name__} has no attribute '{name}'")
+
+
+class _Tables:
+    '''
+    The table store of the offline model with cached row indexes
+    '''
+    def __init__(self, tables: Union[dict, None]=None):
+        self.tables = {}
+        self._indexes = {}
+        for table_key, df in (tables or {}).items():
+            self.set(table_key, df)
+
+    def __contains__(self, table_key):
+        return table_key in self.tables
+
+    def get(self, table_key) -> Union[pd.DataFrame, None]:
+        return self.tables.get(table_key, None)
+
+    def set(self, table_key, df: pd.DataFrame) -> None:
+        df = df.reset_index(drop=True)
+        df = df.fillna('').astype(str)
+        self.tables[table_key] = df
+        self.invalidate(table_key)
+
+    def invalidate(self, table_key) -> None:
+        for key in [key for key in self._indexes if key[0] == table_key]:
+            del self._indexes[key]
+
+    def index(self, table_key, column: str='UniqueName') -> dict:
+        '''
+        return {value: row_position} of the first row with each value
+        '''
+        key = (table_key, column)
+        index = self._indexes.get(key, None)
+        if index is None:
+            df = self.get(table_key)
+            index = {}
+            if df is not None and column in df.columns:
+                for i, value in enumerate(df[column]):
+                    index.setdefault(value, i)
+            self._indexes[key] = index
+        return index
+
+    def groups(self, table_key, column: str) -> dict:
+        '''
+        return {value: [row_positions]}
+        '''
+        key = (table_key, column, 'groups')
+        groups = self._indexes.get(key, None)
+        if groups is None:
+            df = self.get(table_key)
+            groups = defaultdict(list)
+            if df is not None and column in df.columns:
+                for i, value in enumerate(df[column]):
+                    groups[value].append(i)
+            self._indexes[key] = groups
+        return groups
+
+    def row(self, table_key, value, column: str='UniqueName') -> Union[dict, None]:
+        i = self.index(table_key, column).get(value, None)
+        if i is None:
+            return None
+        df = self.tables[table_key]
+        return dict(zip(df.columns, df.iloc[i]))
+
+    def set_row(self, table_key, value, row: dict, column: str='UniqueName') -> None:
+        df = self.tables.get(table_key, None)
+        if df is None:
+            df = pd.DataFrame(columns=list(row))
+        for col in row:
+            if col not in df.columns:
+                df[col] = ''
+        i = self.index(table_key, column).get(value, None)
+        values = {col: _to_str(v) for col, v in row.items()}
+        if i is None:
+            new_row = {col: '' for col in df.columns}
+            new_row.update(values)
+            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
+        else:
+            for col, v in values.items():
+                df.at[i, col] = v
+        self.tables[table_key] = df
+        self.invalidate(table_key)
+
+    def append_rows(self, table_key, rows: list) -> None:
+        if not rows:
+            return
+        new = pd.DataFrame(rows)
+        df = self.tables.get(table_key, None)
+        if df is not None:
+            new = pd.concat([df, new], ignore_index=True)
+        self.set(table_key, new)
+
+    def drop_rows(self, table_key, filt) -> None:
+        df = self.tables.get(table_key, None)
+        if df is None:
+            return
+        self.set(table_key, df.loc[~filt])
+
+
+class OfflineSapModel(_OfflineComObject):
+    '''
+    In-memory replacement for SapModel, tables is a dict of table_key: DataFrame
+    or a folder of csv table dumps.
+    The values are stored in the dump unit, SetPresentUnits only changes the
+    reported unit, unless scale_units, then the database tables convert the
+    columns of UNIT_DIMENSIONS from the dump unit to the present unit.
+    '''
+    def __init__(self,
+                 tables: Union[dict, str, Path, None]=None,
+                 filename: str='',
+                 version: str='21.0.0',
+                 unit: int=6,
+                 latency: float=0,
+                 scale_units: bool=False,
+                 ):
+        super().__init__(self, '')
+        self.recorder = ComCallRecorder(latency)
+        if isinstance(tables, (str, Path)):
+            if not filename:
+                filename = str(Path(tables) / 'model.EDB')
+            tables = load_table_dumps(tables)
+        self.tables = _Tables(tables)
+        self.filename = filename
+        self.version = version
+        self.unit = unit
+        self.dump_unit = unit
+        self.scale_units = scale_units
+        self.project_info = {}
+        self.selected = set()
+        # group: set of (object type, name)
+        self.groups = {}
+        self.output_cases = set()
+        self.output_combos = set()
+        self.display_cases = None
+        self.display_combos = None
+        self.display_patterns = None
+        self.pending_tables = {}
+        self.has_results = any(self.is_result_table(key) for key in self.tables.tables)
+        self.locked = self.has_results
+        self.number_of_analyses = 0
+        self.dump_rs_scales = self.response_spectrum_scales()
+        self.analysed_rs_scales = dict(self.dump_rs_scales)
+        self.FrameObj = _FrameObj(self, 'FrameObj')
+        self.PointObj = _PointObj(self, 'PointObj')
+        self.AreaObj = _AreaObj(self, 'AreaObj')
+        self.DatabaseTables = _DatabaseTables(self, 'DatabaseTables')
+        self.Results = _Results(self, 'Results')
+        self.RespCombo = _RespCombo(self, 'RespCombo')
+        self.LoadCases = _LoadCases(self, 'LoadCases')
+        self.LoadPatterns = _LoadPatterns(self, 'LoadPatterns')
+        self.Story = _Story(self, 'Story')
+        self.PropFrame = _PropFrame(self, 'PropFrame')
+        self.PropMaterial = _PropMaterial(self, 'PropMaterial')
+        self.Analyze = _Analyze(self, 'Analyze')
+        self.File = _File(self, 'File')
+        self.SelectObj = _SelectObj(self, 'SelectObj')
+        self.GroupDef = _GroupDef(self, 'GroupDef')
+        self.View = _View(self, 'View')
+
+    @staticmethod
+    def is_result_table(table_key: str) -> bool:
+        return table_key.startswith(RESULT_TABLE_PREFIXES)
+
+    def response_spectrum_scales(self) -> dict:
+        df = self.tables.get('Load Case Definitions - Response Spectrum')
+        if df is None or 'TransAccSF' not in df.columns:
+            return {}
+        df = df.drop_duplicates('Name')
+        return {name: _to_float(sf, 1) for name, sf in zip(df['Name'], df['TransAccSF'])}
+
+    def result_scale_factors(self) -> dict:
+        '''
+        response spectrum results are linear in the scale factor used in the
+        last analysis
+        '''
+        factors = {}
+        for name, sf in self.analysed_rs_scales.items():
+            dump_sf = self.dump_rs_scales.get(name, 0)
+            if dump_sf and sf != dump_sf:
+                factors[name] = sf / dump_sf
+        return factors
+
+    def result_table(self, table_key) -> Union[pd.DataFrame, None]:
+        df = self.tables.get(table_key)
+        if df is None or not self.has_results:
+            return None
+        factors = self.result_scale_factors()
+        if factors and 'OutputCase' in df.columns:
+            filt = df['OutputCase'].isin(factors)
+            if filt.any():
+                df = df.copy()
+                mult = df.loc[filt, 'OutputCase'].map(factors)
+                for col in LINEAR_RESULT_COLUMNS:
+                    if col in df.columns:
+                        values = pd.to_numeric(df.loc[filt, col], errors='coerce') * mult
+                        df.loc[filt, col] = values.map(_to_str)
+        return df
+
+    @staticmethod
+    def unit_tuple(unit: int) -> tuple:
+        for key, n in EtabsModelBase.enum_units.items():
+            if n == unit:
+                return tuple(key.split('_'))
+        raise KeyError(unit)
+
+    def unit_table(self,
+                   df: pd.DataFrame,
+                   inverse: bool=False,
+                   ) -> pd.DataFrame:
+        '''
+        convert the columns of UNIT_DIMENSIONS from the dump unit to the present
+        unit, or from the present unit to the dump unit if inverse
+        '''
+        if not self.scale_units or self.unit == self.dump_unit:
+            return df
+        columns = [col for col in df.columns if col in UNIT_DIMENSIONS]
+        if not columns:
+            return df
+        from_unit = self.unit_tuple(self.dump_unit)
+        to_unit = self.unit_tuple(self.unit)
+        if inverse:
+            from_unit, to_unit = to_unit, from_unit
+        df = df.copy()
+        for col in columns:
+            factor = unit_factor(from_unit, to_unit, *UNIT_DIMENSIONS[col])
+            values = pd.to_numeric(df[col], errors='coerce')
+            df[col] = df[col].where(values.isna(), (values * factor).map(_to_str))
+        return df
+
+    def unlock(self) -> None:
+        self.locked = False
+        self.has_results = False
+
+    # model level COM methods
+    def GetVersion(self):
+        return [self.version, float(self.version.split('.')[0]), 0]
+
+    def GetProgramInfo(self):
+        return ['ETABS', self.version, 'Ultimate', 0]
+
+    def GetPresentUnits(self):
+        return self.unit
+
+    def SetPresentUnits(self, units):
+        self.unit = units
+        return 0
+
+    def GetModelIsLocked(self):
+        return self.locked
+
+    def SetModelIsLocked(self, lock_it):
+        if lock_it:
+            self.locked = True
+        else:
+            self.unlock()
+        return 0
+
+    def GetModelFilename(self, IncludePath=True):
+        if IncludePath:
+            return self.filename
+        return Path(self.filename).name
+
+    def GetModelFilepath(self):
+        return str(Path(self.filename).parent)
+
+    def GetProjectInfo(self):
+        items = tuple(self.project_info)
+        data = tuple(self.project_info.values())
+        return [len(items), items, data, 0]
+
+    def SetProjectInfo(self, Item, Data):
+        self.project_info[Item] = Data
+        return 0
+
+
+class _FrameObj(_OfflineComObject):
+    summary_key = 'Frame Assignments - Summary'
+    modifiers_key = 'Frame Assignments - Property Modifiers'
+    distributed_key = 'Frame Loads Assignments - Distributed'
+    point_key = 'Frame Loads Assignments - Point'
+    connectivity_keys = (
+        'Beam Object Connectivity',
+        'Column Object Connectivity',
+        'Brace Object Connectivity',
+        )
+
+    @property
+    def _tables(self):
+        return self._model.tables
+
+    def _summary(self, name):
+        return self._tables.row(self.summary_key, name)
+
+    def _names(self):
+        df = self._tables.get(self.summary_key)
+        if df is None:
+            return ()
+        return tuple(df['UniqueName'])
+
+    def _connectivity(self, name):
+        for table_key in self.connectivity_keys:
+            row = self._tables.row(table_key, name)
+            if row is not None:
+                return row
+        return None
+
+    def GetNameList(self):
+        names = self._names()
+        return [len(names), names, 0]
+
+    def GetAllFrames(self):
+        names = self._names()
+        return [len(names), names, tuple(self.GetSection(name)[0] for name in names), 0]
+
+    def GetLabelNameList(self):
+        df = self._tables.get(self.summary_key)
+        if df is None:
+            return [0, (), (), (), 0]
+        return [len(df), tuple(df['UniqueName']), tuple(df['Label']), tuple(df['Story']), 0]
+
+    def GetNameListOnStory(self, StoryName):
+        df = self._tables.get(self.summary_key)
+        if df is None:
+            return [0, (), 0]
+        names = tuple(df.loc[df['Story'] == StoryName, 'UniqueName'])
+        return [len(names), names, 0]
+
+    def GetLabelFromName(self, Name):
+        row = self._summary(Name)
+        if row is None:
+            return ['', '', 1]
+        return [row['Label'], row['Story'], 0]
+
+    def GetNameFromLabel(self, Label, Story):
+        i = self._tables.index(self.summary_key, 'Label')
+        df = self._tables.get(self.summary_key)
+        if df is not None and Label in i:
+            filt = (df['Label'] == Label) & (df['Story'] == Story)
+            names = df.loc[filt, 'UniqueName']
+            if len(names) > 0:
+                return [names.iloc[0], 0]
+        return ['', 1]
+
+    def GetDesignOrientation(self, Name):
+        row = self._summary(Name)
+        if row is None:
+            return [0, 1]
+        return [DESIGN_ORIENTATIONS.get(row.get('Type', ''), 5), 0]
+
+    def GetDesignProcedure(self, Name):
+        row = self._summary(Name)
+        if row is None:
+            return [0, 1]
+        return [DESIGN_PROCEDURES.get(row.get('DesignProc', 'Concrete Frame'), 0), 0]
+
+    def GetSection(self, Name):
+        row = self._summary(Name)
+        if row is None:
+            return ['', '', 1]
+        return [row.get('AnalysisSect', ''), '', 0]
+
+    def SetSection(self, Name, PropName, ItemType=0, SVarRelStartLoc=0, SVarTotalLength=0):
+        if self._summary(Name) is None:
+            return 1
+        self._tables.set_row(self.summary_key, Name, {'AnalysisSect': PropName})
+        return 0
+
+    def Delete(self, Name, ItemType=0):
+        if self._summary(Name) is None:
+            return 1
+        for table_key in (self.summary_key,) + self.connectivity_keys:
+            df = self._tables.get(table_key)
+            if df is not None:
+                self._tables.drop_rows(table_key, df['UniqueName'] == Name)
+        return 0
+
+    def GetPoints(self, Name):
+        row = self._connectivity(Name)
+        if row is None:
+            return ['', '', 1]
+        return [row['UniquePtI'], row['UniquePtJ'], 0]
+
+    def GetModifiers(self, Name):
+        row = self._tables.row(self.modifiers_key, Name)
+        if row is None:
+            return [(1.0,) * 8, 0]
+        return [tuple(_to_float(row.get(col, 1), 1) for col in FRAME_MODIFIER_COLUMNS), 0]
+
+    def SetModifiers(self, Name, Value, ItemType=0):
+        summary = self._summary(Name)
+        if summary is None:
+            return 1
+        row = {'Story': summary['Story'], 'Label': summary['Label'], 'UniqueName': Name}
+        row.update(zip(FRAME_MODIFIER_COLUMNS, Value))
+        self._tables.set_row(self.modifiers_key, Name, row)
+        return 0
+
+    def SetSelected(self, Name, Selected, ItemType=0):
+        if Selected:
+            self._model.selected.add((2, Name))
+        else:
+            self._model.selected.discard((2, Name))
+        return 0
+
+    def SetGroupAssign(self, Name, GroupName, Remove=False, ItemType=0):
+        assignments = self._model.groups.get(GroupName)
+        if assignments is None:
+            return 1
+        if Remove:
+            assignments.discard((2, Name))
+        else:
+            assignments.add((2, Name))
+        return 0
+
+    def SetLoadDistributed(self, Name, LoadPat, MyType, Dir, Dist1, Dist2, Val1, Val2,
+                           CSys='Global', RelDist=True, Replace=True, ItemType=0):
+        if Replace:
+            self.DeleteLoadDistributed(Name, LoadPat)
+        summary = self._summary(Name) or {}
+        row = {
+            'Story': summary.get('Story', ''),
+            'Label': summary.get('Label', ''),
+            'UniqueName': Name,
+            'LoadPattern': LoadPat,
+            'LoadType': 'Force' if MyType == 1 else 'Moment',
+            'Dir': 'Gravity' if Dir in (6, 10) else str(Dir),
+            'DistType': 'Relative Distance' if RelDist else 'Absolute Distance',
+            'RelDistA': Dist1,
+            'RelDistB': Dist2,
+            'ForceA': Val1,
+            'ForceB': Val2,
+            }
+        self._tables.append_rows(self.distributed_key, [row])
+        return 0
+
+    def DeleteLoadDistributed(self, Name, LoadPat, ItemType=0):
+        df = self._tables.get(self.distributed_key)
+        if df is not None:
+            filt = (df['UniqueName'] == Name) & (df['LoadPattern'] == LoadPat)
+            self._tables.drop_rows(self.distributed_key, filt)
+        return 0
+
+    def SetLoadPoint(self, Name, LoadPat, MyType, Dir, Dist, Val,
+                     CSys='Global', RelDist=True, Replace=True, ItemType=0):
+        if Replace:
+            self.DeleteLoadPoint(Name, LoadPat)
+        summary = self._summary(Name) or {}
+        row = {
+            'Story': summary.get('Story', ''),
+            'Label': summary.get('Label', ''),
+            'UniqueName': Name,
+            'LoadPattern': LoadPat,
+            'LoadType': 'Force' if MyType == 1 else 'Moment',
+            'Dir': 'Gravity' if Dir in (6, 10) else str(Dir),
+            'DistType': 'Relative Distance' if RelDist else 'Absolute Distance',
+            'RelDist': Dist,
+            'Force': Val,
+            }
+        self._tables.append_rows(self.point_key, [row])
+        return 0
+
+    def DeleteLoadPoint(self, Name, LoadPat, ItemType=0):
+        df = self._tables.get(self.point_key)
+        if df is not None:
+            filt = (df['UniqueName'] == Name) & (df['LoadPattern'] == LoadPat)
+            self._tables.drop_rows(self.point_key, filt)
+        return 0
+
+
+class _PointObj(_OfflineComObject):
+    connectivity_key = 'Point Object Connectivity'
+    force_key = 'Joint Loads Assignments - Force'
+
+    @property
+    def _tables(self):
+        return self._model.tables
+
+    def GetNameList(self):
+        df = self._tables.get(self.connectivity_key)
+        if df is None:
+            return [0, (), 0]
+        return [len(df), tuple(df['UniqueName']), 0]
+
+    def GetNameListOnStory(self, StoryName):
+        df = self._tables.get(self.connectivity_key)
+        if df is None:
+            return [0, (), 0]
+        names = tuple(df.loc[df['Story'] == StoryName, 'UniqueName'])
+        return [len(names), names, 0]
+
+    def GetCoordCartesian(self, Name, X=0, Y=0, Z=0, CSys='Global'):
+        row = self._tables.row(self.connectivity_key, Name)
+        if row is None:
+            return [0.0, 0.0, 0.0, 1]
+        return [float(row['X']), float(row['Y']), float(row['Z']), 0]
+
+    def GetLabelFromName(self, Name):
+        row = self._tables.row(self.connectivity_key, Name)
+        if row is None:
+            return ['', '', 1]
+        return [row.get('Label', ''), row.get('Story', ''), 0]
+
+    def GetNameFromLabel(self, Label, Story):
+        df = self._tables.get(self.connectivity_key)
+        if df is not None:
+            filt = (df['Label'] == Label) & (df['Story'] == Story)
+            names = df.loc[filt, 'UniqueName']
+            if len(names) > 0:
+                return [names.iloc[0], 0]
+        return ['', 1]
+
+    def GetConnectivity(self, Name):
+        types = []
+        names = []
+        for table_key in _FrameObj.connectivity_keys:
+            df = self._tables.get(table_key)
+            if df is None:
+                continue
+            filt = (df['UniquePtI'] == Name) | (df['UniquePtJ'] == Name)
+            for frame in df.loc[filt, 'UniqueName']:
+                types.append(2)
+                names.append(frame)
+        point_numbers = [1] * len(names)
+        return [len(names), tuple(types), tuple(names), tuple(point_numbers), 0]
+
+    def AddCartesian(self, X, Y, Z, Name='', UserName='', CSys='Global', MergeOff=False, MergeNumber=0):
+        df = self._tables.get(self.connectivity_key)
+        if not MergeOff and df is not None and len(df) > 0:
+            xyz = df[['X', 'Y', 'Z']].astype(float).to_numpy()
+            dist = np.abs(xyz - np.array([X, Y, Z])).max(axis=1)
+            i = int(dist.argmin())
+            if dist[i] < 1e-6:
+                return [df['UniqueName'].iloc[i], 0]
+        if not UserName:
+            numbers = pd.to_numeric(df['UniqueName'], errors='coerce') if df is not None else pd.Series([0])
+            UserName = str(int(np.nan_to_num(numbers.max())) + 1)
+        row = {'UniqueName': UserName, 'Story': '', 'Label': UserName, 'X': X, 'Y': Y, 'Z': Z}
+        self._tables.append_rows(self.connectivity_key, [row])
+        return [UserName, 0]
+
+    def SetLoadForce(self, Name, LoadPat, Value, Replace=False, CSys='Global', ItemType=0):
+        df = self._tables.get(self.force_key)
+        if Replace and df is not None:
+            filt = (df['UniqueName'] == Name) & (df['LoadPattern'] == LoadPat)
+            self._tables.drop_rows(self.force_key, filt)
+        row = {'UniqueName': Name, 'LoadPattern': LoadPat}
+        row.update(zip(['FX', 'FY', 'FZ', 'MX', 'MY', 'MZ'], Value))
+        self._tables.append_rows(self.force_key, [row])
+        return 0
+
+    def SetSelected(self, Name, Selected, ItemType=0):
+        if Selected:
+            self._model.selected.add((1, Name))
+        else:
+            self._model.selected.discard((1, Name))
+        return 0
+
+
+class _AreaObj(_OfflineComObject):
+    summary_key = 'Area Assignments - Summary'
+    modifiers_key = 'Area Assignments - Stiffness Modifiers'
+
+    @property
+    def _tables(self):
+        return self._model.tables
+
+    def GetNameList(self):
+        df = self._tables.get(self.summary_key)
+        if df is None:
+            return [0, (), 0]
+        return [len(df), tuple(df['UniqueName']), 0]
+
+    def GetLabelNameList(self):
+        df = self._tables.get(self.summary_key)
+        if df is None:
+            return [0, (), (), (), 0]
+        return [len(df), tuple(df['UniqueName']), tuple(df['Label']), tuple(df['Story']), 0]
+
+    def GetNameListOnStory(self, StoryName):
+        df = self._tables.get(self.summary_key)
+        if df is None:
+            return [0, (), 0]
+        names = tuple(df.loc[df['Story'] == StoryName, 'UniqueName'])
+        return [len(names), names, 0]
+
+    def GetLabelFromName(self, Name):
+        row = self._tables.row(self.summary_key, Name)
+        if row is None:
+            return ['', '', 1]
+        return [row['Label'], row['Story'], 0]
+
+    def GetNameFromLabel(self, Label, Story):
+        df = self._tables.get(self.summary_key)
+        if df is not None:
+            filt = (df['Label'] == Label) & (df['Story'] == Story)
+            names = df.loc[filt, 'UniqueName']
+            if len(names) > 0:
+                return [names.iloc[0], 0]
+        return ['', 1]
+
+    def GetDesignOrientation(self, Name):
+        row = self._tables.row(self.summary_key, Name)
+        if row is None:
+            return [0, 1]
+        return [AREA_DESIGN_ORIENTATIONS.get(row.get('Type', ''), 5), 0]
+
+    def GetModifiers(self, Name):
+        row = self._tables.row(self.modifiers_key, Name)
+        if row is None:
+            return [(1.0,) * 10, 0]
+        return [tuple(_to_float(row.get(col, 1), 1) for col in AREA_MODIFIER_COLUMNS), 0]
+
+    def SetModifiers(self, Name, Value, ItemType=0):
+        summary = self._tables.row(self.summary_key, Name)
+        if summary is None:
+            return 1
+        row = {'Story': summary['Story'], 'Label': summary['Label'], 'UniqueName': Name}
+        row.update(zip(AREA_MODIFIER_COLUMNS, Value))
+        self._tables.set_row(self.modifiers_key, Name, row)
+        return 0
+
+    def Delete(self, Name, ItemType=0):
+        df = self._tables.get(self.summary_key)
+        if df is None or not (df['UniqueName'] == Name).any():
+            return 1
+        self._tables.drop_rows(self.summary_key, df['UniqueName'] == Name)
+        return 0
+
+    def GetPier(self, Name):
+        row = self._tables.row(self.summary_key, Name)
+        if row is None:
+            return ['', 1]
+        return [row.get('Pier', 'None'), 0]
+
+    def SetSelected(self, Name, Selected, ItemType=0):
+        if Selected:
+            self._model.selected.add((5, Name))
+        else:
+            self._model.selected.discard((5, Name))
+        return 0
+
+
+class _DatabaseTables(_OfflineComObject):
+
+    def GetAvailableTables(self):
+        model = self._model
+        keys = tuple(key for key in model.tables.tables
+                     if model.has_results or not model.is_result_table(key))
+        return [len(keys), keys, keys, tuple(1 for _ in keys), 0]
+
+    def GetAllTables(self):
+        keys = tuple(self._model.tables.tables)
+        return [len(keys), keys, keys, tuple(1 for _ in keys), tuple(True for _ in keys), 0]
+
+    def _display_table(self, TableKey, FieldKeyList=None):
+        model = self._model
+        if model.is_result_table(TableKey):
+            df = model.result_table(TableKey)
+            if df is not None and 'OutputCase' in df.columns and \
+                    (model.display_cases is not None or model.display_combos is not None):
+                selected = (model.display_cases or set()) | (model.display_combos or set())
+                df = df.loc[df['OutputCase'].isin(selected)]
+        else:
+            df = model.tables.get(TableKey)
+        if df is not None and FieldKeyList:
+            df = df[[col for col in FieldKeyList if col in df.columns]]
+        return df
+
+    def _group_objects(self, GroupName):
+        '''
+        unique names of objects in GroupName from 'Group Assignments' table,
+        None if GroupName is not a group
+        '''
+        df = self._model.tables.get('Group Assignments')
+        if df is None:
+            return None
+        df = df.loc[df['GroupName'] == GroupName]
+        if len(df) == 0:
+            return None
+        return set(df['UniqueName'])
+
+    def GetTableForDisplayArray(self, TableKey, FieldKeyList, GroupName, TableVersion=0,
+                                FieldsKeysIncluded=None, NumberRecords=0, TableData=None):
+        df = self._display_table(TableKey, FieldKeyList)
+        objects = self._group_objects(GroupName)
+        if df is not None and objects is not None and 'UniqueName' in df.columns:
+            df = df.loc[df['UniqueName'].isin(objects)]
+        if df is None or len(df) == 0:
+            return [FieldKeyList, 0, (None,), 0, (), 1]
+        df = self._model.unit_table(df)
+        fields = tuple(df.columns)
+        data = tuple(df.to_numpy().ravel())
+        return [FieldKeyList, 1, fields, len(df), data, 0]
+
+    def GetTableForEditingArray(self, TableKey, GroupName='All', TableVersion=0,
+                                FieldsKeysIncluded=None, NumberRecords=0, TableData=None):
+        df = self._model.tables.get(TableKey)
+        if df is None:
+            return [0, (), 0, (), 1]
+        df = self._model.unit_table(df)
+        return [1, tuple(df.columns), len(df), tuple(df.to_numpy().ravel()), 0]
+
+    def SetTableForEditingArray(self, TableKey, TableVersion, FieldsKeysIncluded, NumberRecords, TableData):
+        fields = list(FieldsKeysIncluded)
+        n = len(fields)
+        data = np.array(TableData, dtype=object).reshape(-1, n) if n else np.empty((0, 0))
+        df = pd.DataFrame(data, columns=fields)
+        self._model.pending_tables[TableKey] = self._model.unit_table(df, inverse=True)
+        return 0
+
+    def CancelTableEditing(self):
+        self._model.pending_tables.clear()
+        return 0
+
+    def ApplyEditedTables(self, FillImportLog=True, NumFatalErrors=0, NumErrorMsgs=0,
+                          NumWarnMsgs=0, NumInfoMsgs=0, ImportLog=''):
+        model = self._model
+        if model.locked:
+            return [1, 0, 0, 0, 'Model is locked.', 1]
+        for table_key, df in model.pending_tables.items():
+            model.tables.set(table_key, df)
+            if table_key == 'Load Case Definitions - Response Spectrum':
+                model.dump_rs_scales.update(
+                    {name: sf for name, sf in model.response_spectrum_scales().items()
+                     if name not in model.dump_rs_scales})
+        n = len(model.pending_tables)
+        model.pending_tables.clear()
+        model.unlock()
+        log = f'{n} tables imported.' if FillImportLog else ''
+        return [0, 0, 0, n, log, 0]
+
+    def SetLoadCasesSelectedForDisplay(self, NameList):
+        self._model.display_cases = set(NameList) if NameList else set()
+        return 0
+
+    def SetLoadCombinationsSelectedForDisplay(self, NameList):
+        self._model.display_combos = set(NameList) if NameList else set()
+        return 0
+
+    def SetLoadPatternsSelectedForDisplay(self, NameList):
+        self._model.display_patterns = set(NameList) if NameList else set()
+        return 0
+
+    def GetLoadCasesSelectedForDisplay(self):
+        names = tuple(self._model.display_cases or ())
+        return [len(names), names, 0]
+
+    def GetLoadCombinationsSelectedForDisplay(self):
+        names = tuple(self._model.display_combos or ())
+        return [len(names), names, 0]
+
+
+class _ResultsSetup(_OfflineComObject):
+
+    def DeselectAllCasesAndCombosForOutput(self):
+        self._model.output_cases.clear()
+        self._model.output_combos.clear()
+        return 0
+
+    def SetCaseSelectedForOutput(self, Name, Selected=True):
+        if Selected:
+            self._model.output_cases.add(Name)
+        else:
+            self._model.output_cases.discard(Name)
+        return 0
+
+    def SetComboSelectedForOutput(self, Name, Selected=True):
+        if Selected:
+            self._model.output_combos.add(Name)
+        else:
+            self._model.output_combos.discard(Name)
+        return 0
+
+
+class _Results(_OfflineComObject):
+
+    def __init__(self, model, path):
+        super().__init__(model, path)
+        self.Setup = _ResultsSetup(model, f'{path}.Setup')
+
+    def _selected(self, table_key) -> Union[pd.DataFrame, None]:
+        df = self._model.result_table(table_key)
+        if df is None:
+            return None
+        selected = self._model.output_cases | self._model.output_combos
+        df = df.loc[df['OutputCase'].isin(selected)]
+        if len(df) == 0:
+            return None
+        return df
+
+    def _joint_results(self, table_key, Name, columns):
+        df = self._selected(table_key)
+        if df is not None:
+            df = df.loc[df['UniqueName'] == Name]
+        if df is None or len(df) == 0:
+            return [0, (), (), (), (), ()] + [()] * 6 + [1]
+        n = len(df)
+        step_type = tuple(df['StepType']) if 'StepType' in df.columns else ('',) * n
+        ret = [n, (Name,) * n, (Name,) * n, tuple(df['OutputCase']), step_type, (0.0,) * n]
+        for col in columns:
+            ret.append(tuple(df[col].astype(float)) if col in df.columns else (0.0,) * n)
+        ret.append(0)
+        return ret
+
+    def JointReact(self, Name, ItemTypeElm=0):
+        return self._joint_results('Joint Reactions', Name, ['FX', 'FY', 'FZ', 'MX', 'MY', 'MZ'])
+
+    def JointDispl(self, Name, ItemTypeElm=0):
+        return self._joint_results('Joint Displacements', Name, ['Ux', 'Uy', 'Uz', 'Rx', 'Ry', 'Rz'])
+
+    def JointDisplAbs(self, Name, ItemTypeElm=0):
+        return self.JointDispl(Name, ItemTypeElm)
+
+    def BaseReact(self):
+        df = self._selected('Base Reactions')
+        if df is None:
+            return [0] + [()] * 12 + [1]
+        n = len(df)
+        step_type = tuple(df['StepType']) if 'StepType' in df.columns else ('',) * n
+        ret = [n, tuple(df['OutputCase']), step_type, (0.0,) * n]
+        for col in ('FX', 'FY', 'FZ', 'MX', 'MY', 'MZ'):
+            ret.append(tuple(df[col].astype(float)) if col in df.columns else (0.0,) * n)
+        ret += [0.0, 0.0, 0.0, 0]
+        return ret
+
+    def ModalParticipatingMassRatios(self):
+        df = self._selected('Modal Participating Mass Ratios')
+        if df is None:
+            df = self._model.result_table('Modal Participating Mass Ratios')
+        if df is None:
+            return [0] + [()] * 15 + [1]
+        n = len(df)
+        ret = [n, tuple(df['OutputCase']), ('Mode',) * n, tuple(df['Mode'].astype(float))]
+        for col in ('Period', 'UX', 'UY', 'UZ', 'SumUX', 'SumUY', 'SumUZ', 'RX', 'RY', 'RZ', 'SumRX', 'SumRY', 'SumRZ'):
+            ret.append(tuple(df[col].astype(float)) if col in df.columns else (0.0,) * n)
+        ret.append(0)
+        return ret
+
+
+class _RespCombo(_OfflineComObject):
+    table_key = 'Load Combination Definitions'
+
+    @property
+    def _df(self):
+        df = self._model.tables.get(self.table_key)
+        if df is None:
+            df = pd.DataFrame(columns=['Name', 'Type', 'LoadName', 'SF'])
+        return df
+
+    def GetNameList(self):
+        names = tuple(self._df['Name'].unique())
+        return [len(names), names, 0]
+
+    def GetTypeOAPI(self, Name):
+        row = self._model.tables.row(self.table_key, Name, 'Name')
+        if row is None:
+            return [0, 1]
+        return [COMBO_TYPES.get(row['Type'], 0), 0]
+
+    def GetCaseList(self, Name):
+        df = self._df
+        df = df.loc[(df['Name'] == Name) & (df['LoadName'] != '')]
+        combos = set(self._df['Name'])
+        types = tuple(1 if name in combos else 0 for name in df['LoadName'])
+        return [len(df), types, tuple(df['LoadName']), tuple(df['SF'].astype(float)), 0]
+
+    def Add(self, Name, ComboType):
+        if self._model.tables.row(self.table_key, Name, 'Name') is not None:
+            return 1
+        type_ = {v: k for k, v in COMBO_TYPES.items()}.get(ComboType, 'Linear Add')
+        self._model.tables.append_rows(self.table_key, [{'Name': Name, 'Type': type_, 'LoadName': '', 'SF': ''}])
+        return 0
+
+    def SetCaseList(self, Name, CNameType, CName, SF):
+        df = self._df
+        filt = df['Name'] == Name
+        if not filt.any():
+            return 1
+        type_ = df.loc[filt, 'Type'].iloc[0]
+        filt_empty = filt & (df['LoadName'] == '')
+        filt_same = filt & (df['LoadName'] == CName)
+        df = df.loc[~(filt_empty | filt_same)]
+        row = pd.DataFrame([{'Name': Name, 'Type': type_, 'LoadName': CName, 'SF': _to_str(SF)}])
+        self._model.tables.set(self.table_key, pd.concat([df, row], ignore_index=True))
+        return 0
+
+    def Delete(self, Name):
+        df = self._df
+        self._model.tables.set(self.table_key, df.loc[df['Name'] != Name])
+        return 0
+
+
+class _ResponseSpectrum(_OfflineComObject):
+    table_key = 'Load Case Definitions - Response Spectrum'
+
+    def GetLoads(self, Name):
+        df = self._model.tables.get(self.table_key)
+        if df is None:
+            return [0, (), (), (), (), (), 1]
+        df = df.loc[df['Name'] == Name]
+        if len(df) == 0:
+            return [0, (), (), (), (), (), 1]
+        n = len(df)
+        coord = tuple(df['CoordSys']) if 'CoordSys' in df.columns else ('Global',) * n
+        return [
+            n,
+            tuple(df['LoadName']),
+            tuple(df['Function']),
+            tuple(df['TransAccSF'].astype(float)),
+            coord,
+            tuple(df['Angle'].map(lambda a: _to_float(a, 0))),
+            0,
+            ]
+
+    def SetLoads(self, Name, NumberLoads, LoadName, Func, SF, CSys, Ang):
+        df = self._model.tables.get(self.table_key)
+        if df is None:
+            df = pd.DataFrame(columns=['Name', 'LoadName', 'Function', 'TransAccSF', 'CoordSys', 'Angle'])
+        old = df.loc[df['Name'] == Name]
+        common = old.iloc[0].to_dict() if len(old) > 0 else {}
+        rows = []
+        for i in range(NumberLoads):
+            row = dict(common)
+            row.update({
+                'Name': Name,
+                'LoadName': LoadName[i],
+                'Function': Func[i],
+                'TransAccSF': _to_str(SF[i]),
+                'CoordSys': CSys[i],
+                'Angle': _to_str(Ang[i]),
+                })
+            rows.append(row)
+        new = pd.concat([df.loc[df['Name'] != Name], pd.DataFrame(rows)], ignore_index=True)
+        self._model.tables.set(self.table_key, new)
+        self._model.dump_rs_scales.setdefault(Name, float(SF[0]) if NumberLoads else 1)
+        self._model.unlock()
+        return 0
+
+    def SetCase(self, Name):
+        self._model.LoadCases._add_case(Name, 'Response Spectrum')
+        return 0
+
+    def SetEccentricity(self, Name, Eccen):
+        df = self._model.tables.get(self.table_key)
+        if df is not None:
+            df = df.copy()
+            df.loc[df['Name'] == Name, 'EccenRatio'] = _to_str(Eccen)
+            self._model.tables.set(self.table_key, df)
+        return 0
+
+
+class _StaticLinear(_OfflineComObject):
+    table_key = 'Load Case Definitions - Linear Static'
+
+    def GetLoads(self, Name):
+        df = self._model.tables.get(self.table_key)
+        if df is None:
+            return [0, (), (), (), 1]
+        df = df.loc[(df['Name'] == Name) & (df['LoadName'] != '')]
+        n = len(df)
+        return [n, ('Load',) * n, tuple(df['LoadName']), tuple(df['LoadSF'].astype(float)), 0]
+
+
+class _LoadCases(_OfflineComObject):
+    summary_key = 'Load Case Definitions - Summary'
+
+    def __init__(self, model, path):
+        super().__init__(model, path)
+        self.ResponseSpectrum = _ResponseSpectrum(model, f'{path}.ResponseSpectrum')
+        self.StaticLinear = _StaticLinear(model, f'{path}.StaticLinear')
+
+    def _cases(self) -> dict:
+        '''
+        return {name: type}
+        '''
+        tables = self._model.tables
+        df = tables.get(self.summary_key)
+        if df is not None:
+            return dict(zip(df['Name'], df['Type']))
+        cases = {}
+        for table_key, type_ in (
+                ('Load Case Definitions - Linear Static', 'Linear Static'),
+                (_ResponseSpectrum.table_key, 'Response Spectrum'),
+                ):
+            df = tables.get(table_key)
+            if df is not None:
+                for name in df['Name'].unique():
+                    cases[name] = type_
+        return cases
+
+    def _add_case(self, name, type_):
+        tables = self._model.tables
+        if tables.get(self.summary_key) is not None and name not in self._cases():
+            tables.append_rows(self.summary_key, [{'Name': name, 'Type': type_}])
+
+    def GetNameList(self, CaseType=0):
+        names = tuple(self._cases())
+        return [len(names), names, 0]
+
+    def GetTypeOAPI(self, Name):
+        type_ = self._cases().get(Name, None)
+        if type_ is None:
+            return [0, 0, 1]
+        for prefix, n in LOAD_CASE_TYPES.items():
+            if type_.startswith(prefix):
+                return [n, 0, 0]
+        return [0, 0, 0]
+
+
+class _LoadPatterns(_OfflineComObject):
+    table_key = 'Load Pattern Definitions'
+
+    def GetNameList(self):
+        df = self._model.tables.get(self.table_key)
+        if df is None:
+            return [0, (), 0]
+        return [len(df), tuple(df['Name']), 0]
+
+    def GetLoadType(self, Name):
+        row = self._model.tables.row(self.table_key, Name, 'Name')
+        if row is None:
+            return [0, 1]
+        return [LoadPatterns.map_pattern_to_number.get(row['Type'], 8), 0]
+
+    def Add(self, Name, MyType, SelfWTMultiplier=0, AddAnalysisCase=True):
+        if self._model.tables.row(self.table_key, Name, 'Name') is not None:
+            return 1
+        type_ = LoadPatterns.map_number_to_pattern.get(MyType, 'Other')
+        row = {'Name': Name, 'IsAuto': 'No', 'Type': type_, 'SelfWtMult': SelfWTMultiplier}
+        self._model.tables.append_rows(self.table_key, [row])
+        if AddAnalysisCase:
+            self._model.LoadCases._add_case(Name, 'Linear Static')
+            self._model.tables.append_rows('Load Case Definitions - Linear Static',
+                [{'Name': Name, 'LoadType': 'Load Pattern', 'LoadName': Name, 'LoadSF': '1'}])
+        return 0
+
+
+class _Story(_OfflineComObject):
+    table_key = 'Story Definitions'
+    base_key = 'Tower and Base Story Definitions'
+
+    def _base(self):
+        df = self._model.tables.get(self.base_key)
+        if df is not None and len(df) > 0:
+            row = dict(zip(df.columns, df.iloc[0]))
+            return row.get('BSName', 'Base'), _to_float(row.get('BSElev', 0))
+        return 'Base', 0.0
+
+    def _stories(self):
+        '''
+        return names and heights from top to bottom
+        '''
+        df = self._model.tables.get(self.table_key)
+        if df is None:
+            return [], []
+        return list(df['Story']), [float(h) for h in df['Height']]
+
+    def _levels(self) -> dict:
+        base_name, base_level = self._base()
+        names, heights = self._stories()
+        levels = {base_name: base_level}
+        level = base_level
+        for name, height in zip(reversed(names), reversed(heights)):
+            level += height
+            levels[name] = level
+        return levels
+
+    def GetNameList(self):
+        names = tuple(self._stories()[0])
+        return [len(names), names, 0]
+
+    def GetStories(self):
+        levels = self._levels()
+        names = tuple(levels)
+        heights = [0.0] + list(reversed(self._stories()[1]))
+        n = len(names)
+        return [n, names, tuple(levels.values()), tuple(heights), (False,) * n,
+                ('None',) * n, (False,) * n, (0.0,) * n, 0]
+
+    def GetHeight(self, Name):
+        names, heights = self._stories()
+        if Name not in names:
+            return [0.0, 1]
+        return [heights[names.index(Name)], 0]
+
+    def GetElevation(self, Name):
+        levels = self._levels()
+        if Name not in levels:
+            return [0.0, 1]
+        return [levels[Name], 0]
+
+
+class _PropFrame(_OfflineComObject):
+    rectangular_key = 'Frame Section Property Definitions - Concrete Rectangular'
+
+    def GetNameList(self):
+        df = self._model.tables.get('Frame Section Property Definitions - Summary')
+        if df is None:
+            df = self._model.tables.get(self.rectangular_key)
+        if df is None:
+            return [0, (), 0]
+        return [len(df), tuple(df['Name']), 0]
+
+    def GetRectangle(self, Name):
+        row = self._model.tables.row(self.rectangular_key, Name, 'Name')
+        if row is None:
+            return ['', '', 0.0, 0.0, -1, '', '', 1]
+        return ['', row.get('Material', ''), float(row['t3']), float(row['t2']), -1, '', '', 0]
+
+    def SetRectangle(self, Name, MatProp, T3, T2, Color=-1, Notes='', GUID=''):
+        row = {'Name': Name, 'Material': MatProp, 't3': T3, 't2': T2}
+        self._model.tables.set_row(self.rectangular_key, Name, row, 'Name')
+        return 0
+
+    def GetMaterial(self, Name):
+        row = self._model.tables.row(self.rectangular_key, Name, 'Name')
+        if row is None:
+            return ['', 1]
+        return [row.get('Material', ''), 0]
+
+
+class _PropMaterial(_OfflineComObject):
+    concrete_key = 'Material Properties - Concrete Data'
+
+    def GetNameList(self):
+        df = self._model.tables.get('Material Properties - Basic Mechanical Properties')
+        if df is None:
+            return [0, (), 0]
+        return [len(df), tuple(df['Material']), 0]
+
+    def GetOConcrete(self, Name):
+        row = self._model.tables.row(self.concrete_key, Name, 'Material')
+        if row is None:
+            return [0.0, False, 1, 2, 4, 0.002219, 0.005, 1]
+        return [float(row['Fc']), False, 1, 2, 4, 0.002219, 0.005, 0]
+
+
+class _Analyze(_OfflineComObject):
+
+    def RunAnalysis(self):
+        model = self._model
+        model.locked = True
+        model.has_results = True
+        model.analysed_rs_scales = model.response_spectrum_scales()
+        model.number_of_analyses += 1
+        return 0
+
+    def SetRunCaseFlag(self, Name, Run, All=False):
+        return 0
+
+    def GetCaseStatus(self):
+        names = tuple(self._model.LoadCases._cases())
+        status = 4 if self._model.has_results else 1
+        return [len(names), names, (status,) * len(names), 0]
+
+
+class _File(_OfflineComObject):
+
+    def OpenFile(self, FileName):
+        model = self._model
+        path = Path(FileName)
+        if path.is_dir():
+            model.tables = _Tables(load_table_dumps(path))
+            model.has_results = any(model.is_result_table(key) for key in model.tables.tables)
+            model.locked = model.has_results
+            model.dump_rs_scales = model.response_spectrum_scales()
+            model.analysed_rs_scales = dict(model.dump_rs_scales)
+            FileName = str(path / 'model.EDB')
+        model.filename = str(FileName)
+        return 0
+
+    def Save(self, FileName=''):
+        if FileName:
+            self._model.filename = str(FileName)
+        return 0
+
+
+class _SelectObj(_OfflineComObject):
+
+    def All(self, DeSelect=False):
+        model = self._model
+        if DeSelect:
+            model.selected.clear()
+            return 0
+        for name in model.FrameObj._names():
+            model.selected.add((2, name))
+        return 0
+
+    def ClearSelection(self):
+        self._model.selected.clear()
+        return 0
+
+    def GetSelected(self):
+        selected = sorted(self._model.selected)
+        types = tuple(t for t, _ in selected)
+        names = tuple(name for _, name in selected)
+        return [len(selected), types, names, 0]
+
+
+class _GroupDef(_OfflineComObject):
+
+    def GetNameList(self):
+        names = tuple(self._model.groups)
+        return [len(names), names, 0]
+
+    def SetGroup(self, Name, color=-1, SpecifiedForSelection=True, *args):
+        self._model.groups.setdefault(Name, set())
+        return 0
+
+    def Delete(self, Name):
+        return 0 if self._model.groups.pop(Name, None) is not None else 1
+
+    def GetAssignments(self, Name):
+        assignments = sorted(self._model.groups.get(Name, ()))
+        types = tuple(t for t, _ in assignments)
+        names = tuple(name for _, name in assignments)
+        return [len(assignments), types, names, 0]
+
+
+class _View(_OfflineComObject):
+
+    def RefreshView(self, Window=0, Zoom=True):
+        return 0
+
+    def RefreshWindow(self, Window=0):
+        return 0
+
+
+class OfflineEtabsModel(EtabsModelBase):
+    '''
+    etabs_obj.EtabsModel built on an OfflineSapModel instead of attaching to
+    ETABS, it holds the same sub-objects and shares the methods of
+    EtabsModelBase, so each module can be used and benchmarked in isolation
+    '''
+    def __init__(
+                self,
+                SapModel: Union[OfflineSapModel, None]=None,
+                software: str='ETABS',
+                ):
+        if SapModel is None:
+            SapModel = OfflineSapModel()
+        self.software = software
+        self.success = True
+        self.etabs = self
+        self.SapModel = SapModel
+        self.init_model_objects()
+
+    @property
+    def recorder(self) -> ComCallRecorder:
+        return self.SapModel.recorder
+
+
+def grid_model_tables(
+        stories: int=10,
+        nx: int=5,
+        ny: int=5,
+        spacing: float=5,
+        height: float=3,
+        column_section: str='C50X50',
+        beam_section: str='B40X50',
+        dead_load: float=1000,
+        ) -> dict:
+    '''
+    return the database tables of a regular concrete frame with nx * ny columns
+    on each story and beams between them, useful for benchmarks
+    '''
+    story_names = [f'Story{i}' for i in range(1, stories + 1)]
+    ix, iy = np.meshgrid(np.arange(nx), np.arange(ny), indexing='ij')
+    xs = (ix.ravel() * spacing).astype(float)
+    ys = (iy.ravel() * spacing).astype(float)
+    n_grid = nx * ny
+    # points, level 0 is base
+    levels = np.arange(stories + 1) * float(height)
+    point_names = np.arange(1, n_grid * (stories + 1) + 1).reshape(stories + 1, n_grid)
+    point_labels = np.tile(np.arange(1, n_grid + 1), stories + 1)
+    points = pd.DataFrame({
+        'UniqueName': point_names.ravel().astype(str),
+        'Story': np.repeat(['Base'] + story_names, n_grid),
+        'Label': point_labels.astype(str),
+        'X': np.tile(xs, stories + 1).astype(str),
+        'Y': np.tile(ys, stories + 1).astype(str),
+        'Z': np.repeat(levels, n_grid).astype(str),
+        })
+    # columns
+    column_names = np.arange(1, n_grid * stories + 1)
+    columns = pd.DataFrame({
+        'UniqueName': column_names.astype(str),
+        'Story': np.repeat(story_names, n_grid),
+        'Label': np.tile([f'C{i}' for i in range(1, n_grid + 1)], stories),
+        'UniquePtI': point_names[:-1].ravel().astype(str),
+        'UniquePtJ': point_names[1:].ravel().astype(str),
+        'Length': str(float(height)),
+        })
+    # beams along x and y on each story
+    grid = np.arange(n_grid).reshape(nx, ny)
+    pairs = np.vstack([
+        np.column_stack([grid[:-1, :].ravel(), grid[1:, :].ravel()]),
+        np.column_stack([grid[:, :-1].ravel(), grid[:, 1:].ravel()]),
+        ])
+    n_beam = len(pairs)
+    beam_names = np.arange(1, n_beam * stories + 1) + column_names[-1]
+    story_index = np.repeat(np.arange(1, stories + 1), n_beam)
+    beams = pd.DataFrame({
+        'UniqueName': beam_names.astype(str),
+        'Story': np.repeat(story_names, n_beam),
+        'Label': np.tile([f'B{i}' for i in range(1, n_beam + 1)], stories),
+        'UniquePtI': point_names[story_index, np.tile(pairs[:, 0], stories)].astype(str),
+        'UniquePtJ': point_names[story_index, np.tile(pairs[:, 1], stories)].astype(str),
+        'Length': str(float(spacing)),
+        })
+    summary = pd.concat([
+        columns[['Story', 'Label', 'UniqueName']].assign(
+            Type='Column', DesignProc='Concrete Frame', AnalysisSect=column_section, AxisAngle='0'),
+        beams[['Story', 'Label', 'UniqueName']].assign(
+            Type='Beam', DesignProc='Concrete Frame', AnalysisSect=beam_section, AxisAngle='0'),
+        ], ignore_index=True)
+    stories_df = pd.DataFrame({
+        'Tower': 'T1',
+        'Story': list(reversed(story_names)),
+        'Height': str(float(height)),
+        })
+    sections = pd.DataFrame([
+        {'Name': column_section, 'Material': 'C25', 't3': '0.5', 't2': '0.5'},
+        {'Name': beam_section, 'Material': 'C25', 't3': '0.5', 't2': '0.4'},
+        ])
+    distributed = beams[['Story', 'Label', 'UniqueName']].assign(
+        LoadPattern='Dead', LoadType='Force', Dir='Gravity', DistType='Relative Distance',
+        RelDistA='0', RelDistB='1', ForceA=str(float(dead_load)), ForceB=str(float(dead_load)),
+        )
+    load_patterns = pd.DataFrame([
+        {'Name': 'Dead', 'IsAuto': 'No', 'Type': 'Dead', 'SelfWtMult': '1'},
+        {'Name': 'Live', 'IsAuto': 'No', 'Type': 'Live', 'SelfWtMult': '0'},
+        ])
+    load_cases = pd.DataFrame([
+        {'Name': 'Dead', 'LoadType': 'Load Pattern', 'LoadName': 'Dead', 'LoadSF': '1'},
+        {'Name': 'Live', 'LoadType': 'Load Pattern', 'LoadName': 'Live', 'LoadSF': '1'},
+        ])
+    return {
+        'Story Definitions': stories_df,
+        'Point Object Connectivity': points,
+        'Column Object Connectivity': columns,
+        'Beam Object Connectivity': beams,
+        'Frame Assignments - Summary': summary,
+        'Frame Section Property Definitions - Concrete Rectangular': sections,
+        'Frame Loads Assignments - Distributed': distributed,
+        'Load Pattern Definitions': load_patterns,
+        'Load Case Definitions - Linear Static': load_cases,
+        }
+
+def create_offline_etabs(
+        tables: Union[dict, str, Path, None]=None,
+        unit: int=6,
+        scale_units: bool=False,
+        **kwargs,
+        ) -> OfflineEtabsModel:
+    '''
+    return an OfflineEtabsModel of tables, or of grid_model_tables(**kwargs)
+    if tables is None, unit is the present unit of the model, see
+    OfflineSapModel for scale_units
+    '''
+    if tables is None:
+        tables = grid_model_tables(**kwargs)
+    return OfflineEtabsModel(OfflineSapModel(tables, unit=unit, scale_units=scale_units))
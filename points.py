@@ -1,7 +1,8 @@
 from typing import Iterable, Union
 import math
 
-import numpy as np
+from points_functions import PointsIndex
+
 
 class Points:
     def __init__(
@@ -18,17 +19,22 @@ class Points:
     def get_point_names(self):
         return self.SapModel.PointObj.GetNameList()[1]
     
+    def get_points_index(self,
+                         cell_size: Union[float, None]=None,
+                         ) -> PointsIndex:
+        '''
+        read the coordinates of all points from 'Point Object Connectivity' table
+        in one call and return an index for coordinates and spatial queries
+        '''
+        table_key = 'Point Object Connectivity'
+        cols = ['UniqueName', 'X', 'Y', 'Z']
+        df = self.etabs.database.read(table_key, to_dataframe=True, cols=cols, schema=True)
+        if df is None:
+            return PointsIndex([], [], cell_size)
+        return PointsIndex.from_dataframe(df, cell_size)
+
     def get_unique_xyz_coordinates(self):
-        xs = set()
-        ys = set()
-        zs = set()
-        points = self.get_point_names()
-        for p in points:
-            x, y, z = self.get_point_coordinate(p)
-            xs.add(x)
-            ys.add(y)
-            zs.add(z)
-        return sorted(xs), sorted(ys), sorted(zs)
+        return self.get_points_index().unique_coordinates()
     
     def set_point_restraint(self,
             point_names,
@@ -75,11 +81,44 @@ class Points:
 
 
     def get_points_coords(self, points : Iterable):
+        points = list(points)
+        coords = self.get_points_index().coords(points)
         points_xyz = {}
         for p in points:
-            x, y, z, _ = self.SapModel.PointObj.GetCoordCartesian(p)
-            points_xyz[p] = (x, y, z)
+            xyz = coords.get(p, None)
+            if xyz is None:
+                x, y, z, _ = self.SapModel.PointObj.GetCoordCartesian(p)
+                xyz = (x, y, z)
+            points_xyz[p] = xyz
         return points_xyz
+
+    def get_nearest_point(self,
+                          x: float,
+                          y: float,
+                          z: float,
+                          ) -> tuple:
+        '''
+        return the name of the nearest point to (x, y, z) and its distance
+        '''
+        return self.get_points_index().nearest(x, y, z)
+
+    def get_points_on_level(self,
+                            z: float,
+                            tolerance: float=0.01,
+                            ) -> list:
+        return self.get_points_index().on_level(z, tolerance)
+
+    def get_points_within(self,
+                          x: float,
+                          y: float,
+                          z: Union[float, None]=None,
+                          tolerance: float=0.01,
+                          ) -> list:
+        '''
+        return the points that each coordinate differs at most tolerance from
+        (x, y, z), if z is None only x and y are compared
+        '''
+        return self.get_points_index().within(x, y, z, tolerance)
     
     def add_point(self,
         x: float,
@@ -120,11 +159,11 @@ class Points:
         '''
         table_key = 'Point Object Connectivity'
         cols = ['UniqueName', 'X', 'Y', 'Z']
-        df = self.etabs.database.read(table_key, to_dataframe=True, cols=cols)
+        df = self.etabs.database.read(table_key, to_dataframe=True, cols=cols, schema=True)
         if points:
             filt = df['UniqueName'].isin(points)
             df = df.loc[filt]
-        df = df.astype({'UniqueName': int, 'X': float, 'Y': float, 'Z': float})
+        df = df.astype({'UniqueName': int})
         if to_dict:
             return df.set_index("UniqueName").apply(tuple, axis=1).to_dict()
         else:
@@ -141,19 +180,17 @@ class Points:
         map_dict: A dictionary for mapping mesh points name to int point name
         Return all joints coordinates in FEM, include mesh joints
         '''
-        force, length = self.etabs.get_current_unit()
-        self.etabs.set_current_unit(force, unit)
         self.etabs.run_analysis()
         table_key = 'Objects and Elements - Joints'
         cols = ['ObjType', 'ElmName', 'GlobalX', 'GlobalY', 'GlobalZ']
-        df = self.etabs.database.read(table_key=table_key, to_dataframe=True, cols=cols)
+        df = self.etabs.database.read(table_key=table_key, to_dataframe=True, cols=cols, schema=True)
         if joints:
             df = df[df['ElmName'].isin(joints)]
         if types:
             df = df[df['ObjType'].isin(types)]
         del df['ObjType']
-        df = df.astype({'GlobalX': float, 'GlobalY': float, 'GlobalZ': float, })
-        self.etabs.set_current_unit(force, length)
+        xyz = ['GlobalX', 'GlobalY', 'GlobalZ']
+        df[xyz] = self.etabs.convert_unit(df[xyz].to_numpy(), ('N', unit), force=0, length=1)
         if map_dict:
             col = 'ElmName'
             df[col] = df[col].map(map_dict).fillna(df[col])
@@ -169,22 +206,7 @@ class Points:
         return max_number
     
     def get_boundbox_coords(self):
-        points = self.get_point_names()
-        min_x = np.inf
-        min_y = np.inf
-        min_z = np.inf
-        max_x = -np.inf
-        max_y = -np.inf
-        max_z = -np.inf
-        for p in points:
-            x, y, z, _ = self.SapModel.PointObj.GetCoordCartesian(p)
-            min_x = min(x, min_x)
-            max_x = max(x, max_x)
-            min_y = min(y, min_y)
-            max_y = max(y, max_y)
-            min_z = min(z, min_z)
-            max_z = max(z, max_z)
-        return min_x, min_y, min_z, max_x, max_y, max_z
+        return self.get_points_index().bounds()
 
 
     
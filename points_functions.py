@@ -1,33 +1,241 @@
+from typing import Iterable, Union
 import math
 
+import numpy as np
+import pandas as pd
+
+
+class PointsIndex:
+    '''
+    names and coordinates of points in contiguous arrays with a grid hash on
+    (x, y) for nearest, on level and within tolerance queries
+    '''
+    def __init__(self,
+                 names: Iterable,
+                 xyz: Iterable,
+                 cell_size: Union[float, None]=None,
+                 ):
+        self.names = np.asarray(list(names), dtype=object)
+        self.xyz = np.asarray(xyz, dtype=float).reshape(-1, 3)
+        self.cell_size = cell_size
+        self._positions = pd.Index(self.names)
+        self._z_order = None
+        self._grid = None
+
+    @classmethod
+    def from_dataframe(cls,
+                       df: pd.DataFrame,
+                       cell_size: Union[float, None]=None,
+                       columns: tuple=('UniqueName', 'X', 'Y', 'Z'),
+                       ) -> 'PointsIndex':
+        name, x, y, z = columns
+        return cls(df[name], df[[x, y, z]].to_numpy(dtype=float), cell_size)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def positions(self, names: Iterable) -> np.ndarray:
+        '''
+        return the positions of names in arrays, -1 for unknown names
+        '''
+        return self._positions.get_indexer(np.asarray(list(names), dtype=object))
+
+    def coords(self, names: Union[Iterable, None]=None) -> dict:
+        '''
+        return a dictionary like {'10': (0, 0, 0), ...}, unknown names are ignored
+        '''
+        if names is None:
+            positions = np.arange(len(self.names))
+        else:
+            names = list(names)
+            positions = self.positions(names)
+            positions = positions[positions >= 0]
+        return dict(zip(self.names[positions].tolist(), map(tuple, self.xyz[positions].tolist())))
+
+    def bounds(self) -> tuple:
+        '''
+        return min_x, min_y, min_z, max_x, max_y, max_z
+        '''
+        if len(self.xyz) == 0:
+            return (np.inf,) * 3 + (-np.inf,) * 3
+        return tuple(self.xyz.min(axis=0).tolist() + self.xyz.max(axis=0).tolist())
+
+    def unique_coordinates(self) -> tuple:
+        '''
+        return sorted unique xs, ys and zs
+        '''
+        return tuple(np.unique(self.xyz[:, i]).tolist() for i in range(3))
+
+    def take(self, positions: Iterable) -> 'PointsIndex':
+        '''
+        return a new index of points in positions
+        '''
+        positions = np.asarray(positions, dtype=int)
+        return PointsIndex(self.names[positions], self.xyz[positions])
+
+    def level_positions(self,
+                        z: float,
+                        tolerance: float=0.01,
+                        ) -> np.ndarray:
+        '''
+        return the sorted positions of points with |Z - z| <= tolerance
+        '''
+        if self._z_order is None:
+            self._z_order = np.argsort(self.xyz[:, 2], kind='stable')
+        zs = self.xyz[self._z_order, 2]
+        start = np.searchsorted(zs, z - tolerance, side='left')
+        end = np.searchsorted(zs, z + tolerance, side='right')
+        return np.sort(self._z_order[start:end])
+
+    def on_level(self,
+                 z: float,
+                 tolerance: float=0.01,
+                 ) -> list:
+        '''
+        return the names of points with |Z - z| <= tolerance
+        '''
+        return self.names[self.level_positions(z, tolerance)].tolist()
+
+    def _build_grid(self) -> None:
+        xy = self.xyz[:, :2]
+        if self.cell_size is None:
+            span = float(np.ptp(xy, axis=0).max()) if len(xy) else 0
+            self.cell_size = span / max(math.sqrt(len(xy)), 1) if span > 0 else 1.0
+        cells = np.floor(xy / self.cell_size).astype(np.int64)
+        order = np.lexsort((cells[:, 1], cells[:, 0]))
+        cells = cells[order]
+        splits = np.flatnonzero(np.any(np.diff(cells, axis=0) != 0, axis=1)) + 1
+        starts = np.concatenate([[0], splits]) if len(cells) else np.array([], dtype=int)
+        self._grid = {
+            (int(cells[i, 0]), int(cells[i, 1])): indices
+            for i, indices in zip(starts, np.split(order, splits))
+        }
+
+    def _cell(self, x: float, y: float) -> tuple:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _candidates(self, x: float, y: float, tolerance: float) -> np.ndarray:
+        if self._grid is None:
+            self._build_grid()
+        i0, j0 = self._cell(x - tolerance, y - tolerance)
+        i1, j1 = self._cell(x + tolerance, y + tolerance)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(self._grid):
+            return np.arange(len(self.names))
+        indices = [self._grid[(i, j)] for i in range(i0, i1 + 1) for j in range(j0, j1 + 1) if (i, j) in self._grid]
+        if not indices:
+            return np.array([], dtype=int)
+        return np.sort(np.concatenate(indices))
+
+    def within(self,
+               x: float,
+               y: float,
+               z: Union[float, None]=None,
+               tolerance: float=0.01,
+               ) -> list:
+        '''
+        return the names of points that each coordinate differs at most tolerance,
+        if z is None only x and y are compared
+        '''
+        indices = self._candidates(x, y, tolerance)
+        xyz = self.xyz[indices]
+        filt = (np.abs(xyz[:, 0] - x) <= tolerance) & (np.abs(xyz[:, 1] - y) <= tolerance)
+        if z is not None:
+            filt &= np.abs(xyz[:, 2] - z) <= tolerance
+        return self.names[indices[filt]].tolist()
+
+    @staticmethod
+    def _ring_cells(ci: int, cj: int, ring: int) -> list:
+        if ring == 0:
+            return [(ci, cj)]
+        cells = []
+        for i in range(-ring, ring + 1):
+            cells.append((ci + i, cj - ring))
+            cells.append((ci + i, cj + ring))
+        for j in range(-ring + 1, ring):
+            cells.append((ci - ring, cj + j))
+            cells.append((ci + ring, cj + j))
+        return cells
+
+    def nearest(self,
+                x: float,
+                y: float,
+                z: float,
+                ) -> tuple:
+        '''
+        return the name of nearest point and its distance
+        '''
+        if len(self.names) == 0:
+            return None, np.inf
+        if self._grid is None:
+            self._build_grid()
+        ci, cj = self._cell(x, y)
+        keys = np.array(list(self._grid.keys()))
+        max_ring = int(np.abs(keys - (ci, cj)).max())
+        best, best_distance = None, np.inf
+        for ring in range(max_ring + 1):
+            cells = [cell for cell in self._ring_cells(ci, cj, ring) if cell in self._grid]
+            if cells:
+                indices = np.concatenate([self._grid[cell] for cell in cells])
+                distances = np.linalg.norm(self.xyz[indices] - (x, y, z), axis=1)
+                i = int(np.argmin(distances))
+                if distances[i] < best_distance:
+                    best, best_distance = indices[i], float(distances[i])
+            # points out of this ring are at least ring * cell_size far in xy plane
+            if best_distance <= ring * self.cell_size:
+                break
+        return self.names[best], best_distance
+
 
 def get_similar_points_in_two_models(
         model1,
         model2,
         level1: float,
         level2: float,
+        tolerance: float=.01,
         ):
     '''
     Return points with similar (x, y) coordinates in two models
     '''
     model1.set_current_unit("kgf", 'm')
     model2.set_current_unit("kgf", 'm')
-    left_points = model1.SapModel.PointObj.GetNameList()[1]
-    right_points = model2.SapModel.PointObj.GetNameList()[1]
-    used_points = []
+    left_points = model1.points.get_points_index()
+    right_points = model2.points.get_points_index()
+    left_points = left_points.take(left_points.level_positions(level1, tolerance))
+    right_points = right_points.take(right_points.level_positions(level2, tolerance))
+    used_points = set()
     similar_points = {}
-    for p1 in left_points:
-        p1_x, p1_y, p1_z, _ = model1.SapModel.PointObj.GetCoordCartesian(p1)
-        if math.isclose(p1_z, level1, abs_tol=.01):
-            for p2 in right_points:
-                if p2 not in used_points:
-                    p2_x, p2_y, p2_z, _ = model2.SapModel.PointObj.GetCoordCartesian(p2)
-                    if math.isclose(p2_z, level2, abs_tol=.01) and math.isclose(p1_x, p2_x, abs_tol=.01) and math.isclose(p1_y, p2_y, abs_tol=.01):
-                        similar_points[p1] = p2
-                        used_points.append(p2)
-                        break
+    for p1, (p1_x, p1_y, _) in zip(left_points.names.tolist(), left_points.xyz.tolist()):
+        for p2 in right_points.within(p1_x, p1_y, tolerance=tolerance):
+            if p2 not in used_points:
+                similar_points[p1] = p2
+                used_points.add(p2)
+                break
     return similar_points
 
+def get_points_reactions(
+        model,
+        points: Iterable,
+        load_cases: Iterable,
+        ) -> dict:
+    '''
+    Return the reactions of points for load cases from 'Joint Reactions' table,
+    like {'1': [('Dead', fx, fy, fz, mx, my, mz), ...], ...}
+    '''
+    model.load_cases.select_load_cases(list(load_cases))
+    table_key = 'Joint Reactions'
+    cols = ['UniqueName', 'OutputCase', 'FX', 'FY', 'FZ', 'MX', 'MY', 'MZ']
+    df = model.database.read(table_key, to_dataframe=True, cols=cols, schema=True)
+    if df is None:
+        return {}
+    df = df.loc[df['UniqueName'].isin(set(points))]
+    reactions = {}
+    for row in df.itertuples(index=False):
+        reactions.setdefault(row[0], []).append(tuple(row[1:]))
+    return reactions
+
 def transfer_loads_between_two_models(
         model1,
         model2,
@@ -40,23 +248,13 @@ def transfer_loads_between_two_models(
     similar_points = get_similar_points_in_two_models(model1, model2, level1, level2)
     not_applied_forces = []
     model1.run_analysis()
-    model1.SapModel.Results.Setup.DeselectAllCasesAndCombosForOutput()
-    for lc in map_loadcases.keys():
-        model1.SapModel.Results.Setup.SetCaseSelectedForOutput(lc)
+    reactions = get_points_reactions(model1, similar_points.keys(), map_loadcases.keys())
     model2.unlock_model()
     for p1, p2 in similar_points.items():
-        ret = model1.SapModel.Results.JointReact(p1, 0)
-        for i in range(ret[0]):
-            lc1 = ret[3][i]
-            fx = multiply * -ret[6][i]
-            fy = multiply * -ret[7][i]
-            fz = multiply * -ret[8][i]
-            mx = multiply * -ret[9][i]
-            my = multiply * -ret[10][i]
-            mz = multiply * -ret[11][i]
+        for lc1, *forces in reactions.get(p1, []):
             lc2 = map_loadcases.get(lc1, None)
             if lc2 is not None:
-                point_load_value = [fx, fy, fz, mx, my, mz]
+                point_load_value = [multiply * -f for f in forces]
                 model2.SapModel.PointObj.SetLoadForce(p2, lc2, point_load_value, replace)
             else:
                 not_applied_forces.append((p1, lc1))
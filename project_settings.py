@@ -0,0 +1,135 @@
+'''
+Settings of etabs_api that are stored as a JSON string in the "Company Name"
+item of the project information of the model.
+
+The settings are read once per model file and served from memory. Updates are kept in memory
+and written with one SetProjectInfo and one save of the model by flush():
+
+    with etabs.settings.transaction():
+        etabs.update_setting(['key1'], [value1])
+        etabs.update_setting({'key2': value2})
+    # saved once here
+
+Outside of a transaction every update is flushed immediately, like before.
+'''
+
+from contextlib import contextmanager
+from typing import Union
+import copy
+import json
+
+
+__all__ = ['ProjectSettings']
+
+
+class ProjectSettings:
+    item = "Company Name"
+
+    def __init__(self, etabs):
+        self.etabs = etabs
+        self._data = None
+        self.filename = None
+        self.dirty = False
+        self.depth = 0
+        self.number_of_saves = 0
+
+    def read_from_model(self) -> dict:
+        info = self.etabs.SapModel.GetProjectInfo()
+        items, data = info[1], info[2]
+        if not data:
+            return {}
+        if items and self.item in items:
+            json_str = data[list(items).index(self.item)]
+        else:
+            json_str = data[0]
+        try:
+            d = json.loads(json_str)
+        except (json.JSONDecodeError, TypeError):
+            return {}
+        if isinstance(d, dict):
+            return d
+        return {}
+
+    def load(self, refresh: bool=False) -> dict:
+        '''
+        read the settings if they are not read or an other file opens with
+        direct COM call, pending changes are never discarded
+        '''
+        if self.dirty:
+            return self._data
+        filename = self.etabs.SapModel.GetModelFilename()
+        if refresh or self._data is None or filename != self.filename:
+            self._data = self.read_from_model()
+            self.filename = filename
+        return self._data
+
+    def get(self, refresh: bool=False) -> dict:
+        '''
+        return a copy of settings, read from the model only the first time or if refresh
+        '''
+        return copy.deepcopy(self.load(refresh))
+
+    def update(self,
+               keys: Union[list, dict],
+               values: Union[list, None] = None,
+               ) -> None:
+        if isinstance(keys, dict):
+            new_d = keys
+        else:
+            new_d = dict(zip(keys, values))
+        data = self.load()
+        if all(key in data and data[key] == value for key, value in new_d.items()):
+            return
+        data.update(copy.deepcopy(new_d))
+        self.dirty = True
+        if not self.depth:
+            self.flush()
+
+    def set(self, d: dict) -> None:
+        if d == self.load():
+            return
+        self._data = copy.deepcopy(d)
+        self.dirty = True
+        if not self.depth:
+            self.flush()
+
+    def flush(self, save: bool=True) -> bool:
+        '''
+        write the changed settings to the model and save it, return True if it writes
+        '''
+        if not self.dirty:
+            return False
+        json_str = json.dumps(self._data)
+        self.etabs.SapModel.SetProjectInfo(self.item, json_str)
+        if save:
+            self.etabs.wait_for_backup()
+            self.etabs.SapModel.File.Save()
+            self.number_of_saves += 1
+        self.dirty = False
+        return True
+
+    def invalidate(self) -> None:
+        '''
+        forget the settings without writing them, e.g. when an other model opens
+        '''
+        self._data = None
+        self.filename = None
+        self.dirty = False
+
+    @contextmanager
+    def transaction(self, save: bool=True):
+        '''
+        keep the updates in memory and flush them once at the end of the
+        outermost transaction, the updates are discarded if an exception raises
+        '''
+        self.depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.depth -= 1
+            if self.depth == 0:
+                self.invalidate()
+            raise
+        self.depth -= 1
+        if self.depth == 0:
+            self.flush(save)
@@ -1,4 +1,5 @@
 from pathlib import Path
+import functools
 import os
 import sys
 import math
@@ -44,23 +45,15 @@ def open_file(filename):
         subprocess.call([opener, filename])
 
 def change_unit(force=None, length=None):
+    '''
+    run the method in the force and length unit of self.etabs and restore the
+    unit after it, even if it raises. None keeps the present force or length.
+    '''
     def decorator(original_method):
+        @functools.wraps(original_method)
         def wrapper(self, *args, **kwargs):
-            # Get the unit from etabs
-            curr_force, curr_length = self.etabs.get_current_unit()
-            print(f"{curr_force=}, {curr_length=}")
-            force_to_use = force if force is not None else curr_force
-            length_to_use = length if length is not None else curr_length
-            print(f"{force_to_use=}, {length_to_use=}")
-            self.etabs.set_current_unit(force_to_use, length_to_use)
-
-            # Call the original method
-            result = original_method(self, *args, **kwargs)
-
-            # Set the unit back in etabs
-            self.etabs.set_current_unit(curr_force, curr_length)
-
-            return result
+            with self.etabs.unit_scope(force, length):
+                return original_method(self, *args, **kwargs)
 
         return wrapper
     return decorator
@@ -244,7 +237,7 @@ def get_column_labels(df, etabs):
         labels = set()
         for name in col.dropna():
             if name is not None:
-                label = etabs.SapModel.FrameObj.GetLabelFromName(str(name))[0]
+                label = etabs.frame_obj.get_label_and_story(str(name))[0]
                 if label is not None:
                     labels.add(label)
         return ','.join(sorted(labels))
@@ -67,23 +67,43 @@ class Results:
                                          points: list=[],
                                          load_cases: list=[],
                                          load_combinations: list=[],
+                                         chunk_size: int=0,
                                          ):
-        self.etabs.database.select_load_cases_combinations(load_cases=load_cases, load_combinations=load_combinations)
+        '''
+        chunk_size: if it is not zero, read the table for chunk_size load cases
+        or combinations at a time to limit the memory usage, the results are
+        the same
+        '''
+        import pandas as pd
+        # only load_cases and load_combinations are selected for display
+        if not load_cases and not load_combinations:
+            return
         table_key = 'Joint Displacements'
         cols = ['UniqueName', 'OutputCase', 'Ux', 'Uy', 'Uz']
-        df = self.etabs.database.read(table_key, to_dataframe=True, cols=cols)
-        if df is None:
+        agg = {'Ux': ['min', 'max'], 'Uy': ['min', 'max'], 'Uz': ['min', 'max']}
+        database = self.etabs.database
+        self.etabs.run_analysis()
+        if chunk_size:
+            dfs = database.iter_read(table_key,
+                                     load_cases=load_cases,
+                                     load_combinations=load_combinations,
+                                     chunk_size=chunk_size,
+                                     cols=cols,
+                                     )
+        else:
+            database.set_selected_for_display(load_cases=load_cases, load_combinations=load_combinations)
+            dfs = [database.read(table_key, to_dataframe=True, cols=cols, schema=True)]
+        aggs = []
+        for df in dfs:
+            if df is None:
+                continue
+            if points:
+                df = df.loc[df['UniqueName'].isin(points)]
+            # the chunks are separated by OutputCase
+            aggs.append(df.groupby(['UniqueName', 'OutputCase']).agg(agg))
+        if not aggs:
             return
-        convert_type = {
-                    'Ux' : float,
-                    'Uy' : float,
-                    'Uz' : float,
-                    }
-        df = df.astype(convert_type)
-        if points:
-            filt = df['UniqueName'].isin(points)
-            df = df.loc[filt]
-        return df.groupby(['UniqueName', 'OutputCase']).agg({'Ux': ['min', 'max'], 'Uy': ['min', 'max'], 'Uz': ['min', 'max']})
+        return pd.concat(aggs).sort_index()
 
     def get_point_abs_displacement(self,
             point_name: str,
@@ -0,0 +1,179 @@
+'''
+Scale factors of response spectrum load cases.
+
+The base shear of a response spectrum is linear in its scale factor, so the
+scale that gives the target base shear is target / V of one analysis. The
+scales are applied once and the next analysis verifies them:
+
+    v = etabs.results.get_base_react(specs, directions, absolute=True)
+    scales, v, report = solve_spectrum_scales(read, apply, specs, targets, v)
+    report['saved']
+
+read(specs) returns the base shears of specs after an analysis and
+apply(spec, scale) multiplies the scale factor of spec, like
+LoadCases.multiply_response_spectrum_scale_factor.
+
+The base shears of angular spectra come from section cuts with the angle
+of each spectrum, section_cuts_base_shear gets them from the section cut
+forces table.
+'''
+
+from typing import Callable, Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = [
+    'get_spectrum_scales',
+    'fixed_point_analyses',
+    'solve_spectrum_scales',
+    'section_cuts_base_shear',
+    ]
+
+
+def get_spectrum_scales(
+    v: Iterable,
+    targets: Iterable,
+    ) -> np.ndarray:
+    '''
+    return the multipliers of scale factors that give targets base shears
+    '''
+    return np.asarray(targets, dtype=float) / np.asarray(v, dtype=float)
+
+def _converged(scales: np.ndarray, tolerance: float) -> bool:
+    return (scales.max() < 1 + tolerance) and (scales.min() > 1 - tolerance)
+
+def _multipliers(scales: np.ndarray, scale_min: Union[float, None]) -> np.ndarray:
+    if scale_min is None:
+        return scales
+    return np.maximum(scales, scale_min)
+
+def fixed_point_analyses(
+    v: Iterable,
+    targets: Iterable,
+    tolerance: float = .05,
+    num_iteration: int = 3,
+    scale_min: Union[float, None] = 1.0,
+    ) -> int:
+    '''
+    return the number of analyses of the fixed point iteration, one analysis
+    for each iteration until the scales are in tolerance, for base shears
+    that are linear in the scale factors
+    '''
+    v = np.asarray(v, dtype=float)
+    n = 0
+    for _ in range(num_iteration):
+        n += 1
+        scales = get_spectrum_scales(v, targets)
+        if _converged(scales, tolerance):
+            break
+        v = v * _multipliers(scales, scale_min)
+    return n
+
+def solve_spectrum_scales(
+    read: Callable[[list], Iterable],
+    apply: Callable[[str, float], object],
+    specs: list,
+    targets: Iterable,
+    v: Iterable,
+    tolerance: float = .05,
+    num_iteration: int = 3,
+    scale_min: Union[float, None] = 1.0,
+    verify: bool = True,
+    ) -> tuple:
+    '''
+    return the last scales, target / V, the base shears of specs and a report
+    of the number of analyses.
+
+    targets: target base shears of specs, from static load cases that do not
+        change with the scales
+    v: base shears of specs from the first analysis
+    scale_min: the scale factors are multiplied by max(scale, scale_min)
+    verify: read the base shears after the scales are applied, otherwise
+        the base shears are v * scale
+    '''
+    specs = list(specs)
+    targets = np.asarray(targets, dtype=float)
+    v = np.asarray(v, dtype=float)
+    report = {
+        'analyses': 1,
+        'fixed_point_analyses': fixed_point_analyses(v, targets, tolerance, num_iteration, scale_min),
+        }
+    iterations = 0
+    scales = get_spectrum_scales(v, targets)
+    for _ in range(num_iteration):
+        if _converged(scales, tolerance):
+            break
+        multipliers = _multipliers(scales, scale_min)
+        changed = multipliers != 1
+        if not changed.any():
+            # the spectra are greater than the targets and scale_min keeps them
+            break
+        iterations += 1
+        for spec, mult in zip(np.asarray(specs, dtype=object)[changed], multipliers[changed]):
+            apply(spec, float(mult))
+        if verify:
+            v = np.asarray(read(specs), dtype=float)
+            report['analyses'] += 1
+        else:
+            v = v * multipliers
+        scales = get_spectrum_scales(v, targets)
+    report['iterations'] = iterations
+    report['saved'] = report['fixed_point_analyses'] - report['analyses']
+    return scales, v, report
+
+def section_cuts_base_shear(
+    df: pd.DataFrame,
+    ex_names: Iterable,
+    ey_names: Iterable,
+    section_cut_angles: dict,
+    angle_specs: dict,
+    ) -> pd.DataFrame:
+    '''
+    return the base shears of section cuts for the spectra of their angles,
+    one row for each angle from its last section cut, with columns
+    SectionCut, angle, spec, F_spec, F_ex, F_ey, F_static and Ratio.
+    F_ex and F_ey are the absolute sum of F1 of ex_names and ey_names,
+    F_static = (F_ex ** 2 + F_ey ** 2) ** 0.5 and Ratio = F_spec / F_static.
+
+    df: 'Section Cut Forces - Analysis' table with SectionCut, OutputCase and F1
+    section_cut_angles: {section cut: angle}, like DatabaseTables.get_section_cuts_angle
+    angle_specs: {angle: spec}, like LoadCases.get_spectral_with_angles
+    '''
+    df = df.drop_duplicates(['SectionCut', 'OutputCase'], keep='last')
+    cuts = pd.Index(pd.unique(df['SectionCut']))
+    cases = pd.Index(pd.unique(df['OutputCase']))
+    # F1 of section cuts and output cases
+    f1 = np.full((len(cuts), len(cases)), np.nan)
+    f1[cuts.get_indexer(df['SectionCut']), cases.get_indexer(df['OutputCase'])] = \
+        pd.to_numeric(df['F1']).to_numpy(dtype=float)
+
+    def abs_sum(names):
+        i = cases.get_indexer(list(names))
+        return np.abs(np.nansum(f1[:, i[i >= 0]], axis=1))
+
+    f_ex = abs_sum(ex_names)
+    f_ey = abs_sum(ey_names)
+    angles = np.array([section_cut_angles.get(cut, cut) for cut in cuts], dtype=object)
+    specs = np.array([angle_specs.get(angle) for angle in angles], dtype=object)
+    i = cases.get_indexer(specs)
+    f_spec = np.abs(f1[np.arange(len(cuts)), i])
+    filt = (i >= 0) & ~np.isnan(f_spec)
+    f_static = np.hypot(f_ex, f_ey)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = f_spec / f_static
+    ret = pd.DataFrame({
+        'SectionCut': cuts,
+        'angle': angles,
+        'spec': specs,
+        'F_spec': f_spec,
+        'F_ex': f_ex,
+        'F_ey': f_ey,
+        'F_static': f_static,
+        'Ratio': ratio,
+        }).loc[filt]
+    # the last section cut of each angle in the order of angles
+    order = pd.unique(ret['angle'])
+    ret = ret.drop_duplicates('angle', keep='last').set_index('angle', drop=False)
+    return ret.loc[order].reset_index(drop=True)
@@ -93,18 +93,16 @@ class Story:
         [('Story1', level1), ('Story2', level2), ('Story3', level3), ... ]
         unit: if unit is not None, it will convert the levels to the given unit
         '''
-        if unit is not None:
-            current_unit = self.etabs.get_current_unit()
-            self.etabs.set_current_unit('N', unit)
         storyname_and_levels = self.storyname_and_levels()
+        if unit is not None:
+            levels = self.etabs.convert_unit(list(storyname_and_levels.values()), ('N', unit), force=0, length=1)
+            storyname_and_levels = dict(zip(storyname_and_levels.keys(), levels.tolist()))
         storyname_and_levels = sorted(storyname_and_levels.items(), key=lambda item: item[1], reverse=reverse)
         if not include_base:
             if reverse:
                 storyname_and_levels = storyname_and_levels[:-1]
             else:
                 storyname_and_levels = storyname_and_levels[1:]
-        if unit is not None:
-            self.etabs.set_current_unit(*current_unit)
         return storyname_and_levels
     
     def get_sorted_story_name(self,
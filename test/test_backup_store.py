@@ -0,0 +1,145 @@
+import sys
+from pathlib import Path
+import datetime
+import os
+
+import pytest
+
+etabs_api_path = Path(__file__).parent.parent
+sys.path.insert(0, str(etabs_api_path))
+
+from backup_store import BackupStore
+from offline_sap_model import create_offline_etabs
+
+
+CHUNK_SIZE = 1024
+
+def create_model(tmp_path, n_chunks=10):
+    model = tmp_path / 'model.EDB'
+    model.write_bytes(os.urandom(n_chunks * CHUNK_SIZE + 100))
+    return model
+
+def modify(model, position=0):
+    data = bytearray(model.read_bytes())
+    data[position] = (data[position] + 1) % 256
+    model.write_bytes(bytes(data))
+    stat = model.stat()
+    os.utime(model, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+def test_backup_and_restore(tmp_path):
+    model = create_model(tmp_path)
+    store = BackupStore(tmp_path / 'backups', chunk_size=CHUNK_SIZE)
+    manifest = store.backup(model)
+    assert manifest.name == 'BACKUP_model_1'
+    assert len(manifest.chunks) == 11
+    target = store.restore(manifest.name, tmp_path / 'restored.EDB', verify=True)
+    assert target.read_bytes() == model.read_bytes()
+
+def test_unchanged_chunks_are_stored_once(tmp_path):
+    model = create_model(tmp_path)
+    store = BackupStore(tmp_path / 'backups', chunk_size=CHUNK_SIZE)
+    store.backup(model)
+    n_chunks = len(list(store.chunks_path.glob('*/*.z')))
+    original = model.read_bytes()
+    modify(model, 5 * CHUNK_SIZE)
+    manifest = store.backup(model)
+    assert manifest.name == 'BACKUP_model_2'
+    assert len(list(store.chunks_path.glob('*/*.z'))) == n_chunks + 1
+    store.restore('BACKUP_model_1', tmp_path / 'first.EDB')
+    assert (tmp_path / 'first.EDB').read_bytes() == original
+    store.restore('BACKUP_model_2', tmp_path / 'second.EDB')
+    assert (tmp_path / 'second.EDB').read_bytes() == model.read_bytes()
+
+def test_backup_async(tmp_path):
+    model = create_model(tmp_path)
+    store = BackupStore(tmp_path / 'backups', chunk_size=CHUNK_SIZE)
+    futures = [store.backup_async(model) for _ in range(3)]
+    store.wait()
+    assert [f.result().name for f in futures] == [f'BACKUP_model_{i}' for i in (1, 2, 3)]
+    assert store.backup_names(model) == ['BACKUP_model_1', 'BACKUP_model_2', 'BACKUP_model_3']
+
+def test_model_saves_after_backup_async(tmp_path):
+    model = create_model(tmp_path, n_chunks=200)
+    etabs = create_offline_etabs(stories=1)
+    etabs.backup_store = BackupStore(tmp_path / 'backups', chunk_size=CHUNK_SIZE)
+    done = []
+    etabs.SapModel.File.Save = lambda *args: done.append(all(f.done() for f in futures))
+    etabs.SapModel.File.OpenFile = lambda *args: done.append(all(f.done() for f in futures))
+    futures = [etabs.backup_store.backup_async(model)]
+    etabs.update_setting({'a': 1})
+    futures.append(etabs.backup_store.backup_async(model))
+    etabs.open_model(model)
+    assert done == [True, True]
+    assert etabs.backup_store.backup_names(model) == ['BACKUP_model_1', 'BACKUP_model_2']
+
+def test_retention(tmp_path):
+    model = create_model(tmp_path, n_chunks=2)
+    store = BackupStore(tmp_path / 'backups', keep_last=2, chunk_size=CHUNK_SIZE)
+    for i in range(4):
+        modify(model, i)
+        store.backup(model)
+    assert store.backup_names(model) == ['BACKUP_model_3', 'BACKUP_model_4']
+    # first chunk of removed backups are collected
+    assert len(list(store.chunks_path.glob('*/*.z'))) == 4
+    with pytest.raises(FileNotFoundError):
+        store.restore('BACKUP_model_1', tmp_path / 'first.EDB')
+    store.keep_last = None
+    store.max_age_days = 1
+    manifest = store.read_manifest('BACKUP_model_3')
+    manifest.created = (datetime.datetime.now() - datetime.timedelta(days=2)).isoformat()
+    store.write_manifest(manifest)
+    assert store.prune(model) == ['BACKUP_model_3']
+    store.clear()
+    assert store.nbytes() == 0
+
+def test_next_name_after_full_copies(tmp_path):
+    model = create_model(tmp_path, n_chunks=1)
+    backups = tmp_path / 'backups'
+    backups.mkdir()
+    (backups / 'BACKUP_model_7.EDB').write_bytes(b'')
+    store = BackupStore(backups, chunk_size=CHUNK_SIZE)
+    assert store.backup(model).name == 'BACKUP_model_8'
+
+def test_no_pruning_by_default(tmp_path):
+    model = create_model(tmp_path, n_chunks=1)
+    store = BackupStore(tmp_path / 'backups', chunk_size=CHUNK_SIZE)
+    for i in range(25):
+        modify(model, i)
+        store.backup(model)
+    assert len(store.backup_names(model)) == 25
+
+def test_backup_reads_again_when_file_changes(tmp_path):
+    model = create_model(tmp_path, n_chunks=3)
+    store = BackupStore(tmp_path / 'backups', chunk_size=CHUNK_SIZE)
+    read_chunks = store.read_chunks
+    reads = []
+
+    def save_while_reading(source):
+        chunks = read_chunks(source)
+        if not reads:
+            modify(model, 2 * CHUNK_SIZE)
+        reads.append(chunks)
+        return chunks
+
+    store.read_chunks = save_while_reading
+    manifest = store.backup(model)
+    assert len(reads) == 2
+    assert manifest.mtime_ns == model.stat().st_mtime_ns
+    store.restore(manifest.name, tmp_path / 'restored.EDB', verify=True)
+    assert (tmp_path / 'restored.EDB').read_bytes() == model.read_bytes()
+
+def test_backup_of_unstable_file_raises(tmp_path):
+    model = create_model(tmp_path, n_chunks=2)
+    store = BackupStore(tmp_path / 'backups', chunk_size=CHUNK_SIZE, retries=1)
+    read_chunks = store.read_chunks
+
+    def always_saving(source):
+        chunks = read_chunks(source)
+        modify(model, 0)
+        return chunks
+
+    store.read_chunks = always_saving
+    with pytest.raises(RuntimeError):
+        store.backup(model)
+    assert store.backup_names(model) == []
+    assert store.nbytes() == 0
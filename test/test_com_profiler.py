@@ -0,0 +1,75 @@
+import sys
+from pathlib import Path
+
+etabs_api_path = Path(__file__).parent.parent
+sys.path.insert(0, str(etabs_api_path))
+
+import com_profiler
+from database import DatabaseTables
+from offline_sap_model import create_offline_etabs
+
+
+def test_install_and_uninstall():
+    etabs = create_offline_etabs(stories=2, nx=2, ny=2)
+    sap_model = etabs.SapModel
+    profiler = com_profiler.install(etabs)
+    assert isinstance(etabs.SapModel, com_profiler.ComProxy)
+    assert isinstance(etabs.frame_obj.SapModel, com_profiler.ComProxy)
+    assert com_profiler.uninstall(etabs) is profiler
+    assert etabs.SapModel is sap_model
+    assert etabs.frame_obj.SapModel is sap_model
+
+def test_attribute_calls_to_caller():
+    etabs = create_offline_etabs(stories=2, nx=2, ny=2)
+    profiler = com_profiler.install(etabs)
+    etabs.frame_obj.get_beams_columns(use_tables=False)
+    com_profiler.uninstall(etabs)
+    df = profiler.to_dataframe()
+    filt = df['Method'] == 'FrameObj.GetDesignProcedure'
+    assert df.loc[filt, 'Caller'].tolist() == ['FrameObj.get_beams_columns']
+    assert df.loc[filt, 'Calls'].sum() == 16
+    df = profiler.to_dataframe(by='Method')
+    assert df['Calls'].sum() == profiler.total_calls
+    # the recorder of the offline model sees the same calls
+    assert profiler.total_calls == etabs.recorder.total_calls - 1
+
+def test_nested_stack_and_payload():
+    etabs = create_offline_etabs(stories=2, nx=2, ny=2)
+    profiler = com_profiler.install(etabs)
+    for name in ('1', '2'):
+        etabs.SapModel.FrameObj.GetLabelFromName(name)
+    etabs.frame_obj.get_beams_columns(use_tables=False)
+    com_profiler.uninstall(etabs)
+    stacks = profiler.collapsed_stacks()
+    leaf = 'FrameObj.get_beams_columns;FrameObj.is_column;SapModel.FrameObj.GetDesignOrientation'
+    assert any(line.startswith(leaf + ' ') for line in stacks)
+    df = profiler.to_dataframe(by='Method').set_index('Method')
+    # GetLabelNameList returns 4 tuples of 12 frames
+    assert df.loc['FrameObj.GetLabelNameList', 'Payload'] == 1 + 4 * 12 + 1
+    # one name in and label, story and ret out
+    assert df.loc['FrameObj.GetLabelFromName', 'Payload'] == 2 * (1 + 3)
+
+def test_export_flamegraph(tmp_path):
+    etabs = create_offline_etabs(stories=2, nx=2, ny=2)
+    profiler = com_profiler.install(etabs)
+    etabs.story.get_sorted_story_name()
+    com_profiler.uninstall(etabs)
+    filename = profiler.export_flamegraph(tmp_path / 'etabs.folded')
+    lines = filename.read_text().splitlines()
+    assert lines == profiler.collapsed_stacks()
+    stack, weight = lines[0].rsplit(' ', 1)
+    assert stack == 'Story.get_sorted_story_name;Story.storyname_and_levels;SapModel.Story.GetStories'
+    assert int(weight) > 0
+
+def test_install_on_nested_objects():
+    etabs = create_offline_etabs(stories=2, nx=2, ny=2)
+    sap_model = etabs.SapModel
+    # a helper of frame_obj with its own SapModel
+    etabs.frame_obj.database = DatabaseTables(SapModel=sap_model)
+    profiler = com_profiler.install(etabs)
+    assert isinstance(etabs.frame_obj.database.SapModel, com_profiler.ComProxy)
+    etabs.frame_obj.database.read('Story Definitions')
+    com_profiler.uninstall(etabs)
+    assert etabs.frame_obj.database.SapModel is sap_model
+    df = profiler.to_dataframe(by='Method').set_index('Method')
+    assert df.loc['DatabaseTables.GetTableForDisplayArray', 'Calls'] == 1
@@ -0,0 +1,169 @@
+import sys
+from pathlib import Path
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+etabs_api_path = Path(__file__).parent.parent
+sys.path.insert(0, str(etabs_api_path))
+
+from combo_expansion import ComboExpansion, topological_order
+from offline_sap_model import create_offline_etabs, grid_model_tables
+
+
+COLUMNS = ['Name', 'Type', 'IsAuto', 'LoadName', 'SF', 'Notes', 'GUID']
+
+def test_topological_order():
+    graph = {'C4': {'C2', 'C3'}, 'C1': set(), 'C2': {'C1'}, 'C3': {'C1', 'C2'}}
+    order = topological_order(graph)
+    assert sorted(order) == sorted(graph)
+    for node, uses in graph.items():
+        assert all(order.index(used) < order.index(node) for used in uses)
+    with pytest.raises(ValueError):
+        topological_order({'C1': {'C2'}, 'C2': {'C1'}, 'C3': set()})
+
+def create_loadcombos(n_zip=4, n_expanded=3, n_combos=20, n_nested=5, n_envelopes=2, seed=0):
+    '''
+    combos use at most one zip load case or one other combo
+    '''
+    rng = np.random.default_rng(seed)
+    expanded_loads = {f'EZIP{i}': [f'E{i}_{j}' for j in range(n_expanded)] for i in range(n_zip)}
+    zip_loads = list(expanded_loads)
+    rows = []
+    def add(name, type_, loads):
+        for load in loads:
+            rows.append([name, type_, 'No', load, f'{rng.integers(1, 10) / 10}', '', name])
+    for i in range(n_combos):
+        loads = ['Dead', 'Live']
+        if rng.random() < 0.7:
+            loads.append(zip_loads[rng.integers(len(zip_loads))])
+        add(f'COMB{i}', 'Linear Add', loads)
+    for i in range(n_nested):
+        add(f'NCOMB{i}', 'Linear Add', ['Dead', f'COMB{i}'])
+    add('NNCOMB', 'Linear Add', ['NCOMB0', 'Live'])
+    for i in range(n_envelopes):
+        loads = [f'COMB{j}' for j in rng.choice(n_combos, 4, replace=False)]
+        loads += ['NCOMB0', 'Dead']
+        add(f'ENV{i}', 'Envelope', loads)
+    return pd.DataFrame(rows, columns=COLUMNS), expanded_loads
+
+def reference_expand_linear_loadcombos(loads_expanded, loadcombos_df):
+    '''
+    expand_linear_loadcombos before the expansion engine
+    '''
+    loadcombos_df = loadcombos_df.drop(columns='GUID', errors='ignore')
+    zip_loadcases = list(loads_expanded.keys())
+    envelop_combos = list(loadcombos_df[loadcombos_df['Type'] == 'Envelope']['Name'])
+    filt_envelope = loadcombos_df['Name'].isin(envelop_combos)
+    new_loadcombo_df = loadcombos_df.loc[~filt_envelope]
+    filt = new_loadcombo_df['LoadName'].isin(zip_loadcases)
+    loadcombos_include_zip_loadcases = list(new_loadcombo_df.loc[filt]['Name'].unique())
+    filt = ~(new_loadcombo_df['Name'].isin(loadcombos_include_zip_loadcases))
+    new_loadcombo_df = new_loadcombo_df.loc[filt]
+    zip_loadcombos = dict()
+    for loadcombo in loadcombos_include_zip_loadcases:
+        zip_df = loadcombos_df.loc[loadcombos_df['Name'] == loadcombo]
+        load_names = list(zip_df['LoadName'])
+        for zip_loadpat, expand_loaded in loads_expanded.items():
+            n = len(expand_loaded)
+            if zip_loadpat in load_names:
+                for i, load in enumerate(expand_loaded, start=1):
+                    append_df = zip_df.replace(zip_loadpat, load)
+                    name = f'{loadcombo}({i}/{n})'
+                    append_df['Name'] = name
+                    new_loadcombo_df = pd.concat([new_loadcombo_df, append_df])
+                    if i == 1:
+                        zip_loadcombos[loadcombo] = [name]
+                    else:
+                        zip_loadcombos[loadcombo].append(name)
+    return new_loadcombo_df, zip_loadcombos
+
+def reference_expand_loadcombos(convert_loadcases, loadcombos_df):
+    '''
+    expand_loadcombos before the expansion engine, a fixpoint of
+    expand_linear_loadcombos over the whole table
+    '''
+    df_linear_combos, convert_lcombos = reference_expand_linear_loadcombos(convert_loadcases, loadcombos_df)
+    additional_convert_lcombos = convert_lcombos.copy()
+    while additional_convert_lcombos:
+        df_linear_combos, additional_convert_lcombos = reference_expand_linear_loadcombos(additional_convert_lcombos, df_linear_combos)
+        convert_lcombos.update(additional_convert_lcombos)
+    df = loadcombos_df.drop(columns='GUID')
+    df = df.loc[df['Type'] == 'Envelope']
+    filt = df['LoadName'].isin(convert_lcombos.keys())
+    df_include = df.loc[filt].copy()
+    df_include['LoadName'] = df_include['LoadName'].map(convert_lcombos)
+    df_envelop_combos = pd.concat([df.loc[~filt], df_include.explode('LoadName')])
+    return pd.concat([df_linear_combos, df_envelop_combos]), convert_lcombos
+
+def sort_rows(df):
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+def test_same_as_reference():
+    for seed in range(3):
+        df, expanded_loads = create_loadcombos(seed=seed)
+        expected, expected_convert = reference_expand_loadcombos(expanded_loads, df)
+        expansion = ComboExpansion(df, expanded_loads)
+        ret, convert = expansion.expand()
+        assert convert == expected_convert
+        pd.testing.assert_frame_equal(sort_rows(ret), sort_rows(expected))
+        assert set(expansion.timings) == {'graph', 'linear', 'envelope', 'concat'}
+
+def test_nested_names():
+    df, expanded_loads = create_loadcombos(n_zip=1, n_expanded=2, n_combos=1, n_nested=1, n_envelopes=0)
+    df.loc[df['Name'] == 'COMB0', 'LoadName'] = ['Dead', 'Live', 'EZIP0']
+    df, convert = ComboExpansion(df, expanded_loads).expand()
+    assert convert['COMB0'] == ['COMB0(1/2)', 'COMB0(2/2)']
+    assert convert['NCOMB0'] == ['NCOMB0(1/2)', 'NCOMB0(2/2)']
+    assert convert['NNCOMB'] == ['NNCOMB(1/2)', 'NNCOMB(2/2)']
+    loads = df.loc[df['Name'] == 'NNCOMB(2/2)', 'LoadName'].tolist()
+    assert loads == ['NCOMB0(2/2)', 'Live']
+
+def test_combo_with_two_expanded_loads():
+    df = pd.DataFrame([
+        ['COMB1', 'Linear Add', 'No', 'EXALL', '1', ''],
+        ['COMB1', 'Linear Add', 'No', 'EYALL', '0.3', ''],
+        ], columns=COLUMNS[:-1])
+    expanded_loads = {'EXALL': ['EX', 'EPX', 'ENX'], 'EYALL': ['EY', 'EPY']}
+    df, convert = ComboExpansion(df, expanded_loads).expand()
+    assert len(convert['COMB1']) == 6
+    assert len(df) == 12
+    assert convert['COMB1'][1] == 'COMB1(1/3)(2/2)'
+    assert df.loc[df['Name'] == 'COMB1(3/3)(2/2)', 'LoadName'].tolist() == ['ENX', 'EPY']
+
+def test_envelope_uses_expanded_load_cases():
+    df = pd.DataFrame([
+        ['ENV', 'Envelope', 'No', 'EXALL', '1', ''],
+        ['ENV', 'Envelope', 'No', 'Dead', '1', ''],
+        ], columns=COLUMNS[:-1])
+    df, convert = ComboExpansion(df, {'EXALL': ['EX', 'EPX']}).expand()
+    assert convert == {}
+    assert df['LoadName'].tolist() == ['EX', 'EPX', 'Dead']
+
+def test_database_expand_loadcombos():
+    df, expanded_loads = create_loadcombos()
+    tables = grid_model_tables(stories=1)
+    tables['Load Combination Definitions'] = df
+    etabs = create_offline_etabs(tables)
+    etabs.recorder.reset()
+    ret, convert = etabs.database.expand_loadcombos(expanded_loads)
+    assert etabs.recorder.counts['DatabaseTables.GetTableForDisplayArray'] == 1
+    expected, expected_convert = reference_expand_loadcombos(expanded_loads, df)
+    assert convert == expected_convert
+    pd.testing.assert_frame_equal(sort_rows(ret), sort_rows(expected))
+    assert 'load combinations - linear' in etabs.database.expand_timings
+
+@pytest.mark.slow
+def test_benchmark():
+    df, expanded_loads = create_loadcombos(n_zip=40, n_expanded=6, n_combos=200, n_nested=50, n_envelopes=10)
+    start = time.perf_counter()
+    expected, _ = reference_expand_loadcombos(expanded_loads, df)
+    reference_time = time.perf_counter() - start
+    start = time.perf_counter()
+    ret, _ = ComboExpansion(df, expanded_loads).expand()
+    engine_time = time.perf_counter() - start
+    pd.testing.assert_frame_equal(sort_rows(ret), sort_rows(expected))
+    # timings are only reported, they depend on the machine
+    print(f'reference: {reference_time:.3f} s, engine: {engine_time:.3f} s')
@@ -0,0 +1,259 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+etabs_api_path = Path(__file__).parent.parent
+sys.path.insert(0, str(etabs_api_path))
+
+from database import DatabaseTables, TableCache, TableCatalogue
+from offline_sap_model import (
+    create_offline_etabs,
+    grid_model_tables,
+    save_table_dumps,
+    )
+
+
+def display_calls(etabs):
+    return etabs.recorder.counts['DatabaseTables.GetTableForDisplayArray']
+
+def available_tables_calls(etabs):
+    return etabs.recorder.counts['DatabaseTables.GetAvailableTables']
+
+def test_read_without_cache():
+    etabs = create_offline_etabs(stories=2)
+    table_key = 'Point Object Connectivity'
+    etabs.database.read(table_key)
+    etabs.database.read(table_key)
+    assert display_calls(etabs) == 2
+
+def test_read_cached_table():
+    etabs = create_offline_etabs(stories=2)
+    cache = etabs.database.enable_cache()
+    table_key = 'Point Object Connectivity'
+    df1 = etabs.database.read(table_key, to_dataframe=True)
+    df2 = etabs.database.read(table_key, to_dataframe=True)
+    assert display_calls(etabs) == 1
+    assert df1.equals(df2)
+    assert (cache.hits, cache.misses) == (1, 1)
+    df2['X'] = '100'
+    assert etabs.database.read(table_key, to_dataframe=True).equals(df1)
+
+def test_cache_invalidation():
+    etabs = create_offline_etabs(stories=2)
+    etabs.database.enable_cache()
+    table_key = 'Frame Section Property Definitions - Concrete Rectangular'
+    df = etabs.database.read(table_key, to_dataframe=True)
+    df['t3'] = '0.6'
+    etabs.database.apply_data(table_key, df)
+    df = etabs.database.read(table_key, to_dataframe=True)
+    assert display_calls(etabs) == 2
+    assert set(df['t3']) == {'0.6'}
+    etabs.unlock_model()
+    etabs.database.read(table_key)
+    assert display_calls(etabs) == 3
+    etabs.run_analysis()
+    etabs.database.read(table_key)
+    assert display_calls(etabs) == 4
+    etabs.database.read(table_key)
+    assert display_calls(etabs) == 4
+
+def test_cache_invalidation_on_open_model(tmp_path):
+    tables = grid_model_tables(stories=3)
+    save_table_dumps(tables, tmp_path)
+    etabs = create_offline_etabs(stories=1)
+    etabs.database.enable_cache()
+    table_key = 'Point Object Connectivity'
+    n = len(etabs.database.read(table_key))
+    etabs.open_model(tmp_path)
+    assert len(etabs.database.read(table_key)) > n
+
+def test_cache_key_contains_display_selection():
+    etabs = create_offline_etabs(stories=1)
+    etabs.database.enable_cache()
+    table_key = 'Load Pattern Definitions'
+    etabs.database.read(table_key)
+    etabs.load_patterns.select_all_load_patterns()
+    etabs.database.read(table_key)
+    etabs.load_patterns.select_all_load_patterns()
+    etabs.database.read(table_key)
+    assert display_calls(etabs) == 2
+
+def test_cache_key_contains_present_unit():
+    etabs = create_offline_etabs(stories=2, unit=6, scale_units=True)
+    etabs.database.enable_cache()
+    table_key = 'Point Object Connectivity'
+    df_m = etabs.database.read(table_key, to_dataframe=True)
+    etabs.set_current_unit('N', 'mm')
+    df_mm = etabs.database.read(table_key, to_dataframe=True)
+    with etabs.unit_scope('tonf', 'cm'):
+        df_cm = etabs.database.read(table_key, to_dataframe=True)
+        etabs.database.read(table_key)
+    etabs.database.read(table_key)
+    assert display_calls(etabs) == 3
+    x = df_m['X'].astype(float)
+    assert np.allclose(df_mm['X'].astype(float), 1000 * x)
+    assert np.allclose(df_cm['X'].astype(float), 100 * x)
+    assert x.max() > 0
+
+def test_table_cache_lru_by_size():
+    ret = [None, 1, ('A', 'B'), 2, tuple(str(i) for i in range(100)), 0]
+    size = TableCache.size_of(ret)
+    cache = TableCache(max_bytes=int(2.5 * size))
+    for key in 'abc':
+        cache.put((key, None), ret)
+    assert len(cache) == 2
+    assert ('a', None) not in cache
+    cache.get(('b', None))
+    cache.put(('d', None), ret)
+    assert ('b', None) in cache
+    assert ('c', None) not in cache
+    assert cache.nbytes == 2 * size
+    cache.invalidate('b')
+    assert len(cache) == 1
+    cache.invalidate()
+    assert (len(cache), cache.nbytes) == (0, 0)
+    big = TableCache(max_bytes=size - 1)
+    big.put(('a', None), ret)
+    assert len(big) == 0
+
+def test_table_catalogue():
+    names = [
+        'Frame Assignments - Summary',
+        'Frame Assignments - Property Modifiers',
+        'Area Assignments - Stiffness Modifiers',
+        'Joint Displacements',
+        ]
+    catalogue = TableCatalogue(names)
+    assert 'Joint Displacements' in catalogue
+    assert 'Joint' not in catalogue
+    assert catalogue.containing('Modifiers') == names[1:3]
+    assert catalogue.containing('Frame', 'Modifiers') == names[1:2]
+    assert catalogue.containing('Frame', ' - ') == names[:2]
+    assert catalogue.containing('nt D') == names[3:]
+    assert catalogue.containing('Wall') == []
+
+def test_available_tables_fetched_once():
+    etabs = create_offline_etabs(stories=1)
+    database = etabs.database
+    assert database.table_exist('Point Object Connectivity')
+    assert database.table_name_that_containe('Object Connectivity') is None
+    assert database.table_name_that_containe_texts(('Column', 'Connectivity')) == 'Column Object Connectivity'
+    database.read('Story Definitions')
+    assert available_tables_calls(etabs) == 1
+
+def test_available_tables_refreshed_on_invalidation():
+    etabs = create_offline_etabs(stories=1)
+    etabs.SapModel.tables.set('Base Reactions', etabs.SapModel.tables.get('Story Definitions'))
+    database = etabs.database
+    assert not database.table_exist('Base Reactions')
+    assert database.table_names_that_containe('Reactions') == []
+    assert available_tables_calls(etabs) == 1
+    # direct COM calls must follow with clear_cache
+    etabs.SapModel.Analyze.RunAnalysis()
+    assert not database.table_exist('Base Reactions')
+    assert available_tables_calls(etabs) == 1
+    assert etabs.recorder.counts['GetModelIsLocked'] == 0
+    database.clear_cache()
+    assert database.table_exist('Base Reactions')
+    etabs.unlock_model()
+    assert not database.table_exist('Base Reactions')
+    etabs.run_analysis()
+    assert database.table_names_that_containe('Reactions') == ['Base Reactions']
+    assert available_tables_calls(etabs) == 4
+
+def test_reshape_data():
+    fields = ('Name', 'X', 'Y')
+    data = ('A', '1', '2.5', 'B', '3', '')
+    assert DatabaseTables.reshape_data(fields, data) == [['A', '1', '2.5'], ['B', '3', '']]
+    df = DatabaseTables.reshape_data_to_df(fields, data, cols=['Y', 'Name'])
+    assert list(df.columns) == ['Y', 'Name']
+    assert list(df['Name']) == ['A', 'B']
+    df = DatabaseTables.reshape_data_to_df(fields, data, schema=('X', 'Y'))
+    assert list(df.columns) == list(fields)
+    assert df['X'].dtype == 'float64'
+    assert df['X'].tolist() == [1, 3]
+    assert df['Y'].isna().tolist() == [False, True]
+
+def test_read_with_schema():
+    etabs = create_offline_etabs(stories=2, nx=2, ny=2, spacing=4)
+    table_key = 'Point Object Connectivity'
+    df = etabs.database.read(table_key, to_dataframe=True, cols=['UniqueName', 'Z'], schema=True)
+    assert df['Z'].dtype == 'float64'
+    assert df['Z'].max() == 6
+    df = etabs.points.get_points_coordinates()
+    assert (df.dtypes[['X', 'Y', 'Z']] == 'float64').all()
+    assert etabs.points.get_points_coordinates(['8'], to_dict=True) == {8: (4, 4, 3)}
+
+def create_etabs_with_displacements(cases=('DEAD', 'LIVE', 'EX', 'EY')):
+    tables = grid_model_tables(stories=2, nx=2, ny=2)
+    points = tables['Point Object Connectivity']['UniqueName']
+    rows = []
+    for i, case in enumerate(cases):
+        for point in points:
+            for step, sign in (('Max', 1), ('Min', -1)):
+                rows.append({'Story': 'Story1', 'Label': point, 'UniqueName': point,
+                             'OutputCase': case, 'CaseType': 'LinStatic', 'StepType': step,
+                             'Ux': str(sign * (i + 1) * int(point)), 'Uy': '0', 'Uz': '-0.001'})
+    tables['Joint Displacements'] = pd.DataFrame(rows)
+    tables['Group Assignments'] = pd.DataFrame([
+        {'GroupName': 'G1', 'ObjectType': 'Joint', 'UniqueName': '1'},
+        {'GroupName': 'G1', 'ObjectType': 'Joint', 'UniqueName': '2'},
+        {'GroupName': 'G2', 'ObjectType': 'Joint', 'UniqueName': '3'},
+        ])
+    etabs = create_offline_etabs(tables)
+    etabs.run_analysis()
+    return etabs
+
+def test_iter_read_chunks_of_load_cases():
+    etabs = create_etabs_with_displacements()
+    etabs.recorder.reset()
+    chunks = list(etabs.database.iter_read('Joint Displacements', load_cases=['DEAD', 'LIVE', 'EX'], chunk_size=2))
+    assert display_calls(etabs) == 2
+    assert [set(df['OutputCase']) for df in chunks] == [{'DEAD', 'LIVE'}, {'EX'}]
+    assert chunks[0]['Ux'].dtype == 'float64'
+    chunks = list(etabs.database.iter_read('Joint Displacements', groups=['G1', 'G2'], cols=['UniqueName', 'Ux']))
+    assert [set(df['UniqueName']) for df in chunks] == [{'1', '2'}, {'3'}]
+    assert list(chunks[0].columns) == ['UniqueName', 'Ux']
+
+def test_iter_read_restores_display_selection():
+    etabs = create_etabs_with_displacements()
+    etabs.load_cases.select_load_cases(['EY'])
+    for _ in etabs.database.iter_read('Joint Displacements', load_cases=['DEAD', 'LIVE']):
+        pass
+    df = etabs.database.read('Joint Displacements', to_dataframe=True)
+    assert set(df['OutputCase']) == {'EY'}
+
+def test_points_min_max_displacements_in_chunks():
+    etabs = create_etabs_with_displacements()
+    cases = ['DEAD', 'LIVE', 'EX', 'EY']
+    df1 = etabs.results.get_points_min_max_displacements(points=['1', '5'], load_cases=cases)
+    df2 = etabs.results.get_points_min_max_displacements(points=['1', '5'], load_cases=cases, chunk_size=3)
+    assert len(df1) == 8
+    pd.testing.assert_frame_equal(df1, df2)
+    etabs.load_cases.select_load_cases(['EY'])
+    assert etabs.results.get_points_min_max_displacements(points=['1']) is None
+    assert etabs.results.get_points_min_max_displacements(points=['1'], chunk_size=3) is None
+
+def test_element_forces_in_chunks():
+    tables = grid_model_tables(stories=2, nx=2, ny=2)
+    beams = tables['Frame Assignments - Summary'].query("Type == 'Beam'")['UniqueName']
+    combos = ['COMB1', 'COMB2', 'COMB3']
+    tables['Element Forces - Beams'] = pd.DataFrame([
+        {'Story': 'Story1', 'Beam': beam, 'UniqueName': beam, 'OutputCase': combo,
+         'P': '0', 'T': str(i * int(beam))}
+        for beam in beams for i, combo in enumerate(combos)])
+    etabs = create_offline_etabs(tables)
+    etabs.run_analysis()
+    elements = list(beams[:3])
+    df1 = etabs.database.get_beams_forces(combos, elements, cols=['UniqueName', 'OutputCase', 'T'])
+    etabs.recorder.reset()
+    df2 = etabs.database.get_beams_forces(combos, elements, cols=['UniqueName', 'OutputCase', 'T'], chunk_size=2)
+    assert display_calls(etabs) == 2
+    assert len(df1) == 9
+    sort = ['UniqueName', 'OutputCase']
+    pd.testing.assert_frame_equal(
+        df1.sort_values(sort).reset_index(drop=True),
+        df2.sort_values(sort).reset_index(drop=True),
+        )
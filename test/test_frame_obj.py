@@ -80,6 +80,14 @@ def test_get_beams_columns_in_stories():
     assert len(beams) == 44
     assert len(columns) == 22
 
+@open_etabs_file('shayesteh.EDB')
+def test_get_beams_columns_from_tables():
+    for kwargs in ({}, {'type_': 1}, {'types': [1, 2]}, {'stories': ['STORY1', 'STORY2']}):
+        beams, columns = etabs.frame_obj.get_beams_columns_from_tables(**kwargs)
+        beams_com, columns_com = etabs.frame_obj.get_beams_columns(use_tables=False, **kwargs)
+        assert set(beams) == set(beams_com)
+        assert set(columns) == set(columns_com)
+
 @open_etabs_file('shayesteh.EDB')
 def test_get_beams_columns_weakness_structure():
     if version < 20:
@@ -1,7 +1,11 @@
 import sys
 from pathlib import Path
+import math
+import time
 
 import numpy as np
+import pandas as pd
+import pytest
 
 etabs_api_path = Path(__file__).parent.parent
 sys.path.insert(0, str(etabs_api_path))
@@ -231,3 +235,138 @@ def test_get_b_joint_shear_of_column():
         beams_c=beams_c,
     )
     np.testing.assert_allclose(b, 250, atol=.01)
+
+
+def stacked_columns_grid(stories, n_columns, height=3000.0, seed=None):
+    '''
+    synthetic points and columns, some column lines stop or split at random stories
+    '''
+    rng = np.random.default_rng(seed)
+    points = []
+    columns = []
+    point_name = 0
+    for line in range(n_columns):
+        top = stories if seed is None else int(rng.integers(1, stories + 1))
+        previous = None
+        for level in range(top + 1):
+            point_name += 1
+            points.append((str(point_name), float(line), 0.0, level * height))
+            if previous is not None:
+                pt_i, pt_j = (previous, str(point_name))
+                if seed is not None and rng.random() < 0.3:
+                    pt_i, pt_j = pt_j, pt_i
+                columns.append((str(len(columns) + 1), pt_i, pt_j))
+            previous = str(point_name)
+        if seed is not None and top > 1 and rng.random() < 0.3:
+            # a second shorter column from the base point
+            columns.append((str(len(columns) + 1), str(point_name - top), str(point_name - top + 1)))
+    points_df = pd.DataFrame(points, columns=['UniqueName', 'X', 'Y', 'Z'])
+    columns_df = pd.DataFrame(columns, columns=['UniqueName', 'UniquePtI', 'UniquePtJ'])
+    return points_df, columns_df
+
+def reference_stacked_columns(points_df, columns_df, tolerance=1e-2):
+    '''
+    the previous row by row implementation of FrameObj.stacked_columns_dataframe_by_points
+    '''
+    point_z = points_df.set_index('UniqueName')['Z'].to_dict()
+    col_info = {}
+    for _, row in columns_df.iterrows():
+        z_i, z_j = point_z[row['UniquePtI']], point_z[row['UniquePtJ']]
+        if z_i <= z_j:
+            info = (row['UniquePtI'], row['UniquePtJ'], z_i, z_j)
+        else:
+            info = (row['UniquePtJ'], row['UniquePtI'], z_j, z_i)
+        col_info[row['UniqueName']] = info
+    pt_low_map = {}
+    pt_up_map = {}
+    for col_id, info in col_info.items():
+        pt_low_map.setdefault(info[0], []).append(col_id)
+        pt_up_map.setdefault(info[1], []).append(col_id)
+    used_cols = set()
+    groups = []
+    for base_col in [c for c, info in col_info.items() if info[0] not in pt_up_map]:
+        chain = []
+        curr_col = base_col
+        while curr_col is not None:
+            chain.append(curr_col)
+            used_cols.add(curr_col)
+            next_cols = pt_low_map.get(col_info[curr_col][1], [])
+            next_col = None
+            if next_cols:
+                next_col = max(next_cols, key=lambda c: col_info[c][3] - col_info[c][2])
+                if next_col in used_cols:
+                    break
+            curr_col = next_col
+        groups.append(chain)
+    groups.extend([c] for c in col_info if c not in used_cols)
+    for group in groups:
+        group.sort(key=lambda c: col_info[c][2])
+    z_levels = sorted({z for info in col_info.values() for z in info[2:]}, reverse=True)
+    if len(z_levels) > 1:
+        z_levels = z_levels[:-1]
+    data = []
+    for z in z_levels:
+        row = []
+        for group in groups:
+            col_at_z = None
+            for col_id in group:
+                z_low, z_up = col_info[col_id][2:]
+                if z_low < z <= z_up or math.isclose(z, z_up, abs_tol=tolerance):
+                    col_at_z = col_id
+                    break
+            row.append(col_at_z)
+        data.append(row)
+    return groups, z_levels, data
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_stacked_columns_same_as_reference(seed):
+    points_df, columns_df = stacked_columns_grid(8, 30, seed=seed)
+    groups, z_levels, data = reference_stacked_columns(points_df, columns_df)
+    assert fof.group_stacked_columns(points_df, columns_df) == groups
+    assert fof.get_stacked_columns_levels(points_df, columns_df, groups) == (z_levels, data)
+
+def test_stacked_columns_tolerance():
+    points_df = pd.DataFrame([
+        {'UniqueName': 1, 'Z': 0.0},
+        {'UniqueName': 2, 'Z': 3.0},
+        {'UniqueName': 3, 'Z': 3.005},
+        {'UniqueName': 4, 'Z': 6.0},
+    ])
+    columns_df = pd.DataFrame([
+        {'UniqueName': 101, 'UniquePtI': 1, 'UniquePtJ': 2},
+        {'UniqueName': 102, 'UniquePtI': 3, 'UniquePtJ': 4},
+    ])
+    groups, z_levels, data = reference_stacked_columns(points_df, columns_df)
+    assert fof.group_stacked_columns(points_df, columns_df) == groups == [[101], [102]]
+    assert fof.get_stacked_columns_levels(points_df, columns_df, groups) == (z_levels, data)
+
+@pytest.mark.slow
+def test_stacked_columns_benchmark():
+    points_df, columns_df = stacked_columns_grid(100, 2000)
+    start = time.perf_counter()
+    groups = fof.group_stacked_columns(points_df, columns_df)
+    z_levels, data = fof.get_stacked_columns_levels(points_df, columns_df, groups)
+    elapsed = time.perf_counter() - start
+    print(f'200000 stacked columns in {elapsed:.2f} s')
+    assert len(groups) == 2000
+    assert all(len(group) == 100 for group in groups)
+    assert len(z_levels) == len(data) == 100
+    assert data[0][0] == groups[0][-1]
+    assert elapsed < 30
+
+def test_get_ev_loads():
+    df = pd.DataFrame({
+        'UniqueName': ['1', '1', '2', '3', '2'],
+        'LoadPattern': ['Dead', 'Live', 'Dead', 'Dead', 'EV'],
+        'Force': ['100', '200', '-50.5', '10', '3'],
+        'GUID': '',
+        })
+    ret = fof.get_ev_loads(df, ['1', '2'], ['Dead'], 'EV', 0.21, ('Force',))
+    assert 'GUID' not in ret.columns
+    assert ret['LoadPattern'].tolist() == ['Dead', 'Live', 'Dead', 'Dead', 'EV', 'EV']
+    assert ret['Force'].tolist()[-2:] == [21, -10]
+    ret = fof.get_ev_loads(df, ['1', '2'], ['Dead'], 'EV', 0.21, ('Force',), replace=False)
+    assert (ret['LoadPattern'] == 'EV').sum() == 3
+    additional = pd.DataFrame({'UniqueName': ['4'], 'LoadPattern': ['EV'], 'Force': [5.]})
+    ret = fof.get_ev_loads(None, ['4'], ['Dead'], 'EV', 0.21, ('Force',), additional=additional)
+    assert ret.to_dict('records') == [{'UniqueName': '4', 'LoadPattern': 'EV', 'Force': 5.}]
@@ -0,0 +1,320 @@
+import sys
+from pathlib import Path
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+etabs_api_path = Path(__file__).parent.parent
+sys.path.insert(0, str(etabs_api_path))
+
+from offline_sap_model import create_offline_etabs, grid_model_tables
+
+
+def create_etabs(**kwargs):
+    tables = grid_model_tables(**kwargs)
+    df = tables['Frame Assignments - Summary']
+    # some steel beams and a brace
+    df.loc[df['UniqueName'].isin(['40', '41']), 'DesignProc'] = 'Steel Frame'
+    df.loc[df['UniqueName'] == '42', 'Type'] = 'Brace'
+    return create_offline_etabs(tables)
+
+def test_get_beams_columns_from_tables():
+    etabs = create_etabs(stories=4, nx=3, ny=2)
+    for kwargs in (
+        {},
+        {'type_': 1},
+        {'types': [1, 2]},
+        {'story': 'Story2'},
+        {'stories': ['Story1', 'Story3']},
+        {'story': 'Story4', 'stories': ['Story1'], 'types': [1]},
+        ):
+        ret = etabs.frame_obj.get_beams_columns(**kwargs)
+        assert ret == etabs.frame_obj.get_beams_columns(use_tables=False, **kwargs)
+    beams, columns = etabs.frame_obj.get_beams_columns(type_=1)
+    assert beams == ['40', '41']
+    assert columns == []
+
+def test_get_beams_columns_from_tables_com_calls():
+    etabs = create_etabs(stories=4, nx=3, ny=2)
+    etabs.recorder.reset()
+    etabs.frame_obj.get_beams_columns(stories=['Story1', 'Story2'])
+    assert etabs.recorder.counts['DatabaseTables.GetTableForDisplayArray'] == 1
+    assert 'FrameObj.GetDesignProcedure' not in etabs.recorder.counts
+    assert 'FrameObj.GetDesignOrientation' not in etabs.recorder.counts
+
+def test_get_beams_columns_without_design_procedure_column():
+    etabs = create_etabs(stories=2, nx=2, ny=2)
+    df = etabs.SapModel.tables.get('Frame Assignments - Summary')
+    proc = dict(zip(df['UniqueName'], df['DesignProc']))
+    etabs.SapModel.tables.set('Frame Assignments - Summary', df.drop(columns='DesignProc'))
+    etabs.SapModel.FrameObj.GetDesignProcedure = lambda name: [2 if proc[name] == 'Concrete Frame' else 1, 0]
+    # the frames are classified with COM calls of get_beams_columns
+    assert etabs.frame_obj.get_frames_type_and_design_procedure() is None
+    beams, columns = etabs.frame_obj.get_beams_columns()
+    assert len(beams) == 8
+    assert len(columns) == 8
+
+def test_stacked_columns_dataframe_by_points():
+    etabs = create_etabs(stories=3, nx=2, ny=2)
+    groups = etabs.frame_obj.group_stacked_columns_by_points()
+    assert groups == [['1', '5', '9'], ['2', '6', '10'], ['3', '7', '11'], ['4', '8', '12']]
+    df = etabs.frame_obj.stacked_columns_dataframe_by_points()
+    assert list(df.index) == ['Story3', 'Story2', 'Story1']
+    assert list(df.columns) == ['C1', 'C2', 'C3', 'C4']
+    assert list(df['C1']) == ['9', '5', '1']
+
+def create_etabs_with_walls(remove_beam=False):
+    tables = grid_model_tables(stories=3, nx=2, ny=2, height=3.2)
+    df = tables['Frame Assignments - Summary']
+    # beams above the beams B1 and B2 of Story1
+    df.loc[(df['Story'] == 'Story2') & (df['Label'] == 'B1'), 'AnalysisSect'] = 'None'
+    if remove_beam:
+        df.drop(df.index[(df['Story'] == 'Story2') & (df['Label'] == 'B2')], inplace=True)
+    tables['Frame Loads Assignments - Distributed'] = tables['Frame Loads Assignments - Distributed'].iloc[:2]
+    return create_offline_etabs(tables)
+
+def test_get_beams_wall_heights():
+    etabs = create_etabs_with_walls()
+    frame_obj = etabs.frame_obj
+    beams, _ = frame_obj.get_beams_columns()
+    heights = frame_obj.get_beams_wall_heights(beams, none_beam_h=.2, parapet=1)
+    expected = [frame_obj.get_heigth_from_top_of_beam_to_buttom_of_above_beam(name, .2, 1) for name in beams]
+    assert heights.tolist() == pytest.approx(expected)
+    assert set(heights.round(6).tolist()) == {2.7, 3.0, 1}
+    heights = frame_obj.get_beams_wall_heights(beams, none_beam_h=.2, height_from_below=True)
+    expected = [frame_obj.get_heigth_from_top_of_below_story_to_below_of_beam(name, .2) * .5 for name in beams]
+    assert heights.tolist() == pytest.approx(expected)
+    # there is no beam above the beam
+    etabs = create_etabs_with_walls(remove_beam=True)
+    heights = etabs.frame_obj.get_beams_wall_heights(['13', '14', '17'], none_beam_h=.2, parapet=1)
+    assert heights.tolist() == pytest.approx([3, 1, 2.7])
+
+def test_assign_gravity_loads_from_walls():
+    etabs1 = create_etabs_with_walls()
+    etabs2 = create_etabs_with_walls()
+    beams, _ = etabs1.frame_obj.get_beams_columns()
+    for name in beams:
+        etabs1.frame_obj.assign_gravity_load_from_wall(name, 'Dead', 300, parapet=1, opening_ratio=.2)
+    etabs2.recorder.reset()
+    etabs2.frame_obj.assign_gravity_loads_from_walls(beams, 'Dead', 300, parapet=1, opening_ratio=.2)
+    assert etabs2.recorder.counts['DatabaseTables.ApplyEditedTables'] == 1
+    assert 'FrameObj.SetLoadDistributed' not in etabs2.recorder.counts
+    table_key = 'Frame Loads Assignments - Distributed'
+    cols = ['UniqueName', 'LoadPattern', 'ForceA', 'ForceB']
+    df1 = etabs1.database.read(table_key, to_dataframe=True, cols=cols)
+    df2 = etabs2.database.read(table_key, to_dataframe=True, cols=cols)
+    assert len(df1) == len(df2) == len(beams)
+    for df in (df1, df2):
+        for col in ('ForceA', 'ForceB'):
+            df[col] = df[col].astype(float).abs()
+    df1 = df1.sort_values('UniqueName', ignore_index=True)
+    df2 = df2.sort_values('UniqueName', ignore_index=True)
+    pd.testing.assert_frame_equal(df1, df2)
+
+def test_assign_gravity_loads_without_replace():
+    etabs = create_etabs_with_walls()
+    table_key = 'Frame Loads Assignments - Distributed'
+    n = len(etabs.database.read(table_key))
+    names = list(etabs.database.read(table_key, to_dataframe=True)['UniqueName'])
+    etabs.frame_obj.assign_gravity_loads(names, 'Dead', 100, 200, replace=False)
+    df = etabs.database.read(table_key, to_dataframe=True)
+    assert len(df) == 2 * n
+    assert set(df['Story']) == {'Story1'}
+    etabs.frame_obj.assign_gravity_loads(names, 'Dead', 100, 200)
+    assert len(etabs.database.read(table_key)) == n
+
+def test_assign_gravity_load_to_selfs_and_above_beams():
+    etabs = create_etabs_with_walls(remove_beam=True)
+    frame_obj = etabs.frame_obj
+    names = frame_obj.get_frames_with_same_labels(['13', '14'], ['Story1', 'Story2', 'Story3'])
+    assert names == ['13', '17', '21', '14', '22']
+    etabs.recorder.reset()
+    frame_obj.assign_gravity_load_to_selfs_and_above_beams('Live', 250, names=['13', '14'], parapet=1)
+    assert etabs.recorder.counts['DatabaseTables.ApplyEditedTables'] == 1
+    assert etabs.recorder.counts['File.Save'] == 1
+    df = etabs.database.read('Frame Loads Assignments - Distributed', to_dataframe=True)
+    df = df[df['LoadPattern'] == 'Live']
+    assert set(df['UniqueName']) == set(names)
+    beams_props = etabs.get_settings_from_model()['beams_wall_loads']
+    assert set(beams_props['wall_loadpat']) == set(names)
+
+def test_assign_gravity_load_to_selfs_and_above_beams_item_types():
+    names = ['13', '17', '21', '14', '22']
+    for item_type in (1, 2):
+        etabs = create_etabs_with_walls(remove_beam=True)
+        sap_model = etabs.SapModel
+        sap_model.GroupDef.SetGroup('walls')
+        for name in ('13', '14'):
+            sap_model.FrameObj.SetGroupAssign(name, 'walls')
+            sap_model.FrameObj.SetSelected(name, True)
+        group_names = ['walls'] if item_type == 1 else ['unused']
+        assert etabs.frame_obj.get_frame_names_of_item_type(group_names, item_type) == ['13', '14']
+        etabs.frame_obj.assign_gravity_load_to_selfs_and_above_beams('Live', 250,
+            names=group_names, item_type=item_type, parapet=1)
+        df = etabs.database.read('Frame Loads Assignments - Distributed', to_dataframe=True)
+        assert set(df.loc[df['LoadPattern'] == 'Live', 'UniqueName']) == set(names)
+    with pytest.raises(ValueError):
+        etabs.frame_obj.get_frame_names_of_item_type(['13'], 3)
+
+def test_label_index_without_com_calls():
+    etabs = create_etabs(stories=4, nx=2, ny=2)
+    frame_obj = etabs.frame_obj
+    etabs.recorder.reset()
+    columns = frame_obj.get_columns_type_names()
+    assert columns['C1'] == ['1', '5', '9', '13']
+    assert frame_obj.get_above_frames('17', ['Story1', 'Story2']) == ['17', '21']
+    assert frame_obj.is_frame_on_story('17', 'Story1')
+    assert frame_obj.get_unique_frames(['1', '5', '2'])[1] == ['C1', 'C2']
+    counts = etabs.recorder.counts
+    assert 'FrameObj.GetLabelFromName' not in counts
+    assert 'FrameObj.GetNameFromLabel' not in counts
+    assert counts['DatabaseTables.GetTableForDisplayArray'] == 2
+
+def test_label_index_invalidation():
+    etabs = create_etabs(stories=2, nx=2, ny=2)
+    frame_obj = etabs.frame_obj
+    assert frame_obj.get_name_from_label('C1', 'Story2') == '5'
+    frame_obj.delete_frames(['5'])
+    assert frame_obj.get_name_from_label('C1', 'Story2') is None
+    # frames that are added with direct COM calls are found
+    etabs.SapModel.tables.append_rows('Frame Assignments - Summary', [
+        {'Story': 'Story2', 'Label': 'C1', 'UniqueName': '100', 'Type': 'Column'}])
+    assert frame_obj.get_label_and_story('100') == ('C1', 'Story2')
+    assert frame_obj.get_name_from_label('C1', 'Story2') == '100'
+    assert frame_obj.get_label_and_story('200') == ('', '')
+
+def test_area_label_index():
+    tables = grid_model_tables(stories=2, nx=2, ny=2)
+    tables['Area Assignments - Summary'] = pd.DataFrame({
+        'Story': ['Story1', 'Story2'], 'Label': ['F1', 'F1'], 'UniqueName': ['1', '2'], 'Type': 'Floor'})
+    etabs = create_offline_etabs(tables)
+    area = etabs.area
+    assert area.get_label_and_story_from_names(['1', '2']) == {'1': ('F1', 'Story1'), '2': ('F1', 'Story2')}
+    assert area.get_name_from_label('F1', 'Story2') == '2'
+    area.delete('2')
+    assert area.get_name_from_label('F1', 'Story2') is None
+
+def create_etabs_with_point_loads():
+    etabs = create_etabs(stories=2, nx=3, ny=2)
+    beams, _ = etabs.frame_obj.get_beams_columns()
+    for i, name in enumerate(beams[:4]):
+        etabs.SapModel.FrameObj.SetLoadPoint(name, 'Dead', 1, 10, 0.5, 1234.5 + i, Replace=False)
+        etabs.SapModel.FrameObj.SetLoadPoint(name, 'Live', 1, 10, 0.25, 500, Replace=False)
+    # current ev loads
+    etabs.SapModel.FrameObj.SetLoadDistributed(beams[0], 'EV', 1, 10, 0, 1, 7, 7, Replace=False)
+    etabs.SapModel.FrameObj.SetLoadPoint(beams[5], 'EV', 1, 10, 0.5, 7, Replace=False)
+    return etabs, beams
+
+def ev_loads(etabs, table_key, force_columns):
+    df = etabs.database.read(table_key, to_dataframe=True)
+    df = df.loc[df['LoadPattern'] == 'EV']
+    cols = ['UniqueName'] + force_columns
+    return df[cols].astype({col: float for col in force_columns}).sort_values(cols).reset_index(drop=True)
+
+def test_assign_ev_with_tables():
+    frames = None
+    results = []
+    for use_tables in (True, False):
+        etabs, beams = create_etabs_with_point_loads()
+        frames = beams[:3] + beams[5:7]
+        etabs.recorder.reset()
+        etabs.frame_obj.assign_ev(frames, ['Dead'], acc=0.35, ev='EV', importance_factor=1.2, use_tables=use_tables)
+        results.append((
+            ev_loads(etabs, 'Frame Loads Assignments - Distributed', ['ForceA', 'ForceB']),
+            ev_loads(etabs, 'Frame Loads Assignments - Point', ['Force']),
+            etabs.recorder.counts,
+            ))
+    (distributed, point, counts), (distributed_com, point_com, _) = results
+    # the com loads have Z direction
+    distributed_com[['ForceA', 'ForceB']] *= -1
+    point_com['Force'] *= -1
+    pd.testing.assert_frame_equal(distributed, distributed_com.sort_values(list(distributed.columns)).reset_index(drop=True))
+    pd.testing.assert_frame_equal(point, point_com.sort_values(list(point.columns)).reset_index(drop=True))
+    assert set(distributed['UniqueName']) == set(frames)
+    assert (distributed['ForceA'] == math.ceil(1000 * 0.6 * 0.35 * 1.2)).all()
+    assert point['Force'].tolist() == [math.ceil((1234.5 + i) * 0.6 * 0.35 * 1.2) for i in range(3)]
+    assert counts['DatabaseTables.SetTableForEditingArray'] == 2
+    assert counts['FrameObj.SetLoadDistributed'] == counts['FrameObj.DeleteLoadDistributed'] == 0
+
+def test_assign_ev_without_replace():
+    etabs, beams = create_etabs_with_point_loads()
+    etabs.frame_obj.assign_ev(beams[:1], ['Dead'], acc=0.35, ev='EV', replace=False)
+    distributed = ev_loads(etabs, 'Frame Loads Assignments - Distributed', ['ForceA', 'ForceB'])
+    assert distributed['ForceA'].tolist() == [7, math.ceil(1000 * 0.6 * 0.35)]
+
+def create_etabs_with_torsion(seed=0):
+    '''
+    the torsion of beams increases with their j and a little with the j of
+    the other beams, like compatibility torsion
+    '''
+    rng = np.random.default_rng(seed)
+    etabs = create_etabs(stories=2, nx=3, ny=3)
+    etabs.SapModel.tables.set('Material Properties - Concrete Data',
+        pd.DataFrame([{'Material': 'C25', 'Fc': '25'}]))
+    beams, _ = etabs.frame_obj.get_beams_columns()
+    phi_tcr = etabs.frame_obj.get_t_crack(beams)['B40X50']
+    combos = ['COMB1', 'COMB2', 'COMB3']
+    t0 = phi_tcr * rng.uniform(0.2, 3, (len(beams), len(combos)))
+    run_analysis = etabs.run_analysis
+
+    def run_analysis_with_torsion(*args, **kwargs):
+        run_analysis(*args, **kwargs)
+        j = np.array(list(etabs.frame_obj.get_beams_torsion_prop_modifiers(beams).values()))
+        t = t0 * (j / (j + 0.3) * 1.3 * (0.8 + 0.2 * j.mean()))[:, None]
+        etabs.SapModel.tables.set('Element Forces - Beams', pd.DataFrame({
+            'Story': np.repeat([etabs.frame_obj.get_label_index().story(b) for b in beams], len(combos)),
+            'Beam': np.repeat(beams, len(combos)),
+            'UniqueName': np.repeat(beams, len(combos)),
+            'OutputCase': np.tile(combos, len(beams)),
+            'T': t.ravel(),
+            }))
+        # the results table is added after the analysis
+        etabs.database.clear_cache()
+    etabs.run_analysis = run_analysis_with_torsion
+    return etabs, beams, combos, phi_tcr
+
+def run_torsion(etabs, combos, **kwargs):
+    ret = list(etabs.frame_obj.correct_torsion_stiffness_factor(combos, num_iteration=30, **kwargs))
+    return ret[:-1], ret[-1]
+
+def test_correct_torsion_stiffness_factor_modes():
+    analyses = {}
+    for name, kwargs in (
+        ('full', {}),
+        ('incremental', {'incremental': True}),
+        ('secant', {'incremental': True, 'secant': True, 'relaxation': 0.9}),
+        ):
+        etabs, beams, combos, phi_tcr = create_etabs_with_torsion()
+        etabs.recorder.reset()
+        iterations, df = run_torsion(etabs, combos, **kwargs)
+        # converged with the torsion of all beams and combinations
+        assert (df['T'] < phi_tcr / 0.9 + 1e-9).all()
+        js = etabs.frame_obj.get_beams_torsion_prop_modifiers(beams)
+        assert np.allclose(df['j'], df['UniqueName'].map(js))
+        assert etabs.recorder.counts['FrameObj.SetModifiers'] == 0
+        history = etabs.frame_obj.torsion_history
+        assert len(history) == etabs.SapModel.number_of_analyses - 1
+        assert history[-1]['residual'] < 1 / 0.9 - 1
+        assert all(key in history[0] for key in ('active', 'changed', 'write', 'analysis', 'read'))
+        analyses[name] = etabs.SapModel.number_of_analyses
+        if name == 'incremental':
+            assert history[-1]['active'] < len(beams)
+    assert analyses['incremental'] <= analyses['full']
+    assert analyses['secant'] <= analyses['incremental']
+
+def test_update_torsion_j_same_as_before():
+    import frame_obj_funcs as fof
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'j': rng.uniform(0.01, 1, 50),
+        'T': np.r_[0, rng.uniform(0, 10, 49)],
+        'phi_Tcr': np.r_[rng.uniform(1, 5, 49), np.nan],
+        })
+    # previous correct_torsion_stiffness_factor update
+    ratio = (df['phi_Tcr'] / df['T']).replace([np.inf, -np.inf], 1).fillna(1)
+    j = (ratio * df['j']).clip(0.01, 1)
+    mask = df['T'] / df['phi_Tcr'] < 0.9
+    j[mask] = ratio.clip(0.01, 1)[mask]
+    np.testing.assert_allclose(fof.update_torsion_j(df['j'], df['T'], df['phi_Tcr']), j)
@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+etabs_api_path = Path(__file__).parent.parent
+sys.path.insert(0, str(etabs_api_path))
+
+from label_index import LabelIndex
+
+
+def create_index():
+    df = pd.DataFrame({
+        'UniqueName': ['1', '2', '3', '4', '5'],
+        'Label': ['C1', 'C1', 'B1', 'B1', 'B1'],
+        'Story': ['Story1', 'Story2', 'Story1', 'Story2', 'Story2'],
+        })
+    return LabelIndex.from_dataframe(df)
+
+def test_label_story_lookups():
+    index = create_index()
+    assert len(index) == 5
+    assert '4' in index
+    assert '6' not in index
+    assert index.label_story('4') == ('B1', 'Story2')
+    assert index.label('1') == 'C1'
+    assert index.story('3') == 'Story1'
+    assert index.label_story('6') is None
+    # the first object like GetNameFromLabel
+    assert index.name('B1', 'Story2') == '4'
+    assert index.name('C1', 'Story3') is None
+
+def test_names_by_story():
+    index = create_index()
+    assert index.unique_labels() == ['C1', 'B1']
+    assert index.unique_labels(['4', '6', '3', '1']) == ['B1', 'C1']
+    df = index.names_by_story(stories=['Story1', 'Story2', 'Story3'])
+    assert df.loc['C1'].tolist() == ['1', '2', None]
+    assert df.loc['B1'].tolist() == ['3', '4', None]
+    df = index.names_by_story(['B1'])
+    assert list(df.columns) == ['Story1', 'Story2']
+
+def test_empty_index():
+    index = LabelIndex.from_dataframe(None)
+    assert len(index) == 0
+    assert index.name('C1', 'Story1') is None
+    assert index.names_by_story().empty
@@ -1,11 +1,27 @@
 import sys
 from pathlib import Path
 import math
+import time
 
 etabs_api_path = Path(__file__).parent.parent
 sys.path.insert(0, str(etabs_api_path))
 
-from load_combinations import get_mabhas6_load_combinations, generate_concrete_load_combinations
+import numpy as np
+import pandas as pd
+
+from load_combinations import (
+    get_mabhas6_load_combinations,
+    get_mabhas6_rules,
+    MABHAS6_RULES,
+    generate_concrete_load_combinations,
+    generate_concrete_load_combinations_table,
+    generate_concrete_load_combinations_batch,
+    load_combination_parameter_grid,
+    unique_load_combinations_table,
+    )
+import pytest
+
+from offline_sap_model import create_offline_etabs, grid_model_tables
 
 
 def test_get_mabhas6_load_combinations():
@@ -102,5 +118,152 @@ def test_generate_concrete_load_combinations():
                                             dynamic=dynamic,
                                         )
         
+def test_generate_concrete_load_combinations_table():
+    equal_loads = {'Dead' : ['Dead', 'SDead'],
+                    'L' : ['Live'],
+                    'EX': ['EX'], 'EXP': ['EXP'], 'EXN': ['EXN'],
+                    'EY': ['EY'], 'EYP': ['EYP'], 'EYN': ['EYN'],
+                    'EV': ['ev'],
+                    }
+    for kwargs in (
+        {},
+        {'sequence_numbering': True, 'A': 0.35},
+        {'add_notional_loads': True, 'separate_direction': True},
+        {'design_type': 'ASD', 'rho_x': 1.2},
+        ):
+        data, _ = generate_concrete_load_combinations(equal_loads, **kwargs)
+        df, _ = generate_concrete_load_combinations_table(equal_loads, **kwargs)
+        assert list(df.columns) == ['Name', 'Type', 'LoadName', 'SF']
+        assert df['Name'].tolist() == data[0::4]
+        assert df['LoadName'].tolist() == data[2::4]
+        assert all(math.isclose(sf1, sf2) for sf1, sf2 in zip(df['SF'], data[3::4]))
+
+def test_unique_load_combinations_table():
+    df = pd.DataFrame([
+        ['C1', 'Linear Add', 'Dead', 1.2], ['C1', 'Linear Add', 'Live', 1.6],
+        ['C2', 'Linear Add', 'Live', 1.6], ['C2', 'Linear Add', 'Dead', 1.2],
+        ['C3', 'Linear Add', 'Dead', 0.6 * 2], ['C3', 'Linear Add', 'Live', 1.6],
+        ['C4', 'Linear Add', 'Dead', 0.9],
+        ['C5', 'Linear Add', 'Dead', 1.2],
+        ['C6', 'Linear Add', 'Dead', 0.9],
+        ], columns=['Name', 'Type', 'LoadName', 'SF'])
+    ret = unique_load_combinations_table(df)
+    assert ret['Name'].tolist() == ['C1', 'C1', 'C4', 'C5']
+    ret = unique_load_combinations_table(df, sequence_numbering=True, prefix='COMB', suffix='_1')
+    assert ret['Name'].tolist() == ['COMB1_1', 'COMB1_1', 'COMB2_1', 'COMB3_1']
+
+def test_apply_load_combinations_table():
+    tables = grid_model_tables(stories=1)
+    tables['Load Combination Definitions'] = pd.DataFrame([
+        ['USER1', 'Linear Add', 'No', 'Dead', '1', '', 'guid1'],
+        ['COMBO11', 'Linear Add', 'No', 'Live', '1', '', 'guid2'],
+        ], columns=['Name', 'Type', 'IsAuto', 'LoadName', 'SF', 'Notes', 'GUID'])
+    etabs = create_offline_etabs(tables)
+    etabs.recorder.reset()
+    equal_loads = {'Dead' : ['Dead'], 'L' : ['Live'], 'EX': ['EX'], 'EY': ['EY']}
+    df = etabs.load_combinations.generate_concrete_load_combinations_table(equal_loads)
+    counts = etabs.recorder.counts
+    assert counts['DatabaseTables.SetTableForEditingArray'] == 1
+    assert counts['RespCombo.Add'] == counts['RespCombo.SetCaseList'] == 0
+    names = etabs.load_combinations.get_load_combination_names()
+    assert set(names) == {'USER1'}.union(df['Name'])
+    assert etabs.SapModel.RespCombo.GetCaseList('COMBO11')[2] == ('Dead',)
+
+def test_mabhas6_rules():
+    assert len(MABHAS6_RULES) == 48
+    rules = get_mabhas6_rules('LRFD', False, True, 'ACI', '100-30')
+    assert rules is MABHAS6_RULES[('LRFD', False, True, 'ACI', '100-30')]
+    assert get_mabhas6_rules('lrfd', 0, 1, 'aci', '100-30') is rules
+    assert len(rules.combo_index) == len(rules.loads) == len(rules.scale_factors)
+    number, items = rules.combinations[0]
+    assert math.isclose(items['Dead'], rules.scale_factors[0])
+    with pytest.raises(TypeError):
+        items['Dead'] = 2
+    with pytest.raises(ValueError):
+        rules.scale_factors[0] = 2
+    d = get_mabhas6_load_combinations('LRFD', False, True, 'ACI', '100-30')
+    d[number]['Dead'] = 2
+    assert d != rules.to_dict()
+    assert get_mabhas6_load_combinations('LRFD', False, True, 'ACI', '100-30') == rules.to_dict()
+
+def test_generate_concrete_load_combinations_does_not_change_rules():
+    equal_loads = {'Dead' : ['Dead'], 'L' : ['Live'], 'EX': ['EX'], 'EY': ['EY'], 'EV': ['ev']}
+    mabhas6_load_combinations = {'51' : {'Dead':1.2, 'L':1, 'EX': 1, 'EV':1}}
+    rules = get_mabhas6_rules().to_dict()
+    for _ in range(2):
+        data, _ = generate_concrete_load_combinations(equal_loads, A=0.35)
+        assert math.isclose(data[data.index('COMBO51') + 3], 1.2 + 0.6 * 0.35)
+        data, _ = generate_concrete_load_combinations(equal_loads, A=0.35,
+            mabhas6_load_combinations=mabhas6_load_combinations)
+        assert math.isclose(data[3], 1.2 + 0.6 * 0.35)
+    assert get_mabhas6_rules().to_dict() == rules
+    assert mabhas6_load_combinations == {'51' : {'Dead':1.2, 'L':1, 'EX': 1, 'EV':1}}
+
+def test_generate_concrete_load_combinations_batch():
+    equal_loads = {'Dead' : ['Dead'], 'L' : ['Live'], 'L_5': ['L0.5'], 'Snow' : ['snow'],
+                   'EX': ['EX'], 'EXP': ['EXP'], 'EXN': ['EXN'],
+                   'EY': ['EY'], 'EYP': ['EYP'], 'EYN': ['EYN'], 'EV': ['ev'],
+                   }
+    # with rho_x=0 the combinations of +EX and -EX are the same
+    variants = load_combination_parameter_grid(rho_x=[0, 1.2], omega_y=[0, 2.5], A=[0.3, 0.35], I=[1, 1.4])
+    variants.index = [f'V{i}' for i in range(len(variants))]
+    for kwargs in (
+        {},
+        {'sequence_numbering': True, 'prefix': 'C'},
+        {'separate_direction': True, 'add_notional_loads': True, 'ev_negative': False},
+        ):
+        df, _ = generate_concrete_load_combinations_batch(equal_loads, variants, **kwargs)
+        assert list(df.columns) == ['Variant', 'Name', 'Type', 'LoadName', 'SF']
+        for variant, parameters in variants.iterrows():
+            expected, _ = generate_concrete_load_combinations_table(equal_loads, **kwargs, **parameters.to_dict())
+            ret = df.loc[df['Variant'] == variant].drop(columns='Variant').reset_index(drop=True)
+            pd.testing.assert_frame_equal(ret, expected)
+    n_combos = df.groupby('Variant')['Name'].nunique()
+    assert n_combos['V0'] < n_combos['V15']
+
+def test_generate_concrete_load_combinations_batch_hash_collisions(monkeypatch):
+    import load_combinations
+    equal_loads = {'Dead' : ['Dead'], 'L' : ['Live'], 'EX': ['EX'], 'EY': ['EY']}
+    variants = load_combination_parameter_grid(rho_x=[0, 1.2])
+    expected, _ = generate_concrete_load_combinations_batch(equal_loads, variants)
+    # all combinations have the same hash
+    monkeypatch.setattr(load_combinations, '_multiset_hash',
+        lambda combo_index, load_codes, scale_factors: np.zeros(
+            (len(scale_factors), len(np.unique(combo_index))), dtype=np.uint64))
+    df, _ = generate_concrete_load_combinations_batch(equal_loads, variants)
+    pd.testing.assert_frame_equal(df, expected)
+
+def test_generate_concrete_load_combinations_batch_parameters():
+    equal_loads = {'Dead' : ['Dead'], 'EX': ['EX'], 'EY': ['EY']}
+    variants = [{'rho_x': 1.2}, {'rho_x': 1.3}]
+    df, _ = generate_concrete_load_combinations_batch(equal_loads, variants, rho_y=1.1)
+    expected, _ = generate_concrete_load_combinations_table(equal_loads, rho_x=1.3, rho_y=1.1)
+    ret = df.loc[df['Variant'] == 1].drop(columns='Variant').reset_index(drop=True)
+    pd.testing.assert_frame_equal(ret, expected)
+    with pytest.raises(ValueError):
+        generate_concrete_load_combinations_batch(equal_loads, [{'rho': 1}])
+
+@pytest.mark.slow
+def test_generate_concrete_load_combinations_batch_benchmark():
+    equal_loads = {'Dead' : ['Dead', 'SDead'], 'L' : ['Live'], 'L_5': ['L0.5'], 'Snow' : ['snow'],
+                   'EX': ['EX'], 'EXP': ['EXP'], 'EXN': ['EXN'],
+                   'EY': ['EY'], 'EYP': ['EYP'], 'EYN': ['EYN'], 'EV': ['ev'],
+                   }
+    variants = load_combination_parameter_grid(
+        rho_x=np.linspace(1, 1.3, 10), rho_y=np.linspace(1, 1.3, 10), A=[0.3, 0.35], I=[1, 1.2, 1.4, 1.5, 1.6])
+    assert len(variants) == 1000
+    start = time.perf_counter()
+    df, _ = generate_concrete_load_combinations_batch(equal_loads, variants, separate_direction=True)
+    batch_time = time.perf_counter() - start
+    start = time.perf_counter()
+    expected = {variant: generate_concrete_load_combinations_table(
+                    equal_loads, separate_direction=True, **parameters.to_dict())[0]
+                for variant, parameters in variants.iloc[::50].iterrows()}
+    # timings are only reported, they depend on the machine
+    print(f'1000 variants: {batch_time:.3f} s, 20 runs: {time.perf_counter() - start:.3f} s')
+    for variant, expected_df in expected.items():
+        ret = df.loc[df['Variant'] == variant].drop(columns='Variant').reset_index(drop=True)
+        pd.testing.assert_frame_equal(ret, expected_df)
+
 if __name__ == "__main__":
     test_get_mabhas6_load_combinations_1()
\ No newline at end of file
@@ -0,0 +1,105 @@
+import sys
+from pathlib import Path
+import itertools
+
+import numpy as np
+import pandas as pd
+
+etabs_api_path = Path(__file__).parent.parent
+sys.path.insert(0, str(etabs_api_path))
+
+from load_patterns import SEISMIC_DIRECTIONS
+from offline_sap_model import create_offline_etabs, grid_model_tables
+
+
+def create_etabs(n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    tables = grid_model_tables(stories=1)
+    # one or more directions for each load pattern
+    combinations = [c for r in (1, 2) for c in itertools.combinations(SEISMIC_DIRECTIONS, r)]
+    names = [f'E{i}' for i in range(n)]
+    rows = []
+    for name in names:
+        directions = combinations[rng.integers(len(combinations))]
+        row = {'Name': name, 'C': '0.1'}
+        row.update({col: 'Yes' if col in directions else 'No' for col in SEISMIC_DIRECTIONS})
+        rows.append(row)
+    tables['Load Pattern Definitions - Auto Seismic - User Coefficient'] = pd.DataFrame(rows)
+    types = rng.choice(['Seismic', 'QuakeDrift'], n)
+    tables['Load Pattern Definitions'] = pd.concat([
+        tables['Load Pattern Definitions'],
+        pd.DataFrame({'Name': names, 'IsAuto': 'No', 'Type': types, 'SelfWtMult': '0'}),
+        ], ignore_index=True)
+    return create_offline_etabs(tables)
+
+def reference_seismic_load_patterns(etabs, drifts=False):
+    table_key = 'Load Pattern Definitions - Auto Seismic - User Coefficient'
+    df = etabs.database.read(table_key, to_dataframe=True)
+    drift_names = etabs.load_patterns.get_drift_load_pattern_names()
+    order = ('XDir', 'XDirMinusE', 'XDirPlusE', 'YDir', 'YDirMinusE', 'YDirPlusE')
+    ret = tuple(set() for _ in order)
+    for _, row in df.iterrows():
+        if (row['Name'] in drift_names) != drifts:
+            continue
+        for i, col in enumerate(order):
+            if all((row[c] == 'Yes') == (c == col) for c in SEISMIC_DIRECTIONS):
+                ret[i].add(row['Name'])
+    return ret
+
+def test_seismic_load_patterns_same_as_reference():
+    for seed in range(3):
+        etabs = create_etabs(seed=seed)
+        for drifts in (False, True):
+            assert etabs.load_patterns.get_seismic_load_patterns(drifts) == \
+                reference_seismic_load_patterns(etabs, drifts)
+
+def test_load_patterns_in_xy_direction():
+    etabs = create_etabs()
+    df = etabs.database.read('Load Pattern Definitions - Auto Seismic - User Coefficient', to_dataframe=True)
+    yes = df[list(SEISMIC_DIRECTIONS)] == 'Yes'
+    x = yes[['XDir', 'XDirPlusE', 'XDirMinusE']].any(axis=1)
+    y = yes[['YDir', 'YDirPlusE', 'YDirMinusE']].any(axis=1) & ~x
+    x_names, y_names = etabs.load_patterns.get_load_patterns_in_XYdirection()
+    assert x_names == set(df.loc[x, 'Name'])
+    assert y_names == set(df.loc[y, 'Name'])
+    no_ecc = (yes['XDir'] & ~yes['XDirPlusE'] & ~yes['XDirMinusE']) | \
+             (yes['YDir'] & ~yes['YDirPlusE'] & ~yes['YDirMinusE'])
+    x_names, y_names = etabs.load_patterns.get_load_patterns_in_XYdirection(only_ecc=True)
+    assert x_names == set(df.loc[x & ~no_ecc, 'Name'])
+    assert y_names == set(df.loc[y & ~no_ecc, 'Name'])
+    drift_names = etabs.load_patterns.get_drift_load_pattern_names()
+    xy_names = etabs.load_patterns.get_xy_seismic_load_patterns()
+    assert xy_names == set(df.loc[x | y, 'Name']).difference(drift_names)
+
+def test_seismic_classification_read_once():
+    etabs = create_etabs()
+    load_patterns = etabs.load_patterns
+    etabs.recorder.reset()
+    load_patterns.get_seismic_load_patterns()
+    load_patterns.get_xy_seismic_load_patterns()
+    load_patterns.get_EX_EY_load_pattern()
+    counts = etabs.recorder.counts
+    assert counts['DatabaseTables.GetTableForDisplayArray'] == 1
+    n = counts['LoadPatterns.GetLoadType']
+    load_patterns.get_xy_seismic_load_patterns_separate()
+    assert etabs.recorder.counts['LoadPatterns.GetLoadType'] == n
+    load_patterns.add_load_patterns(['EZ'], 'Seismic')
+    load_patterns.get_seismic_load_patterns()
+    assert etabs.recorder.counts['DatabaseTables.GetTableForDisplayArray'] == 2
+
+def test_seismic_classification_after_table_edit():
+    etabs = create_etabs(n=4)
+    table_key = 'Load Pattern Definitions - Auto Seismic - User Coefficient'
+    df = etabs.database.read(table_key, to_dataframe=True)
+    df[list(SEISMIC_DIRECTIONS)] = 'No'
+    df['XDir'] = 'Yes'
+    etabs.load_patterns.get_seismic_load_patterns()
+    etabs.database.apply_data(table_key, df)
+    x_names, y_names = etabs.load_patterns.get_load_patterns_in_XYdirection()
+    assert x_names == set(df['Name'])
+    assert y_names == set()
+
+def test_without_seismic_table():
+    etabs = create_offline_etabs(stories=1)
+    assert etabs.load_patterns.get_seismic_load_patterns() == tuple(set() for _ in range(6))
+    assert etabs.load_patterns.get_EX_EY_load_pattern() == (None, None)
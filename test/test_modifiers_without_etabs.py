@@ -0,0 +1,182 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+etabs_api_path = Path(__file__).parent.parent
+sys.path.insert(0, str(etabs_api_path))
+
+import modifiers
+from modifiers import ModifierTable, FRAME_MODIFIER_COLUMNS, AREA_MODIFIER_COLUMNS
+from offline_sap_model import create_offline_etabs, grid_model_tables
+
+
+def create_etabs(stories=2, seed=0):
+    rng = np.random.default_rng(seed)
+    tables = grid_model_tables(stories=stories, nx=3, ny=3)
+    summary = tables['Frame Assignments - Summary']
+    # one steel column and some frames with modifiers
+    summary.loc[0, 'DesignProc'] = 'Steel Frame'
+    names = summary['UniqueName'].iloc[::3]
+    frame_mods = pd.DataFrame(rng.integers(1, 10, (len(names), 8)) / 10,
+                              columns=FRAME_MODIFIER_COLUMNS).astype(str)
+    frame_mods.insert(0, 'UniqueName', names.to_numpy())
+    frame_mods.insert(0, 'Label', summary['Label'].iloc[::3].to_numpy())
+    frame_mods.insert(0, 'Story', summary['Story'].iloc[::3].to_numpy())
+    tables['Frame Assignments - Property Modifiers'] = frame_mods
+    areas = pd.DataFrame({
+        'Story': 'Story1',
+        'Label': [f'W{i}' for i in range(3)] + [f'F{i}' for i in range(3)],
+        'UniqueName': [str(i) for i in range(1, 7)],
+        'Type': 3 * ['Wall'] + 3 * ['Floor'],
+        })
+    tables['Area Assignments - Summary'] = areas
+    area_mods = areas[['Story', 'Label', 'UniqueName']].iloc[[1, 4]].copy()
+    for col in AREA_MODIFIER_COLUMNS:
+        area_mods[col] = '0.5'
+    tables['Area Assignments - Stiffness Modifiers'] = area_mods
+    return create_offline_etabs(tables)
+
+def frame_modifiers_com(etabs):
+    obj = etabs.SapModel.FrameObj
+    return {name: list(obj.GetModifiers(name)[0]) for name in obj.GetNameList()[1]}
+
+def area_modifiers_com(etabs):
+    obj = etabs.SapModel.AreaObj
+    return {name: list(obj.GetModifiers(name)[0]) for name in obj.GetNameList()[1]}
+
+def assert_same_modifiers(a, b):
+    assert a.keys() == b.keys()
+    for name in a:
+        np.testing.assert_allclose(a[name], b[name], err_msg=name)
+
+def reference_drift_modifiers(etabs, i_beam=0.5, i_col_wall=1, i_floor=0.25 * 1.5):
+    '''
+    the modifiers of get_drift_periods with GetModifiers and SetModifiers
+    '''
+    obj = etabs.SapModel.FrameObj
+    for label in obj.GetLabelNameList()[1]:
+        if obj.GetDesignProcedure(label)[0] == 2:
+            mods = list(obj.GetModifiers(label)[0])
+            if obj.GetDesignOrientation(label)[0] == 1:
+                mods[:6] = 6 * [i_col_wall]
+            elif obj.GetDesignOrientation(label)[0] == 2:
+                mods[4:6] = [i_beam, i_beam]
+            obj.SetModifiers(label, mods)
+    obj = etabs.SapModel.AreaObj
+    for label in obj.GetLabelNameList()[1]:
+        mods = list(obj.GetModifiers(label)[0])
+        if obj.GetDesignOrientation(label)[0] == 1:
+            mods[:6] = 6 * [i_col_wall]
+        elif obj.GetDesignOrientation(label)[0] == 2:
+            for i in range(3, 6):
+                mods[i] = i_floor * mods[-1]
+        obj.SetModifiers(label, mods)
+
+def test_read():
+    etabs = create_etabs()
+    df = ModifierTable.frames(etabs).read()
+    assert list(df.columns) == ['Story', 'Label', 'Type', 'DesignProc', 'AnalysisSect'] + FRAME_MODIFIER_COLUMNS
+    com = frame_modifiers_com(etabs)
+    assert list(df.index) == list(com)
+    np.testing.assert_allclose(df[FRAME_MODIFIER_COLUMNS].to_numpy(), list(com.values()))
+    df = ModifierTable.areas(etabs).read(['5', '2', 'unknown'])
+    assert list(df.index) == ['5', '2']
+    assert (df.loc['5', AREA_MODIFIER_COLUMNS] == 0.5).all()
+    assert (df.loc['2', AREA_MODIFIER_COLUMNS] == 0.5).all()
+
+def test_drift_modifiers_same_as_reference():
+    etabs = create_etabs()
+    reference = create_etabs()
+    reference_drift_modifiers(reference)
+    etabs.recorder.reset()
+    etabs.frame_obj.set_drift_modifiers()
+    etabs.area.set_drift_modifiers()
+    counts = etabs.recorder.counts
+    assert counts['FrameObj.GetModifiers'] == counts['FrameObj.SetModifiers'] == 0
+    assert counts['AreaObj.GetModifiers'] == counts['AreaObj.SetModifiers'] == 0
+    assert counts['DatabaseTables.SetTableForEditingArray'] == 2
+    assert_same_modifiers(frame_modifiers_com(etabs), frame_modifiers_com(reference))
+    assert_same_modifiers(area_modifiers_com(etabs), area_modifiers_com(reference))
+
+def test_assign_frame_modifiers():
+    etabs = create_etabs()
+    sections = etabs.database.read('Frame Section Property Definitions - Concrete Rectangular', to_dataframe=True)
+    sections['t3'] = ['600', '500']
+    etabs.database.apply_data('Frame Section Property Definitions - Concrete Rectangular', sections)
+    names = list(etabs.SapModel.FrameObj.GetNameList()[1])
+    before = frame_modifiers_com(etabs)
+    etabs.recorder.reset()
+    etabs.frame_obj.assign_frame_modifiers(names, torsion=0.15, i33=150,
+        design_procedure='concrete', design_orientation='column')
+    assert etabs.recorder.counts['DatabaseTables.SetTableForEditingArray'] == 1
+    assert etabs.recorder.counts['FrameObj.SetModifiers'] == 0
+    df = etabs.frame_obj.get_modifiers()
+    columns = (df['Type'] == 'Column') & (df['DesignProc'] == 'Concrete Frame')
+    assert (df.loc[columns, 'JMod'] == 0.15).all()
+    assert np.allclose(df.loc[columns, 'I3Mod'], 0.75)
+    after = frame_modifiers_com(etabs)
+    for name in df.index[~columns]:
+        assert after[name] == before[name]
+
+def test_drift_modifiers_with_design_procedure_column():
+    etabs = create_etabs()
+    reference = create_etabs()
+    reference_drift_modifiers(reference)
+    summary = etabs.SapModel.tables.get('Frame Assignments - Summary')
+    etabs.SapModel.tables.set('Frame Assignments - Summary', summary.rename(columns={'DesignProc': 'DesignProcedure'}))
+    etabs.frame_obj.set_drift_modifiers()
+    assert_same_modifiers(frame_modifiers_com(etabs), frame_modifiers_com(reference))
+
+def test_drift_modifiers_without_design_procedure():
+    etabs = create_etabs()
+    summary = etabs.SapModel.tables.get('Frame Assignments - Summary')
+    etabs.SapModel.tables.set('Frame Assignments - Summary', summary.drop(columns='DesignProc'))
+    before = frame_modifiers_com(etabs)
+    with pytest.raises(ValueError):
+        etabs.frame_obj.set_drift_modifiers()
+    summary['DesignProc'] = 'Steel Frame'
+    etabs.SapModel.tables.set('Frame Assignments - Summary', summary)
+    with pytest.raises(ValueError):
+        etabs.frame_obj.set_drift_modifiers()
+    assert frame_modifiers_com(etabs) == before
+
+def test_assign_frame_modifiers_without_match():
+    etabs = create_etabs()
+    summary = etabs.SapModel.tables.get('Frame Assignments - Summary')
+    concrete = summary.loc[summary['DesignProc'] == 'Concrete Frame', 'UniqueName'].tolist()
+    with pytest.raises(ValueError):
+        etabs.frame_obj.assign_frame_modifiers(concrete, torsion=0.15, design_procedure='steel')
+
+def test_assign_modifiers_length_without_depth():
+    df = pd.DataFrame({'I3Mod': [1., 1., 1.]}, index=['1', '2', '3'])
+    depths = pd.Series({'1': 600., '2': 100.})
+    ret = modifiers.assign_modifiers(df, {'I3Mod': 150, 'JMod': None}, depths)
+    assert ret['I3Mod'].tolist() == [0.75, 150, 1]
+    ret = modifiers.assign_modifiers(df, {'I3Mod': 150})
+    assert ret['I3Mod'].tolist() == [1, 1, 1]
+
+def test_multiply_modifiers_and_torsion():
+    etabs = create_etabs()
+    beams, _ = etabs.frame_obj.get_beams_columns(2)
+    before = etabs.frame_obj.get_modifiers(beams)
+    etabs.frame_obj.multiply_modifiers(8 * [1.4], beams)
+    after = etabs.frame_obj.get_modifiers(beams)
+    expected = np.minimum(before[FRAME_MODIFIER_COLUMNS].to_numpy() * 1.4, 1)
+    np.testing.assert_allclose(after[FRAME_MODIFIER_COLUMNS].to_numpy(), expected)
+    etabs.frame_obj.set_constant_j(0.15, beams)
+    assert set(etabs.frame_obj.get_beams_torsion_prop_modifiers(beams).values()) == {0.15}
+    coeffs = {beams[0]: 0.3, beams[1]: 0.4}
+    etabs.frame_obj.apply_torsion_stiffness_coefficient(coeffs)
+    js = etabs.frame_obj.get_beams_torsion_prop_modifiers(beams)
+    assert js[beams[0]] == 0.3 and js[beams[1]] == 0.4 and js[beams[2]] == 0.15
+
+def test_assign_slab_modifiers():
+    etabs = create_etabs()
+    etabs.area.assign_slab_modifiers(['4', '5'], m11=0.25, m22=0.25, weight=1.2)
+    mods = area_modifiers_com(etabs)
+    assert mods['4'] == [1, 1, 1, 0.25, 0.25, 1, 1, 1, 1, 1.2]
+    assert mods['5'] == [0.5, 0.5, 0.5, 0.25, 0.25, 0.5, 0.5, 0.5, 0.5, 1.2]
+    assert mods['6'] == 10 * [1]
@@ -0,0 +1,129 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+etabs_api_path = Path(__file__).parent.parent
+sys.path.insert(0, str(etabs_api_path))
+
+from database import DatabaseTables
+from etabs_model_base import EtabsModelBase
+from offline_sap_model import (
+    OfflineSapModel,
+    OfflineEtabsModel,
+    grid_model_tables,
+    create_offline_etabs,
+    load_table_dumps,
+    save_table_dumps,
+    )
+
+
+def test_get_beams_columns():
+    etabs = create_offline_etabs(stories=3, nx=2, ny=2)
+    beams, columns = etabs.frame_obj.get_beams_columns()
+    assert len(beams) == 12
+    assert len(columns) == 12
+    beams, columns = etabs.frame_obj.get_beams_columns(story='Story2')
+    assert len(beams) == 4
+    assert len(columns) == 4
+
+def test_shares_etabs_model_methods():
+    for name in ('open_model', 'run_analysis', 'unlock_model', 'unit_scope', 'update_setting', 'get_filename'):
+        assert getattr(OfflineEtabsModel, name) is getattr(EtabsModelBase, name)
+    etabs = create_offline_etabs(stories=1)
+    assert etabs.etabs_main_version == 21
+    assert etabs.seismic_drift_text == 'QuakeDrift'
+
+def test_recorder():
+    etabs = create_offline_etabs(stories=2, nx=2, ny=2)
+    etabs.recorder.reset()
+    etabs.frame_obj.get_beams_columns(use_tables=False)
+    counts = etabs.recorder.counts
+    assert counts['FrameObj.GetLabelNameList'] == 1
+    assert counts['FrameObj.GetDesignProcedure'] == 16
+    df = etabs.recorder.to_dataframe()
+    assert set(df.columns) == {'Method', 'Calls', 'Time'}
+    assert df['Calls'].sum() == etabs.recorder.total_calls
+
+def test_com_names_are_case_insensitive():
+    etabs = create_offline_etabs(stories=1)
+    etabs.SapModel.analyze.RunAnalysis()
+    assert etabs.SapModel.number_of_analyses == 1
+    assert etabs.recorder.counts['Analyze.RunAnalysis'] == 1
+
+def test_story():
+    etabs = create_offline_etabs(stories=3, height=3.2)
+    stories = etabs.story.get_sorted_story_and_levels()
+    assert stories[0][0] == 'Story3'
+    assert stories[-1] == ('Base', 0.0)
+    assert etabs.SapModel.Story.GetElevation('Story2')[0] == 6.4
+    assert etabs.SapModel.Story.GetHeight('Story1')[0] == 3.2
+
+def test_points():
+    etabs = create_offline_etabs(stories=2, nx=2, ny=2, spacing=4)
+    coords = etabs.points.get_points_coords(['1', '8'])
+    assert coords['1'] == (0, 0, 0)
+    assert coords['8'] == (4, 4, 3)
+    df = etabs.points.get_points_coordinates()
+    assert len(df) == 12
+
+def test_database_read_and_apply():
+    sap_model = OfflineSapModel(grid_model_tables(stories=2))
+    database = DatabaseTables(SapModel=sap_model)
+    table_key = 'Frame Section Property Definitions - Concrete Rectangular'
+    df = database.read(table_key, to_dataframe=True)
+    df['t3'] = '0.6'
+    database.apply_data(table_key, df)
+    assert sap_model.PropFrame.GetRectangle('C50X50')[2] == 0.6
+    assert sap_model.recorder.counts['DatabaseTables.ApplyEditedTables'] == 1
+
+def test_modifiers():
+    etabs = create_offline_etabs(stories=1, nx=2, ny=2)
+    etabs.frame_obj.set_constant_j(0.15, ['5'])
+    assert etabs.SapModel.FrameObj.GetModifiers('5')[0][3] == 0.15
+    assert etabs.SapModel.FrameObj.GetModifiers('1')[0] == (1,) * 8
+
+def test_results_linear_in_response_spectrum_scale():
+    tables = grid_model_tables(stories=1)
+    tables['Load Case Definitions - Response Spectrum'] = pd.DataFrame([
+        {'Name': 'SX', 'LoadName': 'U1', 'Function': 'SPEC', 'TransAccSF': '1', 'CoordSys': 'Global', 'Angle': '0'},
+        ])
+    tables['Base Reactions'] = pd.DataFrame([
+        {'OutputCase': 'SX', 'CaseType': 'LinRespSpec', 'StepType': 'Max', 'FX': '100', 'FY': '10'},
+        ])
+    etabs = create_offline_etabs(tables)
+    assert etabs.results.get_base_react(['SX'], ['x']) == [100]
+    etabs.load_cases.multiply_response_spectrum_scale_factor('SX', 2.5)
+    # unlocking the model removes the results
+    assert not etabs.database.table_exist('Base Reactions')
+    assert etabs.results.get_base_react(['SX'], ['x']) == [250]
+    assert etabs.SapModel.number_of_analyses == 1
+
+def test_load_combinations():
+    etabs = create_offline_etabs(stories=1)
+    etabs.load_combinations.add_load_combination('COMB1', ['Dead', 'Live'], 1.2)
+    assert etabs.load_combinations.get_load_combination_names() == ('COMB1',)
+    ret = etabs.SapModel.RespCombo.GetCaseList('COMB1')
+    assert ret[2] == ('Dead', 'Live')
+    assert ret[3] == (1.2, 1.2)
+    df = etabs.load_combinations.get_table_of_load_combinations()
+    assert len(df) == 2
+
+def test_table_dumps(tmp_path):
+    tables = grid_model_tables(stories=2)
+    save_table_dumps(tables, tmp_path)
+    loaded = load_table_dumps(tmp_path)
+    assert set(loaded) == set(tables)
+    sap_model = OfflineSapModel(tmp_path)
+    assert sap_model.FrameObj.GetNameList()[0] == len(tables['Frame Assignments - Summary'])
+
+def test_scale_units():
+    etabs = create_offline_etabs(stories=1, unit=6, scale_units=True)
+    table_key = 'Story Definitions'
+    heights = etabs.SapModel.tables.get(table_key)['Height'].tolist()
+    etabs.set_current_unit('kN', 'cm')
+    df = etabs.database.read(table_key, to_dataframe=True)
+    assert [float(h) for h in df['Height']] == [100 * float(h) for h in heights]
+    etabs.database.apply_data(table_key, df)
+    assert etabs.SapModel.tables.get(table_key)['Height'].astype(float).tolist() == \
+        [float(h) for h in heights]
@@ -0,0 +1,123 @@
+import sys
+from pathlib import Path
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+etabs_api_path = Path(__file__).parent.parent
+sys.path.insert(0, str(etabs_api_path))
+
+import points_functions
+from points_functions import PointsIndex
+from offline_sap_model import create_offline_etabs, grid_model_tables
+
+
+def grid_points_index(nx=10, ny=8, levels=(0, 3, 6), spacing=5.0, cell_size=None):
+    names = []
+    xyz = []
+    for z in levels:
+        for i in range(nx):
+            for j in range(ny):
+                names.append(str(len(names) + 1))
+                xyz.append((i * spacing, j * spacing, z))
+    return PointsIndex(names, xyz, cell_size)
+
+def test_points_index_coords_and_bounds():
+    index = grid_points_index(nx=3, ny=2, levels=(0, 3))
+    assert len(index) == 12
+    assert '12' in index and '13' not in index
+    assert index.coords(['1', '12', '13']) == {'1': (0, 0, 0), '12': (10, 5, 3)}
+    assert index.bounds() == (0, 0, 0, 10, 5, 3)
+    assert index.unique_coordinates() == ([0, 5, 10], [0, 5], [0, 3])
+    empty = PointsIndex([], [])
+    assert empty.bounds() == (np.inf,) * 3 + (-np.inf,) * 3
+    assert empty.nearest(0, 0, 0) == (None, np.inf)
+
+def test_points_index_from_dataframe():
+    df = pd.DataFrame({'UniqueName': ['a', 'b'], 'X': ['0', '1.5'], 'Y': [0, 2], 'Z': [1, 1]})
+    index = PointsIndex.from_dataframe(df)
+    assert index.coords() == {'a': (0, 0, 1), 'b': (1.5, 2, 1)}
+
+def test_points_index_queries():
+    index = grid_points_index()
+    assert index.on_level(3.005) == [str(i) for i in range(81, 161)]
+    assert index.on_level(4) == []
+    assert index.within(5.004, 10, tolerance=0.01) == ['11', '91', '171']
+    assert index.within(5.004, 10, 6, tolerance=0.01) == ['171']
+    assert index.within(2.5, 10) == []
+    assert len(index.within(2.5, 2.5, tolerance=10)) == 27
+    name, distance = index.nearest(11, 14, 2)
+    assert name == '100'
+    assert np.isclose(distance, np.sqrt(1 + 1 + 1))
+    name, distance = index.nearest(1000, 1000, 0)
+    assert index.coords([name])[name] == (45, 35, 0)
+
+def test_points_index_same_as_brute_force():
+    rng = np.random.default_rng(1)
+    xyz = rng.uniform(-50, 50, (500, 3))
+    names = [str(i) for i in range(500)]
+    for cell_size in (None, 0.5, 40):
+        index = PointsIndex(names, xyz, cell_size)
+        for x, y, z in rng.uniform(-60, 60, (20, 3)):
+            distances = np.linalg.norm(xyz - (x, y, z), axis=1)
+            name, distance = index.nearest(x, y, z)
+            assert name == names[int(np.argmin(distances))]
+            assert np.isclose(distance, distances.min())
+            filt = (np.abs(xyz[:, 0] - x) <= 8) & (np.abs(xyz[:, 1] - y) <= 8)
+            assert index.within(x, y, tolerance=8) == [names[i] for i in np.flatnonzero(filt)]
+
+def create_two_models(nx=4, ny=3, spacing=5):
+    tables1 = grid_model_tables(stories=2, nx=nx, ny=ny, spacing=spacing)
+    base_points = tables1['Point Object Connectivity'].iloc[:nx * ny]
+    rows = []
+    for case in ('Dead', 'Live'):
+        for name in base_points['UniqueName']:
+            rows.append({'Story': 'Base', 'Label': name, 'UniqueName': name, 'OutputCase': case,
+                         'CaseType': 'LinStatic', 'FX': '1', 'FY': '0', 'FZ': str(10 * int(name)),
+                         'MX': '0', 'MY': '0', 'MZ': '0'})
+    tables1['Joint Reactions'] = pd.DataFrame(rows)
+    model1 = create_offline_etabs(tables1)
+    # foundation model with shifted point names
+    tables2 = grid_model_tables(stories=1, nx=nx + 1, ny=ny, spacing=spacing)
+    model2 = create_offline_etabs(tables2)
+    return model1, model2
+
+def test_get_similar_points_in_two_models():
+    model1, model2 = create_two_models()
+    model1.recorder.reset()
+    model2.recorder.reset()
+    ret = points_functions.get_similar_points_in_two_models(model1, model2, 0, 0)
+    assert model1.recorder.counts['PointObj.GetCoordCartesian'] == 0
+    assert model2.recorder.counts['PointObj.GetCoordCartesian'] == 0
+    assert len(ret) == 12
+    assert ret['1'] == '1'
+    assert ret['12'] == '12'
+    assert model1.SapModel.PointObj.GetCoordCartesian('5')[:2] == model2.SapModel.PointObj.GetCoordCartesian(ret['5'])[:2]
+    assert points_functions.get_similar_points_in_two_models(model1, model2, 3, 3) == {
+        str(i): str(i + 3) for i in range(13, 25)}
+
+def test_transfer_loads_between_two_models():
+    model1, model2 = create_two_models()
+    ret = points_functions.transfer_loads_between_two_models(
+        model1, model2, 0, 0, {'Dead': 'Dead', 'Live': 'Live'}, multiply=2)
+    assert ret == []
+    assert model1.recorder.counts['Results.JointReact'] == 0
+    df = model2.SapModel.tables.get('Joint Loads Assignments - Force')
+    assert len(df) == 24
+    row = df.loc[(df['UniqueName'] == '7') & (df['LoadPattern'] == 'Live')].iloc[0]
+    assert float(row['FZ']) == -140
+    assert float(row['FX']) == -2
+
+@pytest.mark.slow
+def test_get_similar_points_in_two_models_benchmark():
+    tables = grid_model_tables(stories=1, nx=125, ny=120)
+    model1 = create_offline_etabs(tables)
+    model2 = create_offline_etabs(tables)
+    start = time.perf_counter()
+    ret = points_functions.get_similar_points_in_two_models(model1, model2, 0, 0)
+    elapsed = time.perf_counter() - start
+    print(f'{len(ret)} similar points of 30000 points in {elapsed:.2f} s')
+    assert len(ret) == 15000
+    assert elapsed < 30
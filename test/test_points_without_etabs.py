@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+
+etabs_api_path = Path(__file__).parent.parent
+sys.path.insert(0, str(etabs_api_path))
+
+from offline_sap_model import create_offline_etabs
+
+
+def test_points_helpers_read_table_once():
+    etabs = create_offline_etabs(stories=2, nx=3, ny=2, spacing=4)
+    etabs.recorder.reset()
+    coords = etabs.points.get_points_coords(['1', '18'])
+    assert coords == {'1': (0, 0, 0), '18': (8, 4, 6)}
+    assert etabs.points.get_boundbox_coords() == (0, 0, 0, 8, 4, 6)
+    xs, ys, zs = etabs.points.get_unique_xyz_coordinates()
+    assert (xs, ys, zs) == ([0, 4, 8], [0, 4], [0, 3, 6])
+    counts = etabs.recorder.counts
+    assert counts['PointObj.GetCoordCartesian'] == 0
+    assert counts['DatabaseTables.GetTableForDisplayArray'] == 3
+
+def test_points_spatial_queries():
+    etabs = create_offline_etabs(stories=2, nx=3, ny=2, spacing=4)
+    assert etabs.points.get_points_on_level(3) == [str(i) for i in range(7, 13)]
+    assert etabs.points.get_points_within(4, 4) == ['4', '10', '16']
+    assert etabs.points.get_points_within(4, 4, 3) == ['10']
+    assert etabs.points.get_nearest_point(4.1, 3.9, 3.1)[0] == '10'
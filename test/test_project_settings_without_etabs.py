@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+import json
+
+import pytest
+
+etabs_api_path = Path(__file__).parent.parent
+sys.path.insert(0, str(etabs_api_path))
+
+from offline_sap_model import create_offline_etabs
+
+
+def create_etabs(settings=None):
+    etabs = create_offline_etabs(stories=1)
+    if settings is not None:
+        etabs.SapModel.SetProjectInfo("Company Name", json.dumps(settings))
+    etabs.recorder.reset()
+    return etabs
+
+def saves(etabs):
+    return etabs.recorder.counts['File.Save']
+
+def project_info_calls(etabs):
+    return (etabs.recorder.counts['GetProjectInfo'],
+            etabs.recorder.counts['SetProjectInfo'])
+
+def test_settings_read_once():
+    etabs = create_etabs({'ex_combobox': 'EX'})
+    d = etabs.get_settings_from_model()
+    assert d == {'ex_combobox': 'EX'}
+    d['ex_combobox'] = 'EXP'
+    assert etabs.get_settings_from_model() == {'ex_combobox': 'EX'}
+    assert project_info_calls(etabs) == (1, 0)
+    etabs.get_settings_from_model(refresh=True)
+    assert project_info_calls(etabs) == (2, 0)
+
+def test_settings_without_project_info():
+    etabs = create_etabs()
+    assert etabs.get_settings_from_model() == {}
+    etabs.SapModel.SetProjectInfo("Company Name", "company")
+    assert etabs.get_settings_from_model(refresh=True) == {}
+
+def test_update_setting_saves_once():
+    etabs = create_etabs({'a': 1})
+    etabs.update_setting(['b'], [2])
+    assert saves(etabs) == 1
+    etabs.update_setting({'b': 2})
+    assert saves(etabs) == 1
+    assert json.loads(etabs.SapModel.project_info["Company Name"]) == {'a': 1, 'b': 2}
+
+def test_transaction():
+    etabs = create_etabs({'a': 1})
+    with etabs.settings.transaction():
+        etabs.update_setting(['b'], [2])
+        with etabs.settings.transaction():
+            etabs.update_setting({'c': 3})
+            etabs.set_settings_to_model({'a': 0, 'b': 2, 'c': 3})
+        assert saves(etabs) == 0
+        assert etabs.get_settings_from_model() == {'a': 0, 'b': 2, 'c': 3}
+    assert saves(etabs) == 1
+    assert project_info_calls(etabs) == (1, 1)
+    assert json.loads(etabs.SapModel.project_info["Company Name"]) == {'a': 0, 'b': 2, 'c': 3}
+    assert not etabs.settings.flush()
+
+def test_transaction_discards_changes_on_error():
+    etabs = create_etabs({'a': 1})
+    with pytest.raises(ValueError):
+        with etabs.settings.transaction():
+            etabs.update_setting(['a'], [2])
+            raise ValueError
+    assert saves(etabs) == 0
+    assert etabs.get_settings_from_model() == {'a': 1}
+
+def test_settings_of_other_model():
+    etabs = create_etabs({'a': 1})
+    etabs.get_settings_from_model()
+    # other file opens with direct COM call
+    etabs.SapModel.filename = 'other.EDB'
+    etabs.SapModel.SetProjectInfo("Company Name", json.dumps({'a': 2}))
+    assert etabs.get_settings_from_model() == {'a': 2}
@@ -0,0 +1,211 @@
+import sys
+from pathlib import Path
+import math
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+etabs_api_path = Path(__file__).parent.parent
+sys.path.insert(0, str(etabs_api_path))
+
+import spectrum_scale
+from offline_sap_model import create_offline_etabs, grid_model_tables
+
+
+class LinearSpectra:
+    '''
+    base shears that are linear in the scale factors, one analysis for each
+    read after the scales change
+    '''
+    def __init__(self, v):
+        self.v0 = dict(v)
+        self.scales = dict.fromkeys(v, 1.)
+        self.analyses = 0
+
+    def read(self, specs):
+        self.analyses += 1
+        return [self.v0[spec] * self.scales[spec] for spec in specs]
+
+    def apply(self, spec, scale, scale_min=1.0):
+        self.scales[spec] *= max(scale, scale_min)
+
+def reference_fixed_point(spectra, specs, targets, tolerance=.05, num_iteration=3):
+    '''
+    the loop of scale_response_spectrums before the solver
+    '''
+    for i in range(num_iteration):
+        v = spectra.read(specs)
+        scales = [target / vi for target, vi in zip(targets, v)]
+        if max(scales) < 1 + tolerance and min(scales) > 1 - tolerance:
+            break
+        for spec, scale in zip(specs, scales):
+            spectra.apply(spec, scale)
+    return scales
+
+def test_solve_spectrum_scales():
+    specs = ['SX', 'SXE', 'SY']
+    v0 = {'SX': 100., 'SXE': 120., 'SY': 50.}
+    targets = [180., 180., 90.]
+    reference = LinearSpectra(v0)
+    reference_fixed_point(reference, specs, targets)
+    spectra = LinearSpectra(v0)
+    scales, v, report = spectrum_scale.solve_spectrum_scales(
+        spectra.read, spectra.apply, specs, targets, spectra.read(specs))
+    np.testing.assert_allclose(scales, 1)
+    np.testing.assert_allclose(v, targets)
+    assert spectra.scales == reference.scales
+    assert report['analyses'] == spectra.analyses == 2
+    assert report['fixed_point_analyses'] == reference.analyses
+    assert report['saved'] == 0
+
+def test_solve_spectrum_scales_without_verify():
+    spectra = LinearSpectra({'SX': 100., 'SY': 50.})
+    scales, v, report = spectrum_scale.solve_spectrum_scales(
+        spectra.read, spectra.apply, ['SX', 'SY'], [180., 90.], spectra.read(['SX', 'SY']), verify=False)
+    np.testing.assert_allclose(v, [180., 90.])
+    assert spectra.analyses == report['analyses'] == 1
+    assert report['saved'] == 1
+
+def test_spectra_greater_than_targets():
+    specs = ['SX', 'SY']
+    v0 = {'SX': 300., 'SY': 50.}
+    targets = [180., 90.]
+    reference = LinearSpectra(v0)
+    reference_fixed_point(reference, specs, targets)
+    spectra = LinearSpectra(v0)
+    scales, v, report = spectrum_scale.solve_spectrum_scales(
+        spectra.read, spectra.apply, specs, targets, spectra.read(specs))
+    assert spectra.scales == reference.scales
+    assert scales[0] == 0.6
+    # the fixed point iteration analyzes again while scale_min keeps SX
+    assert reference.analyses == report['fixed_point_analyses'] == 3
+    assert report['analyses'] == 2
+    assert report['saved'] == 1
+
+def test_already_scaled():
+    spectra = LinearSpectra({'SX': 180., 'SY': 91.})
+    scales, v, report = spectrum_scale.solve_spectrum_scales(
+        spectra.read, spectra.apply, ['SX', 'SY'], [180., 90.], spectra.read(['SX', 'SY']))
+    assert spectra.analyses == report['analyses'] == report['fixed_point_analyses'] == 1
+    assert report['iterations'] == 0
+
+def test_offline_base_reactions():
+    tables = grid_model_tables(stories=1)
+    tables['Load Case Definitions - Response Spectrum'] = pd.DataFrame([
+        {'Name': 'SX', 'LoadName': 'U1', 'Function': 'SPEC', 'TransAccSF': '9.81', 'CoordSys': 'Global', 'Angle': '0'},
+        {'Name': 'SY', 'LoadName': 'U2', 'Function': 'SPEC', 'TransAccSF': '9.81', 'CoordSys': 'Global', 'Angle': '0'},
+        ])
+    tables['Base Reactions'] = pd.DataFrame([
+        {'OutputCase': 'EX', 'CaseType': 'LinStatic', 'StepType': '', 'FX': '-200', 'FY': '0'},
+        {'OutputCase': 'EY', 'CaseType': 'LinStatic', 'StepType': '', 'FX': '0', 'FY': '-250'},
+        {'OutputCase': 'SX', 'CaseType': 'LinRespSpec', 'StepType': 'Max', 'FX': '100', 'FY': '10'},
+        {'OutputCase': 'SY', 'CaseType': 'LinRespSpec', 'StepType': 'Max', 'FX': '12', 'FY': '150'},
+        ])
+    etabs = create_offline_etabs(tables)
+    etabs.recorder.reset()
+    directions = ['x', 'y', 'x', 'y']
+    v = etabs.results.get_base_react(['EX', 'EY', 'SX', 'SY'], directions, absolute=True)
+    assert etabs.recorder.counts['Results.BaseReact'] == 1
+    targets = [0.9 * v[0], 0.9 * v[1]]
+
+    def read(specs):
+        return etabs.results.get_base_react(specs, directions[2:], absolute=True)
+
+    scales, v, report = spectrum_scale.solve_spectrum_scales(
+        read, etabs.load_cases.multiply_response_spectrum_scale_factor, ['SX', 'SY'], targets, v[2:])
+    np.testing.assert_allclose(v, [180, 225])
+    np.testing.assert_allclose(scales, 1)
+    assert etabs.SapModel.number_of_analyses == report['analyses'] - 1 == 1
+    sf = etabs.SapModel.LoadCases.ResponseSpectrum.GetLoads('SX')[3][0]
+    assert np.isclose(sf, 9.81 * 1.8)
+
+def section_cut_forces(n_angles=36, n_cuts=3, ex_names=('EX', 'EXP'), ey_names=('EY',), seed=0):
+    '''
+    'Section Cut Forces - Analysis' table with n_cuts section cuts for each angle
+    '''
+    rng = np.random.default_rng(seed)
+    angles = list(range(0, 10 * n_angles, 10))
+    cuts = [f'SEC{angle}_{i}' for angle in angles for i in range(n_cuts)]
+    section_cut_angles = {cut: angle for angle in angles for cut in cuts if cut.startswith(f'SEC{angle}_')}
+    angle_specs = {angle: f'SPEC{angle}' for angle in angles}
+    cases = list(ex_names) + list(ey_names) + list(angle_specs.values())
+    df = pd.DataFrame({
+        'SectionCut': np.repeat(cuts, len(cases)),
+        'OutputCase': np.tile(cases, len(cuts)),
+        'F1': rng.uniform(-1000, 1000, len(cuts) * len(cases)).round(3).astype(str),
+        'F2': '0',
+        })
+    return df, section_cut_angles, angle_specs
+
+def reference_section_cuts_base_shear(df, ex_names, ey_names, section_cut_angles, angle_specs):
+    '''
+    the aggregation of angles_response_spectrums_analysis before section_cuts_base_shear
+    '''
+    df = df.drop_duplicates(['SectionCut', 'OutputCase'], keep='last').copy()
+    df['angle'] = df['SectionCut'].replace(section_cut_angles)
+    angles = df['angle'].unique()
+    df['angle_spec'] = df['angle'].replace(angle_specs)
+    spec_sec_angle = df[df['OutputCase'] == df['angle_spec']]
+    df['F1'] = df['F1'].astype(float)
+    base_shear_spec, base_shear_ex, base_shear_ey, angle_specs = {}, {}, {}, {}
+    for i, row in spec_sec_angle.iterrows():
+        spec = row['OutputCase']
+        section_cut = row['SectionCut']
+        angle = row['angle']
+        angle_specs[angle] = spec
+        df_angle_section = df[(df['SectionCut'] == section_cut) & (df['angle'] == angle)][['F1', 'OutputCase']]
+        df_angle_section.set_index('OutputCase', inplace=True)
+        base_shear_ex[angle] = abs(sum(df_angle_section.loc[ex_names, 'F1']))
+        base_shear_ey[angle] = abs(sum(df_angle_section.loc[ey_names, 'F1']))
+        base_shear_spec[angle] = abs(df_angle_section.loc[spec, 'F1'])
+    df = pd.DataFrame({
+        'angle': angles,
+        'spec': [angle_specs[angle] for angle in angles],
+        'F_spec': [base_shear_spec[angle] for angle in angles],
+        'F_ex': [base_shear_ex[angle] for angle in angles],
+        'F_ey': [base_shear_ey[angle] for angle in angles],
+        })
+    df['F_static'] = df.apply(lambda row: math.sqrt(row['F_ex'] ** 2 + row['F_ey'] ** 2), axis=1)
+    df['Ratio'] = df.apply(lambda row: row['F_spec'] / row['F_static'], axis=1)
+    return df
+
+def test_section_cuts_base_shear_same_as_reference():
+    ex_names, ey_names = ['EX', 'EXP'], ['EY']
+    for seed in range(3):
+        df, section_cut_angles, angle_specs = section_cut_forces(n_angles=12, n_cuts=1, seed=seed)
+        # repeated rows keep the last one
+        df = pd.concat([df.iloc[:5].assign(F1='0'), df], ignore_index=True)
+        expected = reference_section_cuts_base_shear(df, ex_names, ey_names, section_cut_angles, angle_specs)
+        ret = spectrum_scale.section_cuts_base_shear(df, ex_names, ey_names, section_cut_angles, angle_specs)
+        assert ret['SectionCut'].tolist() == [f'SEC{angle}_0' for angle in ret['angle']]
+        pd.testing.assert_frame_equal(ret[expected.columns], expected, check_dtype=False)
+
+def test_section_cuts_base_shear_without_spectrum():
+    df, section_cut_angles, angle_specs = section_cut_forces(n_angles=3, n_cuts=2)
+    del angle_specs[10]
+    df = df.loc[df['OutputCase'] != 'SPEC20']
+    ret = spectrum_scale.section_cuts_base_shear(df, ['EX'], ['EY'], section_cut_angles, angle_specs)
+    assert ret['angle'].tolist() == [0]
+    assert ret['SectionCut'].tolist() == ['SEC0_1']
+
+@pytest.mark.slow
+def test_section_cuts_base_shear_benchmark():
+    ex_names, ey_names = ['EX', 'EXP'], ['EY']
+    df, section_cut_angles, angle_specs = section_cut_forces(n_angles=36, n_cuts=1)
+    start = time.perf_counter()
+    expected = reference_section_cuts_base_shear(df, ex_names, ey_names, section_cut_angles, angle_specs)
+    reference_time = time.perf_counter() - start
+    start = time.perf_counter()
+    ret = spectrum_scale.section_cuts_base_shear(df, ex_names, ey_names, section_cut_angles, angle_specs)
+    vectorized_time = time.perf_counter() - start
+    pd.testing.assert_frame_equal(ret[expected.columns], expected, check_dtype=False)
+    # timings are only reported, they depend on the machine
+    print(f'reference: {reference_time:.3f} s, vectorized: {vectorized_time:.3f} s')
+    # many section cuts for each angle
+    df, section_cut_angles, angle_specs = section_cut_forces(n_angles=36, n_cuts=200)
+    start = time.perf_counter()
+    ret = spectrum_scale.section_cuts_base_shear(df, ex_names, ey_names, section_cut_angles, angle_specs)
+    print(f'{len(df)} rows: {time.perf_counter() - start:.3f} s')
+    assert len(ret) == 36
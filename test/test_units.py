@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+etabs_api_path = Path(__file__).parent.parent
+sys.path.insert(0, str(etabs_api_path))
+
+import units
+from offline_sap_model import create_offline_etabs
+from python_functions import change_unit
+
+
+def unit_calls(etabs):
+    counts = etabs.recorder.counts
+    return counts['GetPresentUnits'], counts['SetPresentUnits']
+
+def test_unit_factor():
+    assert units.unit_factor(('kN', 'm'), ('N', 'mm')) == 1000
+    assert units.unit_factor(('kN', 'm'), ('N', 'mm'), force=0, length=1) == 1000
+    assert np.isclose(units.unit_factor(('tonf', 'm'), ('kgf', 'cm'), force=1, length=-2), 0.1)
+    np.testing.assert_allclose(
+        units.convert_unit([1, 2.5], ('kgf', 'm'), ('N', 'cm'), force=0, length=1), [100, 250])
+    assert units.convert_unit(2, ('kip', 'ft'), ('kip', 'inch'), force=0, length=1) == pytest.approx(24)
+
+def test_unit_scope_restores_unit():
+    etabs = create_offline_etabs(stories=1)
+    with etabs.unit_scope('kgf', 'cm') as unit:
+        assert unit == ('kgf', 'cm')
+        assert etabs.SapModel.GetPresentUnits() == 14
+        with etabs.unit_scope(length='m'):
+            assert etabs.get_current_unit() == ('kgf', 'm')
+        assert etabs.get_current_unit() == ('kgf', 'cm')
+    assert etabs.SapModel.GetPresentUnits() == 6
+    with pytest.raises(ValueError):
+        with etabs.unit_scope('tonf', 'm'):
+            etabs.set_current_unit('N', 'mm')
+            raise ValueError
+    assert etabs.get_current_unit() == ('kn', 'm')
+
+def test_unit_scope_skips_redundant_switches():
+    etabs = create_offline_etabs(stories=1)
+    etabs.recorder.reset()
+    with etabs.unit_scope('kgf', 'm'):
+        for _ in range(10):
+            etabs.set_current_unit('kgf', 'm')
+            etabs.get_current_unit()
+        with etabs.unit_scope('kgf', 'm'):
+            pass
+    # one read of present unit, one switch and one restore
+    assert unit_calls(etabs) == (1, 2)
+    etabs.recorder.reset()
+    with etabs.unit_scope('kN', 'm'):
+        pass
+    assert unit_calls(etabs) == (1, 0)
+
+def test_change_unit():
+    class Obj:
+        def __init__(self, etabs):
+            self.etabs = etabs
+
+        @change_unit('N', 'mm')
+        def unit(self):
+            return self.etabs.get_current_unit()
+
+        @change_unit(length='cm')
+        def nested_unit(self):
+            return self.unit(), self.etabs.get_current_unit()
+
+    etabs = create_offline_etabs(stories=1)
+    obj = Obj(etabs)
+    assert obj.unit() == ('n', 'mm')
+    assert obj.nested_unit() == (('n', 'mm'), ('kn', 'cm'))
+    assert etabs.get_current_unit() == ('kn', 'm')
+    assert Obj.unit.__name__ == 'unit'
+
+def test_convert_unit_without_switching():
+    etabs = create_offline_etabs(stories=2, height=3)
+    etabs.recorder.reset()
+    levels = etabs.story.get_sorted_story_and_levels(unit='mm')
+    assert levels == [('Story2', 6000), ('Story1', 3000), ('Base', 0)]
+    assert etabs.recorder.counts['SetPresentUnits'] == 0
+    np.testing.assert_allclose(etabs.convert_unit([1, 2], ('kgf', 'm')), [101.97162, 203.94324])
@@ -0,0 +1,142 @@
+'''
+Present unit of a model with re-entrant unit scopes.
+
+    with etabs.unit_scope('kgf', 'm'):
+        etabs.story.get_top_bot_levels()
+        with etabs.unit_scope(length='cm'):
+            ...
+
+Inside a scope the present unit is tracked locally, so get_current_unit does
+not call the program and set_current_unit skips the switches to the present
+unit. The unit of the outer scope is restored even if an exception raises.
+Values can also be converted to another unit without changing the present
+unit with convert_unit.
+'''
+
+from contextlib import contextmanager
+from typing import Iterable, Union
+
+import numpy as np
+
+
+__all__ = ['UnitState', 'unit_factor', 'convert_unit']
+
+# force units in N
+FORCE_FACTORS = {
+    'ib': 4.4482216152605,
+    'lb': 4.4482216152605,
+    'kip': 4448.2216152605,
+    'n': 1,
+    'kn': 1000,
+    'kgf': 9.80665,
+    'tonf': 9806.65,
+}
+
+# length units in m
+LENGTH_FACTORS = {
+    'inch': 0.0254,
+    'in': 0.0254,
+    'ft': 0.3048,
+    'micron': 1e-6,
+    'mm': 0.001,
+    'cm': 0.01,
+    'm': 1,
+}
+
+
+def unit_factor(from_unit: tuple,
+                to_unit: tuple,
+                force: int=1,
+                length: int=0,
+                ) -> float:
+    '''
+    return the factor that converts a value from_unit to to_unit, units are
+    (force, length) and the value has dimension force ** force * length ** length,
+    e.g. stress is force=1, length=-2
+    '''
+    factor = 1.0
+    if force:
+        factor *= (FORCE_FACTORS[from_unit[0].lower()] / FORCE_FACTORS[to_unit[0].lower()]) ** force
+    if length:
+        factor *= (LENGTH_FACTORS[from_unit[1].lower()] / LENGTH_FACTORS[to_unit[1].lower()]) ** length
+    return factor
+
+def convert_unit(values: Union[float, Iterable],
+                 from_unit: tuple,
+                 to_unit: tuple,
+                 force: int=1,
+                 length: int=0,
+                 ) -> Union[float, np.ndarray]:
+    '''
+    convert values from_unit to to_unit, see unit_factor
+    '''
+    factor = unit_factor(from_unit, to_unit, force, length)
+    if np.isscalar(values):
+        return values * factor
+    return np.asarray(values, dtype=float) * factor
+
+
+class UnitState:
+    def __init__(self, etabs):
+        self.etabs = etabs
+        # present unit inside scopes, like ('kgf', 'm')
+        self.unit = None
+        self.depth = 0
+
+    @staticmethod
+    def unit_key(force: str, length: str) -> str:
+        return f"{force}_{length}".lower()
+
+    def get_current_unit(self) -> tuple:
+        if self.depth and self.unit is not None:
+            return self.unit
+        unit_num = self.etabs.SapModel.GetPresentUnits()
+        for unit_str, n in self.etabs.enum_units.items():
+            if n == unit_num:
+                force, length = unit_str.split("_")[0:2]
+                break
+        else:
+            force, length = 'N', 'mm'
+            self.etabs.SapModel.SetPresentUnits(9)
+        if self.depth:
+            self.unit = (force.lower(), length.lower())
+        return force, length
+
+    def set_current_unit(self, force: str, length: str) -> None:
+        key = self.unit_key(force, length)
+        number = self.etabs.enum_units.get(key, None)
+        if number is None:
+            raise KeyError
+        unit = tuple(key.split("_"))
+        if self.depth and self.unit == unit:
+            return
+        self.etabs.SapModel.SetPresentUnits(number)
+        if self.depth:
+            self.unit = unit
+
+    @contextmanager
+    def scope(self,
+              force: Union[str, None]=None,
+              length: Union[str, None]=None,
+              ):
+        '''
+        set the present unit, None keeps the present force or length, and restore
+        the previous unit at the end
+        '''
+        previous = self.get_current_unit()
+        self.depth += 1
+        if self.unit is None:
+            self.unit = tuple(u.lower() for u in previous)
+        try:
+            self.set_current_unit(
+                force if force is not None else previous[0],
+                length if length is not None else previous[1],
+                )
+            yield self.unit
+        finally:
+            try:
+                self.set_current_unit(*previous)
+            finally:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.unit = None
@@ -34,7 +34,7 @@ class View:
             label : str,
             story : str,
             ):
-        name = self.SapModel.FrameObj.GetNameFromLabel(label, story)[0]
+        name = self.etabs.frame_obj.get_name_from_label(label, story)
         return self.show_frame(name)
     
     def show_frames(